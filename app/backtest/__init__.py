@@ -0,0 +1,14 @@
+from .crossover import CrossoverStrategy, crossover_backtest
+from .engine import Backtester, BacktestResult, Trade, load_candles
+from .exchange import SimulatedExchange, SimulatedOrderExecutor
+
+__all__ = [
+    'Backtester',
+    'CrossoverStrategy',
+    'crossover_backtest',
+    'BacktestResult',
+    'Trade',
+    'load_candles',
+    'SimulatedExchange',
+    'SimulatedOrderExecutor',
+]
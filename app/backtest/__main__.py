@@ -0,0 +1,42 @@
+# app/backtest/__main__.py
+"""Прогон MA-стратегии по свечам из data/candles.
+
+Запуск из корня репозитория:
+    python -m app.backtest SOLUSDT BTCUSDT --interval 3
+    python -m app.backtest SOLUSDT BTCUSDT --vectorized   # только EMA-кроссовер, быстро
+"""
+import argparse
+
+from app.backtest.crossover import crossover_backtest
+from app.backtest.engine import Backtester, format_report, load_candles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бэктест MA-стратегии по сохраненным свечам")
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--interval", default="3")
+    parser.add_argument("--balance", type=float, default=100.0)
+    parser.add_argument("--slippage", type=float, default=0.0005)
+    parser.add_argument("--vectorized", action="store_true",
+                        help="упрощенные правила кроссовера целыми массивами")
+    args = parser.parse_args()
+
+    candles = load_candles(args.symbols, args.interval)
+    missing = sorted(set(args.symbols) - set(candles))
+    if missing:
+        print(f"Нет сохраненных свечей: {', '.join(missing)}")
+
+    backtester = Backtester(args.interval, balance_usdt=args.balance, slippage=args.slippage)
+    if args.vectorized:
+        results = {s: crossover_backtest(s, frame, backtester) for s, frame in candles.items()}
+    else:
+        results = backtester.run_many(candles)
+    print(format_report(results))
+    bars = sum(r.bars for r in results.values())
+    elapsed = sum(r.elapsed for r in results.values())
+    if elapsed:
+        print(f"\n{bars} свечей за {elapsed:.1f} с ({bars / elapsed * 60:,.0f} свечей в минуту)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,742 @@
+# app/backtest/bybit_sim.py
+"""Локальный стенд Bybit v5 для интеграционных и нагрузочных тестов.
+
+Сервер отдает сохраненные свечи так, как их отдала бы биржа в момент
+свечи с индексом cursor, и исполняет рыночные ордера по синтетическому
+стакану вокруг ее close. Реализованы эндпоинты, которыми пользуется бот:
+market/kline, market/tickers, market/orderbook, market/instruments-info,
+account/wallet-balance, order/create, order/history, а также WebSocket
+/v5/public/spot (kline, tickers, orderbook.1) и /v5/private (order,
+execution, wallet). Подписи приватных запросов проверяются, если задан
+api_secret.
+
+Время двигает advance() (или POST /sim/advance), либо сам сервер раз
+в bar_seconds. Бот направляется на стенд через BYBIT_REST_URL,
+BYBIT_WS_PUBLIC_URL и BYBIT_WS_PRIVATE_URL; BybitService в тестах - через
+base_url и clock=simulator.clock.
+
+Запуск из корня репозитория:
+    python -m app.backtest.bybit_sim SOLUSDT BTCUSDT --port 8800 --bar-seconds 1
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import math
+import threading
+import time
+from functools import reduce
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from aiohttp import WSMsgType, web
+
+from app.backtest.engine import load_candles
+from app.backtest.exchange import SimulatedExchange
+from app.utils.candle_frame import CandleFrame
+from app.utils.candle_store import interval_to_ms
+from app.utils.history_loader import KLINE_PAGE_LIMIT
+
+# Уровней стакана на сторону
+BOOK_DEPTH = 50
+ORDER_HISTORY_LIMIT = 50
+DAY_MS = 24 * 3600 * 1000
+
+
+# ===== Свечи и стакан =====
+
+def align_frames(frames: Dict[str, CandleFrame]) -> Dict[str, CandleFrame]:
+    """Оставляет только свечи, время которых есть у всех монет: у стенда
+    один курсор на все символы"""
+    frames = {symbol: CandleFrame.from_candles(frame) for symbol, frame in frames.items()}
+    common = reduce(np.intersect1d, (frame.timestamp for frame in frames.values()))
+    return {
+        symbol: CandleFrame(frame.data[:, np.isin(frame.timestamp, common)])
+        for symbol, frame in frames.items()
+    }
+
+
+def resample(frame: CandleFrame, step: int) -> np.ndarray:
+    """Свечи frame, сгруппированные по интервалу step мс, массивом (n, 6)"""
+    if not len(frame):
+        return np.empty((0, 6))
+    buckets = (frame.timestamp // step).astype(np.int64)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(buckets)] - 1
+    return np.column_stack([
+        buckets[starts] * step,
+        frame.open[starts],
+        np.maximum.reduceat(frame.high, starts),
+        np.minimum.reduceat(frame.low, starts),
+        frame.close[ends],
+        np.add.reduceat(frame.volume, starts),
+    ])
+
+
+def tick_size(price: float) -> float:
+    """Шаг цены: около пяти значащих цифр, как у большинства спотовых пар"""
+    if price <= 0:
+        return 0.0001
+    return 10.0 ** (math.floor(math.log10(price)) - 4)
+
+
+def synthetic_book(
+    price: float,
+    volume: float,
+    depth: int = BOOK_DEPTH,
+    spread: float = 0.0002,
+    level_step: float = 0.0001,
+    book_share: float = 0.05,
+) -> Tuple[List[List[float]], List[List[float]]]:
+    """Стакан вокруг price: спред spread, уровни через level_step от цены,
+    объем уровня растет с удалением от цены. Вся сторона вмещает около
+    book_share * depth / 2 объема свечи"""
+    tick = tick_size(price)
+    base = max(volume, 0.0) * book_share / depth
+    bids, asks = [], []
+    for i in range(depth):
+        offset = spread / 2 + i * level_step
+        size = base * (1 + i / 2)
+        bids.append([round(price * (1 - offset) / tick) * tick, size])
+        asks.append([round(price * (1 + offset) / tick) * tick, size])
+    return bids, asks
+
+
+def walk_book(levels: List[List[float]], quantity: float, is_quote: bool = False) -> Tuple[float, float]:
+    """Количество и стоимость исполнения quantity (в монете или, при is_quote,
+    в USDT) по уровням стакана. Остаток сверх глубины исполняется по цене
+    последнего уровня"""
+    filled = cost = 0.0
+    remaining = quantity
+    for price, size in levels:
+        take = min(size, remaining / price if is_quote else remaining)
+        filled += take
+        cost += take * price
+        remaining -= take * price if is_quote else take
+        if remaining <= 1e-12:
+            break
+    else:
+        if levels and remaining > 0:
+            price = levels[-1][0]
+            take = remaining / price if is_quote else remaining
+            filled += take
+            cost += take * price
+    return filled, cost
+
+
+class BookExchange(SimulatedExchange):
+    """SimulatedExchange, исполняющий рыночные ордера по синтетическому
+    стакану текущей свечи вместо фиксированного slippage: крупный ордер
+    проходит несколько уровней и получает худшую среднюю цену"""
+
+    def __init__(
+        self,
+        candles: Dict[str, CandleFrame],
+        depth: int = BOOK_DEPTH,
+        spread: float = 0.0002,
+        level_step: float = 0.0001,
+        book_share: float = 0.05,
+        **kwargs,
+    ):
+        super().__init__(candles, **kwargs)
+        self.depth = depth
+        self.spread = spread
+        self.level_step = level_step
+        self.book_share = book_share
+
+    def book(self, symbol: str) -> Tuple[List[List[float]], List[List[float]]]:
+        frame = self.candles[symbol]
+        return synthetic_book(
+            float(frame.close[self.cursor]),
+            float(frame.volume[self.cursor]),
+            self.depth,
+            self.spread,
+            self.level_step,
+            self.book_share,
+        )
+
+    def get_best_bid_ask(self, symbol: str):
+        if symbol not in self.candles:
+            return 0, 0
+        bids, asks = self.book(symbol)
+        return bids[0][0], asks[0][0]
+
+    def _fill_price(self, symbol: str, side: str, quantity: float, is_quote: bool) -> float:
+        bids, asks = self.book(symbol)
+        qty, cost = walk_book(asks if side == "Buy" else bids, quantity, is_quote)
+        return cost / qty if qty else self.get_price(symbol)
+
+
+# ===== Сервер =====
+
+def _num(value: float) -> str:
+    return str(float(value))
+
+
+def _sign(secret: str, message: str) -> str:
+    return hmac.new(secret.encode(), message.encode(), hashlib.sha256).hexdigest()
+
+
+class BybitSimulator:
+    """REST и WebSocket Bybit v5 поверх BookExchange.
+
+    Сервер работает в своем потоке с отдельным циклом событий, все
+    изменения счета и курсора выполняются в этом цикле.
+    """
+
+    def __init__(
+        self,
+        exchange: BookExchange,
+        interval: str = "3",
+        host: str = "127.0.0.1",
+        port: int = 0,
+        api_key: Optional[str] = None,
+        api_secret: Optional[str] = None,
+        bar_seconds: Optional[float] = None,
+    ):
+        self.exchange = exchange
+        self.interval = str(interval)
+        self.step = interval_to_ms(interval)
+        self.host = host
+        self.port = port
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.bar_seconds = bar_seconds
+        self.last_cursor = min(len(frame) for frame in exchange.candles.values()) - 1
+        self.requests: Dict[str, int] = {}
+        self._public: Dict[web.WebSocketResponse, Set[str]] = {}
+        self._private: Dict[web.WebSocketResponse, Set[str]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # --- Запуск ---
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def ws_public_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/v5/public/spot"
+
+    @property
+    def ws_private_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/v5/private"
+
+    def start(self) -> "BybitSimulator":
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,), name="bybit-sim", daemon=True)
+        self._thread.start()
+        if not ready.wait(10):
+            raise RuntimeError("Стенд Bybit не запустился")
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(10)
+            self._loop = None
+
+    def __enter__(self) -> "BybitSimulator":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self, ready: threading.Event):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        runner = web.AppRunner(self._app())
+        loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, self.host, self.port)
+        loop.run_until_complete(site.start())
+        self.port = runner.addresses[0][1]
+        if self.bar_seconds:
+            loop.create_task(self._auto_advance())
+        self._loop = loop
+        ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(runner.cleanup())
+            loop.close()
+
+    def _app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/v5/market/kline", self.kline)
+        app.router.add_get("/v5/market/tickers", self.tickers)
+        app.router.add_get("/v5/market/orderbook", self.orderbook)
+        app.router.add_get("/v5/market/instruments-info", self.instruments)
+        app.router.add_get("/v5/account/wallet-balance", self.wallet_balance)
+        app.router.add_post("/v5/order/create", self.create_order)
+        app.router.add_get("/v5/order/history", self.order_history)
+        app.router.add_get("/v5/public/spot", self.public_ws)
+        app.router.add_get("/v5/private", self.private_ws)
+        app.router.add_get("/sim/state", self.state)
+        app.router.add_post("/sim/advance", self.advance_handler)
+        app.on_shutdown.append(self._close_sockets)
+        return app
+
+    # --- Время ---
+
+    def advance(self, bars: int = 1) -> bool:
+        """Сдвигает курсор на bars свечей из любого потока. False, если
+        история кончилась"""
+        return asyncio.run_coroutine_threadsafe(self._advance(bars), self._loop).result()
+
+    async def _advance(self, bars: int) -> bool:
+        for _ in range(bars):
+            if self.exchange.cursor >= self.last_cursor:
+                return False
+            self.exchange.cursor += 1
+            if self._public:
+                await self._publish_bar()
+        return True
+
+    async def _auto_advance(self):
+        while await self._advance(1):
+            await asyncio.sleep(self.bar_seconds)
+
+    def clock(self) -> float:
+        """Время стенда в секундах - середина текущей свечи. Передается в
+        BybitService(clock=...), чтобы кэш свечей шел за курсором, а не за часами"""
+        return self._now_ms() / 1000 + self.step / 2000
+
+    def _now_ms(self) -> int:
+        symbol = next(iter(self.exchange.candles))
+        return int(self.exchange.now(symbol) * 1000)
+
+    # --- Ответы ---
+
+    def _ok(self, result: dict) -> web.Response:
+        return web.json_response(
+            {"retCode": 0, "retMsg": "OK", "result": result, "retExtInfo": {}, "time": self._now_ms()}
+        )
+
+    def _error(self, code: int, message: str) -> web.Response:
+        return web.json_response(
+            {"retCode": code, "retMsg": message, "result": {}, "retExtInfo": {}, "time": self._now_ms()}
+        )
+
+    def _count(self, request: web.Request):
+        self.requests[request.path] = self.requests.get(request.path, 0) + 1
+
+    def _check_auth(self, request: web.Request, payload: str) -> Optional[web.Response]:
+        """Проверка подписи приватного запроса, как на бирже. None - запрос принят"""
+        if not self.api_secret:
+            return None
+        headers = request.headers
+        if headers.get("X-BAPI-API-KEY") != self.api_key:
+            return self._error(10003, "API key is invalid.")
+        expected = _sign(
+            self.api_secret,
+            headers.get("X-BAPI-TIMESTAMP", "") + self.api_key + headers.get("X-BAPI-RECV-WINDOW", "") + payload,
+        )
+        if not hmac.compare_digest(expected, headers.get("X-BAPI-SIGN", "")):
+            return self._error(10004, "error sign! origin_string[]")
+        return None
+
+    # --- Рыночные данные ---
+
+    def _klines(self, symbol: str, step: int, start: Optional[int], end: Optional[int], limit: int) -> np.ndarray:
+        frame = self.exchange.candles[symbol][:self.exchange.cursor + 1]
+        if not len(frame):
+            return np.empty((0, 6))
+        last_bucket = int(frame.timestamp[-1]) // step
+        if end is not None:
+            last_bucket = min(last_bucket, end // step)
+        first_bucket = last_bucket - limit + 1
+        if start is not None:
+            first_bucket = max(first_bucket, -(-start // step))
+        lo = np.searchsorted(frame.timestamp, first_bucket * step)
+        hi = np.searchsorted(frame.timestamp, (last_bucket + 1) * step)
+        return resample(frame[lo:hi], step)
+
+    async def kline(self, request: web.Request) -> web.Response:
+        self._count(request)
+        query = request.query
+        symbol = query.get("symbol", "")
+        if symbol not in self.exchange.candles:
+            return self._error(10001, "Not supported symbols")
+        step = interval_to_ms(query.get("interval"))
+        if step is None or step % self.step:
+            return self._error(10001, "Invalid period!")
+        start = int(query["start"]) if "start" in query else None
+        end = int(query["end"]) if "end" in query else None
+        limit = min(int(query.get("limit", 200)), KLINE_PAGE_LIMIT)
+        rows = self._klines(symbol, step, start, end, limit)
+        items = [
+            [str(int(row[0])), *(_num(value) for value in row[1:6]), _num(row[4] * row[5])]
+            for row in rows[::-1]
+        ]
+        return self._ok({"category": "spot", "symbol": symbol, "list": items})
+
+    def _ticker(self, symbol: str) -> dict:
+        frame = self.exchange.candles[symbol]
+        cursor = self.exchange.cursor
+        now = frame.timestamp[cursor]
+        day = frame[np.searchsorted(frame.timestamp, now - DAY_MS, side="right"):cursor + 1]
+        bid, ask = self.exchange.get_best_bid_ask(symbol)
+        last, prev = float(frame.close[cursor]), float(day.open[0])
+        return {
+            "symbol": symbol,
+            "lastPrice": _num(last),
+            "bid1Price": _num(bid),
+            "ask1Price": _num(ask),
+            "prevPrice24h": _num(prev),
+            "price24hPcnt": _num(last / prev - 1 if prev else 0),
+            "highPrice24h": _num(day.high.max()),
+            "lowPrice24h": _num(day.low.min()),
+            "volume24h": _num(day.volume.sum()),
+            "turnover24h": _num((day.volume * day.close).sum()),
+        }
+
+    async def tickers(self, request: web.Request) -> web.Response:
+        self._count(request)
+        symbol = request.query.get("symbol")
+        if symbol is not None and symbol not in self.exchange.candles:
+            return self._error(10001, "Not supported symbols")
+        symbols = [symbol] if symbol else list(self.exchange.candles)
+        return self._ok({"category": "spot", "list": [self._ticker(s) for s in symbols]})
+
+    def _book(self, symbol: str, limit: int) -> dict:
+        bids, asks = self.exchange.book(symbol)
+        return {
+            "s": symbol,
+            "b": [[_num(price), _num(size)] for price, size in bids[:limit]],
+            "a": [[_num(price), _num(size)] for price, size in asks[:limit]],
+            "ts": self._now_ms(),
+            "u": self.exchange.cursor,
+            "seq": self.exchange.cursor,
+        }
+
+    async def orderbook(self, request: web.Request) -> web.Response:
+        self._count(request)
+        symbol = request.query.get("symbol", "")
+        if symbol not in self.exchange.candles:
+            return self._error(10001, "Not supported symbols")
+        return self._ok(self._book(symbol, min(int(request.query.get("limit", 1)), 200)))
+
+    def _instrument(self, symbol: str) -> dict:
+        exchange = self.exchange
+        precision = exchange.qty_precision
+        tick = tick_size(float(exchange.candles[symbol].close[exchange.cursor]))
+        return {
+            "symbol": symbol,
+            "baseCoin": symbol.replace("USDT", ""),
+            "quoteCoin": "USDT",
+            "status": "Trading",
+            "lotSizeFilter": {
+                "basePrecision": f"{10 ** -precision:.{precision}f}",
+                "quotePrecision": "0.00000001",
+                "minOrderQty": _num(exchange.min_order_qty),
+                "maxOrderQty": "1000000",
+                "minOrderAmt": _num(exchange.min_order_value),
+                "maxOrderAmt": "10000000",
+            },
+            "priceFilter": {"tickSize": f"{tick:.{max(0, -int(round(math.log10(tick))))}f}"},
+        }
+
+    async def instruments(self, request: web.Request) -> web.Response:
+        self._count(request)
+        symbol = request.query.get("symbol")
+        symbols = [symbol] if symbol in self.exchange.candles else [] if symbol else list(self.exchange.candles)
+        return self._ok({
+            "category": "spot",
+            "list": [self._instrument(s) for s in symbols],
+            "nextPageCursor": "",
+        })
+
+    # --- Счет и ордера ---
+
+    def _wallet(self, coins: Optional[List[str]] = None) -> dict:
+        items = []
+        for coin, balance in self.exchange.balances.items():
+            if coins and coin not in coins:
+                continue
+            price = 1.0 if coin == "USDT" else self.exchange.get_price(f"{coin}USDT") or 0.0
+            items.append({
+                "coin": coin,
+                "walletBalance": _num(balance),
+                "equity": _num(balance),
+                "availableToWithdraw": _num(balance),
+                "usdValue": _num(balance * price),
+                "locked": "0",
+            })
+        return {
+            "accountType": "UNIFIED",
+            "totalEquity": _num(self.exchange.equity()),
+            "coin": items,
+        }
+
+    async def wallet_balance(self, request: web.Request) -> web.Response:
+        self._count(request)
+        error = self._check_auth(request, request.rel_url.raw_query_string)
+        if error is not None:
+            return error
+        coins = request.query.get("coin")
+        return self._ok({"list": [self._wallet(coins.split(",") if coins else None)]})
+
+    async def create_order(self, request: web.Request) -> web.Response:
+        self._count(request)
+        body = await request.text()
+        error = self._check_auth(request, body)
+        if error is not None:
+            return error
+        try:
+            params = json.loads(body)
+            symbol, side = params["symbol"], params["side"].capitalize()
+            qty = float(params["qty"])
+        except (ValueError, KeyError, AttributeError):
+            return self._error(10001, "params error")
+        if params.get("category") != "spot" or symbol not in self.exchange.candles:
+            return self._error(10001, "Not supported symbols")
+        if params.get("orderType") != "Market":
+            return self._error(10001, "Simulator accepts market orders only")
+
+        # Рыночная покупка на споте по умолчанию задается в USDT, продажа - в монете
+        unit = params.get("marketUnit") or ("quoteCoin" if side == "Buy" else "baseCoin")
+        response = self.exchange.market_order(symbol, side, qty, is_quote=side == "Buy" and unit == "quoteCoin")
+        if response.get("retCode") != 0:
+            return self._error(response["retCode"], response["retMsg"])
+
+        order = self.exchange.orders[-1]
+        order.update({
+            "category": "spot",
+            "orderType": "Market",
+            "orderLinkId": params.get("orderLinkId", ""),
+            "marketUnit": unit,
+            "price": "0",
+            "leavesQty": "0",
+            "timeInForce": "IOC",
+            "updatedTime": order["createdTime"],
+        })
+        await self._publish_fill(order)
+        return self._ok({"orderId": order["orderId"], "orderLinkId": order["orderLinkId"]})
+
+    async def order_history(self, request: web.Request) -> web.Response:
+        self._count(request)
+        error = self._check_auth(request, request.rel_url.raw_query_string)
+        if error is not None:
+            return error
+        query = request.query
+        limit = min(int(query.get("limit", 20)), ORDER_HISTORY_LIMIT)
+        orders = [
+            order for order in reversed(self.exchange.orders)
+            if query.get("symbol") in (None, order["symbol"])
+            and query.get("orderId") in (None, order["orderId"])
+            and query.get("orderStatus") in (None, order["orderStatus"])
+        ]
+        return self._ok({"category": "spot", "list": orders[:limit], "nextPageCursor": ""})
+
+    # --- Управление стендом ---
+
+    async def state(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "cursor": self.exchange.cursor,
+            "last_cursor": self.last_cursor,
+            "time": self._now_ms(),
+            "balances": self.exchange.balances,
+            "equity": self.exchange.equity(),
+            "orders": len(self.exchange.orders),
+            "requests": self.requests,
+        })
+
+    async def advance_handler(self, request: web.Request) -> web.Response:
+        payload = await request.json() if request.can_read_body else {}
+        advanced = await self._advance(int(payload.get("bars", 1)))
+        return web.json_response({"advanced": advanced, "cursor": self.exchange.cursor, "time": self._now_ms()})
+
+    # --- WebSocket ---
+
+    def _kline_messages(self, topic: str, closed: bool) -> List[dict]:
+        _, interval, symbol = topic.split(".", 2)
+        step = interval_to_ms(interval)
+        if symbol not in self.exchange.candles or step is None or step % self.step:
+            return []
+        cursor = self.exchange.cursor
+        timestamps = self.exchange.candles[symbol].timestamp
+        rows = self._klines(symbol, step, None, None, 2)
+        bars = []
+        # Свеча закрылась, если текущая открыла новый интервал
+        if closed and len(rows) == 2 and cursor and timestamps[cursor - 1] // step != timestamps[cursor] // step:
+            bars.append((rows[0], True))
+        bars.append((rows[-1], False))
+        return [{
+            "topic": topic,
+            "type": "snapshot",
+            "ts": self._now_ms(),
+            "data": [{
+                "start": int(row[0]),
+                "end": int(row[0]) + step - 1,
+                "interval": interval,
+                "open": _num(row[1]),
+                "high": _num(row[2]),
+                "low": _num(row[3]),
+                "close": _num(row[4]),
+                "volume": _num(row[5]),
+                "turnover": _num(row[4] * row[5]),
+                "confirm": confirm,
+                "timestamp": self._now_ms(),
+            } for row, confirm in bars],
+        }]
+
+    def _public_messages(self, topic: str, closed: bool = True) -> List[dict]:
+        """Сообщения темы для текущей свечи. closed - добавить к kline
+        только что закрытую свечу"""
+        kind, _, rest = topic.partition(".")
+        if kind == "kline":
+            return self._kline_messages(topic, closed)
+        symbol = rest.rsplit(".", 1)[-1]
+        if symbol not in self.exchange.candles:
+            return []
+        if kind == "tickers":
+            data = self._ticker(symbol)
+        elif kind == "orderbook":
+            data = self._book(symbol, int(rest.split(".", 1)[0]))
+        else:
+            return []
+        return [{"topic": topic, "type": "snapshot", "ts": self._now_ms(), "data": data}]
+
+    async def _send(self, ws: web.WebSocketResponse, message: dict):
+        if ws.closed:
+            return
+        try:
+            await ws.send_str(json.dumps(message))
+        except ConnectionError:
+            pass
+
+    async def _publish_bar(self):
+        for ws, topics in list(self._public.items()):
+            for topic in sorted(topics):
+                for message in self._public_messages(topic):
+                    await self._send(ws, message)
+
+    async def _publish_fill(self, order: dict):
+        if not self._private:
+            return
+        now = self._now_ms()
+        execution = {
+            "category": "spot",
+            "symbol": order["symbol"],
+            "orderId": order["orderId"],
+            "execId": f"{order['orderId']}-1",
+            "side": order["side"],
+            "execPrice": order["avgPrice"],
+            "execQty": order["cumExecQty"],
+            "execFee": order["cumExecFee"],
+            "execTime": str(now),
+        }
+        messages = {
+            "execution": {"topic": "execution", "creationTime": now, "data": [execution]},
+            "order": {"topic": "order", "creationTime": now, "data": [order]},
+            "wallet": {"topic": "wallet", "creationTime": now, "data": [self._wallet()]},
+        }
+        # Порядок биржи: исполнение, кошелек, затем статус ордера - к событию
+        # Filled (на нем выходит wait_for_fill) баланс уже обновлен
+        for ws, topics in list(self._private.items()):
+            for topic in ("execution", "wallet", "order"):
+                if topic in topics:
+                    await self._send(ws, messages[topic])
+
+    async def _serve_ws(self, request: web.Request, connections: dict, private: bool) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        topics: Set[str] = set()
+        authorized = not private
+        connections[ws] = topics
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    payload = json.loads(msg.data)
+                except ValueError:
+                    continue
+                op, args = payload.get("op"), payload.get("args") or []
+                if op == "ping":
+                    await self._send(ws, {"op": "pong", "success": True, "ret_msg": "pong"})
+                elif op == "auth":
+                    authorized = self._ws_auth_ok(args)
+                    await self._send(ws, {"op": "auth", "success": authorized,
+                                          "ret_msg": "" if authorized else "Invalid apikey"})
+                elif op in ("subscribe", "unsubscribe"):
+                    if not authorized:
+                        await self._send(ws, {"op": op, "success": False, "ret_msg": "Request not authorized"})
+                        continue
+                    if op == "subscribe":
+                        topics.update(args)
+                    else:
+                        topics.difference_update(args)
+                    await self._send(ws, {"op": op, "success": True, "ret_msg": ""})
+                    if op == "subscribe" and not private:
+                        # Сразу после подписки - текущее состояние, как снимок на бирже
+                        for topic in args:
+                            for message in self._public_messages(topic, closed=False):
+                                await self._send(ws, message)
+        finally:
+            connections.pop(ws, None)
+        return ws
+
+    def _ws_auth_ok(self, args: list) -> bool:
+        if not self.api_secret:
+            return True
+        try:
+            key, expires, signature = args
+        except ValueError:
+            return False
+        return key == self.api_key and hmac.compare_digest(
+            _sign(self.api_secret, f"GET/realtime{expires}"), str(signature)
+        )
+
+    async def public_ws(self, request: web.Request) -> web.WebSocketResponse:
+        return await self._serve_ws(request, self._public, private=False)
+
+    async def private_ws(self, request: web.Request) -> web.WebSocketResponse:
+        return await self._serve_ws(request, self._private, private=True)
+
+    async def _close_sockets(self, app: web.Application):
+        for ws in list(self._public) + list(self._private):
+            await ws.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальный стенд Bybit v5 по сохраненным свечам")
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--interval", default="3")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--balance", type=float, default=100.0)
+    parser.add_argument("--start", type=int, default=500, help="свечей истории до первой текущей")
+    parser.add_argument("--bar-seconds", type=float, default=None,
+                        help="сдвигать время на свечу раз в столько секунд")
+    parser.add_argument("--api-key", default=None)
+    parser.add_argument("--api-secret", default=None, help="проверять подписи этим секретом")
+    args = parser.parse_args()
+
+    candles = load_candles(args.symbols, args.interval)
+    missing = sorted(set(args.symbols) - set(candles))
+    if missing:
+        print(f"Нет сохраненных свечей: {', '.join(missing)}")
+    if not candles:
+        return
+
+    exchange = BookExchange(align_frames(candles), balance_usdt=args.balance)
+    simulator = BybitSimulator(exchange, args.interval, args.host, args.port,
+                               args.api_key, args.api_secret, args.bar_seconds)
+    exchange.cursor = min(args.start, simulator.last_cursor)
+    simulator.start()
+    print(f"Стенд Bybit: {simulator.url} ({simulator.last_cursor + 1} свечей)\n"
+          f"  BYBIT_REST_URL={simulator.url}\n"
+          f"  BYBIT_WS_PUBLIC_URL={simulator.ws_public_url}\n"
+          f"  BYBIT_WS_PRIVATE_URL={simulator.ws_private_url}")
+    try:
+        while simulator._thread.is_alive():
+            time.sleep(1)
+    except KeyboardInterrupt:
+        simulator.stop()
+
+
+if __name__ == "__main__":
+    main()
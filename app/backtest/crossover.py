@@ -0,0 +1,196 @@
+# app/backtest/crossover.py
+"""Быстрый бэктест EMA-кроссовера целыми массивами.
+
+Правила - упрощенная часть MovingAverageStrategy:
+- вход без позиции, когда short EMA пересекает medium EMA снизу вверх,
+  RSI не выше rsi_max и объем свечи не меньше min_volume_ratio от
+  среднего за volume_lookback свечей;
+- выход при пересечении сверху вниз.
+Цена и исполнение - close свечи решения, как в Backtester.
+
+crossover_backtest считает ряды индикаторов, маски сигналов, индексы сделок
+и PnL без прохода по свечам - годится для отсева параметров по всем монетам.
+CrossoverStrategy - те же правила по одной свече для событийного
+Backtester.run_strategy: на одинаковых данных оба пути дают одни сделки.
+"""
+import math
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+from app.backtest.engine import Backtester, BacktestResult, Trade
+from app.indicators import vectorized
+from app.indicators.streaming import IndicatorEngine, StreamingEMA, StreamingRSI
+from app.utils.candle_frame import CandleFrame
+from app.utils.candle_store import interval_to_ms
+
+DEFAULTS = {
+    "short_window": 8,
+    "medium_window": 21,
+    "rsi_period": 14,
+    "rsi_max": 65.0,
+    "volume_lookback": 20,
+    "min_volume_ratio": 0.8,
+}
+
+
+def _params(params: dict) -> dict:
+    unknown = set(params) - set(DEFAULTS)
+    if unknown:
+        raise ValueError(f"Неизвестные параметры кроссовера: {', '.join(sorted(unknown))}")
+    return {**DEFAULTS, **params}
+
+
+def crossover_signals(frame: CandleFrame, start: int = 1, **params) -> Tuple[np.ndarray, np.ndarray]:
+    """Индексы свечей входа и выхода (выход i - первая продажа после входа i;
+    у последнего входа выхода может не быть)"""
+    p = _params(params)
+    close, volume = frame.close, frame.volume
+    n = len(close)
+    idx = np.arange(n)
+
+    # EMA до window свечей не готова и равна 0, как в StreamingEMA
+    short = np.where(idx >= p["short_window"] - 1, vectorized.ema(close, p["short_window"]), 0.0)
+    medium = np.where(idx >= p["medium_window"] - 1, vectorized.ema(close, p["medium_window"]), 0.0)
+    rsi = np.nan_to_num(vectorized.rsi(close, p["rsi_period"]), nan=50.0)
+    avg_volume = vectorized.rolling_mean(volume, p["volume_lookback"])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volume_ratio = np.where(avg_volume > 0, volume / avg_volume, 1.0)
+
+    ready = (short > 0) & (medium > 0)
+    ready[1:] &= ready[:-1]
+    ready[0] = False
+    ready[:max(1, start)] = False
+
+    prev_short, prev_medium = np.roll(short, 1), np.roll(medium, 1)
+    cross_up = ready & (prev_short <= prev_medium) & (short > medium)
+    cross_down = ready & (prev_short >= prev_medium) & (short < medium)
+    entry_mask = cross_up & (rsi <= p["rsi_max"]) & (volume_ratio >= p["min_volume_ratio"])
+
+    candidates = np.flatnonzero(entry_mask)
+    downs = np.flatnonzero(cross_down)
+    if not len(candidates):
+        return candidates, candidates
+    # Между кроссом вверх и ближайшим кроссом вниз другого кросса вверх нет,
+    # поэтому каждый вход закрывается ближайшим следующим кроссом вниз
+    exit_pos = np.searchsorted(downs, candidates, side="right")
+    exits = downs[exit_pos[exit_pos < len(downs)]]
+    return candidates, exits
+
+
+def crossover_backtest(symbol: str, candles: CandleFrame, backtester: Optional[Backtester] = None,
+                       start: Optional[int] = None, **params) -> BacktestResult:
+    """Бэктест кроссовера с комиссией, проскальзыванием и размером ордера
+    как у SimulatedOrderExecutor (весь USDT за вычетом 0.1)"""
+    started = time.perf_counter()
+    bt = backtester or Backtester()
+    frame = CandleFrame.from_candles(candles)
+    start = bt.window if start is None else start
+    entries, exits = crossover_signals(frame, start=start, **params)
+    close = frame.close
+    timestamps = frame.timestamp / 1000
+
+    buy_fill = close * (1 + bt.slippage)
+    sell_fill = close * (1 - bt.slippage)
+    step = 10 ** -bt.qty_precision
+
+    cash = np.full(len(frame), float(bt.balance_usdt))
+    holdings = np.zeros(len(frame))
+    usdt = float(bt.balance_usdt)
+    trades = []
+    fees = 0.0
+    orders = 0
+    # Пересчет счета идет по сделкам (их на порядки меньше, чем свечей)
+    for k, entry in enumerate(entries):
+        invest = round(max(0.0, usdt - 0.1), 2)
+        qty = math.floor(invest / buy_fill[entry] / step + 1e-9) * step
+        cost = qty * buy_fill[entry]
+        if invest < 5 or qty < bt.min_order_qty or cost < bt.min_order_value:
+            break
+        coin = qty * (1 - bt.fee)
+        buy_fee = qty * bt.fee * buy_fill[entry]
+        usdt -= cost
+        orders += 1
+        fees += buy_fee
+        end = exits[k] if k < len(exits) else len(frame)
+        cash[entry:] = usdt
+        holdings[entry:end] = coin
+        if k >= len(exits):
+            break
+
+        value = coin * sell_fill[end]
+        sell_fee = value * bt.fee
+        usdt += value - sell_fee
+        orders += 1
+        fees += sell_fee
+        cash[end:] = usdt
+        trades.append(Trade(
+            symbol=symbol,
+            entry_time=timestamps[entry],
+            exit_time=timestamps[end],
+            entry_price=buy_fill[entry],
+            exit_price=sell_fill[end],
+            qty=coin,
+            cost=cost,
+            proceeds=value - sell_fee,
+            fees=buy_fee + sell_fee,
+        ))
+
+    equity = (cash + holdings * close)[start:]
+    return BacktestResult(
+        symbol=symbol,
+        bars=len(equity),
+        start_balance=bt.balance_usdt,
+        equity=equity,
+        trades=trades,
+        fees=fees,
+        orders=orders,
+        elapsed=time.perf_counter() - started,
+    )
+
+
+class CrossoverStrategy:
+    """Правила кроссовера по одной свече для Backtester.run_strategy"""
+
+    def __init__(self, exchange, symbol: str, interval: str = "3", **params):
+        self.bybit = exchange
+        self.symbol = symbol
+        self.params = _params(params)
+        self.indicators = IndicatorEngine(
+            interval_to_ms(interval),
+            short_ema=StreamingEMA(self.params["short_window"]),
+            medium_ema=StreamingEMA(self.params["medium_window"]),
+            rsi=StreamingRSI(self.params["rsi_period"]),
+        )
+        self.prev_short_ema = 0.0
+        self.prev_medium_ema = 0.0
+
+    def should_trade(self, candles: CandleFrame) -> Optional[str]:
+        frame = CandleFrame.from_candles(candles)
+        self.indicators.sync(frame)
+        values = self.indicators.peek(frame)
+        short, medium = values["short_ema"], values["medium_ema"]
+        prev_short, prev_medium = self.prev_short_ema, self.prev_medium_ema
+        self.prev_short_ema, self.prev_medium_ema = short, medium
+        if not (short and medium and prev_short and prev_medium):
+            return None
+
+        coin = self.symbol.replace("USDT", "")
+        holding = self.bybit.get_balance(coin) > 0
+        if holding and prev_short >= prev_medium and short < medium:
+            return "SELL"
+        if not holding and prev_short <= prev_medium and short > medium:
+            lookback = self.params["volume_lookback"]
+            volumes = frame.volume
+            avg_volume = np.mean(volumes[-lookback:]) if len(volumes) >= lookback else 0
+            volume_ratio = volumes[-1] / avg_volume if avg_volume > 0 else 1
+            if values["rsi"] <= self.params["rsi_max"] and volume_ratio >= self.params["min_volume_ratio"]:
+                return "BUY"
+        return None
+
+    def execute_trade(self, action: str, executor):
+        if action == "BUY":
+            executor.execute_buy()
+        elif action == "SELL":
+            executor.execute_sell(strategy=self)
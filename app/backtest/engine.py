@@ -0,0 +1,296 @@
+# app/backtest/engine.py
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.backtest.exchange import SimulatedExchange, SimulatedOrderExecutor
+from app.indicators.streaming import StreamingEMA
+from app.strategies.ma_signal import TAKER_FEE, MASignalCore, Position
+from app.utils.candle_frame import CandleFrame
+from app.utils.candle_store import CandleStore, get_candle_store, interval_to_ms
+
+
+@dataclass
+class Trade:
+    """Закрытая сделка: покупка (или несколько) и продажа всей позиции"""
+    symbol: str
+    entry_time: float
+    exit_time: float
+    entry_price: float
+    exit_price: float
+    qty: float
+    cost: float
+    proceeds: float
+    fees: float
+
+    @property
+    def pnl(self) -> float:
+        return self.proceeds - self.cost
+
+    @property
+    def pnl_pct(self) -> float:
+        return self.pnl / self.cost * 100 if self.cost else 0.0
+
+
+@dataclass
+class BacktestResult:
+    symbol: str
+    bars: int
+    start_balance: float
+    equity: np.ndarray
+    trades: List[Trade] = field(default_factory=list)
+    fees: float = 0.0
+    orders: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def final_equity(self) -> float:
+        return float(self.equity[-1]) if len(self.equity) else self.start_balance
+
+    @property
+    def pnl(self) -> float:
+        return self.final_equity - self.start_balance
+
+    @property
+    def pnl_pct(self) -> float:
+        return self.pnl / self.start_balance * 100 if self.start_balance else 0.0
+
+    @property
+    def max_drawdown_pct(self) -> float:
+        """Наибольшая просадка от пика кривой капитала, %"""
+        if not len(self.equity):
+            return 0.0
+        peaks = np.maximum.accumulate(self.equity)
+        return float(np.max((peaks - self.equity) / peaks) * 100)
+
+    @property
+    def win_rate(self) -> float:
+        if not self.trades:
+            return 0.0
+        return sum(trade.pnl > 0 for trade in self.trades) / len(self.trades)
+
+    def summary(self) -> dict:
+        wins = [t.pnl for t in self.trades if t.pnl > 0]
+        losses = [t.pnl for t in self.trades if t.pnl <= 0]
+        return {
+            "symbol": self.symbol,
+            "bars": self.bars,
+            "trades": len(self.trades),
+            "pnl": self.pnl,
+            "pnl_pct": self.pnl_pct,
+            "max_drawdown_pct": self.max_drawdown_pct,
+            "win_rate": self.win_rate,
+            "avg_win": float(np.mean(wins)) if wins else 0.0,
+            "avg_loss": float(np.mean(losses)) if losses else 0.0,
+            "profit_factor": sum(wins) / -sum(losses) if sum(losses) < 0 else 0.0,
+            "fees": self.fees,
+            "bars_per_second": self.bars / self.elapsed if self.elapsed else 0.0,
+        }
+
+
+def trades_from_orders(orders: List[dict]) -> List[Trade]:
+    """Сделки из истории исполненных ордеров: покупки копятся в позицию,
+    продажа ее закрывает"""
+    trades = []
+    open_trade = None
+    for order in orders:
+        qty = float(order["cumExecQty"])
+        value = float(order["cumExecValue"])
+        fee = float(order["cumExecFee"])
+        ts = int(order["createdTime"]) / 1000
+        if order["side"] == "Buy":
+            if open_trade is None:
+                open_trade = {"time": ts, "qty": 0.0, "cost": 0.0, "fees": 0.0}
+            open_trade["qty"] += qty
+            open_trade["cost"] += value
+            open_trade["fees"] += fee
+        elif open_trade is not None:
+            trades.append(Trade(
+                symbol=order["symbol"],
+                entry_time=open_trade["time"],
+                exit_time=ts,
+                entry_price=open_trade["cost"] / open_trade["qty"],
+                exit_price=float(order["avgPrice"]),
+                qty=qty,
+                cost=open_trade["cost"],
+                proceeds=value - fee,
+                fees=open_trade["fees"] + fee,
+            ))
+            open_trade = None
+    return trades
+
+
+def hourly_trend_series(frame: CandleFrame, trend_interval: str = "30") -> np.ndarray:
+    """Тренд старшего таймфрейма для каждой свечи, как _check_hourly_trend:
+    EMA 5 и 10 по закрытым свечам trend_interval плюс текущая формирующаяся"""
+    step = interval_to_ms(trend_interval)
+    closes = frame.close.tolist()
+    buckets = (frame.timestamp // step).tolist()
+    short, medium = StreamingEMA(5), StreamingEMA(10)
+    trend = np.zeros(len(frame), dtype=np.int8)
+    for i in range(len(frame)):
+        if i and buckets[i] != buckets[i - 1]:
+            short.update(closes[i - 1])
+            medium.update(closes[i - 1])
+        short_ema, medium_ema = short.peek(closes[i]), medium.peek(closes[i])
+        if short_ema and medium_ema:
+            trend[i] = 1 if short_ema > medium_ema else -1 if short_ema < medium_ema else 0
+    return trend
+
+
+class Backtester:
+    """Прогон стратегий по сохраненным свечам через SimulatedExchange.
+
+    Каждый тик - закрытие очередной свечи: стратегия видит последние
+    window свечей, цена и исполнение - по close этой свечи с проскальзыванием.
+    Первые seed_bars свечей идут на затравку индикаторов, как 500 свечей
+    истории при запуске бота.
+    """
+
+    def __init__(
+        self,
+        interval: str = "3",
+        balance_usdt: float = 100.0,
+        fee: float = TAKER_FEE,
+        slippage: float = 0.0005,
+        min_order_qty: float = 0.001,
+        min_order_value: float = 5.0,
+        qty_precision: int = 4,
+        window: int = 100,
+        seed_bars: int = 500,
+    ):
+        self.interval = interval
+        self.balance_usdt = balance_usdt
+        self.fee = fee
+        self.slippage = slippage
+        self.min_order_qty = min_order_qty
+        self.min_order_value = min_order_value
+        self.qty_precision = qty_precision
+        self.window = window
+        self.seed_bars = seed_bars
+
+    def exchange(self, candles: Dict[str, CandleFrame]) -> SimulatedExchange:
+        return SimulatedExchange(
+            candles,
+            balance_usdt=self.balance_usdt,
+            fee=self.fee,
+            slippage=self.slippage,
+            min_order_qty=self.min_order_qty,
+            min_order_value=self.min_order_value,
+            qty_precision=self.qty_precision,
+        )
+
+    def run_ma(self, symbol: str, candles: CandleFrame, **params) -> BacktestResult:
+        """MovingAverageStrategy: ядро MASignalCore с позицией из симулятора.
+        params переопределяют параметры стратегии (см. MASignalCore.from_params)"""
+        frame = CandleFrame.from_candles(candles)
+        exchange = self.exchange({symbol: frame})
+        executor = SimulatedOrderExecutor(symbol, exchange)
+        core = MASignalCore.from_params(symbol, self.interval, **params)
+        start = max(self.seed_bars, self.window)
+        core.seed(frame[:start])
+        trend = hourly_trend_series(frame)
+
+        coin = symbol.replace("USDT", "")
+        closes = frame.close
+        timestamps = frame.timestamp / 1000
+        equity = np.empty(max(0, len(frame) - start))
+        position = Position(last_trade_time=timestamps[start - 1] if start <= len(frame) else 0.0)
+
+        started = time.perf_counter()
+        for i in range(start, len(frame)):
+            exchange.cursor = i
+            price = float(closes[i])
+            now = float(timestamps[i])
+            position.qty = exchange.balances.get(coin, 0.0)
+            result = core.evaluate(
+                frame[i - self.window + 1:i + 1],
+                price,
+                position,
+                balance_usdt=exchange.balances["USDT"],
+                qty_precision=self.qty_precision,
+                hourly_trend=int(trend[i]),
+                now=now,
+            )
+            # SELL_PARTIAL, как и в боте, не исполняется
+            if result.action == "BUY" and executor.execute_buy():
+                core.executed_trades += 1
+                position.last_action = "BUY"
+                position.avg_buy_price = position.last_trade_price = executor.last_buy_price
+                position.last_trade_time = now
+            elif result.action == "SELL" and executor.execute_sell():
+                core.executed_trades += 1
+                position.last_action = "SELL"
+                position.last_trade_price = float(exchange.orders[-1]["avgPrice"])
+                position.avg_buy_price = 0.0
+                position.max_price_since_buy = None
+                position.partial_exit_taken = False
+                position.last_trade_time = now
+            equity[i - start] = exchange.balances["USDT"] + exchange.balances.get(coin, 0.0) * price
+
+        return self._result(symbol, exchange, equity, time.perf_counter() - started)
+
+    def run_strategy(self, strategy, symbol: str, exchange: SimulatedExchange,
+                     start: Optional[int] = None) -> BacktestResult:
+        """Любая стратегия с should_trade/execute_trade, которая ходит на биржу
+        через переданный ей сервис (например NeuralStrategy с
+        bybit_service=exchange). Время в такой стратегии - настоящее"""
+        frame = exchange.candles[symbol]
+        executor = SimulatedOrderExecutor(symbol, exchange)
+        start = self.window if start is None else start
+        equity = np.empty(max(0, len(frame) - start))
+
+        started = time.perf_counter()
+        for i in range(start, len(frame)):
+            exchange.cursor = i
+            action = strategy.should_trade(exchange.get_candles(symbol, limit=self.window))
+            if action:
+                strategy.execute_trade(action, executor)
+            equity[i - start] = exchange.equity()
+
+        return self._result(symbol, exchange, equity, time.perf_counter() - started)
+
+    def run_many(self, candles: Dict[str, CandleFrame], **params) -> Dict[str, BacktestResult]:
+        """MA-стратегия по каждой монете отдельно, со своим счетом"""
+        return {symbol: self.run_ma(symbol, frame, **params) for symbol, frame in candles.items()}
+
+    def _result(self, symbol: str, exchange: SimulatedExchange, equity: np.ndarray,
+                elapsed: float) -> BacktestResult:
+        return BacktestResult(
+            symbol=symbol,
+            bars=len(equity),
+            start_balance=self.balance_usdt,
+            equity=equity,
+            trades=trades_from_orders(exchange.orders),
+            fees=exchange.fees_paid,
+            orders=len(exchange.orders),
+            elapsed=elapsed,
+        )
+
+
+def load_candles(symbols: List[str], interval: str = "3",
+                 store: Optional[CandleStore] = None) -> Dict[str, CandleFrame]:
+    """Вся сохраненная история монет из CandleStore"""
+    store = store or get_candle_store()
+    frames = {}
+    for symbol in symbols:
+        rows = store.read(symbol, interval)
+        if len(rows):
+            frames[symbol] = CandleFrame.from_rows(rows)
+    return frames
+
+
+def format_report(results: Dict[str, BacktestResult]) -> str:
+    lines = [
+        f"{'монета':<12}{'свечей':>9}{'сделок':>8}{'PnL, USDT':>12}{'PnL, %':>9}"
+        f"{'просадка, %':>13}{'winrate':>9}{'комиссии':>10}"
+    ]
+    for symbol, result in results.items():
+        s = result.summary()
+        lines.append(
+            f"{symbol:<12}{s['bars']:>9}{s['trades']:>8}{s['pnl']:>12.4f}{s['pnl_pct']:>9.2f}"
+            f"{s['max_drawdown_pct']:>13.2f}{s['win_rate']:>9.0%}{s['fees']:>10.4f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,211 @@
+# app/backtest/exchange.py
+import math
+from typing import Dict, List, Optional
+
+from app.services.bybit_service import BybitService
+from app.strategies.ma_signal import TAKER_FEE
+from app.utils.candle_frame import CandleFrame
+
+
+class SimulatedExchange:
+    """Замена BybitService для прогона стратегий по сохраненным свечам.
+
+    Время задает курсор: текущей считается свеча с индексом cursor, цена -
+    ее close. Рыночный ордер исполняется сразу по цене закрытия со
+    сдвигом slippage против нас и комиссией тейкера (в монете при покупке,
+    в USDT при продаже - как на споте Bybit). Ордер меньше min_order_qty
+    или дешевле min_order_value отклоняется с retCode, как на бирже.
+    """
+
+    def __init__(
+        self,
+        candles: Dict[str, CandleFrame],
+        balance_usdt: float = 100.0,
+        fee: float = TAKER_FEE,
+        slippage: float = 0.0005,
+        min_order_qty: float = 0.001,
+        min_order_value: float = 5.0,
+        qty_precision: int = 4,
+    ):
+        self.candles = {symbol: CandleFrame.from_candles(frame) for symbol, frame in candles.items()}
+        self.fee = fee
+        self.slippage = slippage
+        self.min_order_qty = min_order_qty
+        self.min_order_value = min_order_value
+        self.qty_precision = qty_precision
+        self.balances: Dict[str, float] = {"USDT": float(balance_usdt)}
+        self.orders: List[dict] = []
+        self.fees_paid = 0.0
+        self.cursor = 0
+        self.market_stream = None
+
+    # ===== Время и цены =====
+
+    def now(self, symbol: str) -> float:
+        """Время текущей свечи в секундах"""
+        return self.candles[symbol].timestamp[self.cursor] / 1000
+
+    def get_candles(self, symbol: str, interval: str = None, limit: int = 100) -> CandleFrame:
+        """Последние limit свечей до текущей включительно"""
+        end = self.cursor + 1
+        return self.candles[symbol][max(0, end - limit):end]
+
+    def get_price(self, symbol: str) -> Optional[float]:
+        frame = self.candles.get(symbol)
+        if frame is None:
+            return None
+        return float(frame.close[self.cursor])
+
+    def get_reliable_price(self, symbol: str) -> float:
+        return self.get_price(symbol) or 0.0
+
+    def validate_price(self, price: float, symbol: str) -> bool:
+        return price is not None and price > 0
+
+    def get_best_bid_ask(self, symbol: str):
+        price = self.get_price(symbol) or 0
+        return price * (1 - self.slippage), price * (1 + self.slippage)
+
+    # ===== Счет =====
+
+    def get_balance(self, coin: str, retries: int = 3) -> float:
+        return self.balances.get(coin, 0.0)
+
+    def get_qty_precision(self, symbol: str) -> int:
+        return self.qty_precision
+
+    def get_min_order_qty(self, symbol: str) -> float:
+        return self.min_order_qty
+
+    def get_open_positions(self) -> list:
+        return [
+            {"coin": coin, "qty": qty}
+            for coin, qty in self.balances.items()
+            if coin != "USDT" and qty >= self.min_order_qty
+        ]
+
+    def equity(self) -> float:
+        """Стоимость счета в USDT по текущим ценам"""
+        total = self.balances.get("USDT", 0.0)
+        for coin, qty in self.balances.items():
+            if coin != "USDT" and qty:
+                total += qty * (self.get_price(f"{coin}USDT") or 0.0)
+        return total
+
+    # ===== Ордера =====
+
+    def market_order(self, symbol: str, side: str, quantity: float, is_quote: bool = False) -> dict:
+        side = side.capitalize()
+        coin = symbol.replace("USDT", "")
+        price = self.get_price(symbol)
+        if not price:
+            return {"retCode": 10001, "retMsg": f"Unknown symbol {symbol}"}
+
+        if side == "Buy":
+            fill_price = self._fill_price(symbol, side, quantity, is_quote)
+            cost = round(quantity, 2) if is_quote else quantity * fill_price
+            qty = self._floor_qty(cost / fill_price)
+            cost = qty * fill_price
+            if cost > self.balances.get("USDT", 0.0) + 1e-9:
+                return {"retCode": 170131, "retMsg": "Insufficient balance."}
+            fee = qty * self.fee
+            received, spent = qty - fee, cost
+            fee_usdt = fee * fill_price
+        else:
+            fill_price = self._fill_price(symbol, side, quantity, False)
+            qty = quantity
+            if qty > self.balances.get(coin, 0.0) + 1e-12:
+                return {"retCode": 170131, "retMsg": "Insufficient balance."}
+            fee_usdt = qty * fill_price * self.fee
+            received, spent = qty * fill_price - fee_usdt, qty
+
+        if qty < self.min_order_qty or qty * fill_price < self.min_order_value:
+            return {"retCode": 170136, "retMsg": "Order quantity below the lower limit."}
+
+        if side == "Buy":
+            self.balances["USDT"] -= spent
+            self.balances[coin] = self.balances.get(coin, 0.0) + received
+        else:
+            self.balances[coin] -= spent
+            self.balances["USDT"] += received
+        self.fees_paid += fee_usdt
+
+        order_id = str(len(self.orders) + 1)
+        self.orders.append({
+            "orderId": order_id,
+            "symbol": symbol,
+            "side": side,
+            "orderStatus": "Filled",
+            "qty": str(qty),
+            "cumExecQty": str(qty),
+            "cumExecValue": str(qty * fill_price),
+            "cumExecFee": str(fee_usdt),
+            "avgPrice": str(fill_price),
+            "createdTime": str(int(self.now(symbol) * 1000)),
+        })
+        return {"retCode": 0, "retMsg": "OK", "result": {"orderId": order_id}}
+
+    def _fill_price(self, symbol: str, side: str, quantity: float, is_quote: bool) -> float:
+        """Средняя цена исполнения рыночного ордера: close со сдвигом slippage"""
+        price = self.get_price(symbol)
+        return price * (1 + self.slippage) if side == "Buy" else price * (1 - self.slippage)
+
+    def _floor_qty(self, qty: float) -> float:
+        step = 10 ** -self.qty_precision
+        return math.floor(qty / step + 1e-9) * step
+
+    def get_filled_orders(self, symbol: str, limit: int = 5) -> list:
+        orders = [order for order in reversed(self.orders) if order["symbol"] == symbol]
+        return orders[:limit]
+
+    def get_order_by_id(self, symbol: str, order_id: str) -> Optional[dict]:
+        index = int(order_id) - 1
+        if 0 <= index < len(self.orders):
+            return self.orders[index]
+        return None
+
+    def get_last_filled_order(self, symbol: str, limit=1) -> Optional[dict]:
+        orders = self.get_filled_orders(symbol, 1)
+        return self._format_filled_order(orders[0]) if orders else None
+
+    def wait_for_fill(self, symbol: str, order_id: str, timeout: float = 10) -> Optional[dict]:
+        order = self.get_order_by_id(symbol, order_id)
+        return self._format_filled_order(order) if order else None
+
+    # Тот же формат, что отдает BybitService
+    _format_filled_order = staticmethod(BybitService._format_filled_order)
+
+
+class SimulatedOrderExecutor:
+    """OrderExecutor поверх SimulatedExchange: те же правила размера ордера
+    (весь USDT за вычетом 0.1 при покупке, вся позиция при продаже), без
+    логирования и ожидания исполнения"""
+
+    def __init__(self, symbol: str, exchange: SimulatedExchange):
+        self.symbol = symbol
+        self.bybit = exchange
+        self.last_buy_price = 0.0
+        self.last_buy_quantity = 0.0
+
+    def execute_buy(self, trading_system=None) -> bool:
+        usdt_balance = round(max(0, self.bybit.get_balance("USDT") - 0.1), 2)
+        if usdt_balance < 5:
+            return False
+        response = self.bybit.market_order(self.symbol, "Buy", usdt_balance, is_quote=True)
+        if response.get("retCode") != 0:
+            return False
+        filled = self.bybit.wait_for_fill(self.symbol, response["result"]["orderId"])
+        self.last_buy_price = float(filled["avg_price"])
+        self.last_buy_quantity = float(filled["cumExecQty"])
+        return True
+
+    def execute_sell(self, strategy=None) -> bool:
+        coin = self.symbol.replace("USDT", "")
+        balance = self.bybit.get_balance(coin)
+        if not balance or balance < self.bybit.get_min_order_qty(self.symbol):
+            return False
+        response = self.bybit.market_order(self.symbol, "Sell", balance, is_quote=False)
+        return response.get("retCode") == 0
+
+    def execute_force_close(self) -> bool:
+        return self.execute_sell(None)
@@ -0,0 +1,340 @@
+# app/backtest/sweep.py
+"""Перебор параметров MA-стратегии на истории.
+
+Свечи один раз выгружаются в колоночные .npy (набор данных), процессы-
+исполнители открывают их через mmap: страницы общие для всех процессов,
+копий нет. Каждая пара (параметры, монета) - отдельная задача пула,
+результат сразу пишется в таблицу sqlite, поэтому прерванный перебор
+продолжается с места остановки. Вместе с результатами хранится отпечаток
+набора данных (число свечей и время последней): продолжить перебор на
+других свечах нельзя - результаты бы смешались.
+
+Запуск из корня репозитория:
+    python -m app.backtest.sweep SOLUSDT BTCUSDT --space space.json --mode random --samples 200
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.backtest.engine import Backtester, load_candles
+from app.utils.candle_frame import CandleFrame
+from app.utils.log_helper import log_maker
+
+RESULT_COLUMNS = (
+    "trades", "pnl", "pnl_pct", "max_drawdown_pct", "win_rate", "profit_factor", "fees", "bars",
+)
+
+
+# ===== Набор данных =====
+
+def build_dataset(frames: Dict[str, CandleFrame], directory: str):
+    """Сохраняет свечи колонками (6, n) - такой массив открывается через
+    mmap и сразу годится для CandleFrame"""
+    os.makedirs(directory, exist_ok=True)
+    for symbol, frame in frames.items():
+        np.save(dataset_path(directory, symbol), CandleFrame.from_candles(frame).data)
+
+
+def dataset_path(directory: str, symbol: str) -> str:
+    return os.path.join(directory, f"{symbol}.npy")
+
+
+def open_frame(directory: str, symbol: str) -> CandleFrame:
+    return CandleFrame(np.load(dataset_path(directory, symbol), mmap_mode="r"))
+
+
+def fingerprint(frame: CandleFrame) -> Tuple[int, int]:
+    """Отпечаток свечей монеты: (число свечей, время последней)"""
+    return len(frame), int(frame.timestamp[-1]) if len(frame) else 0
+
+
+# ===== Пространство поиска =====
+# Список - перечень значений, кортеж (low, high) - диапазон (целый, если
+# обе границы целые). В JSON диапазон задается как {"low": ..., "high": ...}
+
+def _is_range(spec) -> bool:
+    return isinstance(spec, tuple) and len(spec) == 2
+
+
+def grid(space: Dict[str, list]) -> List[dict]:
+    """Все сочетания перечисленных значений. Диапазоны в сетке не
+    перебираются - для них нужен режим random"""
+    ranges = [name for name, spec in space.items() if _is_range(spec)]
+    if ranges:
+        raise ValueError(f"Диапазоны в режиме grid не поддерживаются: {', '.join(ranges)}")
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+
+def _draw(spec, rng: random.Random):
+    if _is_range(spec):
+        low, high = spec
+        if isinstance(low, int) and isinstance(high, int):
+            return rng.randint(low, high)
+        return rng.uniform(low, high)
+    return rng.choice(spec)
+
+
+def random_samples(space: dict, count: int, seed: int = 0) -> List[dict]:
+    rng = random.Random(seed)
+    return [{name: _draw(spec, rng) for name, spec in space.items()} for _ in range(count)]
+
+
+def refine(space: dict, best: List[dict], count: int, scale: float = 0.2, seed: int = 0) -> List[dict]:
+    """Точки рядом с лучшими: диапазоны сдвигаются на ±scale их ширины,
+    перечни - на соседнее значение"""
+    rng = random.Random(seed)
+    samples = []
+    for i in range(count):
+        base = best[i % len(best)]
+        params = {}
+        for name, spec in space.items():
+            value = base[name]
+            if _is_range(spec):
+                low, high = spec
+                step = (high - low) * scale
+                value = min(high, max(low, value + rng.uniform(-step, step)))
+                if isinstance(low, int) and isinstance(high, int):
+                    value = int(round(value))
+            else:
+                index = spec.index(value) + rng.choice((-1, 0, 1))
+                value = spec[min(len(spec) - 1, max(0, index))]
+            params[name] = value
+        samples.append(params)
+    return samples
+
+
+def load_space(path: str) -> dict:
+    with open(path) as f:
+        raw = json.load(f)
+    return {
+        name: (spec["low"], spec["high"]) if isinstance(spec, dict) else list(spec)
+        for name, spec in raw.items()
+    }
+
+
+def params_key(params: dict) -> str:
+    return json.dumps(params, sort_keys=True)
+
+
+# ===== Исполнители =====
+
+_worker_dataset: Optional[str] = None
+_worker_backtester: Optional[Backtester] = None
+_worker_frames: Dict[str, CandleFrame] = {}
+
+
+def _init_worker(dataset_dir: str, backtester_options: dict):
+    global _worker_dataset, _worker_backtester
+    _worker_dataset = dataset_dir
+    _worker_backtester = Backtester(**backtester_options)
+    _worker_frames.clear()
+
+
+def _evaluate(key: str, symbol: str) -> dict:
+    frame = _worker_frames.get(symbol)
+    if frame is None:
+        frame = _worker_frames[symbol] = open_frame(_worker_dataset, symbol)
+    result = _worker_backtester.run_ma(symbol, frame, **json.loads(key))
+    summary = result.summary()
+    return {name: summary[name] for name in RESULT_COLUMNS}
+
+
+class SweepRunner:
+    """Перебор комбинаций параметров по монетам в пуле процессов"""
+
+    def __init__(
+        self,
+        dataset_dir: str,
+        symbols: List[str],
+        db_path: str = "data/sweeps.db",
+        sweep: str = "default",
+        workers: Optional[int] = None,
+        backtester_options: Optional[dict] = None,
+    ):
+        self.dataset_dir = dataset_dir
+        self.symbols = symbols
+        self.db_path = db_path
+        self.sweep = sweep
+        self.workers = workers or os.cpu_count() or 1
+        self.backtester_options = backtester_options or {}
+        self._init_db()
+        self._check_dataset()
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return sqlite3.connect(self.db_path)
+
+    def _init_db(self):
+        columns = ", ".join(f"{name} REAL" for name in RESULT_COLUMNS)
+        with self._connect() as db:
+            db.execute(
+                f"CREATE TABLE IF NOT EXISTS sweep_results ("
+                f"sweep TEXT, params TEXT, symbol TEXT, {columns}, "
+                f"PRIMARY KEY (sweep, params, symbol))"
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS sweep_datasets ("
+                "sweep TEXT, symbol TEXT, bars INTEGER, last_ts INTEGER, "
+                "PRIMARY KEY (sweep, symbol))"
+            )
+
+    def _check_dataset(self):
+        """Запоминает отпечаток набора данных перебора; если перебор уже шел на
+        других свечах, продолжать его нельзя - ValueError"""
+        with self._connect() as db:
+            stored = {
+                symbol: (bars, last_ts)
+                for symbol, bars, last_ts in db.execute(
+                    "SELECT symbol, bars, last_ts FROM sweep_datasets WHERE sweep = ?", (self.sweep,)
+                )
+            }
+            for symbol in self.symbols:
+                current = fingerprint(open_frame(self.dataset_dir, symbol))
+                if symbol not in stored:
+                    db.execute(
+                        "INSERT INTO sweep_datasets VALUES (?, ?, ?, ?)", (self.sweep, symbol, *current)
+                    )
+                elif stored[symbol] != current:
+                    raise ValueError(
+                        f"Набор данных {symbol} изменился с начала перебора {self.sweep} "
+                        f"({stored[symbol][0]} свечей до {stored[symbol][1]}, сейчас {current[0]} "
+                        f"до {current[1]}) - начните новый перебор (--sweep)"
+                    )
+
+    def _done(self) -> set:
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT params, symbol FROM sweep_results WHERE sweep = ?", (self.sweep,)
+            )
+            return set(rows)
+
+    def pending(self, combos: Iterable[dict]) -> List[tuple]:
+        """Пары (параметры, монета), которых еще нет в таблице"""
+        done = self._done()
+        tasks = []
+        for params in combos:
+            key = params_key(params)
+            tasks.extend((key, symbol) for symbol in self.symbols if (key, symbol) not in done)
+        return list(dict.fromkeys(tasks))
+
+    def run(self, combos: Iterable[dict]) -> int:
+        """Считает недостающие пары, возвращает число посчитанных"""
+        tasks = self.pending(combos)
+        if not tasks:
+            return 0
+
+        started = time.perf_counter()
+        placeholders = ", ".join("?" * (3 + len(RESULT_COLUMNS)))
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.dataset_dir, self.backtester_options),
+        ) as pool, self._connect() as db:
+            futures = {pool.submit(_evaluate, key, symbol): (key, symbol) for key, symbol in tasks}
+            for done, future in enumerate(as_completed(futures), 1):
+                key, symbol = futures[future]
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    log_maker(f"⚠️ Перебор {self.sweep}: ошибка {symbol} {key}: {e}")
+                    continue
+                db.execute(
+                    f"INSERT OR REPLACE INTO sweep_results VALUES ({placeholders})",
+                    (self.sweep, key, symbol, *(summary[name] for name in RESULT_COLUMNS)),
+                )
+                # Фиксируем каждый результат: прерванный перебор продолжится с этого места
+                db.commit()
+                if done % 100 == 0:
+                    log_maker(f"🔬 Перебор {self.sweep}: {done}/{len(tasks)} "
+                              f"({time.perf_counter() - started:.0f} с)")
+        return len(tasks)
+
+    def results(self) -> List[dict]:
+        """Итоги по комбинациям: средний PnL по монетам, худшая просадка"""
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT params, COUNT(*), AVG(pnl_pct), MIN(pnl_pct), MAX(max_drawdown_pct), "
+                "SUM(trades), AVG(win_rate) FROM sweep_results WHERE sweep = ? GROUP BY params",
+                (self.sweep,),
+            ).fetchall()
+        return [
+            {
+                "params": json.loads(params),
+                "coins": coins,
+                "pnl_pct": avg_pnl,
+                "worst_pnl_pct": worst_pnl,
+                "max_drawdown_pct": drawdown,
+                "trades": int(trades),
+                "win_rate": win_rate,
+            }
+            for params, coins, avg_pnl, worst_pnl, drawdown, trades, win_rate in rows
+        ]
+
+    def best(self, count: int = 10, metric: str = "pnl_pct") -> List[dict]:
+        complete = [r for r in self.results() if r["coins"] == len(self.symbols)]
+        return sorted(complete, key=lambda r: r[metric], reverse=True)[:count]
+
+    def random_search(self, space: dict, samples: int, refine_rounds: int = 2,
+                      top: int = 5, seed: int = 0) -> List[dict]:
+        """Случайный поиск и несколько раундов уточнения вокруг лучших точек"""
+        self.run(random_samples(space, samples, seed))
+        for round_ in range(refine_rounds):
+            best = [r["params"] for r in self.best(top)]
+            if not best:
+                break
+            self.run(refine(space, best, samples // 2 or 1, seed=seed + round_ + 1))
+        return self.best(top)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Перебор параметров MA-стратегии")
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--space", required=True, help="JSON с пространством поиска")
+    parser.add_argument("--mode", choices=("grid", "random"), default="grid")
+    parser.add_argument("--samples", type=int, default=100)
+    parser.add_argument("--refine", type=int, default=2)
+    parser.add_argument("--interval", default="3")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--sweep", default="default")
+    parser.add_argument("--dataset", default="data/sweep_dataset")
+    parser.add_argument("--db", default="data/sweeps.db")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Выгрузить набор данных заново из хранилища свечей")
+    args = parser.parse_args()
+
+    # Уже выгруженные свечи не перезаписываются: продолженный перебор идет на тех же данных
+    missing = [s for s in args.symbols if args.rebuild or not os.path.exists(dataset_path(args.dataset, s))]
+    if missing:
+        build_dataset(load_candles(missing, args.interval), args.dataset)
+    symbols = [s for s in args.symbols if os.path.exists(dataset_path(args.dataset, s))]
+    try:
+        runner = SweepRunner(args.dataset, symbols, db_path=args.db, sweep=args.sweep,
+                             workers=args.workers, backtester_options={"interval": args.interval})
+        space = load_space(args.space)
+        if args.mode == "grid":
+            runner.run(grid(space))
+            best = runner.best()
+        else:
+            best = runner.random_search(space, args.samples, refine_rounds=args.refine)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+
+    for row in best:
+        print(f"{row['pnl_pct']:>9.2f}% (худшая {row['worst_pnl_pct']:.2f}%, просадка "
+              f"{row['max_drawdown_pct']:.2f}%, сделок {row['trades']}) {params_key(row['params'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,4 +10,19 @@ BYBIT_API_KEY = os.getenv("BYBIT_API_KEY", "your_api_key")
 BYBIT_API_SECRET = os.getenv("BYBIT_API_SECRET", "your_api_secret")
 IS_TESTNET = False
 
+# REST API Bybit (можно переопределить для локального стенда, см. app/backtest/bybit_sim.py)
+BYBIT_REST_URL = os.getenv("BYBIT_REST_URL", "https://api.bybit.com")
+
+# Публичный WebSocket рыночных данных (можно переопределить для локального стенда)
+BYBIT_WS_PUBLIC_URL = os.getenv("BYBIT_WS_PUBLIC_URL", "wss://stream.bybit.com/v5/public/spot")
+# Приватный WebSocket: ордера, исполнения и кошелек
+BYBIT_WS_PRIVATE_URL = os.getenv("BYBIT_WS_PRIVATE_URL", "wss://stream.bybit.com/v5/private")
+# Сколько секунд снимок тикеров всех пар считается свежим
+TICKER_CACHE_TTL = float(os.getenv("TICKER_CACHE_TTL", "2"))
+# Обучение моделей: сколько монет одновременно (процессов) и потоков TensorFlow на процесс
+TRAINING_WORKERS = int(os.getenv("TRAINING_WORKERS", "1"))
+TRAINING_THREADS = int(os.getenv("TRAINING_THREADS", "1"))
+# Бюджет времени одного тика стратегии, мс: более долгие тики попадают в лог
+TICK_BUDGET_MS = float(os.getenv("TICK_BUDGET_MS", "500"))
+
 symbol = "SOLUSDT"
\ No newline at end of file
@@ -0,0 +1,274 @@
+# app/indicators/streaming.py
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.utils.candle_frame import CandleFrame
+
+
+class StreamingIndicator(ABC):
+    """Индикатор, который обновляется по одной закрытой свече за O(1).
+
+    update() учитывает закрытую свечу, peek() возвращает значение с учетом
+    текущей (незакрытой) свечи, не меняя состояния.
+    """
+
+    @abstractmethod
+    def reset(self):
+        """Сбрасывает состояние к началу истории"""
+        pass
+
+    @abstractmethod
+    def update(self, close: float):
+        """Учитывает закрытую свечу"""
+        pass
+
+    @abstractmethod
+    def peek(self, close: float) -> float:
+        """Значение с учетом незакрытой свечи, состояние не меняется"""
+        pass
+
+    # Индикаторы по цене закрытия игнорируют high/low
+    def update_bar(self, high: float, low: float, close: float):
+        self.update(close)
+
+    def peek_bar(self, high: float, low: float, close: float) -> float:
+        return self.peek(close)
+
+
+class RollingWindow:
+    """Сумма и сумма квадратов последних size значений"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values = deque()
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def push(self, value: float):
+        self.values.append(value)
+        self.total += value
+        self.total_sq += value * value
+        if len(self.values) > self.size:
+            old = self.values.popleft()
+            self.total -= old
+            self.total_sq -= old * old
+
+    def with_value(self, value: float):
+        """(count, sum, sum_sq) окна, если бы в него добавили value"""
+        count, total, total_sq = len(self.values), self.total, self.total_sq
+        if count == self.size:
+            old = self.values[0]
+            total -= old
+            total_sq -= old * old
+            count -= 1
+        return count + 1, total + value, total_sq + value * value
+
+
+class StreamingEMA(StreamingIndicator):
+    """EMA с затравкой первой ценой (как в MovingAverageStrategy). До window
+    свечей значение считается неготовым и равно 0"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.k = 2 / (window + 1)
+        self.reset()
+
+    def reset(self):
+        self.ema: Optional[float] = None
+        self.count = 0
+
+    def _next(self, close: float) -> float:
+        if self.ema is None:
+            return close
+        return close * self.k + self.ema * (1 - self.k)
+
+    def update(self, close: float):
+        self.ema = self._next(close)
+        self.count += 1
+
+    def peek(self, close: float) -> float:
+        return self._next(close) if self.count + 1 >= self.window else 0.0
+
+    @property
+    def value(self) -> float:
+        return self.ema if self.ema is not None and self.count >= self.window else 0.0
+
+
+class StreamingRSI(StreamingIndicator):
+    """RSI Уайлдера: первые period изменений усредняются, дальше сглаживание
+    avg = (avg * (period - 1) + x) / period"""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.reset()
+
+    def reset(self):
+        self.prev_close: Optional[float] = None
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.count = 0
+
+    def _next(self, close: float):
+        delta = close - self.prev_close
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        if self.count < self.period:
+            # Затравка - простое среднее первых period изменений
+            n = self.count + 1
+            return (self.avg_gain * self.count + gain) / n, (self.avg_loss * self.count + loss) / n
+        p = self.period
+        return (self.avg_gain * (p - 1) + gain) / p, (self.avg_loss * (p - 1) + loss) / p
+
+    def update(self, close: float):
+        if self.prev_close is not None:
+            self.avg_gain, self.avg_loss = self._next(close)
+            self.count += 1
+        self.prev_close = close
+
+    def peek(self, close: float) -> float:
+        if self.prev_close is None or self.count + 1 < self.period:
+            return 50.0
+        return _rsi(*self._next(close))
+
+    @property
+    def value(self) -> float:
+        return _rsi(self.avg_gain, self.avg_loss) if self.count >= self.period else 50.0
+
+
+def _rsi(avg_gain: float, avg_loss: float) -> float:
+    if avg_loss == 0:
+        return 100.0 if avg_gain > 0 else 50.0
+    rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return min(max(rsi, 0.0), 100.0)
+
+
+class StreamingATR(StreamingIndicator):
+    """ATR как среднее true range последних period свечей"""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.reset()
+
+    def reset(self):
+        self.prev_close: Optional[float] = None
+        self.window = RollingWindow(self.period)
+
+    def _true_range(self, high: float, low: float) -> float:
+        return max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+
+    def update_bar(self, high: float, low: float, close: float):
+        if self.prev_close is not None:
+            self.window.push(self._true_range(high, low))
+        self.prev_close = close
+
+    def peek_bar(self, high: float, low: float, close: float) -> float:
+        if self.prev_close is None:
+            return 0.0
+        count, total, _ = self.window.with_value(self._true_range(high, low))
+        return total / count
+
+    def update(self, close: float):
+        self.update_bar(close, close, close)
+
+    def peek(self, close: float) -> float:
+        return self.peek_bar(close, close, close)
+
+    @property
+    def value(self) -> float:
+        count = len(self.window.values)
+        return self.window.total / count if count else 0.0
+
+
+class RollingStd(StreamingIndicator):
+    """Стандартное отклонение (ddof=0) последних window лог-доходностей"""
+
+    def __init__(self, window: int):
+        self.size = window
+        self.reset()
+
+    def reset(self):
+        self.prev_close: Optional[float] = None
+        self.window = RollingWindow(self.size)
+
+    def update(self, close: float):
+        if self.prev_close is not None:
+            self.window.push(math.log(close / self.prev_close))
+        self.prev_close = close
+
+    def peek(self, close: float) -> float:
+        if self.prev_close is None:
+            return 0.0
+        return _std(*self.window.with_value(math.log(close / self.prev_close)))
+
+    @property
+    def value(self) -> float:
+        return _std(len(self.window.values), self.window.total, self.window.total_sq)
+
+
+def _std(count: int, total: float, total_sq: float) -> float:
+    if count == 0:
+        return 0.0
+    mean = total / count
+    # Погрешность суммы квадратов может дать отрицательную дисперсию около нуля
+    return math.sqrt(max(total_sq / count - mean * mean, 0.0))
+
+
+class IndicatorEngine:
+    """Набор потоковых индикаторов по свечам одного таймфрейма.
+
+    sync() подает индикаторам закрытые свечи кадра (все, кроме последней),
+    которых они еще не видели; при разрыве в истории индикаторы заново
+    считаются по кадру. peek() возвращает значения с учетом текущей свечи.
+    """
+
+    def __init__(self, step_ms: int, **indicators: StreamingIndicator):
+        self.step_ms = step_ms
+        self.indicators = indicators
+        self.last_timestamp: Optional[float] = None
+
+    def __getitem__(self, name: str) -> StreamingIndicator:
+        return self.indicators[name]
+
+    def reset(self):
+        for indicator in self.indicators.values():
+            indicator.reset()
+        self.last_timestamp = None
+
+    def is_current(self, bars: int) -> bool:
+        """Хватит ли последних bars свечей, чтобы продолжить без разрыва"""
+        return (
+            self.last_timestamp is not None
+            and time.time() * 1000 - self.last_timestamp <= bars * self.step_ms
+        )
+
+    def sync(self, frame: CandleFrame) -> int:
+        """Учитывает новые закрытые свечи кадра. Возвращает их число"""
+        timestamps = frame.timestamp[:-1]
+        if not len(timestamps):
+            return 0
+
+        if self.last_timestamp is None or timestamps[0] > self.last_timestamp + self.step_ms:
+            self.reset()
+            start = 0
+        else:
+            start = int(np.searchsorted(timestamps, self.last_timestamp, side="right"))
+
+        highs, lows, closes = frame.high, frame.low, frame.close
+        for i in range(start, len(timestamps)):
+            for indicator in self.indicators.values():
+                indicator.update_bar(highs[i], lows[i], closes[i])
+        if start < len(timestamps):
+            self.last_timestamp = timestamps[-1]
+        return len(timestamps) - start
+
+    def peek(self, frame: CandleFrame) -> Dict[str, float]:
+        """Значения индикаторов с учетом последней (текущей) свечи кадра"""
+        high, low, close = frame.high[-1], frame.low[-1], frame.close[-1]
+        return {
+            name: indicator.peek_bar(high, low, close)
+            for name, indicator in self.indicators.items()
+        }
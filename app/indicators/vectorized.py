@@ -0,0 +1,123 @@
+# app/indicators/vectorized.py
+"""Индикаторы по целым массивам свечей.
+
+Каждая функция считает полный ряд значений за один проход NumPy/SciPy
+без циклов Python. Вход - одномерный массив или двумерный (монеты x свечи),
+расчет всегда идет по последней оси. Пока данных недостаточно, в начале
+ряда стоит NaN.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+
+def _as_float(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def _pad_front(values: np.ndarray, n: int) -> np.ndarray:
+    """Дополняет ряд NaN слева до длины n"""
+    missing = n - values.shape[-1]
+    if missing <= 0:
+        return values
+    pad = np.full(values.shape[:-1] + (missing,), np.nan)
+    return np.concatenate([pad, values], axis=-1)
+
+
+def _smooth(values: np.ndarray, alpha: float, first: np.ndarray) -> np.ndarray:
+    """y[i] = alpha * x[i] + (1 - alpha) * y[i-1] при y[-1] = first"""
+    zi = ((1 - alpha) * first)[..., np.newaxis]
+    y, _ = lfilter([alpha], [1.0, alpha - 1.0], values, axis=-1, zi=zi)
+    return y
+
+
+def ema(values, window: int) -> np.ndarray:
+    """EMA с k = 2 / (window + 1), затравка - первое значение ряда"""
+    values = _as_float(values)
+    if values.shape[-1] == 0:
+        return values.copy()
+    return _smooth(values, 2 / (window + 1), values[..., 0])
+
+
+def wilder(values, period: int) -> np.ndarray:
+    """Сглаживание Уайлдера: первое значение - среднее первых period
+    элементов, дальше avg = (avg * (period - 1) + x) / period"""
+    values = _as_float(values)
+    n = values.shape[-1]
+    if n < period:
+        return np.full(values.shape, np.nan)
+    seed = values[..., :period].mean(axis=-1)
+    rest = _smooth(values[..., period:], 1 / period, seed)
+    return _pad_front(np.concatenate([seed[..., np.newaxis], rest], axis=-1), n)
+
+
+def rolling_mean(values, window: int) -> np.ndarray:
+    values = _as_float(values)
+    n = values.shape[-1]
+    if n < window:
+        return np.full(values.shape, np.nan)
+    return _pad_front(sliding_window_view(values, window, axis=-1).mean(axis=-1), n)
+
+
+def rolling_std(values, window: int) -> np.ndarray:
+    """Скользящее стандартное отклонение (ddof=0)"""
+    values = _as_float(values)
+    n = values.shape[-1]
+    if n < window:
+        return np.full(values.shape, np.nan)
+    return _pad_front(sliding_window_view(values, window, axis=-1).std(axis=-1), n)
+
+
+def log_returns(close) -> np.ndarray:
+    """Лог-доходности: на один элемент короче ряда цен"""
+    return np.diff(np.log(_as_float(close)), axis=-1)
+
+
+def pct_returns(close) -> np.ndarray:
+    """Относительные изменения цены; там, где предыдущая цена 0, - NaN"""
+    close = _as_float(close)
+    prev = close[..., :-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(prev != 0, (close[..., 1:] - prev) / np.where(prev != 0, prev, 1), np.nan)
+
+
+def true_range(high, low, close) -> np.ndarray:
+    """True range со второй свечи: на один элемент короче ряда"""
+    high, low, close = _as_float(high), _as_float(low), _as_float(close)
+    prev_close = close[..., :-1]
+    high, low = high[..., 1:], low[..., 1:]
+    return np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def atr(high, low, close, period: int = 14) -> np.ndarray:
+    """ATR как скользящее среднее true range (значение для каждой свечи)"""
+    tr = true_range(high, low, close)
+    return _pad_front(rolling_mean(tr, period), _as_float(close).shape[-1])
+
+
+def rsi(close, period: int = 14) -> np.ndarray:
+    """RSI Уайлдера; значение для каждой свечи начиная с period-й"""
+    close = _as_float(close)
+    deltas = np.diff(close, axis=-1)
+    avg_gain = wilder(np.maximum(deltas, 0.0), period)
+    avg_loss = wilder(np.maximum(-deltas, 0.0), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    # Без убытков RSI = 100, без движения вовсе - нейтральные 50
+    values = np.where(avg_loss == 0, np.where(avg_gain > 0, 100.0, 50.0), values)
+    values = np.where(np.isnan(avg_gain), np.nan, values)
+    return _pad_front(values, close.shape[-1])
+
+
+def linear_slope(values) -> np.ndarray:
+    """Наклон линии регрессии по индексу (как np.polyfit(x, y, 1)[0])"""
+    values = _as_float(values)
+    x = np.arange(values.shape[-1], dtype=np.float64)
+    x -= x.mean()
+    centered = values - values.mean(axis=-1, keepdims=True)
+    return (centered * x).sum(axis=-1) / (x * x).sum()
+
+
+def relative_range(high, low, close) -> np.ndarray:
+    """Размах свечи относительно цены закрытия"""
+    return (_as_float(high) - _as_float(low)) / _as_float(close)
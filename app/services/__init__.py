@@ -2,7 +2,7 @@ from .coin_ranker import CoinRanker
 from .coin_rotator import CoinRotator
 from .coin_selector import CoinSelector
 from .model_trainer import ModelTrainer
-from .bybit_service import BybitService
+from .bybit_service import BybitService, get_bybit_service
 from .bot_runner import TradingBot
 
 
@@ -13,5 +13,6 @@ __all__ = [
     'CoinSelector', 
     'ModelTrainer', 
     'BybitService', 
+    'get_bybit_service',
     'TradingBot'
 ]
\ No newline at end of file
@@ -0,0 +1,237 @@
+# app/services/account_stream.py
+import hashlib
+import hmac
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from app.config import BYBIT_WS_PRIVATE_URL
+from app.services.ws_client import WebSocketClient
+from app.utils.log_helper import log_maker
+
+ACCOUNT_TOPICS = ("order", "execution", "wallet")
+
+# Статусы, после которых ордер больше не меняется
+FINAL_ORDER_STATUSES = {
+    "Filled",
+    "PartiallyFilledCanceled",
+    "Cancelled",
+    "Rejected",
+    "Deactivated",
+}
+
+# В историю исполненных попадают только полностью исполненные ордера -
+# как в REST-запросе get_order_history(orderStatus="Filled")
+FILLED_ORDER_STATUS = "Filled"
+
+# Сколько последних завершенных ордеров (и исполнений) держать для wait_for_fill
+TRACKED_ORDERS_LIMIT = 200
+
+
+class AccountStream(WebSocketClient):
+    """Локальное представление счета по приватному WebSocket Bybit.
+
+    Балансы, ордера и исполнения обновляются событиями order, execution
+    и wallet. После каждого (пере)подключения состояние заново заполняется
+    через REST в on_ready, и только после этого выставляется ready - до
+    этого вызывающий код продолжает работать через REST.
+    """
+
+    name = "account-stream"
+
+    def __init__(
+        self,
+        api_key: str,
+        api_secret: str,
+        url: str = BYBIT_WS_PRIVATE_URL,
+        on_ready: Optional[Callable[["AccountStream"], None]] = None,
+        reconnect_delay: float = 5.0,
+    ):
+        if not api_key or not api_secret:
+            raise ValueError("Приватный поток требует BYBIT_API_KEY и BYBIT_API_SECRET")
+        super().__init__(url, reconnect_delay)
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.on_ready = on_ready
+        self.ready = threading.Event()
+
+        self._lock = threading.Lock()
+        self._order_updated = threading.Condition(self._lock)
+        self._coins: Dict[str, dict] = {}
+        self._orders: Dict[str, dict] = {}
+        self._finished: "OrderedDict[str, None]" = OrderedDict()  # завершенные, от старых к новым
+        self._executions: "OrderedDict[str, dict]" = OrderedDict()
+        self._filled: Dict[str, List[dict]] = {}
+        self._filled_depth: Dict[str, int] = {}
+
+    # --- Соединение ---
+
+    def _auth_payload(self) -> dict:
+        expires = int((time.time() + 10) * 1000)
+        signature = hmac.new(
+            self.api_secret.encode(), f"GET/realtime{expires}".encode(), hashlib.sha256
+        ).hexdigest()
+        return {"op": "auth", "args": [self.api_key, expires, signature]}
+
+    def on_connected(self):
+        self.send_json(self._auth_payload())
+
+    def _on_close(self):
+        super()._on_close()
+        # Пока нет связи, события могут теряться - представлению не доверяем
+        self.ready.clear()
+        with self._lock:
+            self._filled.clear()
+            self._filled_depth.clear()
+
+    def _on_authenticated(self):
+        self.send_op("subscribe", ACCOUNT_TOPICS)
+        try:
+            if self.on_ready:
+                self.on_ready(self)
+            self.ready.set()
+            log_maker("🔐 Приватный поток подключен, состояние счета синхронизировано")
+        except Exception as e:
+            log_maker(f"🔐⚠️ Не удалось синхронизировать состояние счета: {e}")
+            self.reconnect()
+
+    # --- Начальное состояние из REST ---
+
+    def seed_wallet(self, coins: List[dict]):
+        """Полный снимок монет кошелька (get_wallet_balance)"""
+        with self._lock:
+            self._coins = {item["coin"]: item for item in coins}
+
+    def seed_filled_orders(self, symbol: str, orders: List[dict], depth: int):
+        """История исполненных ордеров символа (новые первыми)"""
+        with self._lock:
+            self._filled[symbol] = list(orders)
+            self._filled_depth[symbol] = depth
+
+    # --- Обработка сообщений ---
+
+    def handle_message(self, message: str):
+        try:
+            msg = json.loads(message)
+        except ValueError:
+            return
+
+        if msg.get("op") == "auth":
+            if msg.get("success"):
+                self._on_authenticated()
+            else:
+                log_maker(f"🔐❌ Ошибка авторизации приватного потока: {msg.get('ret_msg')}")
+            return
+
+        topic = msg.get("topic")
+        try:
+            if topic == "wallet":
+                self._on_wallet(msg["data"])
+            elif topic == "order":
+                self._on_orders(msg["data"])
+            elif topic == "execution":
+                self._on_executions(msg["data"])
+        except (KeyError, IndexError, ValueError, TypeError) as e:
+            log_maker(f"🔐⚠️ Некорректное сообщение {topic}: {e}")
+
+    def _on_wallet(self, accounts: List[dict]):
+        with self._lock:
+            for account in accounts:
+                if account.get("accountType", "UNIFIED") != "UNIFIED":
+                    continue
+                for item in account.get("coin", []):
+                    self._coins[item["coin"]] = item
+
+    def _on_executions(self, executions: List[dict]):
+        with self._lock:
+            for execution in executions:
+                if execution.get("category", "spot") != "spot":
+                    continue
+                totals = self._executions.get(execution["orderId"])
+                if totals is None:
+                    totals = {"qty": 0.0, "value": 0.0, "fee": 0.0, "ids": set()}
+                    self._executions[execution["orderId"]] = totals
+                    # Исполнения без события ордера тоже не копятся бесконечно
+                    while len(self._executions) > TRACKED_ORDERS_LIMIT:
+                        self._executions.popitem(last=False)
+                if execution["execId"] in totals["ids"]:
+                    continue
+                totals["ids"].add(execution["execId"])
+                totals["qty"] += float(execution["execQty"])
+                totals["value"] += float(execution["execQty"]) * float(execution["execPrice"])
+                totals["fee"] += float(execution.get("execFee") or 0)
+            self._order_updated.notify_all()
+
+    def _on_orders(self, orders: List[dict]):
+        with self._lock:
+            for order in orders:
+                if order.get("category", "spot") != "spot":
+                    continue
+                self._orders[order["orderId"]] = order
+                if order.get("orderStatus") in FINAL_ORDER_STATUSES:
+                    self._finish(order["orderId"])
+                if order.get("orderStatus") == FILLED_ORDER_STATUS:
+                    self._record_fill(order)
+            self._order_updated.notify_all()
+
+    def _finish(self, order_id: str):
+        """Запоминает завершенный ордер; самые старые забываются вместе с исполнениями"""
+        self._finished[order_id] = None
+        self._finished.move_to_end(order_id)
+        while len(self._finished) > TRACKED_ORDERS_LIMIT:
+            old_id, _ = self._finished.popitem(last=False)
+            self._orders.pop(old_id, None)
+            self._executions.pop(old_id, None)
+
+    def _record_fill(self, order: dict):
+        filled = self._filled.get(order["symbol"])
+        if filled is None:
+            return  # история символа еще не загружена - ее целиком отдаст REST
+        if any(o["orderId"] == order["orderId"] for o in filled):
+            return
+        filled.insert(0, order)
+        self._filled_depth[order["symbol"]] += 1
+
+    # --- Чтение состояния ---
+
+    def coin(self, coin: str) -> Optional[dict]:
+        with self._lock:
+            return self._coins.get(coin)
+
+    def coins(self) -> List[dict]:
+        with self._lock:
+            return list(self._coins.values())
+
+    def filled_orders(self, symbol: str, limit: int) -> Optional[List[dict]]:
+        """Исполненные ордера (новые первыми) или None, если истории недостаточно"""
+        with self._lock:
+            if self._filled_depth.get(symbol, 0) < limit:
+                return None
+            return self._filled[symbol][:limit]
+
+    def wait_for_fill(self, order_id: str, timeout: float) -> Optional[dict]:
+        """Ждет финального статуса ордера. Возвращает ордер, если по нему были
+        исполнения, иначе None (отменен, отклонен или таймаут)"""
+        deadline = time.time() + timeout
+        with self._order_updated:
+            while True:
+                order = self._orders.get(order_id)
+                if order is not None and order.get("orderStatus") in FINAL_ORDER_STATUSES:
+                    if not _executed(order):
+                        return None
+                    order = dict(order)
+                    totals = self._executions.get(order_id)
+                    # Средняя цена может прийти пустой - считаем по исполнениям
+                    if totals and totals["qty"] and not float(order.get("avgPrice") or 0):
+                        order["avgPrice"] = str(totals["value"] / totals["qty"])
+                    return order
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return None
+                self._order_updated.wait(remaining)
+
+
+def _executed(order: dict) -> bool:
+    return float(order.get("cumExecQty") or 0) > 0
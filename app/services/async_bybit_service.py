@@ -0,0 +1,394 @@
+# app/services/async_bybit_service.py
+import asyncio
+import hashlib
+import hmac
+import json
+import threading
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlencode
+
+import aiohttp
+import numpy as np
+
+from app.services.bybit_service import (
+    RETRY_DELAY,
+    BybitService,
+    get_bybit_service,
+    parse_klines,
+    parse_tickers,
+)
+from app.services.rate_limiter import RATE_LIMIT_RET_CODE, RATE_LIMIT_STATUSES
+from app.utils.candle_frame import CandleFrame
+from app.utils.candle_store import CANDLE_COLUMNS, interval_to_ms
+from app.utils.history_loader import KLINE_PAGE_LIMIT
+from app.utils.log_helper import log_maker
+
+RECV_WINDOW = "15000"
+
+
+class AsyncBybitService:
+    """Асинхронный клиент Bybit с тем же набором методов, что и BybitService.
+
+    Все запросы идут через одну aiohttp-сессию с пулом keep-alive соединений,
+    поэтому параллельные запросы по многим монетам стоят одного цикла событий,
+    а не пула потоков. Хранилище свечей, кэш, таблица инструментов и потоки
+    WebSocket берутся у синхронного BybitService - состояние у них общее.
+    """
+
+    def __init__(
+        self,
+        bybit: Optional[BybitService] = None,
+        base_url: Optional[str] = None,
+        max_connections: int = 16,
+        max_concurrency: int = 8,
+    ):
+        self.bybit = bybit or get_bybit_service()
+        self.base_url = base_url or self.bybit.base_url
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        # Сессия привязана к циклу событий, поэтому создается внутри него
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections,
+                keepalive_timeout=60,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=45, connect=15),
+                headers={"Content-Type": "application/json", "Accept": "application/json"},
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    # --- Транспорт ---
+
+    async def _request(
+        self, method: str, path: str, params: Optional[dict] = None, signed: bool = False
+    ) -> dict:
+        session = await self._get_session()
+        params = params or {}
+        headers = {}
+        url = f"{self.base_url}{path}"
+        body = None
+
+        if method == "GET":
+            query = urlencode(params)
+            if query:
+                url = f"{url}?{query}"
+            payload = query
+        else:
+            body = json.dumps(params)
+            payload = body
+
+        if signed:
+            timestamp = str(int(time.time() * 1000))
+            sign = hmac.new(
+                self.bybit.api_secret.encode(),
+                f"{timestamp}{self.bybit.api_key}{RECV_WINDOW}{payload}".encode(),
+                hashlib.sha256,
+            ).hexdigest()
+            headers = {
+                "X-BAPI-API-KEY": self.bybit.api_key,
+                "X-BAPI-SIGN": sign,
+                "X-BAPI-SIGN-TYPE": "2",
+                "X-BAPI-TIMESTAMP": timestamp,
+                "X-BAPI-RECV-WINDOW": RECV_WINDOW,
+            }
+
+        # Очередь общего ограничителя - до захвата соединения из пула
+        await self.bybit.rate_limiter.acquire_async(path)
+        async with self._semaphore:
+            async with session.request(method, url, data=body, headers=headers) as response:
+                self.bybit.rate_limiter.observe(path, response.status, response.headers)
+                if response.status != 200:
+                    raise aiohttp.ClientResponseError(
+                        response.request_info, response.history, status=response.status
+                    )
+                return await response.json(content_type=None)
+
+    # --- Рыночные данные ---
+
+    async def fetch_klines(
+        self,
+        symbol: str,
+        interval: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        limit: int = KLINE_PAGE_LIMIT,
+    ) -> Optional[np.ndarray]:
+        """Один запрос /v5/market/kline. Свечи в порядке возрастания времени"""
+        params = {"category": "spot", "symbol": symbol, "interval": interval, "limit": limit}
+        if start is not None:
+            params["start"] = start
+        if end is not None:
+            params["end"] = end
+
+        for attempt in range(4):
+            try:
+                data = await self._request("GET", "/v5/market/kline", params)
+                if data.get("retCode") != 0:
+                    error_msg = data.get("retMsg", "Unknown error")
+                    log_maker(f"📊❌ API: {error_msg}")
+                    if (
+                        data.get("retCode") == RATE_LIMIT_RET_CODE
+                        or "too many requests" in error_msg.lower()
+                    ):
+                        self.bybit.rate_limiter.penalize("/v5/market/kline")
+                        continue
+                    if "service unavailable" in error_msg.lower():
+                        await asyncio.sleep(RETRY_DELAY * (attempt + 1))
+                        continue
+                    return None
+                return parse_klines(data["result"]["list"])
+            except aiohttp.ClientResponseError as e:
+                log_maker(f"📊❌ HTTP {e.status} для {symbol}")
+                # Паузу после превышения лимита выставил ограничитель по ответу
+                if e.status in RATE_LIMIT_STATUSES:
+                    continue
+                if e.status not in (500, 502, 503, 504):
+                    return None
+                await asyncio.sleep(RETRY_DELAY * (attempt + 1))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                wait_time = RETRY_DELAY * (attempt + 1)
+                log_maker(
+                    f"📊⚠️ Сетевая ошибка ({attempt+1}): {type(e).__name__} - жду {wait_time} сек"
+                )
+                await asyncio.sleep(wait_time)
+        return None
+
+    async def _fetch_range(self, symbol: str, interval: str, start: int, end: int) -> Optional[np.ndarray]:
+        """Свечи с временем открытия в [start, end]: все страницы запрашиваются параллельно"""
+        step = interval_to_ms(interval)
+        page_span = KLINE_PAGE_LIMIT * step
+        pages = await asyncio.gather(*[
+            self.fetch_klines(
+                symbol, interval, start=page_start,
+                end=min(end, page_start + page_span - step), limit=KLINE_PAGE_LIMIT,
+            )
+            for page_start in range(start, end + 1, page_span)
+        ])
+        if any(page is None for page in pages):
+            return None
+        if not pages:
+            return np.empty((0, len(CANDLE_COLUMNS)), dtype=np.float64)
+        rows = np.concatenate(pages)
+        return rows[(rows[:, 0] >= start) & (rows[:, 0] <= end)]
+
+    async def _sync_candles(self, symbol: str, interval: str, limit: int) -> Optional[np.ndarray]:
+        """Асинхронный аналог BybitService._sync_candles: история и пропуски
+        догружаются тем же кодом (HistoryLoader) в пуле потоков, в цикле
+        событий остаются только запросы окна"""
+        loop = asyncio.get_running_loop()
+        start, end, now_ms = await loop.run_in_executor(
+            None, self.bybit._sync_range, symbol, interval, limit
+        )
+        rows = await self._fetch_range(symbol, interval, start, end)
+        if rows is None:
+            return None
+        return await loop.run_in_executor(
+            None, self.bybit._store_fetched, symbol, interval, rows, now_ms
+        )
+
+    async def get_candles(self, symbol: str, interval: str, limit: int = 100) -> CandleFrame:
+        step = interval_to_ms(interval)
+        if step is None:
+            rows = await self.fetch_klines(symbol, interval, limit=min(limit, KLINE_PAGE_LIMIT))
+            return CandleFrame.from_rows(rows) if rows is not None else CandleFrame.empty()
+
+        # Чтение файлов хранилища и CCXT блокируют поток - не держим ими цикл событий
+        loop = asyncio.get_running_loop()
+        forming = await loop.run_in_executor(
+            None, self.bybit._cached_forming, symbol, interval, limit
+        )
+        if forming is None:
+            forming = self.bybit._remember_forming(
+                symbol, interval, limit, await self._sync_candles(symbol, interval, limit)
+            )
+        return await loop.run_in_executor(
+            None, self.bybit._candles_or_fallback, symbol, interval, limit, forming
+        )
+
+    async def get_candles_many(
+        self, symbols: List[str], interval: str, limit: int = 100
+    ) -> Dict[str, CandleFrame]:
+        """Свечи по списку символов одним пакетом параллельных запросов"""
+        frames = await asyncio.gather(
+            *[self.get_candles(symbol, interval, limit) for symbol in symbols],
+            return_exceptions=True,
+        )
+        result = {}
+        for symbol, frame in zip(symbols, frames):
+            if isinstance(frame, Exception):
+                log_maker(f"📊⚠️ Ошибка получения свечей {symbol}: {frame}")
+                frame = CandleFrame.empty()
+            result[symbol] = frame
+        return result
+
+    async def get_price(self, symbol: str) -> Optional[float]:
+        if self.bybit.market_stream is not None:
+            price = self.bybit.market_stream.get_price(symbol)
+            if price is not None:
+                return price
+        ticker = self.bybit._fresh_tickers().get(symbol)
+        if ticker is not None:
+            return ticker.last
+        try:
+            data = await self._request(
+                "GET", "/v5/market/tickers", {"category": "spot", "symbol": symbol}
+            )
+            return float(data["result"]["list"][0]["lastPrice"])
+        except Exception as e:
+            log_maker(f"💥 [ERROR] Ошибка получения цены: {e}")
+            return None
+
+    async def get_all_tickers(self) -> Dict:
+        """Тикеры всех спотовых пар; снимок общий с BybitService"""
+        tickers = self.bybit._fresh_tickers()
+        if tickers:
+            return tickers
+        try:
+            data = await self._request("GET", "/v5/market/tickers", {"category": "spot"})
+            if data.get("retCode") == 0:
+                self.bybit._store_tickers(parse_tickers(data["result"]["list"]))
+            else:
+                log_maker(f"💹❌ API: {data.get('retMsg')}")
+        except Exception as e:
+            log_maker(f"💥 [ERROR] Ошибка получения тикеров: {e}")
+        return self.bybit._tickers
+
+    async def get_prices(self, symbols: List[str]) -> Dict[str, float]:
+        stream = self.bybit.market_stream
+        prices = {}
+        for symbol in symbols:
+            price = stream.get_price(symbol) if stream is not None else None
+            if price is not None:
+                prices[symbol] = price
+        missing = [symbol for symbol in symbols if symbol not in prices]
+        if missing:
+            tickers = await self.get_all_tickers()
+            prices.update({s: tickers[s].last for s in missing if s in tickers})
+        return prices
+
+    # --- Счет и ордера ---
+
+    async def get_balance(self, coin: str) -> float:
+        view = self.bybit._account_view()
+        if view is not None:
+            item = view.coin(coin)
+            return BybitService._coin_balance(item) if item else 0.0
+        try:
+            data = await self._request(
+                "GET", "/v5/account/wallet-balance",
+                {"accountType": "UNIFIED", "coin": coin}, signed=True,
+            )
+            for item in data["result"]["list"][0]["coin"]:
+                if item["coin"] == coin:
+                    return BybitService._coin_balance(item)
+            return 0.0
+        except Exception as e:
+            log_maker(f"💰❌ [ERROR] Ошибка получения баланса: {e}")
+            return 0.0
+
+    async def get_filled_orders(self, symbol: str, limit: int = 5) -> List[dict]:
+        view = self.bybit._account_view()
+        if view is not None:
+            orders = view.filled_orders(symbol, limit)
+            if orders is not None:
+                return orders
+        try:
+            data = await self._request(
+                "GET", "/v5/order/history",
+                {"category": "spot", "symbol": symbol, "limit": limit, "orderStatus": "Filled"},
+                signed=True,
+            )
+            orders = sorted(
+                data["result"]["list"], key=lambda x: int(x["createdTime"]), reverse=True
+            )
+            if view is not None:
+                view.seed_filled_orders(symbol, orders, limit)
+            return orders
+        except Exception as e:
+            log_maker(f"📜❌ [ERROR] Не удалось получить историю ордеров: {e}")
+            return []
+
+    async def market_order(
+        self, symbol: str, side: str, quantity: float, is_quote: bool = False
+    ) -> dict:
+        params = {
+            "category": "spot",
+            "symbol": symbol,
+            "side": side.capitalize(),
+            "orderType": "Market",
+        }
+        if side.lower() == "buy" and is_quote:
+            params["marketUnit"] = "quoteCoin"
+            quantity = round(quantity, 2)
+        params["qty"] = str(quantity)
+        try:
+            return await self._request("POST", "/v5/order/create", params, signed=True)
+        except Exception as e:
+            log_maker(f"🚫 [ERROR] Ошибка размещения ордера: {e}")
+            return {}
+
+
+class SyncBybitFacade:
+    """Синхронная обертка над AsyncBybitService для существующего кода.
+
+    Свой цикл событий крутится в фоновом потоке; корутины сервиса вызываются
+    как обычные блокирующие методы, а gather выполняет несколько вызовов
+    одновременно: facade.gather(facade.service.get_balance("USDT"), ...).
+    """
+
+    def __init__(self, service: Optional[AsyncBybitService] = None, timeout: float = 120):
+        self.service = service or AsyncBybitService()
+        self.timeout = timeout
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="bybit-async", daemon=True
+        )
+        self._thread.start()
+
+    def run(self, coro):
+        """Выполняет корутину в цикле фасада и возвращает результат"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(self.timeout)
+
+    def gather(self, *coros) -> list:
+        async def _gather():
+            return await asyncio.gather(*coros)
+        return self.run(_gather())
+
+    def __getattr__(self, name):
+        attr = getattr(self.service, name)
+        if not asyncio.iscoroutinefunction(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            return self.run(attr(*args, **kwargs))
+        return call
+
+    def close(self):
+        self.run(self.service.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+_default_facade: Optional[SyncBybitFacade] = None
+_default_facade_guard = threading.Lock()
+
+
+def get_async_bybit() -> SyncBybitFacade:
+    """Общий для процесса асинхронный клиент (один цикл событий, одна сессия)"""
+    global _default_facade
+    with _default_facade_guard:
+        if _default_facade is None:
+            _default_facade = SyncBybitFacade()
+        return _default_facade
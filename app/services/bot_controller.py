@@ -4,8 +4,9 @@ import time
 import threading
 import logging
 from app.services.bot_runner import TradingBot
-from app.services.bybit_service import BybitService
+from app.services.bybit_service import get_bybit_service
 from app.strategies import NeuralStrategy, MovingAverageStrategy
+from app.strategies.neural_network.registry import get_model_registry
 from app.utils.log_helper import log_maker, log_error
 
 class BotController:
@@ -13,7 +14,16 @@ class BotController:
         self.thread = None
         self.strategy_type = strategy_type
         self._running = threading.Event()
-        self.bybit = BybitService()
+        self.bybit = get_bybit_service()
+        # Таблица инструментов загружается один раз и обновляется в фоне
+        self.bybit.instruments.start()
+        # Свечи, цены и стакан активной монеты приходят по WebSocket
+        self.bybit.start_market_stream()
+        # Балансы и исполнения ордеров - по приватному потоку, если заданы ключи
+        if self.bybit.api_key and self.bybit.api_secret:
+            self.bybit.start_account_stream()
+        else:
+            log_maker("⚠️ Ключи API не заданы: приватный поток не запущен, счет читается через REST")
         self.state = self.load_bot_state()
         self.rotator = rotator
         
@@ -77,7 +87,8 @@ class BotController:
                 model_path=model_base_path,
                 rotator=self.rotator,  
                 trading_system=self,
-                interval=self.interval
+                interval=self.interval,
+                registry=get_model_registry()
             )
             log_maker(f"🧠 Нейросетевая стратегия загружена для {self.symbol}")
             return strategy
@@ -103,6 +114,7 @@ class BotController:
     def switch_coin(self, new_coin: str):
         """Переключение на новую монету"""
         log_maker(f"🔄 Переключение на {new_coin}")
+        self.bot.data_provider.unsubscribe()
         self.position_coin = new_coin
         self.symbol = f"{new_coin}USDT"
         
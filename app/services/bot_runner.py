@@ -1,5 +1,6 @@
 import time
 import traceback
+from app.services.async_bybit_service import get_async_bybit
 from app.trading.data_provider import DataProvider
 from app.trading.order_executor import OrderExecutor
 from app.utils.log_helper import log_maker
@@ -14,7 +15,9 @@ class TradingBot:
         self.data_provider = DataProvider(symbol, interval)
         if controller:
             self.data_provider.controller = controller
+        self.data_provider.subscribe()
         self.order_executor = OrderExecutor(symbol)
+        self.async_bybit = get_async_bybit()
         self.synchronizer = CandleSynchronizer(self.interval)
         self._running = False
         self.first_run = True
@@ -43,22 +46,27 @@ class TradingBot:
             sleep_time = self.synchronizer.time_until_next_candle()
             max_wait = 60 if self.first_run else 300
             self.first_run = False
-            
-            if sleep_time > 1:
+
+            if self.data_provider.stream is not None:
+                # Решение принимается сразу по закрытию свечи из WebSocket
+                if not self.data_provider.wait_for_candle_close(sleep_time + 30):
+                    log_maker("📡⚠️ Закрытие свечи не пришло по WebSocket, использую REST")
+            elif sleep_time > 1:
                 actual_wait = min(sleep_time, max_wait)
                 if actual_wait > 5:
                     log_maker(f"⏱ Ожидание свечи: {actual_wait:.1f} сек")
                 time.sleep(actual_wait)
             
-            # Получение балансов
+            # Балансы и свечи запрашиваются одновременно
             coin = self.symbol.replace("USDT", "")
-            usdt_balance = self.order_executor.bybit.get_balance("USDT")
-            coin_balance = self.order_executor.bybit.get_balance(coin)
+            service = self.async_bybit.service
+            usdt_balance, coin_balance, candles = self.async_bybit.gather(
+                service.get_balance("USDT"),
+                service.get_balance(coin),
+                self.data_provider.get_candles_async(service, limit=100),
+            )
             log_maker(f"💰 Баланс: {usdt_balance:.2f} USDT, {coin_balance:.4f} {coin}")
             
-            # Получение данных
-            candles = self.data_provider.get_candles(limit=100)
-            
             if not candles or len(candles) < 10:
                 log_maker(f"⛔ Недостаточно данных: {len(candles)} свечей")
                 return
@@ -76,7 +84,9 @@ class TradingBot:
         finally:
             total_duration = time.time() - start_time
             log_maker(f"⏱ Цикл завершен за {total_duration:.2f} сек")
-            time.sleep(max(10, self.interval * 60 - total_duration))
+            # С WebSocket темп задает ожидание закрытия свечи
+            if self.data_provider.stream is None:
+                time.sleep(max(10, self.interval * 60 - total_duration))
             
     def start(self):
         self._running = True
@@ -1,25 +1,111 @@
 import os
 import json
 import time
+import threading
 import traceback
 import requests
 import numpy as np
 import ccxt  # Добавляем импорт CCXT
 
 from pybit.unified_trading import HTTP
-from typing import List, Dict, Optional, Literal
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-
+from typing import Callable, Iterable, List, Dict, NamedTuple, Optional, Literal, Tuple
+
+from app.services.http_client import BYBIT_REST_URL, get_http_session
+from app.services.instrument_cache import InstrumentCache
+from app.services.rate_limiter import (
+    RATE_LIMIT_RET_CODE,
+    RATE_LIMIT_STATUSES,
+    get_rate_limiter,
+)
+from app.services.market_stream import MarketStream
+from app.services.account_stream import FINAL_ORDER_STATUSES, AccountStream
 from app.utils.log_helper import log_maker
-from app.config import IS_TESTNET
+from app.utils.candle_store import (
+    CANDLE_COLUMNS,
+    CandleStore,
+    get_candle_store,
+    interval_to_ms,
+)
+from app.utils.candle_frame import CandleFrame
+from app.utils.history_loader import KLINE_PAGE_LIMIT, HistoryLoader
+from app.config import IS_TESTNET, TICKER_CACHE_TTL
+
+# Пауза перед повтором после 5xx или сетевой ошибки (умножается на номер попытки)
+RETRY_DELAY = 0.5
+
+
+def parse_klines(items: list) -> np.ndarray:
+    """Список свечей из ответа /v5/market/kline (новые первыми) в массив (n, 6)
+    по возрастанию времени"""
+    candles = []
+    for item in items:
+        try:
+            candles.append([float(value) for value in item[:6]])
+        except (ValueError, IndexError) as e:
+            log_maker(f"📊⚠️ Ошибка парсинга свечи: {e}")
+
+    if not candles:
+        return np.empty((0, len(CANDLE_COLUMNS)), dtype=np.float64)
+    return np.array(candles[::-1], dtype=np.float64)
+
+
+class Ticker(NamedTuple):
+    last: float
+    bid: float
+    ask: float
+    volume: float  # объем за 24 часа в базовой монете
+
+
+def parse_tickers(items: list) -> Dict[str, Ticker]:
+    """Список из ответа /v5/market/tickers в таблицу symbol -> Ticker"""
+    tickers = {}
+    for item in items:
+        try:
+            tickers[item["symbol"]] = Ticker(
+                float(item["lastPrice"]),
+                float(item.get("bid1Price") or 0),
+                float(item.get("ask1Price") or 0),
+                float(item.get("volume24h") or 0),
+            )
+        except (KeyError, ValueError) as e:
+            log_maker(f"💹⚠️ Ошибка парсинга тикера: {e}")
+    return tickers
 
 
 class BybitService:
-    def __init__(self, api_key=None, api_secret=None):
-        self.session = requests.Session()
-        self.session.timeout = 60
-        self.min_order_cache = {}
+    def __init__(
+        self,
+        api_key=None,
+        api_secret=None,
+        candle_store: Optional[CandleStore] = None,
+        session: Optional[requests.Session] = None,
+        base_url: str = BYBIT_REST_URL,
+        clock: Optional[Callable[[], float]] = None,
+    ):
+        # Адрес REST API: биржа или локальный стенд
+        self.base_url = base_url
+        # Рыночное время в секундах (текущая свеча, свежесть кэшей): часы
+        # или время стенда, который сдвигает историю быстрее реального
+        self.clock = clock or time.time
+        # Один пул keep-alive соединений на процесс для всех REST-запросов
+        self.session = session or get_http_session()
+        # Общая очередь запросов по группам эндпоинтов (см. RateLimitedAdapter)
+        self.rate_limiter = get_rate_limiter()
+        # Точность и минимальные объемы всех спотовых пар из памяти
+        self.instruments = InstrumentCache(self.session, base_url=base_url)
+        self.candle_store = candle_store or get_candle_store()
+        self.candle_cache = {}
+        self._backfill_depth = {}
+        self.history_loader = HistoryLoader(self, self.candle_store)
+        # Поток рыночных данных подключается явно через start_market_stream
+        self.market_stream: Optional[MarketStream] = None
+        # Балансы и исполнения ордеров по приватному потоку (start_account_stream)
+        self.account_stream: Optional[AccountStream] = None
+        # Снимок тикеров всех спотовых пар (get_all_tickers)
+        self.ticker_ttl = TICKER_CACHE_TTL
+        self._tickers: Dict[str, Ticker] = {}
+        self._tickers_at = 0.0
+        self._tickers_lock = threading.Lock()
         self.api_key = api_key or os.getenv("BYBIT_API_KEY")
         self.api_secret = api_secret or os.getenv("BYBIT_API_SECRET")
         self.recv_window = "5000"
@@ -28,10 +114,13 @@ class BybitService:
             {
                 "apiKey": self.api_key,
                 "secret": self.api_secret,
-                "enableRateLimit": True,
+                # Темп запросов задает общий ограничитель сессии
+                "enableRateLimit": False,
                 "options": {"defaultType": "spot"},
+                "session": self.session,
             }
         )
+        self.ccxt_exchange.urls["api"] = {key: base_url for key in self.ccxt_exchange.urls["api"]}
 
         self.client = HTTP(
             testnet=IS_TESTNET,
@@ -40,38 +129,218 @@ class BybitService:
             recv_window=15000,
             timeout=10,
         )
+        # pybit создает свою сессию - подменяем ее общей
+        self.client.client = self.session
+        self.client.endpoint = base_url
+
+    def get_candles(self, symbol: str, interval: str, limit: int = 100) -> CandleFrame:
+        """Возвращает последние limit свечей (последняя - текущая незакрытая).
+
+        Закрытые свечи берутся из локального хранилища, с биржи дозагружаются
+        только свечи новее последней сохраненной.
+        """
+        step = interval_to_ms(interval)
+        if step is None:
+            # Интервалы переменной длины (M) не храним локально
+            rows = self.fetch_klines(symbol, interval, limit=min(limit, KLINE_PAGE_LIMIT))
+            return CandleFrame.from_rows(rows) if rows is not None else CandleFrame.empty()
+
+        forming = self._cached_forming(symbol, interval, limit)
+        if forming is None:
+            forming = self._remember_forming(
+                symbol, interval, limit, self._sync_candles(symbol, interval, limit)
+            )
+        return self._candles_or_fallback(symbol, interval, limit, forming)
+
+    def _candles_or_fallback(
+        self, symbol: str, interval: str, limit: int, forming: Optional[np.ndarray]
+    ) -> CandleFrame:
+        """Окно из хранилища и текущей свечи; если оно пустое - свечи через CCXT"""
+        candles = self._assemble_candles(symbol, interval, limit, forming)
+
+        if not candles:
+            fallback = self._get_candles_via_ccxt(symbol, interval, min(limit, KLINE_PAGE_LIMIT))
+            if fallback:
+                return CandleFrame.from_candles(fallback)
+            log_maker("📊❌ Не удалось получить свечи, возвращаю пустой список")
+        return candles
+
+    def _cached_forming(self, symbol: str, interval: str, limit: int) -> Optional[np.ndarray]:
+        """Текущая свеча без обращения к REST (из потока или кэша) или None"""
+        step = interval_to_ms(interval)
+        cached = self.candle_cache.get(f"{symbol}_{interval}")
+        if cached is None or cached["depth"] < limit:
+            return None
 
-        retry_strategy = Retry(
-            total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("https://", adapter)
-
-    def get_candles(self, symbol: str, interval: str, limit: int = 100) -> List[Dict]:
-        # Для больших лимитов используем CCXT
-        if limit > 200:
-            return self._get_candles_via_ccxt(symbol, interval, min(limit, 1000))
+        # Глубину истории в хранилище обеспечивает первый запрос через REST
+        if self.market_stream is not None:
+            streamed = self.market_stream.forming_candle(symbol, interval)
+            if streamed is not None:
+                return streamed
 
-        cache_key = f"{symbol}_{interval}_{limit}"
+        # Пока текущая свеча не закрылась, повторный запрос к бирже не нужен
         cache_duration = 60 if interval == "15" else 300
+        now = self.clock()
+        if now - cached["timestamp"] < cache_duration and now * 1000 < cached["forming"][0] + step:
+            return cached["forming"]
+        return None
 
-        if hasattr(self, "candle_cache") and cache_key in self.candle_cache:
-            cached = self.candle_cache[cache_key]
-            if time.time() - cached["timestamp"] < cache_duration:
-                return cached["data"]
+    def _remember_forming(
+        self, symbol: str, interval: str, limit: int, forming: Optional[np.ndarray]
+    ) -> Optional[np.ndarray]:
+        """Кэширует свечу после синхронизации, при ошибке сети отдает прежнюю"""
+        cache_key = f"{symbol}_{interval}"
+        cached = self.candle_cache.get(cache_key)
+        if forming is not None:
+            self.candle_cache[cache_key] = {
+                "forming": forming,
+                "depth": max(limit, cached["depth"] if cached else 0),
+                "timestamp": self.clock(),
+            }
+        elif cached is not None:
+            log_maker(f"📊⚠️ Использую кэш для {symbol}")
+            forming = cached["forming"]
+        return forming
+
+    def _assemble_candles(
+        self, symbol: str, interval: str, limit: int, forming: Optional[np.ndarray]
+    ) -> CandleFrame:
+        rows = self.candle_store.tail(
+            symbol, interval, limit - (1 if forming is not None else 0)
+        )
+        if forming is not None and (not len(rows) or forming[0] > rows[-1, 0]):
+            rows = np.vstack([rows, forming])
+        return CandleFrame.from_rows(rows[-limit:])
+
+    def start_market_stream(self, url: Optional[str] = None) -> MarketStream:
+        """Запускает общий поток рыночных данных. Цены и свечи берутся из него,
+        пока он жив, иначе - через REST"""
+        if self.market_stream is None:
+            kwargs = {"url": url} if url else {}
+            self.market_stream = MarketStream(store=self.candle_store, **kwargs)
+            self.market_stream.start()
+        return self.market_stream
+
+    def start_account_stream(self, url: Optional[str] = None) -> AccountStream:
+        """Запускает приватный поток. Балансы, позиции и исполнения ордеров
+        читаются из него, пока он синхронизирован, иначе - через REST"""
+        if self.account_stream is None:
+            kwargs = {"url": url} if url else {}
+            self.account_stream = AccountStream(
+                self.api_key, self.api_secret, on_ready=self._seed_account_view, **kwargs
+            )
+            self.account_stream.start()
+        return self.account_stream
+
+    def _seed_account_view(self, stream: AccountStream):
+        data = self.client.get_wallet_balance(accountType="UNIFIED")
+        if data.get("retCode") != 0:
+            raise RuntimeError(data.get("retMsg", "Unknown error"))
+        stream.seed_wallet(data["result"]["list"][0]["coin"])
+
+    def _account_view(self) -> Optional[AccountStream]:
+        stream = self.account_stream
+        if stream is not None and stream.ready.is_set():
+            return stream
+        return None
 
-        limit = min(limit, 100)
+    def _sync_candles(self, symbol: str, interval: str, limit: int) -> Optional[np.ndarray]:
+        """Дозагружает в хранилище недостающие закрытые свечи.
 
-        url = "https://api.bybit.com/v5/market/kline"
+        Возвращает текущую незакрытую свечу (строка из 6 значений)
+        или None при ошибке сети.
+        """
+        start, end, now_ms = self._sync_range(symbol, interval, limit)
+        rows = self._fetch_range(symbol, interval, start, end)
+        if rows is None:
+            return None
+        return self._store_fetched(symbol, interval, rows, now_ms)
+
+    def _sync_range(self, symbol: str, interval: str, limit: int) -> Tuple[int, int, int]:
+        """Догружает через HistoryLoader историю глубже окна и пропуски после
+        простоя. Возвращает (start, end, now_ms) - свечи, которые осталось
+        запросить вместе с текущей. Общая часть синхронного и асинхронного
+        клиентов: сеть HistoryLoader и файловые операции блокируют поток"""
+        step = interval_to_ms(interval)
+        now_ms = int(self.clock() * 1000)
+        current_open = now_ms - now_ms % step
+        window_start = current_open - (limit - 1) * step
+
+        first_ts = self.candle_store.first_timestamp(symbol, interval)
+        depth_key = f"{symbol}_{interval}"
+
+        # Окно длиннее сохраненной истории - догружаем ее постранично и параллельно
+        if (first_ts is None or window_start < first_ts) and self._backfill_depth.get(depth_key, 0) < limit:
+            if self.history_loader.load(symbol, interval, start=window_start) is not None:
+                self._backfill_depth[depth_key] = limit
+
+        last_ts = self.candle_store.last_timestamp(symbol, interval)
+        if last_ts is not None and last_ts + step < window_start:
+            # Бот простаивал дольше окна - догружаем пропуск, иначе в хранилище останется дыра
+            self.history_loader.load(symbol, interval, start=last_ts + step)
+            last_ts = self.candle_store.last_timestamp(symbol, interval)
+        # Если пропуск догружен не полностью, остаток запрашивается вместе с окном
+        start = window_start if last_ts is None else last_ts + step
+        return start, current_open, now_ms
+
+    def _store_fetched(
+        self, symbol: str, interval: str, rows: np.ndarray, now_ms: int
+    ) -> Optional[np.ndarray]:
+        """Дописывает закрытые на момент now_ms свечи ответа в хранилище.
+        Возвращает текущую свечу, а если биржа ее не отдала - последнюю закрытую"""
+        step = interval_to_ms(interval)
+        closed = rows[rows[:, 0] + step <= now_ms]
+        if len(closed):
+            self.candle_store.append(symbol, interval, closed)
+
+        forming = rows[rows[:, 0] + step > now_ms]
+        if len(forming):
+            return forming[-1].copy()
+
+        # Биржа еще не отдала текущую свечу - используем последнюю закрытую
+        last = self.candle_store.tail(symbol, interval, 1)
+        return last[0] if len(last) else None
+
+    def _fetch_range(self, symbol: str, interval: str, start: int, end: int) -> Optional[np.ndarray]:
+        """Загружает свечи с временем открытия в [start, end] постранично"""
+        step = interval_to_ms(interval)
+        pages = []
+        while start <= end:
+            page_end = min(end, start + (KLINE_PAGE_LIMIT - 1) * step)
+            rows = self.fetch_klines(
+                symbol, interval, start=start, end=page_end, limit=KLINE_PAGE_LIMIT
+            )
+            if rows is None:
+                return None
+            pages.append(rows)
+            start = page_end + step
+
+        if not pages:
+            return np.empty((0, len(CANDLE_COLUMNS)), dtype=np.float64)
+        return np.concatenate(pages)
+
+    def fetch_klines(
+        self,
+        symbol: str,
+        interval: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        limit: int = KLINE_PAGE_LIMIT,
+    ) -> Optional[np.ndarray]:
+        """Один запрос /v5/market/kline. Свечи в порядке возрастания времени"""
+        url = f"{self.base_url}/v5/market/kline"
         params = {
             "category": "spot",
             "symbol": symbol,
             "interval": interval,
             "limit": limit,
-            "simple": "true",
         }
+        if start is not None:
+            params["start"] = start
+        if end is not None:
+            params["end"] = end
 
-        for attempt in range(5):
+        for attempt in range(4):
             try:
                 start_time = time.time()
                 response = self.session.get(url, params=params, timeout=(15, 45))
@@ -84,11 +353,14 @@ class BybitService:
 
                 if response.status_code != 200:
                     log_maker(f"📊❌ HTTP {response.status_code} для {symbol}")
-                    # Повторяем попытку для временных ошибок
-                    if response.status_code in [429, 500, 502, 503, 504]:
-                        time.sleep(2**attempt)  # Exponential backoff
+                    # Превышение лимита: паузу до сброса уже выставил ограничитель,
+                    # повторный запрос просто встанет в очередь
+                    if response.status_code in RATE_LIMIT_STATUSES:
+                        continue
+                    if response.status_code in [500, 502, 503, 504]:
+                        time.sleep(RETRY_DELAY * (attempt + 1))
                         continue
-                    return []  # Для других ошибок возвращаем пустой список
+                    return None
 
                 data = response.json()
 
@@ -96,46 +368,24 @@ class BybitService:
                     error_msg = data.get("retMsg", "Unknown error")
                     log_maker(f"📊❌ API: {error_msg}")
 
-                    # Если это временная ошибка, пробуем снова
                     if (
-                        "too many requests" in error_msg.lower()
-                        or "service unavailable" in error_msg.lower()
+                        data.get("retCode") == RATE_LIMIT_RET_CODE
+                        or "too many requests" in error_msg.lower()
                     ):
-                        time.sleep(2**attempt)  # Exponential backoff
+                        self.rate_limiter.penalize("/v5/market/kline")
                         continue
-                    return []  # Для других ошибок возвращаем пустой список
-
-                candles = []
-                for item in data["result"]["list"]:
-                    try:
-                        candles.append(
-                            {
-                                "timestamp": int(item[0]),
-                                "open": float(item[1]),
-                                "high": float(item[2]),
-                                "low": float(item[3]),
-                                "close": float(item[4]),
-                                "volume": float(item[5]),
-                            }
-                        )
-                    except (ValueError, IndexError) as e:
-                        log_maker(f"📊⚠️ Ошибка парсинга свечи: {e}")
-
-                candles = candles[::-1]
-                if not hasattr(self, "candle_cache"):
-                    self.candle_cache = {}
-                self.candle_cache[cache_key] = {
-                    "data": candles,
-                    "timestamp": time.time(),
-                }
-
-                return candles
+                    if "service unavailable" in error_msg.lower():
+                        time.sleep(RETRY_DELAY * (attempt + 1))
+                        continue
+                    return None
+
+                return parse_klines(data["result"]["list"])
 
             except (
                 requests.exceptions.Timeout,
                 requests.exceptions.ConnectionError,
             ) as e:
-                wait_time = min(2**attempt, 10)
+                wait_time = RETRY_DELAY * (attempt + 1)
                 log_maker(
                     f"📊⚠️ Сетевая ошибка ({attempt+1}): {type(e).__name__} - жду {wait_time} сек"
                 )
@@ -143,15 +393,10 @@ class BybitService:
             except Exception as e:
                 error_type = type(e).__name__
                 log_maker(f"📊🔥 Критическая ошибка ({error_type}): {str(e)}")
-                if attempt == 4:
+                if attempt == 3:
                     break
 
-        if hasattr(self, "candle_cache") and cache_key in self.candle_cache:
-            log_maker(f"📊⚠️ Использую кэш для {symbol}")
-            return self.candle_cache[cache_key]["data"]
-
-        log_maker("📊❌ Не удалось получить свечи, возвращаю пустой список")
-        return []
+        return None
 
     def _get_candles_via_ccxt(
         self, symbol: str, interval: str, limit: int
@@ -200,16 +445,74 @@ class BybitService:
 
     # Остальные методы остаются без изменений
     def get_price(self, symbol: str) -> float | None:
+        if self.market_stream is not None:
+            price = self.market_stream.get_price(symbol)
+            if price is not None:
+                return price
+        ticker = self._fresh_tickers().get(symbol)
+        if ticker is not None:
+            return ticker.last
         try:
-            url = "https://api.bybit.com/v5/market/tickers"
+            url = f"{self.base_url}/v5/market/tickers"
             params = {"category": "spot", "symbol": symbol}
-            response = requests.get(url, params=params, timeout=5)
+            response = self.session.get(url, params=params, timeout=5)
             data = response.json()
             return float(data["result"]["list"][0]["lastPrice"])
         except Exception as e:
             log_maker(f"💥 [ERROR] Ошибка получения цены: {e}")
             return None
 
+    def get_all_tickers(self, max_age: Optional[float] = None) -> Dict[str, Ticker]:
+        """Тикеры всех спотовых пар одним запросом /v5/market/tickers.
+
+        Снимок переиспользуется max_age секунд (по умолчанию ticker_ttl).
+        При ошибке возвращается последний полученный снимок.
+        """
+        max_age = self.ticker_ttl if max_age is None else max_age
+        # Запрос под блокировкой: одновременные вызовы дождутся одного ответа
+        with self._tickers_lock:
+            if self._tickers and self.clock() - self._tickers_at < max_age:
+                return self._tickers
+            try:
+                url = f"{self.base_url}/v5/market/tickers"
+                response = self.session.get(url, params={"category": "spot"}, timeout=10)
+                data = response.json()
+                if data.get("retCode") != 0:
+                    log_maker(f"💹❌ API: {data.get('retMsg')}")
+                    return self._tickers
+                self._store_tickers(parse_tickers(data["result"]["list"]))
+            except Exception as e:
+                log_maker(f"💥 [ERROR] Ошибка получения тикеров: {e}")
+            return self._tickers
+
+    def get_prices(self, symbols: Iterable[str]) -> Dict[str, float]:
+        """Последние цены набора символов: из потока, остальные - из снимка
+        тикеров (не более одного REST-запроса на весь набор)"""
+        prices = {}
+        missing = []
+        for symbol in symbols:
+            price = self.market_stream.get_price(symbol) if self.market_stream is not None else None
+            if price is None:
+                missing.append(symbol)
+            else:
+                prices[symbol] = price
+        if missing:
+            tickers = self.get_all_tickers()
+            for symbol in missing:
+                if symbol in tickers:
+                    prices[symbol] = tickers[symbol].last
+        return prices
+
+    def _store_tickers(self, tickers: Dict[str, Ticker]):
+        # Таблица заменяется целиком и не изменяется после публикации
+        self._tickers = tickers
+        self._tickers_at = self.clock()
+
+    def _fresh_tickers(self) -> Dict[str, Ticker]:
+        if self.clock() - self._tickers_at < self.ticker_ttl:
+            return self._tickers
+        return {}
+
     def market_order(
         self, symbol: str, side: str, quantity: float, is_quote: bool = False
     ) -> dict:
@@ -235,21 +538,18 @@ class BybitService:
             return {}
 
     def get_balance(self, coin: str, retries: int = 3) -> float:
+        view = self._account_view()
+        if view is not None:
+            item = view.coin(coin)
+            return self._coin_balance(item) if item else 0.0
+
         for attempt in range(retries):
             try:
                 data = self.client.get_wallet_balance(accountType="UNIFIED", coin=coin)
                 coin_info = data["result"]["list"][0]["coin"]
                 for item in coin_info:
                     if item["coin"] == coin:
-                        # Проверяем и обрабатываем пустые значения
-                        value = item.get("availableToTrade") or \
-                                item.get("availableBalance") or \
-                                item.get("walletBalance")
-                        
-                        # Обрабатываем случаи с пустой строкой
-                        if value == '':
-                            return 0.0
-                        return float(value) if value else 0.0
+                        return self._coin_balance(item)
                 return 0.0
             except Exception as e:
                 if attempt < retries - 1:
@@ -258,14 +558,36 @@ class BybitService:
                     log_maker(f"💰❌ [ERROR] Ошибка получения баланса: {e}")
         return 0.0
 
+    @staticmethod
+    def _coin_balance(item: dict) -> float:
+        # Проверяем и обрабатываем пустые значения
+        value = item.get("availableToTrade") or \
+                item.get("availableBalance") or \
+                item.get("walletBalance")
+
+        # Обрабатываем случаи с пустой строкой
+        if value == '':
+            return 0.0
+        return float(value) if value else 0.0
+
     def get_filled_orders(self, symbol: str, limit: int = 5) -> list[dict]:
+        view = self._account_view()
+        if view is not None:
+            orders = view.filled_orders(symbol, limit)
+            if orders is not None:
+                return orders
+
         try:
             response = self.client.get_order_history(
                 category="spot", symbol=symbol, limit=limit, orderStatus="Filled"
             )
             orders = response["result"]["list"]
 
-            return sorted(orders, key=lambda x: int(x["createdTime"]), reverse=True)
+            orders = sorted(orders, key=lambda x: int(x["createdTime"]), reverse=True)
+            if view is not None:
+                # Дальше история символа пополняется событиями приватного потока
+                view.seed_filled_orders(symbol, orders, limit)
+            return orders
         except Exception as e:
             log_maker(f"📜❌ [ERROR] Не удалось получить историю ордеров: {e}")
             return []
@@ -277,37 +599,18 @@ class BybitService:
         return float(orders[0]["avgPrice"])
 
     def get_qty_precision(self, symbol: str) -> int:
-        try:
-            url = "https://api.bybit.com/v5/market/instruments-info"
-            params = {"category": "spot", "symbol": symbol}
-            resp = requests.get(url, params=params, timeout=10)
-            data = resp.json()
-            base_precision = data["result"]["list"][0]["lotSizeFilter"]["basePrecision"]
-
-            if "." in base_precision:
-                decimal_part = base_precision.split(".")[1]
-                decimal_places = len(decimal_part.rstrip("0"))
-            else:
-                decimal_places = 0
-
-            return decimal_places
-        except Exception as e:
-            log_maker(f"📏⚠️ [ERROR] Ошибка получения точности количества: {e}")
+        info = self.instruments.get(symbol)
+        if info is None:
+            log_maker(f"📏⚠️ [ERROR] Нет данных о точности количества для {symbol}")
             return 4
+        return info["qty_precision"]
 
     def get_price_precision(self, symbol: str) -> int:
-        try:
-            url = "https://api.bybit.com/v5/market/instruments-info"
-            params = {"category": "spot", "symbol": symbol}
-            resp = requests.get(url, params=params, timeout=10)
-            data = resp.json()
-            price_filter = data["result"]["list"][0]["priceFilter"]
-            tick_size = price_filter["tickSize"]
-            decimal_places = len(tick_size.split(".")[-1].rstrip("0"))
-            return decimal_places
-        except Exception as e:
-            log_maker(f"🎯⚠️ [ERROR] Ошибка получения точности цены: {e}")
+        info = self.instruments.get(symbol)
+        if info is None:
+            log_maker(f"🎯⚠️ [ERROR] Нет данных о точности цены для {symbol}")
             return 4
+        return info["price_precision"]
 
     def get_order_by_id(self, symbol: str, order_id: str) -> dict | None:
         try:
@@ -322,6 +625,12 @@ class BybitService:
         return None
 
     def get_last_filled_order(self, symbol: str, limit=1) -> dict:
+        view = self._account_view()
+        if view is not None:
+            orders = view.filled_orders(symbol, 1)
+            if orders:
+                return self._format_filled_order(orders[0])
+
         try:
             response = self.client.get_order_history(
                 category="spot", symbol=symbol, limit=limit, orderStatus="Filled"
@@ -336,53 +645,52 @@ class BybitService:
             if not orders:
                 return None
 
-            return {
-                "symbol": orders[0]["symbol"],
-                "side": orders[0]["side"],
-                "qty": orders[0]["qty"],
-                "cumExecValue": orders[0]["cumExecValue"],
-                "cumExecFee": orders[0]["cumExecFee"],
-                "cumExecQty": orders[0]["cumExecQty"],
-                "avg_price": orders[0]["avgPrice"],
-                "timestamp": int(orders[0]["createdTime"]),
-                "order_id": orders[0]["orderId"],
-            }
+            return self._format_filled_order(orders[0])
         except Exception as e:
             log_maker(f"🔥 КРИТИЧЕСКАЯ ОШИБКА получения ордера: {e}")
             return None
 
-    def get_min_order_qty(self, symbol: str) -> float:
-        if symbol in self.min_order_cache:
-            cached = self.min_order_cache[symbol]
-            if time.time() - cached["timestamp"] < 3600:
-                return cached["value"]
+    @staticmethod
+    def _format_filled_order(order: dict) -> dict:
+        return {
+            "symbol": order["symbol"],
+            "side": order["side"],
+            "qty": order["qty"],
+            "cumExecValue": order["cumExecValue"],
+            "cumExecFee": order["cumExecFee"],
+            "cumExecQty": order["cumExecQty"],
+            "avg_price": order["avgPrice"],
+            "timestamp": int(order["createdTime"]),
+            "order_id": order["orderId"],
+        }
 
-        try:
-            url = "https://api.bybit.com/v5/market/instruments-info"
-            params = {"category": "spot", "symbol": symbol}
-            resp = requests.get(url, params=params, timeout=10)
-            data = resp.json()
-
-            # Проверка наличия данных
-            if (
-                not data.get("result")
-                or not data["result"].get("list")
-                or len(data["result"]["list"]) == 0
-            ):
-                return 0.001  # Значение по умолчанию
-
-            min_order_qty = float(
-                data["result"]["list"][0]["lotSizeFilter"]["minOrderQty"]
-            )
+    def wait_for_fill(self, symbol: str, order_id: str, timeout: float = 10) -> Optional[dict]:
+        """Ждет исполнения конкретного ордера (по событию приватного потока или
+        опросом истории) и возвращает его в формате get_last_filled_order"""
+        view = self._account_view()
+        if view is not None:
+            order = view.wait_for_fill(order_id, timeout)
+            if order is not None:
+                return self._format_filled_order(order)
+            log_maker(f"🔐⚠️ Нет события исполнения ордера {order_id}, проверяю через REST")
+
+        deadline = time.time() + timeout
+        while True:
+            order = self.get_order_by_id(symbol, order_id)
+            if order is not None and order.get("orderStatus") in FINAL_ORDER_STATUSES:
+                if float(order.get("cumExecQty") or 0) > 0:
+                    return self._format_filled_order(order)
+                return None
+            if time.time() >= deadline:
+                return None
+            time.sleep(0.5)
 
-            self.min_order_cache[symbol] = {
-                "value": min_order_qty,
-                "timestamp": time.time(),
-            }
-            return min_order_qty
-        except Exception as e:
-            log_maker(f"📏⚠️ [ERROR] Ошибка получения минимального количества: {e}")
+    def get_min_order_qty(self, symbol: str) -> float:
+        info = self.instruments.get(symbol)
+        if info is None:
+            log_maker(f"📏⚠️ [ERROR] Нет данных о минимальном количестве для {symbol}")
             return 0.001  # Значение по умолчанию
+        return info["min_order_qty"]
 
     def validate_price(self, price: float, symbol: str) -> bool:
         if price is None or price < 0.1 or price > 100000:
@@ -412,10 +720,14 @@ class BybitService:
     def get_best_bid_ask(
         self, symbol: str
     ) -> tuple[float | Literal[0], float | Literal[0]] | tuple[Literal[0], Literal[0]]:
+        if self.market_stream is not None:
+            book = self.market_stream.get_best_bid_ask(symbol)
+            if book is not None:
+                return book
         try:
-            url = "https://api.bybit.com/v5/market/orderbook"
+            url = f"{self.base_url}/v5/market/orderbook"
             params = {"category": "spot", "symbol": symbol, "limit": 1}
-            response = requests.get(url, params=params, timeout=5)
+            response = self.session.get(url, params=params, timeout=5)
             data = response.json()
 
             if data["retCode"] == 0:
@@ -428,24 +740,32 @@ class BybitService:
         return 0, 0
 
     def get_open_positions(self) -> list:
+        view = self._account_view()
+        if view is not None:
+            return self._positions_from_coins(view.coins())
+
         try:
             response = self.client.get_wallet_balance(accountType="UNIFIED")
             coins = response["result"]["list"][0]["coin"]
-            return [
-                {
-                    'symbol': f"{item['coin']}USDT",
-                    'coin': item['coin'],
-                    'size': float(item['availableToWithdraw']) if item['availableToWithdraw'] != '' else 0.0,
-                    'avg_price': 0.0
-                }
-                for item in coins
-                if float(item['availableToWithdraw'] or 0) > 0 and item['coin'] != 'USDT'
-            ]
+            return self._positions_from_coins(coins)
 
         except Exception as e:
             log_maker(f"🔥 Ошибка получения позиций: {str(e)}")
             return []
 
+    @staticmethod
+    def _positions_from_coins(coins: list) -> list:
+        return [
+            {
+                'symbol': f"{item['coin']}USDT",
+                'coin': item['coin'],
+                'size': float(item.get('availableToWithdraw') or 0.0),
+                'avg_price': 0.0
+            }
+            for item in coins
+            if float(item.get('availableToWithdraw') or 0) > 0 and item['coin'] != 'USDT'
+        ]
+
     def get_last_filled_order_for_coin(self, coin: str) -> Optional[dict]:
         """Получает последний исполненный ордер для монеты через API"""
         symbol = f"{coin}USDT"
@@ -472,3 +792,16 @@ class BybitService:
         except Exception as e:
             log_maker(f"🔥 Ошибка получения ордера: {e}")
             return None
+
+
+_default_service: Optional[BybitService] = None
+_default_service_guard = threading.Lock()
+
+
+def get_bybit_service() -> BybitService:
+    """Общий для процесса клиент Bybit (одна сессия, один ccxt и pybit)"""
+    global _default_service
+    with _default_service_guard:
+        if _default_service is None:
+            _default_service = BybitService()
+        return _default_service
@@ -1,14 +1,8 @@
 
-from app.config import BYBIT_API_KEY, BYBIT_API_SECRET, IS_TESTNET
-from pybit.unified_trading import HTTP
+from app.services.bybit_service import get_bybit_service
 from app.utils.log_helper import log_maker
 
-client = HTTP(
-    testnet=IS_TESTNET,
-    api_key=BYBIT_API_KEY,
-    api_secret=BYBIT_API_SECRET,
-    recv_window=15000,
-)
+client = get_bybit_service().client
 
 def get_order_history(symbol: str, limit: int = 50):
     try:
@@ -11,7 +11,8 @@ class CoinRotator:
         initial_coins: list, 
         trading_system,
         rotation_interval: int = 86400,  # 24 часа в секундах
-        min_hold_candles: int = 12       # Минимальное время удержания (в свечах)
+        min_hold_candles: int = 12,      # Минимальное время удержания (в свечах)
+        forecasts=None                   # ForecastService: прогноз нейросетей по монетам
     ):
         self.coin_list = initial_coins
         self.trading_system = trading_system
@@ -19,6 +20,7 @@ class CoinRotator:
         self.min_hold_candles = min_hold_candles
         self.ranker = CoinRanker()
         self.selector = CoinSelector(initial_coins)
+        self.forecasts = forecasts
         self.logger = logging.getLogger("coin_rotator")
         self.logger.setLevel(logging.INFO)
         
@@ -37,7 +39,7 @@ class CoinRotator:
         # Рассчитываем время удержания в свечах
         current_time = time.time()
         hold_time = current_time - self.state.get("last_rotation_time", 0)
-        hold_candles = hold_time / (self.trading_system.strategy.interval * 60)
+        hold_candles = hold_time / (int(self.trading_system.strategy.interval) * 60)
         
         # Проверяем минимальное время удержания
         if hold_candles < self.min_hold_candles:
@@ -66,6 +68,11 @@ class CoinRotator:
         # Комбинируем результаты
         candidates = set(best_coins + top_scores)
         self.logger.info(f"🏆 Кандидаты на ротацию: {candidates}")
+
+        # Цены кандидатов держим в потоке, чтобы переключение не ждало REST
+        stream = self.selector.bybit.market_stream
+        if stream is not None:
+            stream.watch(f"{coin}USDT" for coin in candidates)
         
         # Выбираем лучшую монету (исключая текущую)
         current_coin = self.state["current_coin"]
@@ -75,8 +82,12 @@ class CoinRotator:
             self.logger.info("⏭️ Нет подходящих кандидатов для ротации")
             return current_coin
             
-        # Выбираем монету с максимальным приоритетом в ранкере
-        new_coin = best_coins[0]
+        # Выбираем монету с максимальным приоритетом в ранкере, если нейросети
+        # не ждут роста у кого-то из кандидатов сильнее (пустой ранкер при
+        # первом запуске - берем лучшую по оценке селектора)
+        new_coin = self._forecast_choice(candidates) or next(
+            coin for coin in best_coins + top_scores if coin in candidates
+        )
         
         # Обновляем состояние
         self.state["current_coin"] = new_coin
@@ -89,6 +100,20 @@ class CoinRotator:
         self.logger.info(f"🔄 Ротация с {current_coin} на {new_coin}")
         return new_coin
     
+    def _forecast_choice(self, candidates: set):
+        """Кандидат с наибольшим ожидаемым ростом по последнему прогнозу
+        ForecastService; None - прогноза нет или роста не ждут ни у кого"""
+        if self.forecasts is None:
+            return None
+        changes = self.forecasts.expected_changes()
+        expected = {coin: changes[coin] for coin in candidates if coin in changes}
+        if not expected:
+            return None
+        self.logger.info("🧠 Прогноз кандидатов: " + ", ".join(
+            f"{coin} {change:+.2f}%" for coin, change in sorted(expected.items(), key=lambda x: -x[1])))
+        coin, change = max(expected.items(), key=lambda x: x[1])
+        return coin if change > 0 else None
+
     def set_current_coin(self, coin: str):
         """Устанавливает текущую монету"""
         if coin in self.coin_list:
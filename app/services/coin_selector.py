@@ -1,160 +1,232 @@
 import numpy as np
-from app.services.bybit_service import BybitService
+from app.services.bybit_service import get_bybit_service
+from app.indicators.vectorized import linear_slope, pct_returns, true_range
+from app.utils.candle_frame import CandleFrame
 from app.utils.log_helper import log_maker
 from typing import Dict, List, Optional, Tuple
-import math
 import concurrent.futures
 import time
 
+METRIC_NAMES = ('volatility', 'trend_strength', 'volume_ratio', 'risk_reward', 'price', 'atr')
+
+# Весовые коэффициенты итоговой оценки
+SCORE_WEIGHTS = {
+    'volatility': 0.4,
+    'trend_strength': 0.3,
+    'volume_ratio': 0.2,
+    'risk_reward': 0.1
+}
+
+# Минимум свечей для оценки монеты
+MIN_BARS = 15
+
+
+def sigmoid(values: np.ndarray, midpoint: float, steepness: float = 10) -> np.ndarray:
+    """Сигмоида с отсечкой: при |x| > 100 точно 0 или 1"""
+    x = steepness * (np.asarray(values, dtype=np.float64) - midpoint)
+    with np.errstate(over='ignore'):
+        result = 1 / (1 + np.exp(-np.clip(x, -100, 100)))
+    return np.where(x > 100, 1.0, np.where(x < -100, 0.0, result))
+
+
+def batch_metrics(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray,
+                  volumes: np.ndarray, atr_period: int = 14) -> Dict[str, np.ndarray]:
+    """Метрики для матриц (монеты x свечи) одинаковой длины за один проход"""
+    coins, bars = closes.shape
+
+    # Волатильность: std процентных изменений (изменения от нулевой цены не учитываются)
+    returns = pct_returns(closes)
+    valid = ~np.isnan(returns)
+    count = valid.sum(axis=1)
+    safe_count = np.maximum(count, 1)
+    filled = np.where(valid, returns, 0.0)
+    mean = filled.sum(axis=1) / safe_count
+    variance = (np.where(valid, returns - mean[:, None], 0.0) ** 2).sum(axis=1) / safe_count
+    volatility = np.where(count >= 2, np.sqrt(variance) * 100, 0.0)
+
+    # Тренд: наклон линии регрессии относительно средней цены
+    mean_price = closes.mean(axis=1)
+    slope = linear_slope(closes)
+    trend_strength = np.where(mean_price != 0, slope / np.where(mean_price != 0, mean_price, 1) * 100, 0.0)
+
+    # Отношение последнего объема к среднему за 5 свечей
+    if bars >= 5:
+        avg_volume = volumes[:, -5:].mean(axis=1)
+        volume_ratio = np.where(avg_volume != 0, volumes[:, -1] / np.where(avg_volume != 0, avg_volume, 1), 1.0)
+    else:
+        volume_ratio = np.ones(coins)
+
+    # ATR: среднее true range последних atr_period свечей
+    if bars >= atr_period and bars >= 2:
+        atr = true_range(highs, lows, closes)[:, -atr_period:].mean(axis=1)
+    else:
+        atr = np.zeros(coins)
+
+    price = closes[:, -1]
+    risk_reward = np.where(price != 0, atr / np.where(price != 0, price, 1) * 100, 0.0)
+
+    return {
+        'volatility': volatility,
+        'trend_strength': trend_strength,
+        'volume_ratio': volume_ratio,
+        'risk_reward': risk_reward,
+        'price': price,
+        'atr': atr,
+    }
+
+
+def batch_scores(metrics: Dict[str, np.ndarray]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """Нормализация через сигмоиду и взвешенная оценка для массива монет"""
+    normalized = {
+        'volatility': sigmoid(metrics['volatility'], 1.0),
+        'trend_strength': sigmoid(metrics['trend_strength'], 0.5),
+        'volume_ratio': np.clip(metrics['volume_ratio'], 0.5, 3.0) / 3.0,
+        'risk_reward': sigmoid(metrics['risk_reward'], 1.0)
+    }
+    scores = sum(normalized[k] * weight for k, weight in SCORE_WEIGHTS.items())
+    return scores, normalized
+
+
 class CoinSelector:
     def __init__(self, coin_list: List[str]):
         self.coin_list = coin_list
-        self.bybit = BybitService()
+        self.bybit = get_bybit_service()
         self.cache: Dict[str, dict] = {}
         self.timeout = 25  # Увеличим таймаут до 25 секунд
         self.max_workers = 4  # Оптимальное количество потоков
         self.last_update = 0
         self.update_interval = 3600  # Обновлять данные раз в час
-        
+
     def calculate_volatility(self, closes: List[float]) -> float:
         """Рассчитывает волатильность как стандартное отклонение процентных изменений"""
-        if len(closes) < 2:
-            return 0.0
-            
-        # Рассчитываем процентные изменения
-        returns = []
-        for i in range(1, len(closes)):
-            if closes[i-1] != 0:  # Защита от деления на ноль
-                ret = (closes[i] - closes[i-1]) / closes[i-1]
-                returns.append(ret)
-        
+        # Процентные изменения (изменения от нулевой цены отбрасываются)
+        returns = pct_returns(closes)
+        returns = returns[~np.isnan(returns)]
+
         if len(returns) < 2:
             return 0.0
-            
+
         # Возвращаем стандартное отклонение в процентах
         return np.std(returns) * 100
-        
-    def sigmoid_normalize(self, value: float, midpoint: float, steepness: float = 10) -> float:
-        """Нормализует значение через сигмоиду с защитой от переполнения"""
-        try:
-            x = steepness * (value - midpoint)
-            # Защита от слишком больших значений
-            if x > 100:
-                return 1.0
-            elif x < -100:
-                return 0.0
-            return 1 / (1 + math.exp(-x))
-        except:
-            return 0.5  # Возвращаем нейтральное значение при ошибке
-        
-    def calculate_metrics(self, symbol: str) -> Optional[dict]:
-        """Рассчитывает метрики для одной монеты с повторными попытками"""
+
+    def _load_window(self, symbol: str) -> Optional[CandleFrame]:
+        """Свечи за последние 4 часа (15-минутные) с повторными попытками"""
         for attempt in range(3):  # 3 попытки
             try:
-                # Получаем свечи за последние 4 часа (15-минутные)
                 candles = self.bybit.get_candles(symbol, interval="15", limit=16)
-                
-                if not candles or len(candles) < 15:
+
+                if not candles or len(candles) < MIN_BARS:
                     if attempt == 2:  # Последняя попытка
                         log_maker(f"⚠️ Недостаточно данных для {symbol}")
                         return None
                     time.sleep(2)  # Пауза перед повторной попыткой
                     continue
-                    
-                closes = [c['close'] for c in candles]
-                volumes = [c['volume'] for c in candles]
-                highs = [c['high'] for c in candles]
-                lows = [c['low'] for c in candles]
-                
-                # Рассчитываем показатели
-                volatility = self.calculate_volatility(closes)
-                
-                # Тренд (наклон линии регрессии)
-                x = np.arange(len(closes))
-                slope = np.polyfit(x, closes, 1)[0]
-                mean_price = np.mean(closes)
-                trend_strength = (slope / mean_price) * 100 if mean_price != 0 else 0
-                
-                # Отношение объема к среднему
-                if len(volumes) >= 5:
-                    avg_volume = np.mean(volumes[-5:])
-                    volume_ratio = volumes[-1] / avg_volume if avg_volume != 0 else 1.0
-                else:
-                    volume_ratio = 1.0
-                
-                # ATR (Average True Range)
-                atr = self._calculate_atr(highs, lows, closes)
-                
-                # Соотношение риск/прибыль (на основе ATR)
-                risk_reward = (atr / closes[-1]) * 100 if closes[-1] != 0 else 0
-                
-                return {
-                    'volatility': volatility,
-                    'trend_strength': trend_strength,
-                    'volume_ratio': volume_ratio,
-                    'risk_reward': risk_reward,
-                    'price': closes[-1],
-                    'atr': atr
-                }
-                
+
+                return CandleFrame.from_candles(candles)
+
             except Exception as e:
                 if attempt == 2:  # Последняя попытка
-                    log_maker(f"🔥 Ошибка расчета метрик для {symbol}: {str(e)}")
-                    return None
+                    log_maker(f"🔥 Ошибка загрузки свечей для {symbol}: {str(e)}")
+                    raise
                 time.sleep(1)  # Пауза перед повторной попыткой
-    
-    def _calculate_atr(self, highs: List[float], lows: List[float], closes: List[float], period: int = 14) -> float:
-        """Расчет Average True Range"""
-        if len(highs) < period or len(closes) < 2:
-            return 0.0
-        
-        tr_values = []
-        for i in range(1, len(highs)):
-            tr1 = highs[i] - lows[i]
-            tr2 = abs(highs[i] - closes[i-1])
-            tr3 = abs(lows[i] - closes[i-1])
-            tr = max(tr1, tr2, tr3)
-            tr_values.append(tr)
-        
-        return np.mean(tr_values[-period:]) if tr_values else 0.0
-    
-    def evaluate_coins(self) -> List[Tuple[str, float]]:
-        """Оценивает все монеты с использованием параллельных запросов"""
-        # Используем кэш, если данные не устарели
-        current_time = time.time()
-        if current_time - self.last_update < self.update_interval:
-            return self._get_cached_scores()
-        
-        scores = []
-        self.cache = {}  # Очищаем кэш перед обновлением
-        
-        # Используем ThreadPoolExecutor для параллельных запросов
+        return None
+
+    def metrics_from_frames(self, frames: Dict[str, CandleFrame]) -> Dict[str, dict]:
+        """Метрики сразу для всех монет: окна одной длины складываются в
+        матрицу (монеты x свечи) и считаются одним векторным проходом"""
+        by_length: Dict[int, List[str]] = {}
+        for key, frame in frames.items():
+            by_length.setdefault(len(frame), []).append(key)
+
+        result = {}
+        for keys in by_length.values():
+            stacked = np.stack([frames[key].data for key in keys])  # (монеты, 6, свечи)
+            _, _, highs, lows, closes, volumes = stacked.transpose(1, 0, 2)
+            metrics = batch_metrics(highs, lows, closes, volumes)
+            for i, key in enumerate(keys):
+                result[key] = {name: float(metrics[name][i]) for name in METRIC_NAMES}
+        return result
+
+    def calculate_metrics(self, symbol: str) -> Optional[dict]:
+        """Рассчитывает метрики для одной монеты"""
+        try:
+            frame = self._load_window(symbol)
+        except Exception:
+            return None
+        if frame is None:
+            return None
+        return self.metrics_from_frames({symbol: frame})[symbol]
+
+    def calculate_metrics_many(self, coins: List[str]) -> Dict[str, dict]:
+        """Метрики для списка монет: свечи загружаются параллельно, расчет -
+        одним векторным проходом. Монет без данных в результате нет, у
+        неподдерживаемых биржей символов вместо метрик пустой словарь"""
+        frames: Dict[str, CandleFrame] = {}
+        results: Dict[str, dict] = {}
+
         with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
             future_to_coin = {
-                executor.submit(self._evaluate_coin, coin): coin
-                for coin in self.coin_list
+                executor.submit(self._load_window, f"{coin}USDT"): coin
+                for coin in coins
             }
-            
+
             for future in concurrent.futures.as_completed(future_to_coin, timeout=self.timeout):
                 coin = future_to_coin[future]
                 try:
-                    # Добавляем таймаут для каждого future
-                    result = future.result(timeout=15)
-                    if result:
-                        scores.append(result)
+                    frame = future.result(timeout=15)
+                    if frame is not None:
+                        frames[coin] = frame
                 except Exception as e:
                     # Логируем только серьезные ошибки
                     if "Not supported symbols" not in str(e):
                         log_maker(f"⚠️ Ошибка оценки {coin}: {str(e)}")
                     else:
-                        # Для "Not supported symbols" просто возвращаем 0 оценку
-                        scores.append((coin, 0.0))
-        
+                        # Для "Not supported symbols" оценка 0 без метрик
+                        results[coin] = {}
+
+        results.update(self.metrics_from_frames(frames))
+        return results
+
+    def score_metrics(self, metrics: Dict[str, dict]) -> Dict[str, dict]:
+        """Нормализация и итоговая оценка всех монет одним векторным проходом"""
+        coins = list(metrics)
+        if not coins:
+            return {}
+        columns = {name: np.array([metrics[c][name] for c in coins], dtype=np.float64)
+                   for name in SCORE_WEIGHTS}
+        scores, normalized = batch_scores(columns)
+        now = time.time()
+        return {
+            coin: {
+                'metrics': metrics[coin],
+                'score': float(scores[i]),
+                'normalized': {name: float(values[i]) for name, values in normalized.items()},
+                'timestamp': now
+            }
+            for i, coin in enumerate(coins)
+        }
+
+    def evaluate_coins(self) -> List[Tuple[str, float]]:
+        """Оценивает все монеты: параллельная загрузка и пакетный расчет"""
+        # Используем кэш, если данные не устарели
+        current_time = time.time()
+        if current_time - self.last_update < self.update_interval:
+            return self._get_cached_scores()
+
+        self.cache = {}  # Очищаем кэш перед обновлением
+        metrics = self.calculate_metrics_many(self.coin_list)
+
+        scores = [(coin, 0.0) for coin, values in metrics.items() if values == {}]
+        self.cache = self.score_metrics(
+            {coin: values for coin, values in metrics.items() if values}
+        )
+        scores.extend((coin, report['score']) for coin, report in self.cache.items())
+
         # Сортируем по убыванию оценки
         scores.sort(key=lambda x: x[1], reverse=True)
         self.last_update = current_time
         return scores
-    
+
     def _get_cached_scores(self) -> List[Tuple[str, float]]:
         """Возвращает оценки из кэша"""
         scores = []
@@ -163,51 +235,14 @@ class CoinSelector:
                 scores.append((coin, self.cache[coin]['score']))
         scores.sort(key=lambda x: x[1], reverse=True)
         return scores
-    
-    def _evaluate_coin(self, coin: str) -> Optional[Tuple[str, float]]:
-        """Внутренний метод для оценки одной монеты"""
-        symbol = f"{coin}USDT"
-        metrics = self.calculate_metrics(symbol)
-        
-        if not metrics:
-            return None
-            
-        # Весовые коэффициенты
-        weights = {
-            'volatility': 0.4,
-            'trend_strength': 0.3,
-            'volume_ratio': 0.2,
-            'risk_reward': 0.1
-        }
-        
-        # Нормализация значений через сигмоиду
-        normalized = {
-            'volatility': self.sigmoid_normalize(metrics['volatility'], 1.0),
-            'trend_strength': self.sigmoid_normalize(metrics['trend_strength'], 0.5),
-            'volume_ratio': min(max(metrics['volume_ratio'], 0.5), 3.0) / 3.0,
-            'risk_reward': self.sigmoid_normalize(metrics['risk_reward'], 1.0)
-        }
-        
-        # Рассчет итоговой оценки
-        score = sum(normalized[k] * weights[k] for k in weights)
-        
-        # Кэшируем результаты
-        self.cache[coin] = {
-            'metrics': metrics,
-            'score': score,
-            'normalized': normalized,
-            'timestamp': time.time()
-        }
-        
-        return (coin, score)
-    
+
     def get_best_coin(self) -> Optional[str]:
         """Возвращает лучшую монету для торговли"""
         scores = self.evaluate_coins()
         if not scores:
             return None
         return scores[0][0]
-    
+
     def get_coin_report(self, coin: str) -> Optional[dict]:
         """Возвращает детальный отчет по монете"""
-        return self.cache.get(coin)
\ No newline at end of file
+        return self.cache.get(coin)
@@ -0,0 +1,91 @@
+# app/services/forecast_service.py
+"""Прогноз нейросетей по всем монетам списка раз в свечу.
+
+Веса моделей держит ModelRegistry.batch - одна стопка на все монеты,
+общая с моделями, которые реестр отдает стратегии. Поток сервиса
+просыпается после открытия каждой новой свечи, берет окна из хранилища
+свечей и живые цены и одним пакетным проходом пересчитывает ожидаемые
+изменения - тот же показатель, что NeuralStrategy сравнивает с порогом.
+Новые версии моделей от тренера подхватываются на ближайшей свече.
+CoinRotator учитывает прогноз при выборе монеты.
+"""
+import threading
+import time
+from typing import Dict, List, Optional
+
+from app.services.bybit_service import get_bybit_service
+from app.strategies.neural_network.registry import ModelRegistry, get_model_registry
+from app.utils.candle_store import interval_to_ms
+from app.utils.log_helper import log_maker
+
+
+class ForecastService:
+    def __init__(
+        self,
+        coins: List[str],
+        interval: str = "5",
+        registry: Optional[ModelRegistry] = None,
+        bybit=None,
+        delay: float = 5.0,
+    ):
+        self.coins = list(coins)
+        self.interval = interval
+        self.registry = registry or get_model_registry()
+        self.bybit = bybit or get_bybit_service()
+        self.delay = delay  # пауза после открытия свечи, чтобы биржа отдала закрытую
+        self._changes: Dict[str, float] = {}
+        self._candle: Optional[int] = None  # открытие свечи, на которой сделан прогноз
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Фоновый пересчет прогноза на каждой свече"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True, name="forecast")
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def expected_changes(self) -> Dict[str, float]:
+        """Последний прогноз: монета -> наибольшее по модулю ожидаемое изменение, %"""
+        with self._lock:
+            return dict(self._changes)
+
+    def refresh(self) -> Dict[str, float]:
+        """Пересчитывает прогноз, если с прошлого пересчета открылась новая свеча"""
+        step = interval_to_ms(self.interval)
+        now_ms = int(time.time() * 1000)
+        candle = now_ms - now_ms % step
+        with self._lock:
+            if candle == self._candle:
+                return dict(self._changes)
+
+        batch = self.registry.batch(self.coins)
+        windows = {}
+        for coin in batch.coins:
+            try:
+                candles = self.bybit.get_candles(f"{coin}USDT", self.interval, limit=batch.sequence_length)
+            except Exception as e:
+                log_maker(f"⚠️ Свечи {coin} для прогноза не получены: {e}")
+                continue
+            if len(candles) >= batch.sequence_length:
+                windows[coin] = candles.ohlcv()
+        prices = self.bybit.get_prices(f"{coin}USDT" for coin in windows)
+        changes = batch.expected_changes(
+            windows, {coin: prices.get(f"{coin}USDT") for coin in windows}
+        )
+
+        with self._lock:
+            self._changes, self._candle = changes, candle
+        return dict(changes)
+
+    def _run(self):
+        step = interval_to_ms(self.interval) / 1000
+        while not self._stopped.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                log_maker(f"⚠️ Ошибка прогноза по монетам: {e}")
+            self._stopped.wait(step - time.time() % step + self.delay)
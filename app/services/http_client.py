@@ -0,0 +1,68 @@
+# app/services/http_client.py
+import threading
+from typing import Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.config import BYBIT_REST_URL
+from app.services.rate_limiter import RateLimiter, get_rate_limiter
+
+# Одновременных keep-alive соединений на хост (по числу потоков загрузки)
+POOL_MAXSIZE = 16
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """Адаптер, пропускающий каждый запрос через общий ограничитель и
+    передающий ему заголовки лимитов из ответа"""
+
+    def __init__(self, limiter: RateLimiter, **kwargs):
+        self.limiter = limiter
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        path = urlsplit(request.url).path
+        self.limiter.acquire(path)
+        response = super().send(request, **kwargs)
+        self.limiter.observe(path, response.status_code, response.headers)
+        return response
+
+
+def create_session(
+    pool_maxsize: int = POOL_MAXSIZE,
+    limiter: Optional[RateLimiter] = None,
+    base_url: str = BYBIT_REST_URL,
+) -> requests.Session:
+    """Сессия с пулом keep-alive соединений: TLS-рукопожатие выполняется
+    один раз на соединение, а не на каждый запрос"""
+    session = requests.Session()
+    session.headers.update(
+        {"Content-Type": "application/json", "Accept": "application/json"}
+    )
+    # Повторяем только неудачные подключения. Ответы 429/5xx возвращаются
+    # вызывающему коду, а очередь после превышения лимита ведет ограничитель
+    retry_strategy = Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.5)
+    adapter_options = dict(
+        pool_connections=4,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry_strategy,
+    )
+    session.mount("https://", HTTPAdapter(**adapter_options))
+    session.mount(base_url, RateLimitedAdapter(limiter or get_rate_limiter(), **adapter_options))
+    return session
+
+
+_session: Optional[requests.Session] = None
+_session_guard = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """Общая для процесса HTTP-сессия для всех REST-запросов к Bybit
+    (свои запросы, pybit и ccxt)"""
+    global _session
+    with _session_guard:
+        if _session is None:
+            _session = create_session()
+        return _session
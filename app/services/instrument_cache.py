@@ -0,0 +1,126 @@
+# app/services/instrument_cache.py
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+
+from app.services.http_client import BYBIT_REST_URL
+from app.utils.log_helper import log_maker
+
+
+def decimal_places(step: str) -> int:
+    """Число знаков после запятой у шага вида "0.0010" """
+    if "." not in step:
+        return 0
+    return len(step.split(".")[1].rstrip("0"))
+
+
+class InstrumentCache:
+    """Таблица спотовых инструментов Bybit в памяти.
+
+    Все инструменты загружаются одним запросом /v5/market/instruments-info,
+    после чего точность количества, цены и минимальный объем ордера
+    отдаются из словаря без обращения к бирже. Таблица обновляется
+    в фоновом потоке раз в ttl секунд.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        ttl: float = 3600,
+        retry_after: float = 60,
+        base_url: str = BYBIT_REST_URL,
+    ):
+        self.session = session
+        self.base_url = base_url
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self._instruments: Dict[str, dict] = {}
+        self._loaded_at = 0.0
+        self._last_attempt = 0.0
+        self._refresh_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _parse(self, item: dict) -> dict:
+        lot = item.get("lotSizeFilter", {})
+        price = item.get("priceFilter", {})
+        return {
+            "qty_precision": decimal_places(lot.get("basePrecision", "0.0001")),
+            "price_precision": decimal_places(price.get("tickSize", "0.0001")),
+            "min_order_qty": float(lot.get("minOrderQty") or 0.001),
+            "min_order_amt": float(lot.get("minOrderAmt") or 0),
+            "tick_size": float(price.get("tickSize") or 0),
+            "status": item.get("status"),
+        }
+
+    def refresh(self) -> bool:
+        """Загружает таблицу всех спотовых инструментов. True при успехе"""
+        with self._refresh_lock:
+            self._last_attempt = time.time()
+            try:
+                instruments = {}
+                params = {"category": "spot", "limit": 1000}
+                while True:
+                    resp = self.session.get(
+                        f"{self.base_url}/v5/market/instruments-info",
+                        params=params,
+                        timeout=10,
+                    )
+                    data = resp.json()
+                    if data.get("retCode") != 0:
+                        raise RuntimeError(data.get("retMsg", "Unknown error"))
+
+                    for item in data["result"]["list"]:
+                        instruments[item["symbol"]] = self._parse(item)
+
+                    cursor = data["result"].get("nextPageCursor")
+                    if not cursor:
+                        break
+                    params["cursor"] = cursor
+
+                if not instruments:
+                    raise RuntimeError("пустой список инструментов")
+
+                # Замена ссылки атомарна - читатели видят либо старую, либо новую таблицу
+                self._instruments = instruments
+                self._loaded_at = time.time()
+                return True
+            except Exception as e:
+                log_maker(f"📏⚠️ Ошибка загрузки списка инструментов: {e}")
+                return False
+
+    def start(self):
+        """Загружает таблицу (если она еще пуста) и запускает фоновое обновление"""
+        if not self._instruments and time.time() - self._last_attempt >= self.retry_after:
+            self.refresh()
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._refresh_loop, name="instrument-cache", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _refresh_loop(self):
+        while not self._stop_event.wait(self.ttl if self._instruments else self.retry_after):
+            self.refresh()
+
+    def get(self, symbol: str) -> Optional[dict]:
+        """Параметры инструмента или None, если символ неизвестен"""
+        info = self._instruments.get(symbol)
+        if info is not None:
+            return info
+
+        # Первая загрузка или новый листинг - синхронное обновление, не чаще retry_after
+        if time.time() - self._last_attempt >= self.retry_after:
+            self.refresh()
+            self.start()
+        return self._instruments.get(symbol)
+
+    def __len__(self) -> int:
+        return len(self._instruments)
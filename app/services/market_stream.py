@@ -0,0 +1,190 @@
+# app/services/market_stream.py
+import json
+import threading
+import time
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+import numpy as np
+
+from app.config import BYBIT_WS_PUBLIC_URL
+from app.services.ws_client import WebSocketClient
+from app.utils.candle_store import CandleStore, get_candle_store, interval_to_ms
+from app.utils.log_helper import log_maker
+
+
+class MarketStream(WebSocketClient):
+    """Поток рыночных данных через публичный WebSocket Bybit.
+
+    Для активной монеты подписывается на свечи, тикер и лучший уровень стакана,
+    для кандидатов на ротацию - только на тикер. Последние значения хранятся
+    в памяти, закрытые свечи дописываются в локальное хранилище. Если поток
+    отстал или отключен, методы возвращают None и вызывающий код идет в REST.
+    """
+
+    name = "market-stream"
+
+    def __init__(
+        self,
+        url: str = BYBIT_WS_PUBLIC_URL,
+        store: Optional[CandleStore] = None,
+        stale_after: float = 30.0,
+        reconnect_delay: float = 5.0,
+    ):
+        super().__init__(url, reconnect_delay)
+        self.store = store or get_candle_store()
+        self.stale_after = stale_after
+
+        self._lock = threading.Lock()
+        self._bar_closed = threading.Condition(self._lock)
+        self._topics: Set[str] = set()
+        self._watch_topics: Set[str] = set()
+        self._prices: Dict[str, Tuple[float, float]] = {}
+        self._books: Dict[str, Tuple[float, float, float]] = {}
+        self._forming: Dict[Tuple[str, str], np.ndarray] = {}
+        self._closed: Dict[Tuple[str, str], int] = {}
+
+    # --- Подписки ---
+
+    def subscribe(self, symbol: str, interval: str):
+        """Полная подписка для торгуемой монеты: свечи, тикер, стакан"""
+        topics = {f"kline.{interval}.{symbol}", f"tickers.{symbol}", f"orderbook.1.{symbol}"}
+        with self._lock:
+            new = topics - self._topics - self._watch_topics
+            self._topics |= topics
+        self._send("subscribe", new)
+
+    def unsubscribe(self, symbol: str):
+        """Снимает полную подписку монеты (тикер остается, если монета в watch)"""
+        with self._lock:
+            removed = {t for t in self._topics if t.endswith(f".{symbol}")}
+            self._topics -= removed
+            removed -= self._watch_topics
+        self._send("unsubscribe", removed)
+
+    def watch(self, symbols: Iterable[str]):
+        """Легкая подписка на тикеры кандидатов для ротации (заменяет прежний список)"""
+        topics = {f"tickers.{symbol}" for symbol in symbols}
+        with self._lock:
+            added = topics - self._watch_topics - self._topics
+            removed = self._watch_topics - topics - self._topics
+            self._watch_topics = topics
+        self._send("unsubscribe", removed)
+        self._send("subscribe", added)
+
+    def _send(self, op: str, topics: Iterable[str]):
+        if topics:
+            self.send_op(op, topics)
+
+    def on_connected(self):
+        with self._lock:
+            topics = self._topics | self._watch_topics
+        # После переподключения подписки восстанавливаются заново
+        self._send("subscribe", topics)
+
+    # --- Обработка сообщений ---
+
+    def handle_message(self, message: str):
+        try:
+            msg = json.loads(message)
+        except ValueError:
+            return
+        topic = msg.get("topic")
+        if not topic or "data" not in msg:
+            return  # ответы на subscribe/ping
+
+        kind, _, rest = topic.partition(".")
+        try:
+            if kind == "tickers":
+                self._on_ticker(msg["data"])
+            elif kind == "orderbook":
+                self._on_orderbook(rest.split(".", 1)[1], msg["data"])
+            elif kind == "kline":
+                interval, symbol = rest.split(".", 1)
+                self._on_kline(symbol, interval, msg["data"])
+        except (KeyError, IndexError, ValueError, TypeError) as e:
+            log_maker(f"📡⚠️ Некорректное сообщение {topic}: {e}")
+
+    def _on_ticker(self, data: dict):
+        with self._lock:
+            self._prices[data["symbol"]] = (float(data["lastPrice"]), time.time())
+
+    def _on_orderbook(self, symbol: str, data: dict):
+        with self._lock:
+            bid, ask, _ = self._books.get(symbol, (0.0, 0.0, 0.0))
+            # Пустая сторона в дельте означает, что уровень не изменился
+            if data.get("b"):
+                bid = float(data["b"][0][0])
+            if data.get("a"):
+                ask = float(data["a"][0][0])
+            self._books[symbol] = (bid, ask, time.time())
+
+    def _on_kline(self, symbol: str, interval: str, bars: list):
+        key = (symbol, interval)
+        step = interval_to_ms(interval)
+        for bar in bars:
+            row = np.array(
+                [bar["start"], bar["open"], bar["high"], bar["low"], bar["close"], bar["volume"]],
+                dtype=np.float64,
+            )
+            if bar.get("confirm"):
+                # Дописываем только свечу, следующую за сохраненной. Если после
+                # переподключения свечи пропущены, forming_candle вернет None и
+                # пропуск вместе с этой свечой догрузит REST
+                last_ts = self.store.last_timestamp(symbol, interval)
+                if step is not None and last_ts is not None and int(row[0]) == last_ts + step:
+                    self.store.append(symbol, interval, row[None, :])
+            with self._lock:
+                self._forming[key] = row
+                if bar.get("confirm"):
+                    self._closed[key] = int(row[0])
+                    self._bar_closed.notify_all()
+
+    # --- Чтение состояния ---
+
+    def get_price(self, symbol: str) -> Optional[float]:
+        """Последняя цена, если поток жив и данные свежие"""
+        if not self.connected.is_set():
+            return None
+        with self._lock:
+            price = self._prices.get(symbol)
+        if price is None or time.time() - price[1] > self.stale_after:
+            return None
+        return price[0]
+
+    def get_best_bid_ask(self, symbol: str) -> Optional[Tuple[float, float]]:
+        if not self.connected.is_set():
+            return None
+        with self._lock:
+            book = self._books.get(symbol)
+        if book is None or time.time() - book[2] > self.stale_after:
+            return None
+        return book[0], book[1]
+
+    def forming_candle(self, symbol: str, interval: str) -> Optional[np.ndarray]:
+        """Текущая свеча из потока, если история в хранилище идет без разрыва"""
+        step = interval_to_ms(interval)
+        if step is None or not self.connected.is_set():
+            return None
+        with self._lock:
+            row = self._forming.get((symbol, interval))
+        if row is None or time.time() * 1000 >= row[0] + 2 * step:
+            return None
+
+        # После переподключения могли быть пропущены закрытые свечи - их догрузит REST
+        last_ts = self.store.last_timestamp(symbol, interval)
+        if last_ts is None or last_ts < row[0] - step:
+            return None
+        return row.copy()
+
+    def wait_for_close(self, symbol: str, interval: str, timeout: float) -> bool:
+        """Ждет закрытия следующей свечи. False, если за timeout ее не пришло"""
+        key = (symbol, interval)
+        deadline = time.time() + timeout
+        with self._bar_closed:
+            seen = self._closed.get(key)
+            while self._closed.get(key) == seen:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self._bar_closed.wait(remaining)
+        return True
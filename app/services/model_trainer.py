@@ -1,29 +1,51 @@
 # services/model_trainer.py
-import threading
+import glob
+import subprocess
 import sys
+import threading
 import os
 import time
+from app.config import TRAINING_WORKERS, TRAINING_THREADS
 from app.utils.log_helper import log_maker
 import traceback
 import logging
 import json
-
-# Импорт функции обучения модели
-try:
-    from app.strategies.neural_network.trainer import main as train_model
-except ImportError:
-    log_maker("❌ Ошибка импорта функции обучения модели. Проверьте путь к модулю.")
-    train_model = None
+from app.services.training_pool import TrainingPool
+from app.services.training_queue import (
+    PRIORITY_ACTIVE,
+    PRIORITY_MISSING,
+    PRIORITY_STALE,
+    QueuedJob,
+    TrainingQueue,
+)
+from app.strategies.neural_network.registry import get_model_registry
+from app.strategies.neural_network.runtime import weights_path
+from app.strategies.neural_network.training_job import TrainingJob, thread_env
+
+# Выгрузка весов .keras-моделей для LSTMRuntime (TensorFlow - только в этом процессе)
+CONVERT_MODULE = "app.strategies.neural_network.runtime"
 
 
 class ModelTrainer:
-    def __init__(self, coin_list, interval="5", epochs=100, max_concurrent=1):
+    def __init__(self, coin_list, interval="5", epochs=100, max_concurrent=TRAINING_WORKERS):
         self.coin_list = coin_list
         self.interval = interval  # Сохраняем текущий интервал
         self.epochs = epochs
         self.max_concurrent = max_concurrent
-        self.training_queue = []
-        self.current_training = 0
+        # Очередь с приоритетами, переживает перезапуск (data/training_queue.json)
+        self.training_queue = TrainingQueue()
+        self.active_coin = None
+        # Обучаемые сейчас задания и слоты пула - только под блокировкой
+        self._lock = threading.Lock()
+        self._running = {}
+        self._cancelled = set()
+        self._slots = threading.Semaphore(max_concurrent)
+        # Обучение идет в отдельных процессах, торговый цикл делит с ним только ядра
+        self.pool = TrainingPool(
+            workers=max_concurrent,
+            threads_per_worker=TRAINING_THREADS,
+            on_event=self._on_training_event,
+        )
         self.thread = threading.Thread(target=self._training_loop, daemon=True)
         self.thread.start()
         self.logger = logging.getLogger("model_trainer")
@@ -31,9 +53,64 @@ class ModelTrainer:
         log_maker(
             f"🎓 Инициализирован тренер моделей. Интервал: {interval} мин. Макс. одновременных обучений: {max_concurrent}"
         )
+        if len(self.training_queue):
+            log_maker(f"🎓 Восстановлена очередь обучения: {len(self.training_queue)} монет")
 
         # Создаем директорию для моделей
         os.makedirs("models", exist_ok=True)
+        self.convert_legacy_models()
+
+    def convert_legacy_models(self):
+        """Модели, сохраненные до выгрузки весов, конвертируются отдельным
+        процессом: торговый процесс читает только npz и TensorFlow не импортирует"""
+        legacy = [
+            path for path in glob.glob("models/*_neural_model.keras")
+            if not os.path.exists(weights_path(path))
+        ]
+        if legacy:
+            log_maker(f"🎓 Выгрузка весов {len(legacy)} моделей в отдельном процессе")
+            threading.Thread(target=self._convert_models, daemon=True, name="model-convert").start()
+
+    def _convert_models(self):
+        env = dict(os.environ)
+        env.update(thread_env(TRAINING_THREADS))
+        try:
+            result = subprocess.run(
+                [sys.executable, "-m", CONVERT_MODULE, "--models", "models"],
+                env=env, capture_output=True, text=True,
+            )
+            if result.returncode != 0:
+                log_maker(f"⚠️ Ошибка выгрузки весов моделей: {result.stderr.strip()[-500:]}")
+        except OSError as e:
+            log_maker(f"⚠️ Процесс выгрузки весов не запущен: {e}")
+        # Выгруженные модели становятся доступны боту
+        get_model_registry().refresh()
+
+    @property
+    def current_training(self):
+        with self._lock:
+            return len(self._running)
+
+    def set_active_coin(self, coin):
+        """Монета, которой торгует бот: ее модель обучается в первую очередь,
+        задание прежней активной монеты возвращается на обычное место"""
+        previous, self.active_coin = self.active_coin, coin
+        if previous is not None and previous != coin:
+            priority, order = self._queue_key(previous)
+            if self.training_queue.demote(previous, priority, order):
+                self.logger.info(f"↩️ Обучение {previous} больше не вне очереди")
+        if self.training_queue.promote(coin):
+            self.logger.info(f"🚀 Обучение {coin} (активная монета) перенесено в начало очереди")
+
+    def _queue_key(self, coin):
+        """Приоритет и порядок монеты: активная - первой, без модели - следом
+        (по времени постановки), устаревшие - от самой старой"""
+        model_file = f"models/{coin}_neural_model.keras"
+        if coin == self.active_coin:
+            return PRIORITY_ACTIVE, None
+        if not os.path.exists(model_file):
+            return PRIORITY_MISSING, None
+        return PRIORITY_STALE, os.path.getmtime(model_file)
 
     def add_to_queue(self, coin, force_retrain=False):
         """Добавляет монету в очередь на обучение"""
@@ -64,42 +141,52 @@ class ModelTrainer:
         if os.path.exists(error_path):
             reasons.append("предыдущая ошибка обучения")
 
-        if reasons:
-            reason_str = ", ".join(reasons)
-            self.logger.info(f"🧠 Требуется обучение {coin}: {reason_str}")
-
-            # Удаляем старые файлы если нужно
-            if os.path.exists(model_file):
-                try:
-                    os.remove(model_file)
-                    os.remove(f"{model_path}_scaler.npz")
-                    self.logger.info(f"🧹 Удалены старые файлы модели для {coin}")
-                except Exception as e:
-                    self.logger.info(f"⚠️ Ошибка удаления старых файлов: {e}")
-
-            # Добавляем в очередь, если еще не добавлена
-            if coin not in self.training_queue:
-                # Новые монеты (без модели) добавляем в начало очереди
-                if not os.path.exists(model_file) and not os.path.exists(error_path):
-                    self.training_queue.insert(0, coin)
-                    self.logger.info(
-                        f"🚀 Монета {coin} (новая) добавлена в начало очереди обучения"
-                    )
-                else:
-                    self.training_queue.append(coin)
-                    self.logger.info(
-                        f"🧠 Монета {coin} добавлена в очередь на обучение"
-                    )
-
-            else:
-                self.logger.info(f"🧠 Монета {coin} уже в очереди на обучение")
-            return True
-        else:
+        if not reasons:
             self.logger.info(
                 f"🧠 Модель для {coin} актуальна (интервал: {self.interval} мин)"
             )
             return False
 
+        reason_str = ", ".join(reasons)
+        self.logger.info(f"🧠 Требуется обучение {coin}: {reason_str}")
+        with self._lock:
+            if coin in self._running:
+                self.logger.info(f"🧠 Модель {coin} уже обучается")
+                return False
+
+        # Модель другого интервала непригодна - удаляем. Модель того же
+        # интервала работает, пока новая версия не заменит ее в реестре
+        if interval_mismatch and os.path.exists(model_file):
+            try:
+                os.remove(model_file)
+                os.remove(f"{model_path}_scaler.npz")
+                if os.path.exists(weights_path(model_path)):
+                    os.remove(weights_path(model_path))
+                get_model_registry().update(coin)
+                self.logger.info(f"🧹 Удалены старые файлы модели для {coin}")
+            except Exception as e:
+                self.logger.info(f"⚠️ Ошибка удаления старых файлов: {e}")
+
+        priority, order = self._queue_key(coin)
+        if self.training_queue.put(coin, priority, order, reason_str):
+            self.logger.info(f"🧠 Монета {coin} добавлена в очередь на обучение ({reason_str})")
+        else:
+            self.logger.info(f"🧠 Монета {coin} уже в очереди на обучение")
+        return True
+
+    def cancel(self, coin):
+        """Снимает монету с очереди и прерывает ее обучение, если оно идет"""
+        removed = self.training_queue.cancel(coin)
+        with self._lock:
+            running = coin in self._running
+            if running:
+                self._cancelled.add(coin)
+        if running:
+            self.pool.cancel(coin)
+        if removed or running:
+            log_maker(f"⏹️ Обучение {coin} отменено")
+        return removed or running
+
     def _get_model_interval(self, config_path):
         """Получает интервал из конфигурации модели"""
         if os.path.exists(config_path):
@@ -134,77 +221,93 @@ class ModelTrainer:
         threading.Thread(target=retrain_loop, daemon=True).start()
 
     def _training_loop(self):
-        """Основной цикл обработки очереди обучения"""
+        """Основной цикл: свободный слот пула получает самое важное готовое задание"""
         while True:
+            self._slots.acquire()
+            job = None
             try:
-                # Проверяем возможность запуска нового обучения
-                if self.training_queue and self.current_training < self.max_concurrent:
-
-                    coin = self.training_queue.pop(0)
-                    self.current_training += 1
-
-                    # Запускаем обучение в отдельном потоке
-                    threading.Thread(
-                        target=self._train_coin_model, args=(coin,), daemon=True
-                    ).start()
-
-                time.sleep(10)  # Проверяем очередь каждые 10 секунд
+                job = self.training_queue.get()
+                with self._lock:
+                    self._running[job.coin] = job
+                self._train_coin_model(job.coin)
             except Exception as e:
                 log_maker(f"🔥 Ошибка в цикле обучения: {str(e)}")
                 traceback.print_exc()
+                if job is not None:
+                    with self._lock:
+                        self._running.pop(job.coin, None)
+                    self.training_queue.retry(job)
+                self._slots.release()
                 time.sleep(30)
 
     def _train_coin_model(self, coin):
-        """Обучает модель для конкретной монеты"""
+        """Отправляет обучение модели монеты в пул процессов"""
+        job = TrainingJob(coin=coin, interval=self.interval, epochs=self.epochs)
+        log_maker(f"🧠 Начинаю обучение модели для {job.symbol} ({self.interval} мин)")
+        log_maker(f"🔧 Параметры обучения: {job.to_json()}")
+        self.pool.submit(job)
+
+    def _on_training_event(self, event):
+        """События процессов обучения (поток TrainingPool)"""
+        coin = event["coin"]
         symbol = f"{coin}USDT"
         model_path = f"models/{coin}_neural_model"
-        config_path = f"{model_path}.config"
-
-        try:
-            log_maker(f"🧠 Начинаю обучение модели для {symbol} ({self.interval} мин)")
-
-            # Проверяем наличие функции обучения
-            if train_model is None:
-                raise ImportError("Функция обучения не найдена")
-
-            # Создаем аргументы командной строки для обучения
-            original_argv = sys.argv.copy()
-            sys.argv = [
-                "trainer.py",
-                f"--symbol={symbol}",
-                f"--interval={self.interval}",  # Используем текущий интервал
-                f"--epochs={str(self.epochs)}",
-                f"--model_path={model_path}",
-            ]
 
-            log_maker(f"🔧 Параметры обучения: {' '.join(sys.argv[1:])}")
-
-            # Вызываем функцию обучения
-            train_model()
-
-            # Сохраняем конфигурацию модели
-            self._save_model_config(config_path, self.interval)
-
-            log_maker(
-                f"✅ Модель для {symbol} ({self.interval} мин) успешно обучена и сохранена"
+        if event["type"] == "progress":
+            self.logger.info(
+                f"🧠 {symbol}: эпоха {event['epoch']}/{event['epochs']}, loss {event['loss']:.6f}"
             )
+            return
+        if event["type"] == "started":
+            self.logger.info(f"🧠 {symbol}: процесс обучения {event['pid']}, ядра {event['cpus']}")
+            return
 
-        except Exception as e:
-            error_msg = f"❌ Ошибка обучения модели для {symbol} ({self.interval} мин): {str(e)}"
-            log_maker(error_msg)
-            traceback.print_exc()
-
-            # Создаем файл ошибки
-            try:
-                with open(f"{model_path}.error", "w") as f:
-                    f.write(error_msg)
-            except:
-                pass
-
+        try:
+            if event["type"] == "done":
+                # Сохраняем конфигурацию модели
+                self._save_model_config(f"{model_path}.config", self.interval)
+                if os.path.exists(f"{model_path}.error"):
+                    os.remove(f"{model_path}.error")
+                # Реестр отдаст новую версию стратегии при следующем обращении
+                get_model_registry().update(coin)
+                self.training_queue.finish(coin)
+                log_maker(
+                    f"✅ Модель для {symbol} ({self.interval} мин) успешно обучена и сохранена"
+                    f" ({event['candles']} свечей, loss {event['loss']:.6f})"
+                )
+            elif event["type"] == "failed":
+                with self._lock:
+                    job = self._running.get(coin)
+                    cancelled = coin in self._cancelled
+                if cancelled:
+                    self.training_queue.finish(coin)
+                    return
+                error_msg = f"❌ Ошибка обучения модели для {symbol} ({self.interval} мин): {event['error']}"
+                log_maker(error_msg)
+                # Создаем файл ошибки
+                try:
+                    with open(f"{model_path}.error", "w") as f:
+                        f.write(error_msg)
+                except:
+                    pass
+                get_model_registry().update(coin)
+                # Повтор с растущей паузой
+                retry_job = job or QueuedJob(coin, PRIORITY_MISSING, time.time())
+                if retry_job.priority == PRIORITY_ACTIVE and coin != self.active_coin:
+                    # Пока шло обучение, бот переключился на другую монету
+                    retry_job.priority, order = self._queue_key(coin)
+                    retry_job.order = retry_job.order if order is None else order
+                retry_at = self.training_queue.retry(retry_job)
+                log_maker(
+                    f"🔁 Повтор обучения {symbol} (попытка {retry_job.attempts + 1})"
+                    f" после {time.strftime('%H:%M:%S', time.localtime(retry_at))}"
+                )
         finally:
-            # Восстанавливаем оригинальные аргументы
-            sys.argv = original_argv
-            self.current_training -= 1
+            with self._lock:
+                finished = self._running.pop(coin, None) is not None
+                self._cancelled.discard(coin)
+            if finished:
+                self._slots.release()
 
     def force_retrain_all(self):
         """Принудительное переобучение всех моделей"""
@@ -0,0 +1,177 @@
+# app/services/rate_limiter.py
+import asyncio
+import threading
+import time
+from typing import Dict, Mapping, Optional
+
+from app.utils.log_helper import log_maker
+
+# Группы эндпоинтов Bybit v5 и их бюджет: (запросов в секунду, размер пачки).
+# Значения с запасом ниже лимитов биржи (600 запросов за 5 сек на IP,
+# 10-50 в секунду на UID для приватных эндпоинтов).
+ENDPOINT_GROUPS = {
+    "trade": (10.0, 10),
+    "order": (10.0, 20),
+    "account": (5.0, 10),
+    "market": (20.0, 40),
+    "default": (10.0, 10),
+}
+
+_GROUP_PREFIXES = (
+    ("/v5/order/create", "trade"),
+    ("/v5/order/amend", "trade"),
+    ("/v5/order/cancel", "trade"),
+    ("/v5/order/", "order"),
+    ("/v5/execution/", "order"),
+    ("/v5/position/", "order"),
+    ("/v5/account/", "account"),
+    ("/v5/asset/", "account"),
+    ("/v5/market/", "market"),
+)
+
+# Ответы, означающие превышение лимита
+RATE_LIMIT_STATUSES = {403, 429}
+RATE_LIMIT_RET_CODE = 10006
+
+# Ожидание дольше этого порога попадает в лог
+LOG_WAIT_THRESHOLD = 1.0
+
+
+def endpoint_group(path: str) -> str:
+    for prefix, group in _GROUP_PREFIXES:
+        if path.startswith(prefix):
+            return group
+    return "default"
+
+
+class TokenBucket:
+    """Ведро токенов с резервированием: каждый запрос сразу списывает токен
+    и получает время ожидания своей очереди (токены могут уходить в минус)"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Резервирует токен и возвращает, сколько секунд ждать до запроса"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def sync(self, remaining: int, reset_in: Optional[float]):
+        """Подстраивается под остаток лимита, сообщенный биржей"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if remaining < self.tokens:
+                self.tokens = float(remaining)
+            if remaining <= 0 and reset_in is not None:
+                self.blocked_until = max(self.blocked_until, now + reset_in)
+
+    def block(self, seconds: float):
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class RateLimiter:
+    """Общий для процесса ограничитель REST-запросов к Bybit.
+
+    Запрос сначала резервирует токен в ведре своей группы эндпоинтов и ждет
+    своей очереди, а после ответа ведро подстраивается под заголовки
+    X-Bapi-Limit-Status / X-Bapi-Limit-Reset-Timestamp. Повторы после ошибки
+    лимита тоже проходят через очередь, а не спят вслепую.
+    """
+
+    def __init__(self, groups: Optional[Dict[str, tuple]] = None):
+        groups = groups or ENDPOINT_GROUPS
+        self.buckets = {name: TokenBucket(rate, capacity) for name, (rate, capacity) in groups.items()}
+        self._stats = {name: {"requests": 0, "queued": 0, "wait_total": 0.0, "wait_max": 0.0, "limited": 0}
+                       for name in groups}
+        self._stats_lock = threading.Lock()
+
+    def _bucket(self, group: str) -> TokenBucket:
+        return self.buckets.get(group) or self.buckets["default"]
+
+    def _reserve(self, path: str) -> float:
+        group = endpoint_group(path)
+        wait = self._bucket(group).reserve()
+        with self._stats_lock:
+            stats = self._stats.get(group, self._stats["default"])
+            stats["requests"] += 1
+            if wait > 0:
+                stats["queued"] += 1
+                stats["wait_total"] += wait
+                stats["wait_max"] = max(stats["wait_max"], wait)
+        if wait > LOG_WAIT_THRESHOLD:
+            log_maker(f"🚦 Очередь запросов {group}: ожидание {wait:.1f} сек ({path})")
+        return wait
+
+    def acquire(self, path: str):
+        """Блокирует поток до очереди запроса"""
+        wait = self._reserve(path)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, path: str):
+        wait = self._reserve(path)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def observe(self, path: str, status_code: int, headers: Mapping[str, str]):
+        """Учитывает ответ биржи: остаток лимита и время сброса"""
+        group = endpoint_group(path)
+        bucket = self._bucket(group)
+
+        remaining = headers.get("X-Bapi-Limit-Status")
+        reset_ms = headers.get("X-Bapi-Limit-Reset-Timestamp")
+        reset_in = None
+        if reset_ms:
+            try:
+                reset_in = max(0.0, int(reset_ms) / 1000 - time.time())
+            except ValueError:
+                reset_in = None
+        if remaining is not None:
+            try:
+                bucket.sync(int(remaining), reset_in)
+            except ValueError:
+                pass
+
+        if status_code in RATE_LIMIT_STATUSES:
+            self.penalize(path, reset_in)
+
+    def penalize(self, path: str, seconds: Optional[float] = None):
+        """Превышен лимит: следующие запросы группы ждут seconds (по умолчанию 1 сек)"""
+        group = endpoint_group(path)
+        self._bucket(group).block(seconds if seconds is not None else 1.0)
+        with self._stats_lock:
+            self._stats.get(group, self._stats["default"])["limited"] += 1
+        log_maker(f"🚦⚠️ Превышен лимит запросов {group}, запросы поставлены в очередь")
+
+    def stats(self) -> Dict[str, dict]:
+        """Счетчики по группам: запросы, ожидавшие в очереди, суммарное ожидание"""
+        with self._stats_lock:
+            return {name: dict(values) for name, values in self._stats.items()}
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_guard = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Общий для процесса ограничитель (sync и async клиенты, pybit, ccxt)"""
+    global _limiter
+    with _limiter_guard:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
@@ -1,22 +1,27 @@
-import os
 import json
 import time
 from app.services.coin_ranker import CoinRanker
 from app.services.model_trainer import ModelTrainer
-from app.services.bybit_service import BybitService
+from app.services.bybit_service import get_bybit_service
 from app.strategies.ma_crossover import MovingAverageStrategy
 from app.strategies.neural_strategy import NeuralStrategy
+from app.strategies.neural_network.registry import get_model_registry
 from app.utils.log_helper import log_maker
 from app.services.coin_rotator import CoinRotator
+from app.services.forecast_service import ForecastService
 
 class TradingSystem:
     def __init__(self, coin_list):
         self.coin_list = coin_list
         self.state = self.load_state()
-        self.bybit = BybitService()
+        self.bybit = get_bybit_service()
+        self.models = get_model_registry()
         self.ranker = CoinRanker()
         self.model_trainer = ModelTrainer(coin_list)
-        self.rotator = CoinRotator(coin_list, trading_system=self)
+        # Прогноз по всем монетам раз в свечу - на общих с реестром весах
+        self.forecasts = ForecastService(coin_list, registry=self.models, bybit=self.bybit)
+        self.forecasts.start()
+        self.rotator = CoinRotator(coin_list, trading_system=self, forecasts=self.forecasts)
         self.position_open_time = self.state.get("position_open_time", 0)
         self.position_coin = self.state.get("position_coin", "")
         self.max_hold_hours = 24
@@ -35,11 +40,10 @@ class TradingSystem:
     
     def train_missing_models(self):
         """Обучение моделей для монет, у которых они отсутствуют"""
-        for coin in self.coin_list:
-            model_path = f"models/{coin}_neural_model.keras"
-            if not os.path.exists(model_path):
-                log_maker(f"🧠 Модель для {coin} отсутствует. Добавляю в очередь обучения.")
-                self.model_trainer.add_to_queue(coin, force_retrain=True)
+        # Индекс реестра вместо проверки файлов каждой монеты
+        for coin in self.models.missing(self.coin_list):
+            log_maker(f"🧠 Модель для {coin} отсутствует. Добавляю в очередь обучения.")
+            self.model_trainer.add_to_queue(coin, force_retrain=True)
     
     def load_state(self):
         try:
@@ -63,17 +67,19 @@ class TradingSystem:
         # Формируем символ и путь к модели
         symbol = f"{self.current_coin}USDT"
         model_base = f"models/{self.current_coin}_neural_model"
-        model_file = f"{model_base}.keras"
+        # Обучение модели активной монеты - вне очереди
+        self.model_trainer.set_active_coin(self.current_coin)
         
         try:
             # Пытаемся использовать нейросетевую стратегию, если модель доступна
-            if os.path.exists(model_file):
+            if self.models.has_model(self.current_coin):
                 self.strategy = NeuralStrategy(
                     symbol, 
                     bybit_service=self.bybit,
                     model_path=model_base,
                     rotator=self.rotator,
-                    trading_system=self
+                    trading_system=self,
+                    registry=self.models
                 )
                 log_maker(f"🧠 Используется нейросетевая стратегия для {symbol}")
             else:
@@ -0,0 +1,192 @@
+# app/services/training_pool.py
+"""Обучение моделей в отдельных процессах.
+
+Каждое задание (TrainingJob) обучается в своем процессе
+app.strategies.neural_network.worker: TensorFlow не делит GIL и пулы
+потоков с торговым циклом, память модели освобождается вместе с
+процессом. Одновременно работает до workers процессов; каждый слот
+привязан к своему набору ядер (первые reserved_cpus ядер остаются
+торговому процессу), ограничен threads потоками и запущен с пониженным
+приоритетом. События процессов (started / progress / done / failed)
+передаются в on_event, а без него собираются в очередь events. Отмена
+задания, которое еще ждет слота, снимает его сразу с событием failed.
+"""
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+from typing import Callable, Dict, List, Optional, Set
+
+from app.strategies.neural_network.training_job import TrainingJob, thread_env
+from app.utils.log_helper import log_maker
+
+WORKER_MODULE = "app.strategies.neural_network.worker"
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def cpu_sets(workers: int, reserved: int = 1) -> List[List[int]]:
+    """Наборы ядер для слотов: ядра процесса без reserved первых, поровну
+    между слотами. Если ядер не больше reserved, слоты делят все ядра"""
+    if hasattr(os, "sched_getaffinity"):
+        available = sorted(os.sched_getaffinity(0))
+    else:
+        available = list(range(os.cpu_count() or 1))
+    if len(available) > reserved:
+        available = available[reserved:]
+    sets = [[] for _ in range(workers)]
+    for i, cpu in enumerate(available):
+        sets[i % workers].append(cpu)
+    return [cpus or available for cpus in sets]
+
+
+class TrainingPool:
+    def __init__(
+        self,
+        workers: int = 1,
+        threads_per_worker: int = 1,
+        reserved_cpus: int = 1,
+        nice: int = 10,
+        on_event: Optional[Callable[[dict], None]] = None,
+        cwd: Optional[str] = None,
+    ):
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        self.nice = nice
+        self.on_event = on_event
+        self.cwd = cwd
+        self.events: "queue.Queue[dict]" = queue.Queue()
+        self._slots = cpu_sets(workers, reserved_cpus)
+        self._free = queue.Queue()
+        for slot in range(workers):
+            self._free.put(slot)
+        self._pending: "queue.Queue[Optional[TrainingJob]]" = queue.Queue()
+        self._processes: Dict[str, subprocess.Popen] = {}
+        self._waiting: Dict[str, TrainingJob] = {}  # поставлены, процесс еще не запущен
+        self._dropped: Set[int] = set()  # id отмененных до запуска заданий
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._dispatcher = threading.Thread(target=self._dispatch, daemon=True, name="training-pool")
+        self._dispatcher.start()
+
+    def submit(self, job: TrainingJob):
+        """Ставит задание в очередь; оно начнется, когда освободится слот"""
+        with self._lock:
+            self._waiting[job.coin] = job
+        self._pending.put(job)
+
+    def active(self) -> List[str]:
+        """Монеты, которые обучаются прямо сейчас"""
+        with self._lock:
+            return list(self._processes)
+
+    def cancel(self, coin: str) -> bool:
+        """Прерывает обучение монеты; процесс сообщит failed. Задание, которое
+        еще не запущено, снимается с очереди, и failed публикуется сразу"""
+        with self._lock:
+            process = self._processes.get(coin)
+            job = self._waiting.pop(coin, None) if process is None else None
+            if job is not None:
+                self._dropped.add(id(job))
+        if job is not None:
+            self._publish({"type": "failed", "coin": coin, "error": "Обучение отменено до запуска"})
+            return True
+        if process is None:
+            return False
+        process.terminate()
+        return True
+
+    def stop(self, timeout: float = 5):
+        """Останавливает очередь и завершает запущенные процессы"""
+        self._stopped.set()
+        self._pending.put(None)
+        with self._lock:
+            processes = list(self._processes.values())
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self._dispatcher.join(timeout)
+
+    def _dispatch(self):
+        while not self._stopped.is_set():
+            job = self._pending.get()
+            if job is None:
+                return
+            slot = self._free.get()
+            if self._stopped.is_set():
+                return
+            # Снятие с ожидания и запуск - под одной блокировкой: отмена
+            # застает задание либо ждущим, либо с процессом
+            process = error = None
+            with self._lock:
+                dropped = id(job) in self._dropped
+                self._dropped.discard(id(job))
+                if self._waiting.get(job.coin) is job:
+                    del self._waiting[job.coin]
+                if not dropped:
+                    try:
+                        process = self._spawn(job, self._slots[slot])
+                        self._processes[job.coin] = process
+                    except OSError as e:
+                        error = e
+            if process is None:
+                self._free.put(slot)
+                if error is not None:
+                    self._publish({"type": "failed", "coin": job.coin, "error": f"Процесс не запущен: {error}"})
+                continue
+            threading.Thread(
+                target=self._watch, args=(job, process, slot), daemon=True, name=f"training-{job.coin}"
+            ).start()
+
+    def _spawn(self, job: TrainingJob, cpus: List[int]) -> subprocess.Popen:
+        env = dict(os.environ)
+        env.update(thread_env(self.threads_per_worker))
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get("PYTHONPATH")]))
+        process = subprocess.Popen(
+            [sys.executable, "-m", WORKER_MODULE,
+             "--cpus", ",".join(map(str, cpus)),
+             "--threads", str(self.threads_per_worker),
+             "--nice", str(self.nice)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=self.cwd,
+            env=env,
+            text=True,
+        )
+        process.stdin.write(job.to_json() + "\n")
+        process.stdin.close()
+        return process
+
+    def _watch(self, job: TrainingJob, process: subprocess.Popen, slot: int):
+        """Пересылает события процесса; молча упавший процесс - тоже failed"""
+        finished = False
+        try:
+            for line in process.stdout:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                finished = finished or event.get("type") in ("done", "failed")
+                self._publish(event)
+            code = process.wait()
+            if not finished:
+                self._publish({"type": "failed", "coin": job.coin,
+                               "error": f"Процесс обучения завершился с кодом {code}"})
+        finally:
+            with self._lock:
+                self._processes.pop(job.coin, None)
+            self._free.put(slot)
+
+    def _publish(self, event: dict):
+        if self.on_event is None:
+            self.events.put(event)
+        else:
+            try:
+                self.on_event(event)
+            except Exception as e:
+                log_maker(f"⚠️ Ошибка обработки события обучения {event.get('coin')}: {e}")
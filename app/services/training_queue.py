@@ -0,0 +1,218 @@
+# app/services/training_queue.py
+"""Очередь заданий на обучение моделей с приоритетами.
+
+Порядок: модель активной монеты, затем монеты без модели (по времени
+постановки), затем устаревшие модели (сначала самые старые). Монета
+стоит в очереди не больше одного раза: повторная постановка только
+повышает приоритет, понижает его лишь demote при смене активной монеты. Упавшее обучение возвращается в очередь с
+экспоненциальной паузой. Очередь сохраняется в data/training_queue.json
+после каждого изменения вместе с выданными, но не завершенными
+заданиями (finish) - прерванное перезапуском обучение начнется снова.
+"""
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+from app.utils.log_helper import log_maker
+
+QUEUE_PATH = "data/training_queue.json"
+
+# Приоритеты: меньше - важнее
+PRIORITY_ACTIVE = 0
+PRIORITY_MISSING = 1
+PRIORITY_STALE = 2
+
+
+@dataclass
+class QueuedJob:
+    coin: str
+    priority: int
+    order: float  # порядок внутри приоритета: время постановки или время изменения модели
+    reason: str = ""
+    attempts: int = 0  # неудачных попыток подряд
+    not_before: float = 0.0  # раньше этого времени (пауза после ошибки) не запускать
+
+    def key(self) -> Tuple[int, float]:
+        return self.priority, self.order
+
+
+class TrainingQueue:
+    def __init__(self, path: Optional[str] = QUEUE_PATH, retry_base: float = 300,
+                 retry_max: float = 6 * 3600):
+        self.path = path
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._jobs: Dict[str, QueuedJob] = {}
+        self._taken: Dict[str, QueuedJob] = {}  # выданы get, ждут finish или retry
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        self._changed = threading.Condition(threading.Lock())
+        self._load()
+
+    # ===== Постановка и снятие =====
+
+    def put(self, coin: str, priority: int, order: Optional[float] = None, reason: str = "") -> bool:
+        """Ставит монету в очередь. Если она уже стоит, задание только
+        поднимается, когда новый приоритет выше. True - очередь изменилась"""
+        order = time.time() if order is None else order
+        with self._changed:
+            job = self._jobs.get(coin)
+            if job is not None:
+                if (priority, order) >= job.key():
+                    return False
+                job.priority, job.order = priority, order
+                job.reason = reason or job.reason
+            else:
+                job = QueuedJob(coin, priority, order, reason)
+                self._jobs[coin] = job
+            self._push(job)
+            self._save()
+            self._changed.notify_all()
+            return True
+
+    def promote(self, coin: str) -> bool:
+        """Поднимает стоящее в очереди задание монеты на первое место"""
+        with self._changed:
+            job = self._jobs.get(coin)
+            if job is None or job.priority == PRIORITY_ACTIVE:
+                return False
+        return self.put(coin, PRIORITY_ACTIVE, job.order, job.reason)
+
+    def demote(self, coin: str, priority: int, order: Optional[float] = None) -> bool:
+        """Опускает стоящее в очереди задание монеты до priority (монета
+        перестала быть активной); order None - прежний порядок задания"""
+        with self._changed:
+            job = self._jobs.get(coin)
+            if job is None or job.priority >= priority:
+                return False
+            job.priority = priority
+            job.order = job.order if order is None else order
+            self._push(job)
+            self._save()
+            self._changed.notify_all()
+            return True
+
+    def cancel(self, coin: str) -> bool:
+        with self._changed:
+            if self._jobs.pop(coin, None) is None:
+                return False
+            self._save()
+            return True
+
+    def retry(self, job: QueuedJob) -> float:
+        """Возвращает упавшее задание в очередь с паузой retry_base * 2^(n-1),
+        не больше retry_max. Возвращает время следующей попытки"""
+        job.attempts += 1
+        delay = min(self.retry_base * 2 ** (job.attempts - 1), self.retry_max)
+        job.not_before = time.time() + delay
+        with self._changed:
+            self._taken.pop(job.coin, None)
+            current = self._jobs.get(job.coin)
+            if current is not None:
+                # Пока шло обучение, монету поставили снова - сохраняем лучший приоритет
+                job.priority, job.order = min(job.key(), current.key())
+            self._jobs[job.coin] = job
+            self._push(job)
+            self._save()
+            self._changed.notify_all()
+        return job.not_before
+
+    def finish(self, coin: str):
+        """Задание, выданное get, завершено (успешно или отменено)"""
+        with self._changed:
+            if self._taken.pop(coin, None) is not None:
+                self._save()
+
+    # ===== Выдача =====
+
+    def get(self, timeout: Optional[float] = None) -> Optional[QueuedJob]:
+        """Самое важное задание, которое уже можно запускать; ждет его
+        появления до timeout секунд (None - без ограничения)"""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._changed:
+            while True:
+                job, wake_at = self._pop_ready()
+                if job is not None:
+                    self._taken[job.coin] = job
+                    self._save()
+                    return job
+                now = time.time()
+                if deadline is not None:
+                    if now >= deadline:
+                        return None
+                    wake_at = min(wake_at or deadline, deadline)
+                self._changed.wait(None if wake_at is None else max(wake_at - now, 0))
+
+    def _pop_ready(self) -> Tuple[Optional[QueuedJob], Optional[float]]:
+        """Снимает первое готовое задание; для отложенных - ближайшее время готовности"""
+        now = time.time()
+        deferred = []
+        found = None
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            key, _, coin = entry
+            job = self._jobs.get(coin)
+            if job is None or job.key() != key:
+                continue  # снятое или переставленное задание
+            if job.not_before > now:
+                deferred.append(entry)
+                continue
+            del self._jobs[coin]
+            found = job
+            break
+        for entry in deferred:
+            heapq.heappush(self._heap, entry)
+        wake_at = min((self._jobs[entry[2]].not_before for entry in deferred), default=None)
+        return found, wake_at
+
+    def _push(self, job: QueuedJob):
+        heapq.heappush(self._heap, (job.key(), next(self._seq), job.coin))
+
+    # ===== Состояние =====
+
+    def __contains__(self, coin: str) -> bool:
+        with self._changed:
+            return coin in self._jobs
+
+    def __len__(self) -> int:
+        with self._changed:
+            return len(self._jobs)
+
+    def snapshot(self) -> List[QueuedJob]:
+        """Задания в порядке приоритета (без учета пауз)"""
+        with self._changed:
+            return sorted(self._jobs.values(), key=QueuedJob.key)
+
+    def _save(self):
+        if self.path is None:
+            return
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                jobs = sorted([*self._taken.values(), *self._jobs.values()], key=QueuedJob.key)
+                json.dump([asdict(job) for job in jobs], f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            log_maker(f"⚠️ Ошибка сохранения очереди обучения: {e}")
+
+    def _load(self):
+        if self.path is None or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                jobs = [QueuedJob(**item) for item in json.load(f)]
+        except (OSError, ValueError, TypeError) as e:
+            log_maker(f"⚠️ Очередь обучения не восстановлена: {e}")
+            return
+        for job in jobs:
+            if job.coin not in self._jobs:
+                self._jobs[job.coin] = job
+                self._push(job)
@@ -0,0 +1,91 @@
+# app/services/ws_client.py
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Iterable, Optional
+
+import websocket
+
+from app.utils.log_helper import log_maker
+
+# Bybit принимает не более 10 топиков в одном запросе подписки
+SUBSCRIBE_BATCH = 10
+
+
+class WebSocketClient(ABC):
+    """Базовое соединение с WebSocket Bybit: фоновый поток, пинг,
+    переподключение. Наследники реализуют on_connected и handle_message."""
+
+    name = "ws"
+
+    def __init__(self, url: str, reconnect_delay: float = 5.0):
+        self.url = url
+        self.reconnect_delay = reconnect_delay
+        self.connected = threading.Event()
+        self._ws: Optional[websocket.WebSocketApp] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = threading.Event()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running.clear()
+        if self._ws is not None:
+            self._ws.close()
+
+    def reconnect(self):
+        """Разрывает соединение - поток подключится заново"""
+        if self._ws is not None:
+            self._ws.close()
+
+    def _run(self):
+        while self._running.is_set():
+            self._ws = websocket.WebSocketApp(
+                self.url,
+                on_open=self._on_open,
+                on_message=lambda ws, message: self.handle_message(message),
+                on_error=lambda ws, error: log_maker(f"📡⚠️ Ошибка WebSocket {self.name}: {error}"),
+                on_close=lambda ws, code, reason: self._on_close(),
+            )
+            self._ws.run_forever(ping_interval=20, ping_payload=json.dumps({"op": "ping"}))
+            self._on_close()
+            if self._running.is_set():
+                log_maker(f"📡🔄 {self.name} отключен, переподключение через {self.reconnect_delay} сек")
+                time.sleep(self.reconnect_delay)
+
+    def _on_open(self, ws):
+        self.connected.set()
+        self.on_connected()
+
+    def _on_close(self):
+        self.connected.clear()
+
+    def send_json(self, payload: dict) -> bool:
+        if self._ws is None or not self.connected.is_set():
+            return False
+        try:
+            self._ws.send(json.dumps(payload))
+            return True
+        except Exception as e:
+            log_maker(f"📡⚠️ Не удалось отправить сообщение {self.name}: {e}")
+            return False
+
+    def send_op(self, op: str, topics: Iterable[str]):
+        """Подписка/отписка пачками по SUBSCRIBE_BATCH топиков"""
+        topics = sorted(topics)
+        for i in range(0, len(topics), SUBSCRIBE_BATCH):
+            self.send_json({"op": op, "args": topics[i:i + SUBSCRIBE_BATCH]})
+
+    def on_connected(self):
+        pass
+
+    @abstractmethod
+    def handle_message(self, message: str):
+        """Обработка входящего сообщения (вызывается из потока соединения)"""
+        pass
@@ -0,0 +1,754 @@
+# app/strategies/ma_signal.py
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+
+from app.indicators.market_grades import grade_atr, grade_ema_diff, grade_slope, grade_volatility
+from app.indicators.streaming import (
+    IndicatorEngine,
+    RollingStd,
+    StreamingATR,
+    StreamingEMA,
+    StreamingRSI,
+)
+from app.utils.candle_frame import CandleFrame
+from app.utils.candle_store import interval_to_ms
+
+# Минимум свечей для анализа
+MIN_CANDLES = 50
+
+TAKER_FEE = 0.0018
+
+
+@dataclass
+class Position:
+    """Снимок позиции. Ядро может поправить его поля (пик цены, флаг
+    частичного выхода), оболочка переносит их обратно в стратегию"""
+    qty: float = 0.0
+    avg_buy_price: float = 0.0
+    last_action: str = "NONE"
+    last_trade_time: float = 0.0
+    last_trade_price: float = 0.0
+    max_price_since_buy: Optional[float] = None
+    partial_exit_taken: bool = False
+
+
+@dataclass
+class SignalResult:
+    """Решение тика: действие, значения индикаторов и сообщения для лога"""
+    action: Optional[str]
+    diagnostics: dict = field(default_factory=dict)
+    messages: List[str] = field(default_factory=list)
+
+
+class MASignalCore:
+    """Торговые правила MovingAverageStrategy без ввода-вывода.
+
+    evaluate() получает свечи, цену, позицию и заранее загруженные данные
+    (баланс, точность, тренд старшего таймфрейма) и возвращает действие.
+    Запросов к бирже и записи в лог здесь нет, поэтому ядро можно гонять
+    в тестах и на истории без BybitService.
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        interval: str = "3",
+        short_window: int = 8,
+        medium_window: int = 21,
+        long_window: int = 50,
+    ):
+        self.symbol = symbol
+        self.interval = interval
+        self.short_window = short_window
+        self.medium_window = medium_window
+        self.long_window = long_window
+
+        # Статистика эффективности
+        self.trade_opportunities = 0
+        self.executed_trades = 0
+
+        # ===== ОПТИМИЗИРОВАННЫЕ ПАРАМЕТРЫ ДЛЯ МЕНЕЕ АГРЕССИВНОЙ СТРАТЕГИИ =====
+        # Адаптивные параметры
+        self.adaptive_params = True
+        self.base_min_cross = 0.0005  # Увеличен с 0.0002
+        self.base_min_slope = 0.00001  # Увеличен с 0.000005
+
+        # Риск-менеджмент
+        self.base_min_profit = 0.0080  # Увеличен с 0.0050
+        self.max_loss = 0.0075         # Уменьшен с 0.01
+        self.emergency_stop = -0.006   # Экстренный стоп при -0.6%
+
+        # Фильтры входа
+        self.min_volume_ratio = 0.8    # Увеличен с 0.4
+        self.adaptive_volume_ratio = 0.05  # Увеличен с 0.02
+        self.volume_lookback = 20      # Увеличен с 15
+
+        # Выход из позиции
+        self.trailing_stop_activation = 0.020  # Увеличен с 0.015
+        self.trailing_stop_distance = 0.005    # Уменьшен с 0.006
+
+        # Частичное взятие прибыли (менее агрессивное)
+        self.partial_profit_levels = [0.004, 0.008, 0.012]  # Увеличены
+        self.partial_profit_pcts = [0.2, 0.3, 0.5]          # Уменьшены
+        self.partial_taken = [False, False, False]
+
+        # Частичный выход при убытках
+        self.partial_exit_level = -0.0025  # Увеличен с -0.003
+        self.partial_exit_pct = 0.3        # Уменьшен с 0.5
+
+        # Защита от преждевременного выхода
+        self.min_hold_time = 30 * 60  # Увеличен с 15 до 30 минут
+
+        # Выход по флэту
+        self.flat_volatility_threshold = 0.0008  # Увеличен с 0.0006
+        self.flat_max_duration = 180
+        self.flat_counter = 0
+        self.flat_max_no_growth = 25  # Увеличено с 15 до 25
+        self.flat_exit_profit = 0.0
+        self.min_hold_time_for_flat = 3600  # Увеличен с 30 до 60 минут
+
+        # Фильтры по RSI и тренду
+        self.rsi_overbought_threshold = 65  # Уменьшен с 68
+        self.min_risk_reward_ratio = 2.5    # Увеличен с 1.8
+
+        self.min_avg_price = 0.01  # Минимальная допустимая цена покупки
+
+        # Дополнительные фильтры
+        self.require_confirmation = True    # Требовать подтверждение сигнала
+        self.confirmation_period = 3        # Количество свечей для подтверждения
+        self.required_trend_strength = 4    # Минимальная сила тренда для входа
+
+        # ===== КОНЕЦ ПАРАМЕТРОВ =====
+
+        # Состояние сигналов между тиками
+        self.prev_short_ema = None
+        self.prev_medium_ema = None
+        self.prev_long_ema = None
+        self.ma_crossed_down = False
+        self.ema_history = []
+        self.current_atr = 0.0
+        self.current_short_ema = 0.0
+        self.current_medium_ema = 0.0
+        self.pending_signal = None
+        self.signal_confirmation_count = 0
+
+        # Индикаторы считаются потоково: затравка по истории в seed(),
+        # дальше каждая закрытая свеча учитывается один раз
+        self.indicators = IndicatorEngine(
+            interval_to_ms(interval),
+            short_ema=StreamingEMA(short_window),
+            medium_ema=StreamingEMA(medium_window),
+            long_ema=StreamingEMA(long_window),
+            rsi=StreamingRSI(14),
+            atr=StreamingATR(14),
+            volatility=RollingStd(long_window),
+        )
+
+    @classmethod
+    def from_params(cls, symbol: str, interval: str = "3", **params) -> "MASignalCore":
+        """Ядро с переопределенными параметрами (окна EMA и любые атрибуты
+        из блока параметров), например для прогона на истории"""
+        windows = {
+            name: params.pop(name)
+            for name in ("short_window", "medium_window", "long_window")
+            if name in params
+        }
+        core = cls(symbol, interval=interval, **windows)
+        for name, value in params.items():
+            if not hasattr(core, name):
+                raise ValueError(f"Неизвестный параметр стратегии: {name}")
+            setattr(core, name, value)
+        return core
+
+    def seed(self, candles: CandleFrame):
+        """Затравка индикаторов по истории, EMA последней закрытой свечи
+        становятся предыдущими значениями"""
+        self.indicators.sync(candles)
+        self.prev_short_ema = self.indicators["short_ema"].value
+        self.prev_medium_ema = self.indicators["medium_ema"].value
+        self.prev_long_ema = self.indicators["long_ema"].value
+
+    def evaluate(
+        self,
+        candles: CandleFrame,
+        price: float,
+        position: Position,
+        balance_usdt: float = 0.0,
+        qty_precision: int = 2,
+        hourly_trend: int = 0,
+        now: float = 0.0,
+    ) -> SignalResult:
+        """Решение по свечам и цене. hourly_trend: 1 / 0 / -1 по старшему
+        таймфрейму, now - текущее время в секундах (для сроков удержания)"""
+        result = SignalResult(action=None)
+        self.trade_opportunities += 1
+        if len(candles) < MIN_CANDLES:
+            result.messages.append(
+                f"📊📭 Недостаточно данных для анализа (требуется минимум {MIN_CANDLES} свечей)"
+            )
+            return result
+        result.action = self._decide(
+            CandleFrame.from_candles(candles), price, position,
+            balance_usdt, qty_precision, hourly_trend, now, result,
+        )
+        return result
+
+    def _decide(self, candles: CandleFrame, current_price: float, position: Position,
+                balance_usdt: float, qty_precision: int, hourly_trend: int, now: float,
+                result: SignalResult) -> Optional[str]:
+        say = result.messages.append
+        diagnostics = result.diagnostics
+        current_candle = candles[-1]
+
+        if (position.qty > 0
+            and position.avg_buy_price < self.min_avg_price
+            and position.last_action == "BUY"):
+            say("⚠️ Критическая ошибка: цена покупки неизвестна! Используем текущую цену.")
+            position.avg_buy_price = current_price
+            position.last_trade_time = now
+
+        candle_low = current_candle['low']
+        price_diff = (current_price - candle_low) / candle_low
+        if not position.qty and price_diff > 0.005:
+            say(f"⏩ Пропуск BUY: цена ({current_price}) далеко от минимума свечи ({candle_low})")
+            return None
+
+        closes = candles.close
+        volumes = candles.volume
+        if np.max(volumes[-self.volume_lookback:]) == 0:
+            say("⚠️ Обнаружен нулевой объем, пропускаем итерацию")
+            return None
+
+        range_window = 20
+        upper_level = np.max(closes[-range_window:])
+        lower_level = np.min(closes[-range_window:])
+        level_delta = (upper_level - lower_level) * 0.02
+
+        # Новые закрытые свечи продвигают индикаторы, текущая учитывается без записи
+        self.indicators.sync(candles)
+        indicators = self.indicators.peek(candles)
+        short_ema = indicators["short_ema"]
+        medium_ema = indicators["medium_ema"]
+        long_ema = indicators["long_ema"]
+
+        self.current_short_ema = short_ema
+        self.current_medium_ema = medium_ema
+
+        self.ema_history.append(short_ema)
+        if len(self.ema_history) > 10:
+            self.ema_history.pop(0)
+
+        if len(self.ema_history) >= 3:
+            slopes = []
+            for i in range(1, 3):
+                if self.ema_history[-i - 1] > 0:
+                    slope = (
+                        (self.ema_history[-i] - self.ema_history[-i - 1])
+                        / self.ema_history[-i - 1]
+                    ) * 100
+                    slopes.append(slope)
+            short_ema_slope = np.mean(slopes) if slopes else 0
+        else:
+            short_ema_slope = (
+                ((short_ema - self.prev_short_ema) / self.prev_short_ema) * 100
+                if self.prev_short_ema
+                else 0
+            )
+
+        volatility = indicators["volatility"]
+        volatility_percent = volatility * 100
+
+        volatility_factor = min(5.0, volatility_percent / 0.05) if volatility_percent > 0 else 1.0
+
+        min_profit_dynamic = max(
+            self.base_min_profit,
+            TAKER_FEE * 2 + 0.0003,
+            volatility * 1.5,
+        )
+
+        atr = indicators["atr"]
+        self.current_atr = atr
+        rsi = indicators["rsi"]
+
+        diagnostics.update(
+            short_ema=short_ema,
+            medium_ema=medium_ema,
+            long_ema=long_ema,
+            short_ema_slope=float(short_ema_slope),
+            volatility=volatility,
+            atr=atr,
+            rsi=rsi,
+            min_profit=min_profit_dynamic,
+        )
+
+        if not position.qty and rsi > self.rsi_overbought_threshold:
+            say(f"⏩ Пропуск BUY: RSI {rsi:.2f} > {self.rsi_overbought_threshold} (перекупленность)")
+            return None
+
+        if self.adaptive_params:
+            adaptive_cross_diff = max(
+                self.base_min_cross, min(0.01, volatility_factor * self.base_min_cross)
+            )
+            adaptive_ema_slope = max(
+                self.base_min_slope, min(0.005, volatility_factor * self.base_min_slope)
+            )
+            adaptive_volume_ratio = max(
+                0.01,
+                min(1.0, 0.5 / volatility_factor),
+            )
+
+            if volatility_factor < 0.8:
+                adaptive_cross_diff *= 0.7
+                adaptive_ema_slope *= 0.6
+                adaptive_volume_ratio *= 0.5
+            elif volatility_factor > 1.5:
+                adaptive_cross_diff *= 1.3
+                adaptive_ema_slope *= 1.4
+                adaptive_volume_ratio *= 1.2
+        else:
+            adaptive_cross_diff = self.base_min_cross
+            adaptive_ema_slope = self.base_min_slope
+            adaptive_volume_ratio = 0.3
+
+        coin = self.symbol.replace("USDT", "")
+        quantity_usdt = round(balance_usdt, qty_precision) if balance_usdt else 0
+        time_since_last_trade = (
+            now - position.last_trade_time if position.last_trade_time else 0
+        )
+        hours, remainder = divmod(time_since_last_trade, 3600)
+        minutes, seconds = divmod(remainder, 60)
+        time_display = f"{int(hours):02d}:{int(minutes):02d}:{int(seconds):02d}"
+
+        unrealized_pnl = 0.0
+        unrealized_pnl_pct = 0.0
+        position_status = "⚠️ Нет открытой позиции"
+        if position.qty > 0:
+            if position.avg_buy_price > 0:
+                unrealized_pnl = (current_price - position.avg_buy_price) * position.qty
+                net_profit = unrealized_pnl - current_price * position.qty * TAKER_FEE
+                unrealized_pnl_pct = (
+                    net_profit / (position.avg_buy_price * position.qty)
+                ) * 100
+
+                if net_profit >= 0:
+                    position_status = (
+                        f"💰 Прибыль: +{net_profit:.6f} USDT (+{unrealized_pnl_pct:.4f}%)"
+                    )
+                else:
+                    position_status = (
+                        f"📉 Убыток: {net_profit:.6f} USDT ({unrealized_pnl_pct:.4f}%)"
+                    )
+            else:
+                position_status = "⚠️ Позиция есть, но цена покупки неизвестна"
+        diagnostics["unrealized_pnl_pct"] = unrealized_pnl_pct
+
+        vol_tag, vol_desc = grade_volatility(volatility_percent)
+        atr_tag, atr_desc = grade_atr(atr, current_price)
+
+        # Динамический стоп-лосс на основе ATR
+        dynamic_stop_loss = self.max_loss
+        if position.qty > 0 and position.avg_buy_price > 0:
+            atr_contribution = atr * 2.5 / (position.avg_buy_price * position.qty)
+            dynamic_stop_loss = max(self.max_loss, atr_contribution)
+        diagnostics["stop_loss"] = dynamic_stop_loss
+
+        holding = position.last_action == "BUY" and position.qty > 0
+
+        # Принудительный выход по времени
+        if holding:
+            # Условие 1: если удерживаем больше 1 часа и в убытке
+            if time_since_last_trade > 3600 and unrealized_pnl_pct < 0:
+                say(f"⏱️ [TIME EXIT] Позиция удерживается >1 часа с убытком {unrealized_pnl_pct:.2f}%")
+                return "SELL"
+
+            # Условие 2: если удерживаем больше 30 минут и убыток больше 0.5%
+            if time_since_last_trade > 1800 and unrealized_pnl_pct < -0.5:
+                say(f"🆘 [EMERGENCY EXIT] Позиция удерживается >30 мин с убытком {unrealized_pnl_pct:.2f}%")
+                return "SELL"
+
+            # Экстренный выход при значительном убытке
+            if unrealized_pnl_pct < self.emergency_stop * 100:
+                say(f"🚨 [EMERGENCY STOP] Убыток превысил {self.emergency_stop*100:.2f}%")
+                return "SELL"
+
+        stats_message = (
+            f"📊 short EMA: {short_ema:.6f}\n📊 medium EMA:{medium_ema:.6f}\n📊 long EMA:{long_ema:.6f}\n"
+            f"💰 Текущая цена: {current_price:.6f}\n"
+            f"📦 Баланс {coin}: {position.qty:.6f}\n"
+            f"💵 Баланс USDT: {quantity_usdt:.6f}\n"
+            f"{position_status}\n"
+            f"🌪️ Волатильность: {volatility_percent:.4f}% → {vol_tag} ({vol_desc})\n"
+            f"📏 ATR: {atr:.6f} → {atr_tag} ({atr_desc})\n"
+            f"🟢 Min profit: {min_profit_dynamic*100:.4f}% (base: {self.base_min_profit*100:.2f}%) | \n"
+            f"🔴 Max loss: {dynamic_stop_loss*100:.4f}%\n"
+            f"🧭 Последняя операция: {position.last_action} по цене {position.last_trade_price:.6f} USDT\n"
+            f"⏳ Время удержания: {time_display}\n"
+        )
+
+        failed_conditions = []
+        diagnostics["failed_conditions"] = failed_conditions
+
+        # Обновление максимальной цены
+        if holding:
+            if position.max_price_since_buy is None:
+                position.max_price_since_buy = current_price
+            else:
+                position.max_price_since_buy = max(position.max_price_since_buy, current_price)
+
+            if current_price > position.max_price_since_buy:
+                position.max_price_since_buy = current_price
+                self.flat_counter = 0
+            else:
+                self.flat_counter += 1
+
+            # Увеличено время для флэт-выхода
+            if (
+                self.flat_counter >= self.flat_max_no_growth
+                and unrealized_pnl_pct > self.flat_exit_profit
+                and time_since_last_trade > self.min_hold_time_for_flat
+            ):
+                say(
+                    f"⏹️ [FLAT EXIT] Цена не растёт {self.flat_counter} свечей, выходим по неубытку ({unrealized_pnl_pct:.2f}%)"
+                )
+                self.flat_counter = 0
+                position.max_price_since_buy = None
+                return "SELL"
+
+        # Выход при флэте с минимальным убытком (с добавлением времени удержания)
+        flat_condition = (
+            position.last_action == "BUY"
+            and volatility < self.flat_volatility_threshold
+            and unrealized_pnl_pct >= -0.1
+            and time_since_last_trade > self.min_hold_time_for_flat
+        )
+        if flat_condition:
+            say(f"📈 Закрываем позицию с прибылью {unrealized_pnl_pct:.4f}%")
+            return "SELL"
+        elif position.last_action == "BUY":
+            if not (volatility < self.flat_volatility_threshold):
+                failed_conditions.append("Волатильность выше порога флэта")
+            if not (unrealized_pnl_pct < 0):
+                failed_conditions.append(
+                    f"Позиция в прибыли ({unrealized_pnl_pct:.4f}%)"
+                )
+
+        if holding:
+            if position.max_price_since_buy is None:
+                position.max_price_since_buy = current_price
+            elif current_price > position.max_price_since_buy:
+                position.max_price_since_buy = current_price
+
+            if current_price >= position.avg_buy_price * (1 + min_profit_dynamic):
+                trailing_stop_price = position.max_price_since_buy * (
+                    1 - self.trailing_stop_distance
+                )
+                if current_price <= trailing_stop_price:
+                    say(
+                        f"🔐 [TRAILING STOP] Активирован: пик {position.max_price_since_buy:.6f}, текущая {current_price:.6f}"
+                    )
+                    return "SELL"
+                else:
+                    failed_conditions.append(
+                        f"Трейлинг-стоп: цена ({current_price:.6f}) > стопа ({trailing_stop_price:.6f})"
+                    )
+            else:
+                failed_conditions.append(
+                    f"Трейлинг-стоп: не активирован (прибыль < {min_profit_dynamic*100:.4f}%)"
+                )
+
+        stop_loss_condition = (
+            holding
+            and unrealized_pnl_pct <= -dynamic_stop_loss * 100
+            and time_since_last_trade > 10 * 60
+        )
+        if stop_loss_condition:
+            say(
+                f"🛑 [STOP LOSS] Убыток {unrealized_pnl_pct:.4f}% достиг максимума {-dynamic_stop_loss*100:.4f}%"
+            )
+            return "SELL"
+        elif holding:
+            failed_conditions.append(
+                f"Стоп-лосс: убыток {unrealized_pnl_pct:.4f}% > порога {-dynamic_stop_loss*100:.4f}%"
+            )
+
+        # Частичный выход при убытках
+        partial_exit_condition = (
+            holding
+            and unrealized_pnl_pct < self.partial_exit_level * 100
+            and not position.partial_exit_taken
+        )
+
+        if partial_exit_condition:
+            say(f"🟡 [PARTIAL EXIT] Убыток достиг {self.partial_exit_level*100:.2f}%, продаем {self.partial_exit_pct*100:.0f}% позиции")
+            position.partial_exit_taken = True
+            return "SELL_PARTIAL"
+
+        # Проверка подтверждения сигнала
+        if self.pending_signal and self.require_confirmation:
+            self.signal_confirmation_count += 1
+
+            # Если сигнал подтвержден достаточным количеством свечей
+            if self.signal_confirmation_count >= self.confirmation_period:
+                confirmed_signal = self.pending_signal
+                self.pending_signal = None
+                self.signal_confirmation_count = 0
+                return confirmed_signal
+            else:
+                say(f"⏳ Ожидание подтверждения сигнала ({self.signal_confirmation_count}/{self.confirmation_period})")
+                return None
+
+        if self.prev_short_ema is not None and self.prev_medium_ema is not None:
+            short_medium_diff = (
+                ((short_ema - medium_ema) / medium_ema) * 100 if medium_ema > 0 else 0
+            )
+
+            avg_volume = (
+                np.mean(volumes[-self.volume_lookback :])
+                if len(volumes) >= self.volume_lookback
+                else 0
+            )
+            current_volume = volumes[-1] if len(volumes) else 0
+            volume_ratio = current_volume / avg_volume if avg_volume > 0 else 1
+
+            slope_desc = grade_slope(short_ema_slope)
+            ema_diff_desc = grade_ema_diff(short_medium_diff)
+
+            say(
+                f"📉 EMA Diff: S/M: {short_medium_diff:.4f}% (min: {adaptive_cross_diff:.4f}%) → {ema_diff_desc}\n"
+                f"📐 Наклон short: {short_ema_slope:.4f}% (min: {adaptive_ema_slope:.4f}%) → {slope_desc}\n"
+                f"📊 Объем: {volume_ratio:.2f}x (min: {adaptive_volume_ratio:.2f}x)\n"
+            )
+
+            trend_strength = 0
+            if len(self.ema_history) >= 5:
+                for i in range(1, min(6, len(self.ema_history))):
+                    if (
+                        i < len(self.ema_history)
+                        and self.ema_history[-i] > self.prev_medium_ema
+                    ):
+                        trend_strength += 1
+            diagnostics["trend_strength"] = trend_strength
+
+            entry_condition = False
+            entry_type = ""
+            if not entry_condition:
+                if short_ema <= medium_ema:
+                    failed_conditions.append("Short EMA ≤ Medium EMA")
+                elif short_ema_slope <= 0:
+                    failed_conditions.append("Наклон short EMA ≤ 0")
+                elif current_price <= np.max(closes[-6:-1]):
+                    failed_conditions.append("Цена не обновила локальный максимум")
+            if self.prev_short_ema <= self.prev_medium_ema and short_ema > medium_ema:
+                entry_condition = True
+                entry_type = "🆕 Новый восходящий кросс"
+            elif (
+                trend_strength >= self.required_trend_strength
+                and short_ema > medium_ema
+                and short_ema_slope > 0
+                and current_price > np.max(closes[-6:-1])
+            ):
+                entry_condition = True
+                entry_type = "📈 Продолжение сильного тренда"
+
+            if entry_condition:
+                # Дополнительные фильтры входа
+                if short_ema_slope < 0.00015:  # Более строгий фильтр наклона
+                    say("⏩ Пропуск BUY: слабый тренд (наклон EMA < 0.00015)")
+                    return None
+
+                # Проверка объема относительно ATR
+                volume_threshold = atr * 1500  # Увеличен порог
+                if current_volume < volume_threshold:
+                    say(f"⏩ Пропуск BUY: объем {current_volume} < ATR-порога {volume_threshold:.2f}")
+                    return None
+
+                # Проверка силы тренда
+                if trend_strength < self.required_trend_strength:
+                    say(f"⏩ Пропуск BUY: сила тренда {trend_strength} < требуемой {self.required_trend_strength}")
+                    return None
+
+                if position.last_action == "BUY":
+                    volatility_adjustment = max(0.5, min(2.0, volatility_factor))
+                    min_time_since_last_buy = int(self.min_hold_time / volatility_adjustment)
+                    if time_since_last_trade < min_time_since_last_buy:
+                        say(
+                            f"⏱️ Защита: последняя покупка была {time_display} назад, минимальный интервал: {min_time_since_last_buy//60} мин"
+                        )
+                        failed_conditions.append("Защита от частых входов")
+                        entry_condition = False
+
+                condition_cross = short_medium_diff >= adaptive_cross_diff
+                condition_slope = short_ema_slope >= adaptive_ema_slope
+                condition_volume = volume_ratio >= adaptive_volume_ratio
+                conditions_met = sum([condition_cross, condition_slope, condition_volume])
+
+                strong_slope_condition = (
+                    short_ema_slope >= 0.018
+                    and (condition_cross or condition_volume) and
+                    volume_ratio >= 0.08
+                )
+
+                buy_condition = (
+                    balance_usdt >= 5 and
+                    (conditions_met >= 2 or strong_slope_condition)
+                )
+
+                strong_trend = short_ema_slope > 0.015 or volume_ratio > 1.5
+                if buy_condition and current_price > upper_level - level_delta and not strong_trend:
+                    say(
+                        f"⛔ [LEVEL FILTER] Цена {current_price:.2f} близко к верхней границе диапазона ({upper_level:.2f})"
+                    )
+                    failed_conditions.append("Цена близко к верхней границе диапазона")
+                    buy_condition = False
+
+                if buy_condition:
+                    risk = atr * 2
+                    reward = atr * 4
+                    risk_reward_ratio = reward / risk if risk > 0 else 0
+
+                    if risk_reward_ratio < self.min_risk_reward_ratio:
+                        say(f"⏩ Пропуск BUY: соотношение риск/прибыль {risk_reward_ratio:.1f} < {self.min_risk_reward_ratio:.1f}")
+                        buy_condition = False
+                        failed_conditions.append(f"Соотношение R/R {risk_reward_ratio:.1f} < {self.min_risk_reward_ratio:.1f}")
+
+                if buy_condition and hourly_trend == -1:
+                    say("⏩ Пропуск BUY: нисходящий тренд на часовом графике")
+                    buy_condition = False
+                    failed_conditions.append("Нисходящий тренд на 1H")
+
+                if buy_condition:
+                    reason = ""
+                    if strong_slope_condition:
+                        reason = "📈 СИЛЬНЫЙ НАКЛОН + дополнительное условие"
+                    elif conditions_met >= 2:
+                        reason = f"✅ {conditions_met} из 3 условий выполнено"
+                    say(f"📥 [BUY SIGNAL] {entry_type} | Причина: {reason}\n"
+                        f"  • Разница EMA: {short_medium_diff:.4f}% {'✅' if condition_cross else '❌'} (порог: {adaptive_cross_diff:.4f}%)\n"
+                        f"  • Наклон EMA: {short_ema_slope:.4f}% {'✅' if condition_slope else '❌'} (порог: {adaptive_ema_slope:.4f}%)\n"
+                        f"  • Объем: {volume_ratio:.2f}x {'✅' if condition_volume else '❌'} (порог: {adaptive_volume_ratio:.2f}x)")
+
+                    # Вместо немедленного входа, ставим сигнал на подтверждение
+                    if self.require_confirmation:
+                        self.pending_signal = "BUY"
+                        self.signal_confirmation_count = 1
+                        say("🟡 Предварительный сигнал BUY. Ожидаю подтверждения.")
+                        return None
+                    else:
+                        position.max_price_since_buy = current_price
+                        self.ma_crossed_down = False
+                        return "BUY"
+                else:
+                    buy_failed = []
+                    if not (short_medium_diff >= adaptive_cross_diff):
+                        buy_failed.append(
+                            f"Разница EMA S/M ({short_medium_diff:.4f}% < {adaptive_cross_diff:.4f}%)"
+                        )
+                    if not (short_ema_slope >= adaptive_ema_slope):
+                        buy_failed.append(
+                            f"Наклон short EMA ({short_ema_slope:.4f}% < {adaptive_ema_slope:.4f}%)"
+                        )
+                    if not (volume_ratio >= adaptive_volume_ratio):
+                        buy_failed.append(
+                            f"Объем ({volume_ratio:.2f}x < {adaptive_volume_ratio:.2f}x)"
+                        )
+                    if buy_failed:
+                        failed_conditions.append(
+                            f"Условия покупки: " + ", ".join(buy_failed)
+                        )
+
+            if self.prev_short_ema <= self.prev_medium_ema and short_ema > medium_ema:
+                if self.ma_crossed_down:
+                    say("🟢 Сброс флага выхода (MA кросс вверх)")
+                    self.ma_crossed_down = False
+
+            if self.ma_crossed_down and holding:
+                time_in_trade = now - position.last_trade_time
+                if time_in_trade < self.min_hold_time:
+                    say(
+                        f"⏱️ Удерживаем позицию ({time_in_trade/60:.1f} мин < {self.min_hold_time/60} мин)"
+                    )
+                    failed_conditions.append(
+                        f"Защита: позиция удерживается менее {self.min_hold_time/60} мин"
+                    )
+                elif current_price and position.avg_buy_price:
+                    min_net_profit = min_profit_dynamic * 100 + 0.1
+                    if unrealized_pnl_pct >= min_net_profit:
+                        say(
+                            f"💰 [SELL SIGNAL] Net Profit: {unrealized_pnl_pct:.4f}% ≥ {min_net_profit:.4f}%"
+                        )
+                        return "SELL"
+                    elif short_ema > medium_ema:
+                        say("⚠️ Отменяем выход - MA кросс вниз был ложным")
+                        self.ma_crossed_down = False
+                    else:
+                        failed_conditions.append(
+                            f"Выход по флагу: прибыль {unrealized_pnl_pct:.4f}% < мин. {min_net_profit:.4f}%"
+                        )
+                else:
+                    failed_conditions.append("Выход по флагу: нет данных о цене")
+
+            if self.prev_short_ema >= self.prev_medium_ema and short_ema < medium_ema:
+                if holding:
+                    self.ma_crossed_down = True
+                    say("⚠️ MA cross down - exit flag set")
+                else:
+                    say("⚠️ MA cross down (no position)")
+
+        if (
+            position.qty == 0
+            and len(closes) > 8
+            and all(closes[-i] < closes[-i-1] for i in range(7,2,-1))
+            and closes[-2] < closes[-1]
+            and current_price < short_ema * 1.01
+            and current_price < upper_level - level_delta
+            and balance_usdt >= 5
+        ):
+            risk = atr * 2
+            reward = atr * 4
+            risk_reward_ratio = reward / risk if risk > 0 else 0
+
+            if risk_reward_ratio >= self.min_risk_reward_ratio:
+                # Вход по отскоку также требует подтверждения
+                if self.require_confirmation:
+                    self.pending_signal = "BUY"
+                    self.signal_confirmation_count = 1
+                    say("🟡 Предварительный сигнал BOUNCE BUY. Ожидаю подтверждения.")
+                    return None
+                else:
+                    say("📈 [BOUNCE ENTRY] Вход по отскоку после падения")
+                    position.max_price_since_buy = current_price
+                    self.ma_crossed_down = False
+                    return "BUY"
+            else:
+                say(f"⏩ Пропуск BOUNCE: соотношение риск/прибыль {risk_reward_ratio:.1f} < {self.min_risk_reward_ratio:.1f}")
+
+        self.prev_short_ema = short_ema
+        self.prev_medium_ema = medium_ema
+        self.prev_long_ema = long_ema
+
+        say(stats_message)
+
+        if self.trade_opportunities % 50 == 0 and self.trade_opportunities > 0:
+            ratio = self.executed_trades / self.trade_opportunities
+            say(f"📊 Эффективность: {self.executed_trades}/{self.trade_opportunities} ({ratio:.1%}) сигналов исполнено")
+
+            if ratio < 0.1:
+                self.base_min_cross *= 0.9
+                self.base_min_slope *= 0.85
+                say(f"🔧 Корректировка параметров: min_cross={self.base_min_cross:.6f}, min_slope={self.base_min_slope:.6f}")
+
+            elif ratio > 0.3:
+                self.base_min_cross *= 1.1
+                self.base_min_slope *= 1.15
+                say(f"🔧 Корректировка параметров: min_cross={self.base_min_cross:.6f}, min_slope={self.base_min_slope:.6f}")
+
+        if failed_conditions:
+            say("🔍 Не выполнены условия:")
+            for condition in failed_conditions:
+                say(f"   - {condition}")
+        else:
+            say("⏸️ Ни одно торговое условие не выполнено")
+
+        return None
@@ -0,0 +1,144 @@
+# app/strategies/neural_network/batch.py
+"""Прогноз нейросетей сразу по всем монетам одним проходом.
+
+Модели монет одинаковы по архитектуре (LSTM 128 -> LSTM 64 -> Dense 32 ->
+Dense 3), поэтому их веса складываются в стопки с осью монет, и окна всех
+монет проходят через сеть одним пакетным np.matmul на каждом шаге LSTM -
+по цене примерно одного прогноза вместо N отдельных. Стопку для торгового
+процесса собирает и держит ModelRegistry.batch; модели монет, которые
+реестр отдает стратегии, - срезы той же стопки (runtime), без второй
+копии весов.
+"""
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.strategies.neural_network.runtime import LSTMRuntime, forward
+from app.utils.log_helper import log_maker
+
+
+def _signature(runtime: LSTMRuntime) -> tuple:
+    """Архитектура модели: модели с одной сигнатурой складываются в стопку"""
+    return (runtime.sequence_length, runtime.features) + tuple(
+        (kind, activation, tuple(p.shape for p in params))
+        for kind, activation, params in runtime.layers
+    )
+
+
+class BatchPredictor:
+    """Веса моделей всех монет в памяти и пакетный прогноз по ним"""
+
+    def __init__(self, runtimes: Dict[str, LSTMRuntime]):
+        self.coins: List[str] = []
+        self.layers: List[tuple] = []
+        self.sequence_length = 0
+        self.features = 0
+        self.prediction_steps = 0
+        self._index: Dict[str, int] = {}
+        self.scale = self.min = None
+
+        signatures = {coin: _signature(runtime) for coin, runtime in runtimes.items()}
+        if not signatures:
+            return
+        # Основная архитектура - самая частая; модели другой формы пропускаются
+        values = list(signatures.values())
+        common = max(values, key=values.count)
+        for coin, runtime in runtimes.items():
+            if signatures[coin] != common:
+                log_maker(f"⚠️ Модель {coin} отличается архитектурой, в пакетный прогноз не входит")
+                continue
+            self.coins.append(coin)
+
+        first = runtimes[self.coins[0]]
+        self.sequence_length = first.sequence_length
+        self.features = first.features
+        self.prediction_steps = first.prediction_steps
+        self._index = {coin: i for i, coin in enumerate(self.coins)}
+        self.scale = np.stack([runtimes[coin].scale for coin in self.coins])
+        self.min = np.stack([runtimes[coin].min for coin in self.coins])
+        for position, (kind, activation, _) in enumerate(first.layers):
+            params = tuple(
+                np.stack([runtimes[coin].layers[position][2][k] for coin in self.coins])
+                for k in range(len(first.layers[position][2]))
+            )
+            if kind == "LSTM":
+                # Смещение (монеты, гейты) -> (монеты, 1, гейты): складывается со всеми шагами
+                params = params[:2] + (params[2][:, None, :],)
+            self.layers.append((kind, activation, params))
+
+    @classmethod
+    def from_models(cls, coins: List[str], models_dir: str = "models") -> "BatchPredictor":
+        """Загружает модели монет из models_dir; монеты без модели пропускаются"""
+        runtimes = {}
+        for coin in coins:
+            base_path = os.path.join(models_dir, f"{coin}_neural_model")
+            runtime = LSTMRuntime()
+            try:
+                runtime.load(base_path)
+            except Exception as e:
+                log_maker(f"⚠️ Модель {coin} не загружена для пакетного прогноза: {e}")
+                continue
+            runtimes[coin] = runtime
+        return cls(runtimes)
+
+    def __contains__(self, coin: str) -> bool:
+        return coin in self._index
+
+    def runtime(self, coin: str) -> LSTMRuntime:
+        """Модель одной монеты поверх весов стопки - срезы без копирования"""
+        i = self._index[coin]
+        runtime = LSTMRuntime(self.sequence_length, self.features, self.prediction_steps)
+        for kind, activation, params in self.layers:
+            if kind == "LSTM":
+                params = (params[0][i], params[1][i], params[2][i, 0])
+            else:
+                params = tuple(p[i] for p in params)
+            runtime.layers.append((kind, activation, params))
+        runtime.scale = self.scale[i]
+        runtime.min = self.min[i]
+        return runtime
+
+    def _take(self, index: Optional[np.ndarray]) -> List[tuple]:
+        if index is None:
+            return self.layers
+        return [(kind, activation, tuple(p[index] for p in params))
+                for kind, activation, params in self.layers]
+
+    def predict(self, windows: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Прогноз цен закрытия на prediction_steps свечей вперед для каждой
+        монеты из windows (OHLCV не короче sequence_length); монеты без
+        модели или с коротким окном в ответ не попадают"""
+        coins = [coin for coin, data in windows.items()
+                 if coin in self._index and len(data) >= self.sequence_length]
+        if not coins:
+            return {}
+        index = np.array([self._index[coin] for coin in coins])
+        # Все монеты по порядку стопки - веса без копирования
+        if len(index) == len(self.coins) and np.array_equal(index, np.arange(len(self.coins))):
+            index = None
+
+        scale = self.scale if index is None else self.scale[index]
+        minimum = self.min if index is None else self.min[index]
+        sequences = np.stack([
+            np.asarray(windows[coin], dtype=np.float64)[-self.sequence_length:] for coin in coins
+        ])
+        sequences = sequences * scale[:, None, :] + minimum[:, None, :]
+        predictions = forward(self._take(index), sequences).astype(np.float64)
+        closes = (predictions - minimum[:, 3:4]) / scale[:, 3:4]
+        return dict(zip(coins, closes))
+
+    def expected_changes(
+        self, windows: Dict[str, np.ndarray], prices: Optional[Dict[str, float]] = None
+    ) -> Dict[str, float]:
+        """Наибольшее по модулю прогнозное изменение цены, %. База - живая
+        цена из prices, как у NeuralStrategy перед сравнением с порогом;
+        для монет без цены - последнее закрытие окна (у незакрытой свечи
+        это цена на момент выборки)"""
+        prices = prices or {}
+        changes = {}
+        for coin, closes in self.predict(windows).items():
+            base = prices.get(coin) or float(np.asarray(windows[coin])[-1, 3])
+            steps = (closes - base) / base * 100
+            changes[coin] = float(steps[np.argmax(np.abs(steps))])
+        return changes
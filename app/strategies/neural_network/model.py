@@ -1,9 +1,10 @@
 import os
 os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
 os.environ["CUDA_VISIBLE_DEVICES"] = "-1"
-import tensorflow as tf
 import numpy as np
 from sklearn.preprocessing import MinMaxScaler
+from app.utils.candle_frame import CandleFrame
+from app.strategies.neural_network.runtime import export_weights, save_npz, weights_path
 
 class NeuralPredictor:
     def __init__(
@@ -18,8 +19,10 @@ class NeuralPredictor:
         self.scaler = MinMaxScaler(feature_range=(0, 1))
         self.model = self.build_model()
         
-    def build_model(self) -> tf.keras.Model:
+    def build_model(self) -> "tf.keras.Model":
         """Создает LSTM модель для прогнозирования с правильным указанием input_shape"""
+        # TensorFlow нужен только для обучения; прогноз в боте идет через LSTMRuntime
+        import tensorflow as tf
             
         model = tf.keras.Sequential()
         
@@ -50,13 +53,10 @@ class NeuralPredictor:
     # Остальные методы без изменений
     def prepare_data(self, candles):
         """Подготавливает данные для обучения/прогноза"""
-        data = np.array([
-            [c['open'], c['high'], c['low'], c['close'], c['volume']] 
-            for c in candles
-        ])
+        data = CandleFrame.from_candles(candles).ohlcv()
         return self.scaler.fit_transform(data)
     
-    def train(self, data, epochs=50, batch_size=32):
+    def train(self, data, epochs=50, batch_size=32, callbacks=None, verbose="auto"):
         """Обучает модель на исторических данных"""
         if len(data) < self.sequence_length + self.prediction_steps:
             raise ValueError("Недостаточно данных для обучения")
@@ -69,7 +69,8 @@ class NeuralPredictor:
         X = np.array(X)
         y = np.array(y)
         
-        return self.model.fit(X, y, epochs=epochs, batch_size=batch_size, validation_split=0.1)
+        return self.model.fit(X, y, epochs=epochs, batch_size=batch_size, validation_split=0.1,
+                              callbacks=callbacks, verbose=verbose)
     
     def predict(self, data):
         """Делает прогноз на основе последних данных"""
@@ -101,10 +102,18 @@ class NeuralPredictor:
         return unscaled[:, 3]
     
     def save(self, path):
-        """Сохраняет модель в современном формате"""
-        self.model.save(f"{path}.keras")
+        """Сохраняет модель в современном формате.
+
+        Каждый файл пишется под временным именем и подменяется атомарно.
+        Веса для LSTMRuntime (со скалером внутри) пишутся последними: по ним
+        торговый процесс видит новую версию, когда она записана целиком"""
+        tmp_path = f"{path}.tmp.keras"
+        self.model.save(tmp_path)
+        os.replace(tmp_path, f"{path}.keras")
         # Сохраняем параметры scaler отдельно
-        np.savez(f"{path}_scaler.npz", scale=self.scaler.scale_, min=self.scaler.min_)
+        save_npz(f"{path}_scaler.npz", scale=self.scaler.scale_, min=self.scaler.min_)
+        # Веса для прогноза без TensorFlow (LSTMRuntime)
+        export_weights(self.model, weights_path(path), self.scaler.scale_, self.scaler.min_)
     
     def load(self, path):
         # Убедимся, что путь не содержит лишних расширений
@@ -122,6 +131,8 @@ class NeuralPredictor:
                 f"Доступные файлы: {available_files}"
             )
         
+        import tensorflow as tf
+
         self.model = tf.keras.models.load_model(model_path)
         scaler_data = np.load(scaler_path)
         self.scaler.scale_ = scaler_data['scale']
@@ -0,0 +1,223 @@
+# app/strategies/neural_network/registry.py
+"""Реестр моделей монет в каталоге models/.
+
+Каталог индексируется один раз (версия = время изменения выгруженных
+весов, интервал из .config, признак .error), модели загружаются лениво и
+держатся в памяти LRU-кэшем на capacity штук. При обращении к загруженной
+модели проверяется время изменения файла: если тренер записал новую
+версию, модель перезагружается без перезапуска стратегии. Веса со
+скалером тренер пишет атомарно и последними (NeuralPredictor.save), так
+что версия меняется только на целиком записанной модели; .keras торговый
+процесс не читает.
+
+Для прогноза по всем монетам сразу реестр держит пакетный предиктор
+(batch): веса всех моделей списка постоянно в памяти одной стопкой.
+Модели из стопки get отдает ее срезами, не читая файлы повторно.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from app.strategies.neural_network.batch import BatchPredictor
+from app.strategies.neural_network.runtime import LSTMRuntime, weights_path
+from app.utils.log_helper import log_maker
+
+MODEL_SUFFIX = "_neural_model"
+
+
+@dataclass
+class ModelInfo:
+    coin: str
+    base_path: str
+    version: float = 0.0  # mtime выгруженных весов (_weights.npz)
+    interval: Optional[str] = None
+    has_error: bool = False
+
+    @property
+    def available(self) -> bool:
+        return self.version > 0
+
+
+class ModelRegistry:
+    def __init__(self, models_dir: str = "models", capacity: int = 3):
+        self.models_dir = models_dir
+        self.capacity = capacity
+        self._index: Dict[str, ModelInfo] = {}
+        self._loaded: "OrderedDict[str, tuple]" = OrderedDict()  # coin -> (version, runtime)
+        self._batch: Optional[BatchPredictor] = None
+        self._batch_versions: Dict[str, float] = {}  # монета -> версия, из которой собрана стопка
+        self._lock = threading.RLock()
+        self.refresh()
+
+    # ===== Индекс =====
+
+    def _base_path(self, coin: str) -> str:
+        return os.path.join(self.models_dir, f"{coin}{MODEL_SUFFIX}")
+
+    @staticmethod
+    def _mtime(path: str) -> float:
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return 0.0
+
+    def _version(self, base_path: str) -> float:
+        """Версия модели на диске, 0 - модели (или ее выгрузки для LSTMRuntime) нет"""
+        return self._mtime(weights_path(base_path))
+
+    def _read_info(self, coin: str) -> ModelInfo:
+        base_path = self._base_path(coin)
+        version = self._version(base_path)
+        interval = None
+        try:
+            with open(f"{base_path}.config", "r") as f:
+                interval = json.load(f).get("interval")
+        except (OSError, ValueError):
+            pass
+        return ModelInfo(coin, base_path, version, interval, os.path.exists(f"{base_path}.error"))
+
+    def refresh(self):
+        """Полная переиндексация каталога (один проход os.scandir)"""
+        coins = set()
+        if os.path.isdir(self.models_dir):
+            for entry in os.scandir(self.models_dir):
+                if MODEL_SUFFIX in entry.name:
+                    coins.add(entry.name.split(MODEL_SUFFIX)[0])
+        index = {coin: self._read_info(coin) for coin in coins}
+        with self._lock:
+            self._index = index
+
+    def update(self, coin: str) -> ModelInfo:
+        """Переиндексация одной монеты - тренер вызывает после записи или удаления модели"""
+        info = self._read_info(coin)
+        with self._lock:
+            self._index[coin] = info
+            if not info.available:
+                self._loaded.pop(coin, None)
+        return info
+
+    def info(self, coin: str) -> Optional[ModelInfo]:
+        with self._lock:
+            return self._index.get(coin)
+
+    def has_model(self, coin: str) -> bool:
+        info = self.info(coin)
+        return info is not None and info.available
+
+    def missing(self, coins: List[str]) -> List[str]:
+        """Монеты из списка, для которых нет обученной модели"""
+        return [coin for coin in coins if not self.has_model(coin)]
+
+    # ===== Загруженные модели =====
+
+    def _current(self, coin: str) -> ModelInfo:
+        """Описание модели с проверкой версии на диске (один stat)"""
+        with self._lock:
+            info = self._index.get(coin)
+            # Новая версия или модель, обученная после индексации
+            if info is None or self._version(info.base_path) != info.version:
+                info = self.update(coin)
+            return info
+
+    def _resident(self, coin: str, version: float) -> Optional[LSTMRuntime]:
+        """Модель этой версии, уже находящаяся в памяти (под self._lock)"""
+        cached = self._loaded.get(coin)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        if self._batch is not None and coin in self._batch and self._batch_versions.get(coin) == version:
+            return self._batch.runtime(coin)
+        return None
+
+    def get(self, coin: str) -> LSTMRuntime:
+        """Модель монеты из памяти; загружается при первом обращении и
+        перезагружается, если на диске появилась более новая версия"""
+        with self._lock:
+            info = self._current(coin)
+            if not info.available:
+                raise FileNotFoundError(f"Модель для {coin} не найдена в {self.models_dir}")
+
+            cached = self._loaded.get(coin)
+            runtime = self._resident(coin, info.version)
+            if runtime is not None:
+                self._loaded[coin] = (info.version, runtime)
+                self._loaded.move_to_end(coin)
+                self._evict()
+                return runtime
+
+        # Файлы читаются без блокировки - обращения к загруженным моделям не ждут
+        runtime = LSTMRuntime()
+        runtime.load(info.base_path)
+
+        with self._lock:
+            current = self._loaded.get(coin)
+            if current is not None and current[0] >= info.version:
+                # Другой поток уже загрузил эту (или более новую) версию
+                self._loaded.move_to_end(coin)
+                return current[1]
+            if cached is not None:
+                log_maker(f"🔁 Модель {coin} обновлена до новой версии")
+            self._loaded[coin] = (info.version, runtime)
+            self._loaded.move_to_end(coin)
+            self._evict()
+            return runtime
+
+    def _evict(self):
+        while len(self._loaded) > self.capacity:
+            self._loaded.popitem(last=False)
+
+    def batch(self, coins: List[str]) -> BatchPredictor:
+        """Пакетный предиктор по моделям монет из списка. Стопка весов
+        собирается заново, только если изменился набор моделей или версия
+        одной из них; с диска читаются лишь модели, которых нет в памяти"""
+        versions = {}
+        for coin in coins:
+            info = self._current(coin)
+            if info.available:
+                versions[coin] = info.version
+
+        with self._lock:
+            if self._batch is not None and self._batch_versions == versions:
+                return self._batch
+            runtimes = {coin: self._resident(coin, version) for coin, version in versions.items()}
+
+        for coin, runtime in runtimes.items():
+            if runtime is not None:
+                continue
+            runtime = LSTMRuntime()
+            try:
+                runtime.load(self._base_path(coin))
+            except Exception as e:
+                log_maker(f"⚠️ Модель {coin} не загружена для пакетного прогноза: {e}")
+                continue
+            runtimes[coin] = runtime
+        batch = BatchPredictor({coin: runtime for coin, runtime in runtimes.items() if runtime is not None})
+
+        with self._lock:
+            self._batch, self._batch_versions = batch, versions
+            # Отдельные копии весов в кэше заменяются срезами новой стопки
+            for coin, (version, _) in list(self._loaded.items()):
+                if coin in batch and versions.get(coin) == version:
+                    self._loaded[coin] = (version, batch.runtime(coin))
+        log_maker(f"🧠 Пакетный прогноз: {len(batch.coins)} моделей в памяти")
+        return batch
+
+    def loaded(self) -> List[str]:
+        """Монеты с моделями в памяти, от давно использованной к последней"""
+        with self._lock:
+            return list(self._loaded)
+
+
+_default_registry: Optional[ModelRegistry] = None
+_default_registry_guard = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Общий для процесса реестр моделей каталога models/"""
+    global _default_registry
+    with _default_registry_guard:
+        if _default_registry is None:
+            _default_registry = ModelRegistry()
+        return _default_registry
@@ -0,0 +1,218 @@
+# app/strategies/neural_network/runtime.py
+"""Прогноз NeuralPredictor на NumPy, без TensorFlow.
+
+Веса обученной модели вместе со скалером выгружаются при сохранении
+(NeuralPredictor.save) в models/<COIN>_neural_model_weights.npz, дальше
+прямой проход LSTM считается матричными операциями NumPy: без графа Keras
+и его накладных расходов на каждый вызов predict, и без TensorFlow в
+процессе бота. Торговый процесс только читает npz; модели, сохраненные
+до появления выгрузки, конвертируются отдельно:
+    python -m app.strategies.neural_network.runtime --models models
+"""
+import argparse
+import glob
+import os
+from typing import List, Optional
+
+import numpy as np
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0),
+    "tanh": np.tanh,
+}
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1 / (1 + np.exp(-x))
+
+
+def _gates_last_cell(matrix: np.ndarray) -> np.ndarray:
+    """Гейты Keras (input, forget, cell, output) -> (input, forget, output, cell):
+    три сигмоиды считаются одним вызовом по непрерывному срезу"""
+    i, f, c, o = np.split(matrix, 4, axis=-1)
+    return np.ascontiguousarray(np.concatenate([i, f, o, c], axis=-1))
+
+
+def lstm_layer(x: np.ndarray, kernel: np.ndarray, recurrent: np.ndarray, bias: np.ndarray) -> np.ndarray:
+    """Слой LSTM по всей последовательности: (..., steps, in) -> (..., steps, units).
+
+    Ведущие оси x и весов согласуются по правилам np.matmul, поэтому та же
+    функция считает и одну модель, и стопку моделей разных монет
+    (веса с осью монет, см. BatchPredictor)"""
+    units = recurrent.shape[-2]
+    # Входная часть гейтов считается сразу для всех шагов одним умножением
+    projected = x @ kernel + bias
+    h = np.zeros(projected.shape[:-2] + (units,), dtype=np.float32)
+    c = np.zeros_like(h)
+    outputs = np.empty(x.shape[:-1] + (units,), dtype=np.float32)
+    for t in range(x.shape[-2]):
+        z = projected[..., t, :] + (h[..., None, :] @ recurrent)[..., 0, :]
+        gates = _sigmoid(z[..., :3 * units])
+        c = gates[..., units:2 * units] * c + gates[..., :units] * np.tanh(z[..., 3 * units:])
+        h = gates[..., 2 * units:] * np.tanh(c)
+        outputs[..., t, :] = h
+    return outputs
+
+
+def forward(layers: List[tuple], sequences: np.ndarray) -> np.ndarray:
+    """Прямой проход по слоям (kind, activation, params) из LSTMRuntime.layers"""
+    x = np.asarray(sequences, dtype=np.float32)
+    sequence_output = True
+    for kind, activation, params in layers:
+        if kind == "LSTM":
+            x = lstm_layer(x, *params)
+        else:
+            if sequence_output:
+                x = x[..., -1, :]  # return_sequences=False у последнего LSTM
+                sequence_output = False
+            x = activation((x[..., None, :] @ params[0])[..., 0, :] + params[1])
+    return x
+
+
+def weights_path(base_path: str) -> str:
+    return f"{base_path.replace('.keras', '')}_weights.npz"
+
+
+def save_npz(path: str, **arrays):
+    """Атомарная запись npz: читатель видит либо прежний файл, либо новый целиком"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+def export_weights(model, path: str, scale: Optional[np.ndarray] = None, min_: Optional[np.ndarray] = None):
+    """Сохраняет веса LSTM/Dense слоев модели Keras (и скалер, если передан)
+    в npz для LSTMRuntime"""
+    arrays = {}
+    kinds = []
+    activations = []
+    for layer in model.layers:
+        kind = type(layer).__name__
+        if kind == "Dropout":
+            continue  # на прогнозе Dropout не действует
+        if kind not in ("LSTM", "Dense"):
+            raise ValueError(f"Слой {layer.name} ({kind}) не поддерживается NumPy-прогнозом")
+        index = len(kinds)
+        for name, value in zip(("kernel", "recurrent", "bias") if kind == "LSTM" else ("kernel", "bias"),
+                               layer.get_weights()):
+            arrays[f"{index}_{name}"] = np.asarray(value, dtype=np.float32)
+        kinds.append(kind)
+        activations.append("tanh" if kind == "LSTM" else layer.get_config()["activation"])
+
+    if scale is not None:
+        # Скалер в том же файле: веса и скалер одной версии меняются вместе
+        arrays["scaler_scale"] = np.asarray(scale, dtype=np.float64)
+        arrays["scaler_min"] = np.asarray(min_, dtype=np.float64)
+
+    sequence_length, features = model.input_shape[1:]
+    save_npz(
+        path,
+        kinds=np.array(kinds),
+        activations=np.array(activations),
+        sequence_length=sequence_length,
+        features=features,
+        **arrays,
+    )
+
+
+def convert(base_path: str) -> str:
+    """Выгружает веса и скалер модели {base_path}.keras; TensorFlow нужен только здесь"""
+    import tensorflow as tf
+
+    base_path = base_path.replace('.keras', '')
+    model = tf.keras.models.load_model(f"{base_path}.keras")
+    with np.load(f"{base_path}_scaler.npz") as scaler:
+        scale, min_ = scaler["scale"], scaler["min"]
+    path = weights_path(base_path)
+    export_weights(model, path, scale, min_)
+    return path
+
+
+class LSTMRuntime:
+    """Замена NeuralPredictor для прогноза: тот же интерфейс load/predict,
+    веса из npz, прямой проход на NumPy"""
+
+    def __init__(
+        self,
+        sequence_length: int = 20,
+        features: int = 5,
+        prediction_steps: int = 3
+    ):
+        self.sequence_length = sequence_length
+        self.features = features
+        self.prediction_steps = prediction_steps
+        self.layers: List[tuple] = []
+        self.scale = None
+        self.min = None
+
+    def load(self, path: str):
+        """Загружает выгруженные веса и скалер модели. TensorFlow не
+        импортируется: без npz модель недоступна (см. convert)"""
+        base_path = path.replace('.keras', '')
+        scaler_path = f"{base_path}_scaler.npz"
+        npz_path = weights_path(base_path)
+
+        if not os.path.exists(npz_path):
+            raise FileNotFoundError(
+                f"Веса модели не выгружены: {npz_path}\n"
+                f"Конвертация: python -m app.strategies.neural_network.runtime"
+            )
+
+        with np.load(npz_path) as weights:
+            self.sequence_length = int(weights["sequence_length"])
+            self.features = int(weights["features"])
+            self.layers = []
+            for index, (kind, activation) in enumerate(zip(weights["kinds"], weights["activations"])):
+                if kind == "LSTM":
+                    params = tuple(_gates_last_cell(weights[f"{index}_{name}"])
+                                   for name in ("kernel", "recurrent", "bias"))
+                else:
+                    params = (weights[f"{index}_kernel"], weights[f"{index}_bias"])
+                self.layers.append((str(kind), ACTIVATIONS[str(activation)], params))
+            if "scaler_scale" in weights:
+                self.scale = weights["scaler_scale"]
+                self.min = weights["scaler_min"]
+            else:
+                # Выгрузка без скалера (старый формат) - скалер из отдельного файла
+                with np.load(scaler_path) as scaler:
+                    self.scale = scaler["scale"]
+                    self.min = scaler["min"]
+        self.prediction_steps = self.layers[-1][2][-1].shape[0]
+
+    def forward(self, sequences: np.ndarray) -> np.ndarray:
+        """Прогноз по масштабированным окнам (batch, sequence_length, features)"""
+        if not self.layers:
+            raise RuntimeError("Модель не загружена")
+        return forward(self.layers, sequences)
+
+    def predict(self, data):
+        """Делает прогноз на основе последних данных, как NeuralPredictor.predict"""
+        if len(data) < self.sequence_length:
+            raise ValueError(f"Недостаточно данных. Требуется: {self.sequence_length}, получено: {len(data)}")
+
+        sequence = np.asarray(data, dtype=np.float64)[-self.sequence_length:] * self.scale + self.min
+        prediction = self.forward(sequence[None])[0].astype(np.float64)
+        # Обратное преобразование столбца закрытия (индекс 3)
+        return (prediction - self.min[3]) / self.scale[3]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Выгрузка весов нейросетей для NumPy-прогноза')
+    parser.add_argument('--models', type=str, default='models', help='Каталог моделей')
+    args = parser.parse_args()
+
+    for model_path in sorted(glob.glob(os.path.join(args.models, "*_neural_model.keras"))):
+        npz_path = weights_path(model_path)
+        # Веса, выгруженные после сохранения модели, уже актуальны
+        if os.path.exists(npz_path) and os.path.getmtime(npz_path) >= os.path.getmtime(model_path):
+            continue
+        try:
+            print(f"✅ {convert(model_path)}")
+        except Exception as e:
+            print(f"❌ {model_path}: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,75 @@
 import argparse
 import os
+import tempfile
+import time
 from .model import NeuralPredictor
 
-def main():
-    from app.services.bybit_service import BybitService
-    
-    parser = argparse.ArgumentParser(description='Обучение торговой нейросети')
-    parser.add_argument('--symbol', type=str, default='SOLUSDT', help='Торговый символ')
-    parser.add_argument('--interval', type=str, default='5', help='5-минутный интервал')
-    parser.add_argument('--epochs', type=int, default=200, help='Количество эпох обучения')
-    parser.add_argument('--model_path', type=str, default='models/neural_model.keras', help='Путь для сохранения модели')
-    args = parser.parse_args()
+# Минимум свечей для обучения
+MIN_CANDLES = 180
+
+
+def train(symbol: str, interval: str = "5", epochs: int = 200, days: float = 60,
+          model_path: str = "models/neural_model.keras", callbacks=None, verbose="auto") -> dict:
+    """Обучает модель монеты на истории за days дней и сохраняет ее в model_path"""
+    from app.services.bybit_service import get_bybit_service
+    from app.utils.candle_frame import CandleFrame
+    from app.utils.candle_store import CandleStore, interval_to_ms
+    from app.utils.history_loader import HistoryLoader
+
+    directory = os.path.dirname(model_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    bybit = get_bybit_service()
+    # Общее хранилище data/candles пишет только торговый процесс: обучение
+    # (отдельный процесс пула) берет из него уже сохраненные свечи, а
+    # недостающую историю догружает постранично во временное хранилище
+    with tempfile.TemporaryDirectory(prefix="train_candles_") as base_dir:
+        store = CandleStore(base_dir=base_dir)
+        store.write(symbol, interval, bybit.candle_store.read(symbol, interval))
+        if HistoryLoader(bybit, store).load(symbol, interval, days=days) is None:
+            print(f"⚠️ История {symbol} загружена не полностью, обучение на доступных свечах")
+        rows = store.read(symbol, interval)
+    since = time.time() * 1000 - days * 86_400_000 - interval_to_ms(interval)
+    candles = CandleFrame.from_rows(rows[rows[:, 0] >= since])
 
-    os.makedirs(os.path.dirname(args.model_path), exist_ok=True)
-    
-    bybit = BybitService()
-    candles = bybit.get_candles(args.symbol, args.interval, limit=10000)    
-    
     # Уменьшили минимальный порог данных
-    if not candles or len(candles) < 180:
-        print(f"❌ Недостаточно данных для обучения ({len(candles) if candles else 0} < 180)")
-        return
-    
+    if not candles or len(candles) < MIN_CANDLES:
+        raise ValueError(f"Недостаточно данных для обучения ({len(candles) if candles else 0} < {MIN_CANDLES})")
+
+    print(f"📚 Обучение на {len(candles)} свечах ({days} дн.)")
     # Уменьшили длину последовательности
     predictor = NeuralPredictor(
         sequence_length=30,  # Было 60
         prediction_steps=3
     )
     data = predictor.prepare_data(candles)
-    predictor.train(data, epochs=args.epochs)
-    
-    model_base_path = args.model_path.replace('.keras', '')
+    history = predictor.train(data, epochs=epochs, callbacks=callbacks, verbose=verbose)
+
+    model_base_path = model_path.replace('.keras', '')
     predictor.save(model_base_path)
     print(f"✅ Модель сохранена как: {model_base_path}.keras")
-    
+    return {
+        "candles": len(candles),
+        "loss": float(history.history["loss"][-1]),
+        "model_path": f"{model_base_path}.keras",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Обучение торговой нейросети')
+    parser.add_argument('--symbol', type=str, default='SOLUSDT', help='Торговый символ')
+    parser.add_argument('--interval', type=str, default='5', help='5-минутный интервал')
+    parser.add_argument('--epochs', type=int, default=200, help='Количество эпох обучения')
+    parser.add_argument('--days', type=float, default=60, help='Глубина истории для обучения в днях')
+    parser.add_argument('--model_path', type=str, default='models/neural_model.keras', help='Путь для сохранения модели')
+    args = parser.parse_args()
+
+    try:
+        train(args.symbol, args.interval, args.epochs, args.days, args.model_path)
+    except ValueError as e:
+        print(f"❌ {e}")
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,37 @@
+# app/strategies/neural_network/training_job.py
+"""Задание на обучение модели монеты для процесса worker и TrainingPool"""
+import json
+import os
+from dataclasses import asdict, dataclass
+
+
+@dataclass
+class TrainingJob:
+    coin: str
+    interval: str = "5"
+    epochs: int = 100
+    days: float = 60
+    models_dir: str = "models"
+
+    @property
+    def symbol(self) -> str:
+        return f"{self.coin}USDT"
+
+    @property
+    def model_path(self) -> str:
+        return os.path.join(self.models_dir, f"{self.coin}_neural_model")
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+
+def thread_env(threads: int) -> dict:
+    """Переменные окружения, ограничивающие потоки BLAS/OpenMP и TensorFlow"""
+    value = str(threads)
+    return {
+        "OMP_NUM_THREADS": value,
+        "OPENBLAS_NUM_THREADS": value,
+        "MKL_NUM_THREADS": value,
+        "TF_NUM_INTRAOP_THREADS": value,
+        "TF_NUM_INTEROP_THREADS": "1",
+    }
@@ -0,0 +1,71 @@
+# app/strategies/neural_network/worker.py
+"""Процесс обучения одной модели для TrainingPool.
+
+Задание (JSON TrainingJob) читается из stdin, события - JSON-строки
+started / progress / done / failed - пишутся в исходный stdout. Печать
+обучения и журнала бота уходит в stderr, поэтому канал событий чистый.
+Привязка к ядрам, приоритет и число потоков TensorFlow задаются до
+импорта TensorFlow.
+
+    echo '{"coin": "SOL", "epochs": 5}' | python -m app.strategies.neural_network.worker --cpus 1,2 --threads 2
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from typing import List, Optional
+
+from app.strategies.neural_network.training_job import TrainingJob, thread_env
+
+
+def apply_limits(cpus: Optional[List[int]], threads: int, nice: int):
+    """Ядра, приоритет и потоки текущего процесса"""
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+    if nice and hasattr(os, "nice"):
+        os.nice(nice)
+    os.environ.update(thread_env(threads))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Процесс обучения модели')
+    parser.add_argument('--cpus', type=str, default='', help='Ядра через запятую')
+    parser.add_argument('--threads', type=int, default=1, help='Потоков TensorFlow')
+    parser.add_argument('--nice', type=int, default=10, help='Понижение приоритета')
+    args = parser.parse_args()
+
+    # Канал событий - копия stdout; все остальное, что печатается, идет в stderr
+    events = os.fdopen(os.dup(sys.stdout.fileno()), "w", buffering=1)
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    def emit(kind: str, **payload):
+        events.write(json.dumps({"type": kind, "coin": job.coin, "time": time.time(), **payload}) + "\n")
+
+    job = TrainingJob(**json.loads(sys.stdin.readline()))
+    apply_limits([int(c) for c in args.cpus.split(",") if c], args.threads, args.nice)
+    emit("started", pid=os.getpid(), cpus=args.cpus)
+
+    try:
+        import tensorflow as tf
+        from app.strategies.neural_network.trainer import train
+
+        tf.config.threading.set_intra_op_parallelism_threads(args.threads)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+
+        class Progress(tf.keras.callbacks.Callback):
+            def on_epoch_end(self, epoch, logs=None):
+                emit("progress", epoch=epoch + 1, epochs=job.epochs, loss=float((logs or {}).get("loss", 0)))
+
+        result = train(job.symbol, job.interval, job.epochs, job.days, job.model_path,
+                       callbacks=[Progress()], verbose=0)
+        emit("done", **result)
+    except Exception as e:
+        traceback.print_exc()
+        emit("failed", error=str(e))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
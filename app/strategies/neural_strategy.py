@@ -3,7 +3,10 @@ import time
 from app.strategies.base import Strategy
 from app.strategies.ma_crossover import MovingAverageStrategy
 from app.utils.log_helper import log_maker
-from app.strategies.neural_network.model import NeuralPredictor
+from app.utils.candle_frame import CandleFrame
+from app.indicators.vectorized import relative_range
+from app.strategies.neural_network.runtime import LSTMRuntime
+from app.strategies.neural_network.registry import get_model_registry
 
 class NeuralStrategy(Strategy):
     def __init__(
@@ -15,7 +18,8 @@ class NeuralStrategy(Strategy):
         volatility_factor: float = 0.5,
         rotator=None,
         trading_system=None,
-        interval: str = "5"
+        interval: str = "5",
+        registry=None
     ):
         coin = symbol.replace('USDT', '')
         self.symbol = symbol
@@ -23,10 +27,13 @@ class NeuralStrategy(Strategy):
         self.position_coin = coin
         
         model_base_path = f"models/{coin}_neural_model"
+        # Модели держит реестр: повторный выбор монеты не читает файлы заново
+        self.registry = registry or get_model_registry()
         
         self.base_threshold = base_threshold
         self.volatility_factor = volatility_factor
-        self.predictor = NeuralPredictor(
+        # Прогноз на NumPy по выгруженным весам модели, без TensorFlow
+        self.predictor = LSTMRuntime(
             sequence_length=30,  
             prediction_steps=3
         )
@@ -35,7 +42,7 @@ class NeuralStrategy(Strategy):
         self.interval = interval 
         
         try:
-            self.predictor.load(model_base_path)
+            self.predictor = self.registry.get(coin)
             log_maker(f"🧠 Нейросетевая модель загружена из {model_base_path}")
             log_maker(f"  • Длина последовательности: {self.predictor.sequence_length} свечей")
             log_maker(f"  • Прогноз на шагов: {self.predictor.prediction_steps}")
@@ -54,15 +61,12 @@ class NeuralStrategy(Strategy):
         log_maker(f"  • Минимальный лот: {self.min_order_qty}")
         self.last_candle_time = 0
 
-    def calculate_volatility(self, candles: list, lookback: int = 20) -> float:
-        ranges = []
-        for i in range(-lookback, 0):
-            candle = candles[i]
-            candle_range = (candle['high'] - candle['low']) / candle['close']
-            ranges.append(candle_range)
-        return np.mean(ranges) * 100
+    def calculate_volatility(self, candles: CandleFrame, lookback: int = 20) -> float:
+        recent = CandleFrame.from_candles(candles).tail(lookback)
+        ranges = relative_range(recent.high, recent.low, recent.close)
+        return float(np.mean(ranges)) * 100
 
-    def should_trade(self, candles: list) -> str:
+    def should_trade(self, candles: CandleFrame) -> str:
         if not hasattr(self, 'rotator') or self.rotator is None:
             return log_maker("⚠️ Rotator не инициализирован в стратегии")
 
@@ -80,6 +84,8 @@ class NeuralStrategy(Strategy):
         try:
             # Основной блок анализа
             start_time = time.time()
+            # Новая версия модели от тренера подхватывается на лету
+            self.predictor = self.registry.get(current_coin)
             current_price = self.bybit.get_reliable_price(self.symbol)
             if current_price is None:
                 return log_maker("❌ Не удалось получить текущую цену")
@@ -90,10 +96,7 @@ class NeuralStrategy(Strategy):
             buy_threshold = adaptive_threshold
             sell_threshold = -adaptive_threshold
             
-            data = np.array([
-                [c['open'], c['high'], c['low'], c['close'], c['volume']] 
-                for c in candles[-self.predictor.sequence_length:]
-            ])
+            data = CandleFrame.from_candles(candles).tail(self.predictor.sequence_length).ohlcv()
             
             predictions = self.predictor.predict(data)
             predicted_changes = []
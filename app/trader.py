@@ -1,17 +1,9 @@
 from decimal import ROUND_DOWN, Decimal
 from app.notifier import send_telegram_message
 from app.utils.log_helper import log_maker
-from pybit.unified_trading import HTTP
-from app.services.bybit_service import BybitService
-from app.config import BYBIT_API_KEY, BYBIT_API_SECRET, IS_TESTNET
-
-client = HTTP(
-    testnet=IS_TESTNET,
-    api_key=BYBIT_API_KEY,
-    api_secret=BYBIT_API_SECRET,
-    recv_window=15000,
-)
-bybit = BybitService()
+from app.services.bybit_service import get_bybit_service
+
+bybit = get_bybit_service()
 
 
 
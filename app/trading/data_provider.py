@@ -1,15 +1,39 @@
 # ===== ./app/trader/data_provider.py =====
-from app.services.bybit_service import BybitService
+from app.services.bybit_service import get_bybit_service
 from app.utils.log_helper import log_maker
 
 class DataProvider:
     def __init__(self, symbol: str, interval: str):
         self.symbol = symbol
         self.interval = interval
-        self.bybit = BybitService()
+        self.bybit = get_bybit_service()
         self.controller = None
+
+    @property
+    def stream(self):
+        """Поток рыночных данных, если он запущен и подключен"""
+        stream = self.bybit.market_stream
+        if stream is not None and stream.connected.is_set():
+            return stream
+        return None
+
+    def subscribe(self):
+        """Подписывает монету на свечи, тикер и стакан через WebSocket"""
+        if self.bybit.market_stream is not None:
+            self.bybit.market_stream.subscribe(self.symbol, self.interval)
+
+    def unsubscribe(self):
+        if self.bybit.market_stream is not None:
+            self.bybit.market_stream.unsubscribe(self.symbol)
+
+    def wait_for_candle_close(self, timeout: float) -> bool:
+        """Ждет закрытия свечи по потоку. False - потока нет или свеча не пришла"""
+        stream = self.stream
+        if stream is None:
+            return False
+        return stream.wait_for_close(self.symbol, self.interval, timeout)
     
-    def get_candles(self, limit: int = 200):
+    def _preloaded(self, limit: int):
         # Используем предзагруженные данные если доступны
         if self.controller and hasattr(self.controller, 'preloaded_data'):
             coin = self.symbol.replace('USDT', '')
@@ -17,6 +41,12 @@ class DataProvider:
                 preloaded = self.controller.preloaded_data[coin]
                 if len(preloaded) >= limit:
                     return preloaded[-limit:]
+        return None
+
+    def get_candles(self, limit: int = 200):
+        preloaded = self._preloaded(limit)
+        if preloaded is not None:
+            return preloaded
         
         # Если нет предзагруженных данных, загружаем из API
         try:
@@ -30,6 +60,21 @@ class DataProvider:
                 log_maker(f"⚠️ Получено недостаточно свечей: {len(candles)} из {limit}")
                 
             return candles
+        except Exception as e:
+            log_maker(f"🔥 Ошибка получения данных: {e}")
+            return []
+
+    async def get_candles_async(self, async_bybit, limit: int = 200):
+        """То же, что get_candles, но через AsyncBybitService - чтобы запрос
+        свечей шел одновременно с остальными запросами цикла"""
+        preloaded = self._preloaded(limit)
+        if preloaded is not None:
+            return preloaded
+        try:
+            candles = await async_bybit.get_candles(self.symbol, self.interval, limit)
+            if len(candles) < limit // 2:
+                log_maker(f"⚠️ Получено недостаточно свечей: {len(candles)} из {limit}")
+            return candles
         except Exception as e:
             log_maker(f"🔥 Ошибка получения данных: {e}")
             return []
\ No newline at end of file
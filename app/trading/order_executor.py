@@ -2,22 +2,14 @@ from decimal import ROUND_DOWN, Decimal
 import time
 from app.notifier import send_telegram_message
 from app.utils.log_helper import log_maker
-from pybit.unified_trading import HTTP
-from app.services.bybit_service import BybitService
-from app.config import BYBIT_API_KEY, BYBIT_API_SECRET, IS_TESTNET
+from app.services.bybit_service import get_bybit_service
 
-client = HTTP(
-    testnet=IS_TESTNET,
-    api_key=BYBIT_API_KEY,
-    api_secret=BYBIT_API_SECRET,
-    recv_window=15000,
-)
-bybit = BybitService()
+bybit = get_bybit_service()
 
 class OrderExecutor:
     def __init__(self, symbol: str):
         self.symbol = symbol
-        self.bybit = BybitService()
+        self.bybit = bybit
         self.last_buy_price = 0.0
         self.last_buy_quantity = 0.0
         
@@ -31,6 +23,16 @@ class OrderExecutor:
         log_maker(f"🆘 [FORCE CLOSE] Продаем {balance} {coin}", buy_sell=True)
         return self.execute_sell(None)
         
+    def _wait_for_fill(self, order_response: dict):
+        """Данные исполнения именно этого ордера, а не последнего в истории"""
+        order_id = (order_response.get("result") or {}).get("orderId")
+        if not order_id:
+            return self.bybit.get_last_filled_order(self.symbol)
+        filled_order = self.bybit.wait_for_fill(self.symbol, order_id)
+        if not filled_order:
+            log_maker(f"⚠️ Ордер {order_id} не исполнен за отведенное время")
+        return filled_order
+
     def execute_buy(self, trading_system=None):
         usdt_balance = self.bybit.get_balance("USDT")
         if not usdt_balance:
@@ -60,7 +62,7 @@ class OrderExecutor:
                 trading_system.position_open_time = time.time()
                 trading_system.position_coin = self.symbol.replace('USDT', '')
             
-            filled_order = self.bybit.get_last_filled_order(self.symbol)
+            filled_order = self._wait_for_fill(order_response)
             if filled_order:
                 qty_coin = float(filled_order.get("cumExecQty", 0))
                 avg_price = float(filled_order.get("avg_price", 0))
@@ -96,7 +98,7 @@ class OrderExecutor:
 
         if order_response and order_response.get("retCode") == 0:
             log_maker("✅ Ордер на продажу успешно размещен", buy_sell=True)
-            filled_order = self.bybit.get_last_filled_order(self.symbol)
+            filled_order = self._wait_for_fill(order_response)
             if filled_order:
                 qty_coin = float(filled_order.get("cumExecQty", 0))
                 avg_price = float(filled_order.get("avg_price", 0))
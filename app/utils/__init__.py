@@ -4,6 +4,8 @@ from .log_helper import log_maker
 from .place_order import log_order_failure, safe_place_order
 from .trading_utils import round_qty
 from .get_history import fetch_bybit_ohlcv_15m
+from .candle_store import CandleStore
+from .candle_frame import CandleFrame
 
 __all__ = [
     'load_coin_list',
@@ -12,5 +14,7 @@ __all__ = [
     'log_order_failure',
     'safe_place_order',
     'round_qty',
-    'fetch_bybit_ohlcv_15m'
+    'fetch_bybit_ohlcv_15m',
+    'CandleStore',
+    'CandleFrame'
 ]
@@ -0,0 +1,132 @@
+# app/utils/candle_frame.py
+from typing import Dict, Iterator, List, Sequence, Union
+
+import numpy as np
+
+from app.utils.candle_store import CANDLE_COLUMNS
+
+_COLUMN_INDEX = {name: i for i, name in enumerate(CANDLE_COLUMNS)}
+
+
+class CandleFrame:
+    """Свечи в колоночном виде.
+
+    Данные хранятся одним массивом (6, n): каждая колонка (timestamp, open,
+    high, low, close, volume) - непрерывный float64-массив. Срезы возвращают
+    представления без копирования. Для старого кода фрейм ведет себя как
+    последовательность словарей: frame[-1]["close"], итерация, len().
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: np.ndarray):
+        data = np.asarray(data, dtype=np.float64)
+        if data.ndim != 2 or data.shape[0] != len(CANDLE_COLUMNS):
+            raise ValueError(f"Ожидается массив формы (6, n), получено {data.shape}")
+        self._data = data
+
+    @classmethod
+    def empty(cls) -> "CandleFrame":
+        return cls(np.empty((len(CANDLE_COLUMNS), 0), dtype=np.float64))
+
+    @classmethod
+    def from_rows(cls, rows: np.ndarray) -> "CandleFrame":
+        """Создает фрейм из построчного массива (n, 6)"""
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, len(CANDLE_COLUMNS))
+        return cls(np.ascontiguousarray(rows.T))
+
+    @classmethod
+    def from_candles(cls, candles: Union["CandleFrame", Sequence[Dict]]) -> "CandleFrame":
+        """Приводит список свечей-словарей к фрейму (фрейм возвращается как есть)"""
+        if isinstance(candles, CandleFrame):
+            return candles
+        if not candles:
+            return cls.empty()
+        data = np.empty((len(CANDLE_COLUMNS), len(candles)), dtype=np.float64)
+        for i, name in enumerate(CANDLE_COLUMNS):
+            if name == "timestamp":
+                data[i] = [c.get("timestamp") or 0 for c in candles]
+            else:
+                data[i] = [c.get(name, 0) for c in candles]
+        return cls(data)
+
+    @property
+    def data(self) -> np.ndarray:
+        """Массив (6, n) без копирования"""
+        return self._data
+
+    @property
+    def timestamp(self) -> np.ndarray:
+        return self._data[0]
+
+    @property
+    def open(self) -> np.ndarray:
+        return self._data[1]
+
+    @property
+    def high(self) -> np.ndarray:
+        return self._data[2]
+
+    @property
+    def low(self) -> np.ndarray:
+        return self._data[3]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self._data[4]
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self._data[5]
+
+    def column(self, name: str) -> np.ndarray:
+        return self._data[_COLUMN_INDEX[name]]
+
+    def ohlcv(self) -> np.ndarray:
+        """Матрица (n, 5) open/high/low/close/volume для нейросети"""
+        return self._data[1:].T
+
+    def tail(self, n: int) -> "CandleFrame":
+        """Последние n свечей без копирования"""
+        if n <= 0:
+            return CandleFrame(self._data[:, :0])
+        return CandleFrame(self._data[:, -n:])
+
+    def to_rows(self) -> np.ndarray:
+        return self._data.T.copy()
+
+    def to_dicts(self) -> List[Dict]:
+        return [self._candle(i) for i in range(len(self))]
+
+    def _candle(self, i: int) -> Dict:
+        col = self._data[:, i]
+        return {
+            "timestamp": int(col[0]),
+            "open": float(col[1]),
+            "high": float(col[2]),
+            "low": float(col[3]),
+            "close": float(col[4]),
+            "volume": float(col[5]),
+        }
+
+    def __len__(self) -> int:
+        return self._data.shape[1]
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return CandleFrame(self._data[:, item])
+        if isinstance(item, str):
+            return self.column(item)
+        index = int(item)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Индекс свечи вне диапазона")
+        return self._candle(index)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(len(self)):
+            yield self._candle(i)
+
+    def __repr__(self) -> str:
+        return f"CandleFrame(n={len(self)})"
@@ -0,0 +1,181 @@
+# app/utils/candle_store.py
+import os
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+
+# Колонки записи: timestamp (мс), open, high, low, close, volume
+CANDLE_COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+RECORD_SIZE = len(CANDLE_COLUMNS) * 8  # 6 x float64
+
+# Длительность свечи в миллисекундах для интервалов Bybit
+INTERVAL_MS = {
+    "1": 60_000,
+    "3": 180_000,
+    "5": 300_000,
+    "15": 900_000,
+    "30": 1_800_000,
+    "60": 3_600_000,
+    "120": 7_200_000,
+    "240": 14_400_000,
+    "360": 21_600_000,
+    "720": 43_200_000,
+    "D": 86_400_000,
+    "W": 604_800_000,
+}
+
+
+def interval_to_ms(interval) -> Optional[int]:
+    """Длительность свечи в мс или None для интервалов переменной длины (M)"""
+    return INTERVAL_MS.get(str(interval))
+
+
+class CandleStore:
+    """Локальное хранилище закрытых OHLCV-свечей.
+
+    Для каждой пары (symbol, interval) ведется отдельный бинарный файл
+    из записей фиксированной длины (6 x float64), отсортированных по времени.
+    Новые свечи только дописываются в конец, поэтому чтение последних N свечей
+    не требует загрузки всего файла.
+    """
+
+    def __init__(self, base_dir: str = "data/candles"):
+        self.base_dir = base_dir
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._last_ts: Dict[str, Optional[int]] = {}
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    def _key(self, symbol: str, interval) -> str:
+        return f"{symbol}_{interval}"
+
+    def path(self, symbol: str, interval) -> str:
+        return os.path.join(self.base_dir, f"{self._key(symbol, interval)}.bin")
+
+    def _lock(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    def _count_unlocked(self, path: str) -> int:
+        if not os.path.exists(path):
+            return 0
+        # Недописанная запись (например, после падения процесса) игнорируется
+        return os.path.getsize(path) // RECORD_SIZE
+
+    def _read_unlocked(self, path: str, limit: Optional[int] = None) -> np.ndarray:
+        count = self._count_unlocked(path)
+        if limit is not None:
+            limit = max(0, min(limit, count))
+        else:
+            limit = count
+        if limit == 0:
+            return np.empty((0, len(CANDLE_COLUMNS)), dtype=np.float64)
+
+        with open(path, "rb") as f:
+            f.seek((count - limit) * RECORD_SIZE)
+            data = np.fromfile(f, dtype="<f8", count=limit * len(CANDLE_COLUMNS))
+        return data.reshape(-1, len(CANDLE_COLUMNS))
+
+    def count(self, symbol: str, interval) -> int:
+        """Количество сохраненных свечей"""
+        return self._count_unlocked(self.path(symbol, interval))
+
+    def last_timestamp(self, symbol: str, interval) -> Optional[int]:
+        """Время открытия последней сохраненной свечи (мс)"""
+        key = self._key(symbol, interval)
+        with self._lock(key):
+            return self._last_timestamp_unlocked(key, self.path(symbol, interval))
+
+    def _last_timestamp_unlocked(self, key: str, path: str) -> Optional[int]:
+        if key not in self._last_ts:
+            last = self._read_unlocked(path, 1)
+            self._last_ts[key] = int(last[0, 0]) if len(last) else None
+        return self._last_ts[key]
+
+    def first_timestamp(self, symbol: str, interval) -> Optional[int]:
+        """Время открытия самой старой сохраненной свечи (мс)"""
+        path = self.path(symbol, interval)
+        with self._lock(self._key(symbol, interval)):
+            if not self._count_unlocked(path):
+                return None
+            with open(path, "rb") as f:
+                first = np.fromfile(f, dtype="<f8", count=1)
+            return int(first[0])
+
+    def tail(self, symbol: str, interval, limit: int) -> np.ndarray:
+        """Возвращает последние limit свечей массивом (n, 6)"""
+        with self._lock(self._key(symbol, interval)):
+            return self._read_unlocked(self.path(symbol, interval), limit)
+
+    def read(self, symbol: str, interval) -> np.ndarray:
+        """Возвращает всю сохраненную историю массивом (n, 6)"""
+        with self._lock(self._key(symbol, interval)):
+            return self._read_unlocked(self.path(symbol, interval))
+
+    def append(self, symbol: str, interval, rows: np.ndarray) -> int:
+        """Дописывает свечи новее последней сохраненной. Возвращает число записанных"""
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, len(CANDLE_COLUMNS))
+        if not len(rows):
+            return 0
+
+        key = self._key(symbol, interval)
+        path = self.path(symbol, interval)
+        with self._lock(key):
+            last_ts = self._last_timestamp_unlocked(key, path)
+            rows = rows[np.argsort(rows[:, 0], kind="stable")]
+            if last_ts is not None:
+                rows = rows[rows[:, 0] > last_ts]
+            if len(rows) > 1:
+                # Дубликаты внутри пачки: оставляем последнюю версию свечи
+                keep = np.append(rows[1:, 0] != rows[:-1, 0], True)
+                rows = rows[keep]
+            if not len(rows):
+                return 0
+
+            with open(path, "ab") as f:
+                # Отрезаем недописанный хвост, чтобы не сбить выравнивание записей
+                f.truncate(self._count_unlocked(path) * RECORD_SIZE)
+                f.write(rows.astype("<f8").tobytes())
+            self._last_ts[key] = int(rows[-1, 0])
+            return len(rows)
+
+    def write(self, symbol: str, interval, rows: np.ndarray) -> int:
+        """Объединяет свечи с уже сохраненными (включая более старые) и
+        атомарно перезаписывает файл. Возвращает итоговое число свечей"""
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, len(CANDLE_COLUMNS))
+        key = self._key(symbol, interval)
+        path = self.path(symbol, interval)
+        with self._lock(key):
+            existing = self._read_unlocked(path)
+            merged = np.concatenate([existing, rows]) if len(rows) else existing
+            if not len(merged):
+                return 0
+
+            # При совпадении времени приоритет у новых данных
+            order = np.argsort(merged[:, 0], kind="stable")
+            merged = merged[order]
+            keep = np.append(merged[1:, 0] != merged[:-1, 0], True)
+            merged = merged[keep]
+
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(merged.astype("<f8").tobytes())
+            os.replace(tmp_path, path)
+            self._last_ts[key] = int(merged[-1, 0])
+            return len(merged)
+
+
+_default_store: Optional[CandleStore] = None
+_default_store_guard = threading.Lock()
+
+
+def get_candle_store() -> CandleStore:
+    """Общее для процесса хранилище свечей (один набор блокировок на файл)"""
+    global _default_store
+    with _default_store_guard:
+        if _default_store is None:
+            _default_store = CandleStore()
+        return _default_store
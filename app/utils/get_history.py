@@ -2,8 +2,10 @@ import requests
 import pandas as pd
 import json
 
+from app.config import BYBIT_REST_URL
+
 def fetch_bybit_ohlcv_15m(symbol="SOLUSDT", category="spot"):
-    url = "https://api.bybit.com/v5/market/kline"
+    url = f"{BYBIT_REST_URL}/v5/market/kline"
     params = {
         "category": category,
         "symbol": symbol,
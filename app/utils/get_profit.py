@@ -1,15 +1,16 @@
 import time
 import hmac
 import hashlib
-import requests
 from datetime import datetime, timedelta
 import urllib.parse
 
+from app.config import BYBIT_REST_URL
+
 class ProfitCalculator:
     def __init__(self, api_key, api_secret):
         self.api_key = api_key
         self.api_secret = api_secret
-        self.base_url = "https://api.bybit.com"
+        self.base_url = BYBIT_REST_URL
         self.recv_window = "5000"
 
     def _generate_signature(self, params):
@@ -46,7 +47,10 @@ class ProfitCalculator:
         
         endpoint = "/v5/account/transaction-log"
         url = f"{self.base_url}{endpoint}"
-        response = requests.get(url, params=params, headers=headers)
+        # Общая сессия: запрос проходит через ограничитель частоты запросов
+        from app.services.http_client import get_http_session
+
+        response = get_http_session().get(url, params=params, headers=headers)
         
         return response.json()
 
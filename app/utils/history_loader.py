@@ -0,0 +1,172 @@
+# app/utils/history_loader.py
+import argparse
+import concurrent.futures
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.utils.candle_store import CandleStore, interval_to_ms
+from app.utils.log_helper import log_maker
+
+# Максимальное число свечей в одном ответе /v5/market/kline
+KLINE_PAGE_LIMIT = 1000
+
+
+class HistoryLoader:
+    """Загрузка глубокой истории свечей в локальное хранилище.
+
+    История листается назад страницами по KLINE_PAGE_LIMIT свечей через параметр end.
+    Несколько страниц запрашиваются параллельно; темп задает общий лимитер
+    группы market (get_rate_limiter) в адаптере сессии BybitService,
+    пересечения страниц и уже сохраненные свечи отбрасываются при записи.
+    """
+
+    def __init__(
+        self,
+        bybit,
+        store: Optional[CandleStore] = None,
+        max_workers: int = 4,
+    ):
+        self.bybit = bybit
+        self.store = store or bybit.candle_store
+        self.max_workers = max_workers
+
+    def _fetch_page(self, symbol: str, interval: str, start: int, end: int) -> Optional[np.ndarray]:
+        rows = self.bybit.fetch_klines(
+            symbol, interval, start=start, end=end, limit=KLINE_PAGE_LIMIT
+        )
+        if rows is None:
+            return None
+        return rows[(rows[:, 0] >= start) & (rows[:, 0] <= end)]
+
+    def _missing_ranges(self, symbol: str, interval: str, start: int, end: int) -> List[Tuple[int, int]]:
+        """Диапазоны [start, end], которых еще нет в хранилище (старее и новее сохраненных)"""
+        step = interval_to_ms(interval)
+        first_ts = self.store.first_timestamp(symbol, interval)
+        last_ts = self.store.last_timestamp(symbol, interval)
+        if first_ts is None:
+            return [(start, end)] if start <= end else []
+
+        ranges = []
+        if last_ts + step <= end:
+            ranges.append((max(start, last_ts + step), end))
+        if start < first_ts:
+            ranges.append((start, min(end, first_ts - step)))
+        return ranges
+
+    def load(
+        self,
+        symbol: str,
+        interval: str,
+        start: Optional[int] = None,
+        days: Optional[float] = None,
+        bars: Optional[int] = None,
+    ) -> Optional[int]:
+        """Догружает закрытые свечи начиная с start (мс), за days дней или
+        последние bars свечей. Возвращает число свечей в хранилище или None,
+        если часть истории загрузить не удалось (записывается только то, что
+        примыкает к сохраненным свечам без пропусков)"""
+        step = interval_to_ms(interval)
+        if step is None:
+            raise ValueError(f"Интервал {interval} не поддерживается хранилищем")
+
+        now_ms = int(self.bybit.clock() * 1000)
+        last_closed = now_ms - now_ms % step - step
+        if start is None:
+            if days is not None:
+                start = last_closed - int(days * 86_400_000)
+            elif bars is not None:
+                start = last_closed - (bars - 1) * step
+            else:
+                raise ValueError("Нужно указать start, days или bars")
+        start -= start % step
+
+        first_ts = self.store.first_timestamp(symbol, interval)
+        loaded = []
+        complete = True
+        for range_start, range_end in self._missing_ranges(symbol, interval, start, last_closed):
+            pages, range_complete = self._load_backward(symbol, interval, range_start, range_end)
+            if not range_complete:
+                complete = False
+                # Страницы листаются от конца диапазона: к свечам новее сохраненных
+                # загруженная часть примыкает, только если диапазон загружен целиком
+                if first_ts is not None and range_start > first_ts:
+                    pages = []
+            loaded.extend(pages)
+
+        if loaded:
+            rows = np.concatenate(loaded)
+            self.store.write(symbol, interval, rows)
+            log_maker(f"📚 {symbol} ({interval} мин): загружено {len(rows)} свечей истории")
+        if not complete:
+            log_maker(f"📚⚠️ {symbol}: не удалось загрузить часть истории")
+            return None
+        return self.store.count(symbol, interval)
+
+    def _load_backward(
+        self, symbol: str, interval: str, start: int, end: int
+    ) -> Tuple[List[np.ndarray], bool]:
+        """Листает историю от end к start пачками по max_workers страниц.
+        Возвращает непрерывную от end часть страниц и признак полной загрузки"""
+        step = interval_to_ms(interval)
+        page_span = KLINE_PAGE_LIMIT * step
+        page_ends = list(range(end, start - 1, -page_span))
+        pages = []
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for i in range(0, len(page_ends), self.max_workers):
+                batch = page_ends[i:i + self.max_workers]
+                results = list(executor.map(
+                    lambda page_end: self._fetch_page(
+                        symbol, interval, max(start, page_end - page_span + step), page_end
+                    ),
+                    batch,
+                ))
+                for rows in results:
+                    # Страницы после неудачной отделены от end дырой - не берем их
+                    if rows is None:
+                        return pages, False
+                    # Пустая страница - дошли до начала торгов по монете
+                    if not len(rows):
+                        return pages, True
+                    pages.append(rows)
+
+        return pages, True
+
+    def load_many(self, symbols: List[str], interval: str, days: float) -> dict:
+        """Загружает историю для списка символов. Возвращает {symbol: число свечей}"""
+        counts = {}
+        started = time.time()
+        for symbol in symbols:
+            try:
+                count = self.load(symbol, interval, days=days)
+                counts[symbol] = self.store.count(symbol, interval) if count is None else count
+            except Exception as e:
+                log_maker(f"📚🔥 Ошибка загрузки истории {symbol}: {e}")
+                counts[symbol] = self.store.count(symbol, interval)
+        log_maker(
+            f"📚 История за {days} дн. для {len(symbols)} монет загружена "
+            f"за {time.time() - started:.1f} сек"
+        )
+        return counts
+
+
+def main():
+    from app.services.bybit_service import get_bybit_service
+    from app.utils.coin_loader import load_coin_list
+
+    parser = argparse.ArgumentParser(description='Загрузка истории свечей в локальное хранилище')
+    parser.add_argument('--coins', type=str, default='coins_list.txt', help='Файл со списком монет')
+    parser.add_argument('--interval', type=str, default='5', help='Интервал свечей')
+    parser.add_argument('--days', type=float, default=60, help='Глубина истории в днях')
+    parser.add_argument('--workers', type=int, default=4, help='Параллельных запросов')
+    args = parser.parse_args()
+
+    loader = HistoryLoader(get_bybit_service(), max_workers=args.workers)
+    symbols = [f"{coin}USDT" for coin in load_coin_list(args.coins)]
+    loader.load_many(symbols, args.interval, days=args.days)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,16 @@
 # app/services/symbol_selector.py
 import numpy as np
-from app.services.bybit_service import BybitService
+from app.services.bybit_service import get_bybit_service
 from app.strategies.ma_crossover import MovingAverageStrategy
 from app.utils.log_helper import log_maker
+from app.utils.candle_frame import CandleFrame
+from app.indicators.vectorized import log_returns
 
 class SymbolSelector:
     def __init__(self, symbols: list, volatility_window: int = 24):
         self.symbols = symbols
         self.window = volatility_window
-        self.bybit = BybitService()
+        self.bybit = get_bybit_service()
         self.strategies = {s: MovingAverageStrategy(s) for s in symbols}
         self.scores = {}  # Для хранения текущих баллов
         
@@ -19,20 +21,21 @@ class SymbolSelector:
             return 0
             
         # 1. Историческая волатильность
-        closes = [c['close'] for c in candles]
+        frame = CandleFrame.from_candles(candles)
+        closes = frame.close
         if len(closes) < 2:
             return 0
             
-        returns = np.diff(np.log(closes))
-        volatility = np.std(returns) * 100 if returns else 0
+        returns = log_returns(closes)
+        volatility = np.std(returns) * 100 if len(returns) else 0
         
         # 2. Объемы
-        volumes = [c['volume'] for c in candles[-6:]]
-        if not volumes:
+        volumes = frame.volume[-6:]
+        if not len(volumes):
             volume_ratio = 1
         else:
-            min_vol = min(volumes) if min(volumes) > 0 else 1
-            volume_ratio = max(volumes) / min_vol
+            min_vol = np.min(volumes) if np.min(volumes) > 0 else 1
+            volume_ratio = np.max(volumes) / min_vol
         
         # 3. Текущий тренд (EMA slope)
         try:
@@ -52,7 +55,12 @@ class SymbolSelector:
     def select_best_symbol(self, current_symbol: str = None):
         """Выбор символа с повышающим коэффициентом для текущего"""
         scores = {}
+        # Один запрос тикеров на все символы: неторгуемые пропускаем без запроса свечей
+        tickers = self.bybit.get_all_tickers()
         for symbol in self.symbols:
+            if tickers and symbol not in tickers:
+                scores[symbol] = 0
+                continue
             try:
                 score = self.calculate_volatility_score(symbol)
                 
@@ -0,0 +1,165 @@
+# app/utils/tick_profiler.py
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from app.utils.log_helper import log_maker
+
+# Верхние границы корзин гистограммы, мс (последняя - все, что дольше)
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, float("inf"))
+
+
+class Histogram:
+    """Гистограмма длительностей с фиксированными корзинами"""
+
+    def __init__(self, bounds=BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float):
+        for i, bound in enumerate(self.bounds):
+            if ms <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> float:
+        """Верхняя граница корзины, в которую попадает q-й процентиль"""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "max_ms": self.max_ms,
+            "buckets": {
+                ("inf" if bound == float("inf") else str(bound)): count
+                for bound, count in zip(self.bounds, self.counts)
+            },
+        }
+
+
+class TickProfiler:
+    """Время фаз одного тика стратегии.
+
+    Фазы отмечаются контрольными точками: mark("price") закрывает текущую
+    фазу и начинает новую, end_tick() закрывает последнюю. Так разметка не
+    мешает многочисленным return в теле метода. Тик дольше budget_ms
+    попадает в лог с разбивкой по фазам.
+    """
+
+    def __init__(self, name: str, budget_ms: Optional[float] = None, report_every: int = 100,
+                 export_path: Optional[str] = None):
+        self.name = name
+        self.budget_ms = budget_ms
+        self.report_every = report_every
+        self.export_path = export_path
+        self.phases: Dict[str, Histogram] = {}
+        self.ticks = Histogram()
+        self.slow_ticks = 0
+        self._lock = threading.Lock()
+        self._current: List = []
+        self._phase: Optional[str] = None
+        self._phase_started = 0.0
+        self._tick_started: Optional[float] = None
+
+    def start_tick(self, phase: str = "start"):
+        self._current = []
+        self._tick_started = time.perf_counter()
+        self._phase = phase
+        self._phase_started = self._tick_started
+
+    def mark(self, phase: str):
+        """Время с прошлой отметки относится к прошлой фазе, дальше идет phase"""
+        if self._tick_started is None:
+            return
+        now = time.perf_counter()
+        self._current.append((self._phase, (now - self._phase_started) * 1000))
+        self._phase = phase
+        self._phase_started = now
+
+    def end_tick(self) -> float:
+        """Закрывает тик и возвращает его длительность в мс"""
+        if self._tick_started is None:
+            return 0.0
+        self.mark(None)
+        total_ms = (time.perf_counter() - self._tick_started) * 1000
+        self._tick_started = None
+
+        phases: Dict[str, float] = {}
+        for phase, ms in self._current:
+            phases[phase] = phases.get(phase, 0.0) + ms
+
+        with self._lock:
+            self.ticks.add(total_ms)
+            for phase, ms in phases.items():
+                self.phases.setdefault(phase, Histogram()).add(ms)
+            slow = self.budget_ms is not None and total_ms > self.budget_ms
+            if slow:
+                self.slow_ticks += 1
+            report = self.report_every and self.ticks.count % self.report_every == 0
+
+        if slow:
+            breakdown = ", ".join(
+                f"{phase} {ms:.0f}" for phase, ms in sorted(phases.items(), key=lambda p: -p[1])
+            )
+            log_maker(
+                f"🐢 Тик {self.name}: {total_ms:.0f} мс при бюджете {self.budget_ms:.0f} мс "
+                f"(фазы, мс: {breakdown})"
+            )
+        if report:
+            log_maker(self.summary())
+            if self.export_path:
+                self.export(self.export_path)
+        return total_ms
+
+    def snapshot(self) -> dict:
+        """Гистограммы тиков и фаз"""
+        with self._lock:
+            return {
+                "name": self.name,
+                "budget_ms": self.budget_ms,
+                "slow_ticks": self.slow_ticks,
+                "tick": self.ticks.to_dict(),
+                "phases": {phase: hist.to_dict() for phase, hist in self.phases.items()},
+            }
+
+    def summary(self) -> str:
+        data = self.snapshot()
+        tick = data["tick"]
+        lines = [
+            f"⏱️ Профиль {self.name}: {tick['count']} тиков, p50 {tick['p50_ms']:.0f} мс, "
+            f"p95 {tick['p95_ms']:.0f} мс, max {tick['max_ms']:.0f} мс, "
+            f"медленных {data['slow_ticks']}"
+        ]
+        for phase, hist in sorted(data["phases"].items(), key=lambda p: -p[1]["mean_ms"]):
+            lines.append(
+                f"  {phase}: среднее {hist['mean_ms']:.1f} мс, p95 {hist['p95_ms']:.0f} мс, "
+                f"max {hist['max_ms']:.0f} мс"
+            )
+        return "\n".join(lines)
+
+    def export(self, path: str):
+        """Сохраняет гистограммы в JSON"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2, ensure_ascii=False)
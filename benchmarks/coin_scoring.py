@@ -0,0 +1,46 @@
+# benchmarks/coin_scoring.py
+"""Время пакетной оценки монет (метрики + нормализация) без загрузки данных.
+
+Запуск из корня репозитория:
+    python -m benchmarks.coin_scoring
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.services.coin_selector import batch_metrics, batch_scores
+
+COIN_COUNTS = (29, 300)
+BARS = 16
+
+
+def make_windows(coins: int, bars: int, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.003, (coins, bars)), axis=1))
+    high = close * (1 + rng.uniform(0, 0.002, (coins, bars)))
+    low = close * (1 - rng.uniform(0, 0.002, (coins, bars)))
+    volume = rng.uniform(1_000, 10_000, (coins, bars))
+    return high, low, close, volume
+
+
+def run(repeat: int):
+    print(f"{'монет':>8}{'мс на оценку':>16}")
+    for coins in COIN_COUNTS:
+        windows = make_windows(coins, BARS)
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            batch_scores(batch_metrics(*windows))
+            timings.append(time.perf_counter() - start)
+        print(f"{coins:>8}{min(timings) * 1000:>16.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк пакетной оценки монет")
+    parser.add_argument("--repeat", type=int, default=20)
+    run(parser.parse_args().repeat)
+
+
+if __name__ == "__main__":
+    main()
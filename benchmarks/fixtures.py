@@ -0,0 +1,120 @@
+# benchmarks/fixtures.py
+"""Записанные ответы и данные для бенчмарков без сети.
+
+Свечи генерируются детерминированно (seed) и отдаются в формате ответа
+/v5/market/kline, поэтому прогоны на разных коммитах видят одни и те же
+данные. Время свечей привязано к текущему часу: хранилище и кэш
+BybitService считают их свежими, как в живом боте.
+"""
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import numpy as np
+
+from app.backtest.bybit_sim import resample
+from app.backtest.exchange import SimulatedExchange
+from app.utils.candle_frame import CandleFrame
+from app.utils.candle_store import interval_to_ms
+
+
+def make_frame(n: int, interval: str = "3", seed: int = 1, end_ms: int = None) -> CandleFrame:
+    """n свечей интервала interval, последняя - текущая незакрытая"""
+    step = interval_to_ms(interval)
+    if end_ms is None:
+        end_ms = int(time.time() * 1000)
+    last_open = end_ms - end_ms % step
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.002, n))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.002, n))
+    volume = rng.uniform(1_000, 100_000, n)
+    timestamps = last_open - step * np.arange(n)[::-1]
+    return CandleFrame(np.vstack([timestamps, open_, high, low, close, volume]))
+
+
+def kline_items(frame: CandleFrame) -> List[list]:
+    """Строки свечей в формате /v5/market/kline (по возрастанию времени)"""
+    return [
+        [str(int(row[0])), *(str(value) for value in row[1:6]), str(row[4] * row[5])]
+        for row in frame.to_rows()
+    ]
+
+
+class RecordedResponse:
+    status_code = 200
+    headers: Dict[str, str] = {}
+
+    def __init__(self, payload: dict):
+        self.payload = payload
+
+    def json(self) -> dict:
+        return self.payload
+
+
+class RecordedSession:
+    """Вместо requests.Session: /v5/market/kline из записанных свечей"""
+
+    def __init__(self, frames: Dict[str, CandleFrame]):
+        self.timestamps = {symbol: frame.timestamp for symbol, frame in frames.items()}
+        self.items = {symbol: kline_items(frame) for symbol, frame in frames.items()}
+        self.calls = 0
+
+    def get(self, url: str, params: dict = None, timeout=None) -> RecordedResponse:
+        self.calls += 1
+        symbol = params["symbol"]
+        timestamps, items = self.timestamps[symbol], self.items[symbol]
+        hi = len(items) if "end" not in params else np.searchsorted(timestamps, params["end"], side="right")
+        lo = 0 if "start" not in params else np.searchsorted(timestamps, params["start"])
+        lo = max(lo, hi - int(params.get("limit", 200)))
+        return RecordedResponse({"retCode": 0, "retMsg": "OK", "result": {"list": items[lo:hi][::-1]}})
+
+
+class RecordedExchange(SimulatedExchange):
+    """SimulatedExchange, отдающий свечи любого интервала кратного
+    хранимому (как get_candles живого сервиса)"""
+
+    def __init__(self, candles: Dict[str, CandleFrame], interval: str = "3", **kwargs):
+        super().__init__(candles, **kwargs)
+        self.interval = interval
+        self.step = interval_to_ms(interval)
+
+    def get_candles(self, symbol: str, interval: str = None, limit: int = 100) -> CandleFrame:
+        step = interval_to_ms(interval) if interval else self.step
+        if step == self.step:
+            return super().get_candles(symbol, interval, limit)
+        ratio = step // self.step
+        history = super().get_candles(symbol, interval, (limit + 1) * ratio)
+        return CandleFrame.from_rows(resample(history, step)[-limit:])
+
+
+def ranking_data(coins: int, seed: int = 1) -> dict:
+    """Файл CoinRanker с coins активными монетами и историей сделок"""
+    rng = np.random.default_rng(seed)
+    now = datetime.now()
+    active = {}
+    for i in range(coins):
+        trades = int(rng.integers(0, 40))
+        first = now - timedelta(days=int(rng.integers(1, 60)))
+        active[f"C{i:04d}"] = {
+            "selections": int(rng.integers(1, (now - first).days + 1)),
+            "trades": trades,
+            "profitable_trades": int(rng.integers(0, trades + 1)),
+            "total_profit": float(rng.normal(0, 0.05)),
+            "last_selected": now.isoformat(),
+            "first_selected": first.isoformat(),
+            "last_trade": now.isoformat() if trades else None,
+            "trial_used": int(rng.integers(0, 10)),
+            "performance_score": float(rng.uniform(0, 1)),
+            "priority": float(rng.uniform(0.5, 2)),
+        }
+    return {
+        "active_coins": active,
+        "archived_coins": {},
+        "statistics": {
+            "total_rotations": coins,
+            "last_rotation": now.isoformat(),
+            "created_at": (now - timedelta(days=60)).isoformat(),
+        },
+    }
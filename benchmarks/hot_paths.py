@@ -0,0 +1,361 @@
+# benchmarks/hot_paths.py
+"""Бенчмарки горячих путей бота на записанных данных, без сети.
+
+Каждый прогон дописывается в data/benchmarks.jsonl с хэшем коммита,
+таблица сравнивает медианы с последним прогоном другого коммита (или
+с --against) и помечает замедления больше --threshold.
+
+Запуск из корня репозитория:
+    python -m benchmarks.hot_paths
+    python -m benchmarks.hot_paths --only should_trade coin_ranker --repeat 50
+    python -m benchmarks.hot_paths --against 1a2b3c4 --check   # код 1 при регрессии
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from unittest.mock import patch
+
+import numpy as np
+
+from benchmarks.fixtures import (
+    RecordedExchange,
+    RecordedSession,
+    kline_items,
+    make_frame,
+    ranking_data,
+)
+
+RESULTS_PATH = "data/benchmarks.jsonl"
+THRESHOLD = 0.2
+
+# Каталог для файлов замеров, удаляется после прогона
+_workdir: Optional[str] = None
+
+
+def _tempdir(prefix: str) -> str:
+    return tempfile.mkdtemp(prefix=prefix, dir=_workdir)
+
+
+class Case:
+    """Замер: setup готовит данные один раз и возвращает функцию одного
+    вызова; reset (если есть) выполняется перед каждым вызовом вне замера"""
+
+    def __init__(self, name: str, setup: Callable[[], Tuple[Callable, Optional[Callable]]]):
+        self.name = name
+        self.setup = setup
+
+
+def measure(func: Callable, reset: Optional[Callable], repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        if reset is not None:
+            reset()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    timings = np.array(timings) * 1000
+    return {
+        "median_ms": float(np.median(timings)),
+        "min_ms": float(timings.min()),
+        "p90_ms": float(np.percentile(timings, 90)),
+        "repeat": repeat,
+    }
+
+
+# ===== Свечи =====
+
+def parse_klines_case(bars: int):
+    from app.services.bybit_service import parse_klines
+
+    items = kline_items(make_frame(bars))[::-1]
+    return lambda: parse_klines(items), None
+
+
+def get_candles_case(limit: int, warm: bool):
+    """get_candles с записанным ответом биржи: warm - история уже в
+    хранилище и догружается только текущая свеча, иначе - пустое хранилище"""
+    from app.services.bybit_service import BybitService
+    from app.utils.candle_store import CandleStore
+
+    symbol = "BENCHUSDT"
+    session = RecordedSession({symbol: make_frame(limit + 50)})
+    workdir = _tempdir("candles_")
+    service = BybitService(api_key="key", api_secret="secret", session=session,
+                           candle_store=CandleStore(base_dir=workdir))
+    runs = [0]
+
+    def reset():
+        service.candle_cache.clear()
+        if not warm:
+            runs[0] += 1
+            service.candle_store = CandleStore(base_dir=os.path.join(workdir, str(runs[0])))
+            service.history_loader.store = service.candle_store
+            service._backfill_depth.clear()
+
+    if warm:
+        service.get_candles(symbol, "3", limit)
+    return lambda: service.get_candles(symbol, "3", limit), reset
+
+
+# ===== Стратегия и отбор монет =====
+
+def should_trade_case(bars: int):
+    """Один тик MovingAverageStrategy.should_trade на окне bars свечей:
+    биржа - симулятор по записанным свечам"""
+    from app.strategies.ma_crossover import MovingAverageStrategy
+
+    symbol = "BENCHUSDT"
+    frame = make_frame(bars + 5_000)
+    exchange = RecordedExchange({symbol: frame})
+    exchange.cursor = bars
+    with patch("app.strategies.ma_crossover.get_bybit_service", return_value=exchange):
+        strategy = MovingAverageStrategy(symbol, initial_data_limit=bars)
+    strategy.profiler.export_path = None
+
+    def tick():
+        exchange.cursor += 1
+        if exchange.cursor >= len(frame):
+            exchange.cursor = bars
+        strategy.should_trade(frame[exchange.cursor - bars + 1:exchange.cursor + 1])
+
+    return tick, None
+
+
+def evaluate_coins_case(coins: int):
+    """CoinSelector.evaluate_coins: свечи монет из памяти вместо биржи"""
+    from app.services.coin_selector import CoinSelector
+
+    names = [f"C{i:04d}" for i in range(coins)]
+    frames = {f"{name}USDT": make_frame(16, "15", seed=i) for i, name in enumerate(names)}
+    exchange = RecordedExchange(frames, interval="15")
+    exchange.cursor = 15
+    with patch("app.services.coin_selector.get_bybit_service", return_value=exchange):
+        selector = CoinSelector(names)
+
+    def reset():
+        selector.last_update = 0
+
+    return selector.evaluate_coins, reset
+
+
+# ===== Нейросеть =====
+
+def predict_case():
+    from app.strategies.neural_network.model import NeuralPredictor
+
+    predictor = NeuralPredictor()
+    frame = make_frame(500)
+    predictor.prepare_data(frame)
+    window = frame.ohlcv()[-100:]
+    return lambda: predictor.predict(window), None
+
+
+def runtime_predict_case():
+    """Тот же прогноз через LSTMRuntime по выгруженным весам"""
+    from app.strategies.neural_network.model import NeuralPredictor
+    from app.strategies.neural_network.runtime import LSTMRuntime
+
+    predictor = NeuralPredictor(sequence_length=30)
+    frame = make_frame(500)
+    predictor.prepare_data(frame)
+    path = os.path.join(_tempdir("model_"), "BENCH_neural_model")
+    predictor.save(path)
+    runtime = LSTMRuntime()
+    runtime.load(path)
+    window = frame.ohlcv()[-100:]
+    return lambda: runtime.predict(window), None
+
+
+def batch_predict_case(coins: int):
+    """BatchPredictor по coins монетам одним проходом (веса у всех одни)"""
+    from app.strategies.neural_network.batch import BatchPredictor
+    from app.strategies.neural_network.model import NeuralPredictor
+    from app.strategies.neural_network.runtime import LSTMRuntime
+
+    predictor = NeuralPredictor(sequence_length=30)
+    predictor.prepare_data(make_frame(500))
+    path = os.path.join(_tempdir("model_"), "BENCH_neural_model")
+    predictor.save(path)
+    runtime = LSTMRuntime()
+    runtime.load(path)
+    names = [f"C{i:04d}" for i in range(coins)]
+    batch = BatchPredictor({name: runtime for name in names})
+    windows = {name: make_frame(100, seed=i).ohlcv() for i, name in enumerate(names)}
+    return lambda: batch.predict(windows), None
+
+
+def train_windows_case(bars: int):
+    """NeuralPredictor.train без fit: только нарезка окон X, y"""
+    from app.strategies.neural_network.model import NeuralPredictor
+
+    predictor = NeuralPredictor()
+    data = predictor.prepare_data(make_frame(bars))
+    predictor.model.fit = lambda *args, **kwargs: None
+    return lambda: predictor.train(data), None
+
+
+# ===== Рейтинг монет =====
+
+def ranker_case(coins: int, save: bool):
+    from app.services.coin_ranker import CoinRanker
+
+    path = os.path.join(_tempdir("ranker_"), "coin_ranking.json")
+    with open(path, "w") as f:
+        json.dump(ranking_data(coins), f, indent=2)
+    if not save:
+        return lambda: CoinRanker(data_path=path), None
+    ranker = CoinRanker(data_path=path)
+    return ranker.save_data, None
+
+
+CASES = [
+    Case("parse_klines[1000]", lambda: parse_klines_case(1_000)),
+    Case("get_candles[100] warm", lambda: get_candles_case(100, warm=True)),
+    Case("get_candles[500] warm", lambda: get_candles_case(500, warm=True)),
+    Case("get_candles[500] cold", lambda: get_candles_case(500, warm=False)),
+    Case("should_trade[100]", lambda: should_trade_case(100)),
+    Case("should_trade[500]", lambda: should_trade_case(500)),
+    Case("evaluate_coins[30]", lambda: evaluate_coins_case(30)),
+    Case("evaluate_coins[300]", lambda: evaluate_coins_case(300)),
+    Case("nn_predict", predict_case),
+    Case("nn_predict_numpy", runtime_predict_case),
+    Case("nn_predict_batch[30]", lambda: batch_predict_case(30)),
+    Case("nn_train_windows[2000]", lambda: train_windows_case(2_000)),
+    Case("coin_ranker_load[30]", lambda: ranker_case(30, save=False)),
+    Case("coin_ranker_load[1000]", lambda: ranker_case(1_000, save=False)),
+    Case("coin_ranker_save[30]", lambda: ranker_case(30, save=True)),
+    Case("coin_ranker_save[1000]", lambda: ranker_case(1_000, save=True)),
+]
+
+
+# ===== История прогонов =====
+
+def git_revision() -> Tuple[str, bool]:
+    """Короткий хэш HEAD и признак незакоммиченных изменений"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "-uno"], capture_output=True,
+                                    text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+
+def load_history(path: str) -> List[dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def save_record(path: str, record: dict):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def pick_baseline(history: List[dict], commit: str, dirty: bool,
+                  against: Optional[str]) -> Optional[dict]:
+    """Последний прогон коммита against или, по умолчанию, последний прогон
+    другого состояния дерева (другой коммит или тот же без правок)"""
+    for record in reversed(history):
+        if against is not None:
+            if record["commit"].startswith(against):
+                return record
+        elif (record["commit"], record["dirty"]) != (commit, dirty):
+            return record
+    return None
+
+
+def compare(results: Dict[str, dict], baseline: Optional[dict], threshold: float) -> Tuple[str, List[str]]:
+    """Таблица замеров и список замедлившихся случаев"""
+    previous = baseline["results"] if baseline else {}
+    lines = [f"{'замер':<26}{'медиана, мс':>13}{'мин, мс':>11}{'p90, мс':>11}{'было, мс':>11}{'изм.':>9}"]
+    regressions = []
+    for name, result in results.items():
+        row = (f"{name:<26}{result['median_ms']:>13.3f}{result['min_ms']:>11.3f}"
+               f"{result['p90_ms']:>11.3f}")
+        before = previous.get(name)
+        if before:
+            change = result["median_ms"] / before["median_ms"] - 1
+            row += f"{before['median_ms']:>11.3f}{change:>+9.0%}"
+            if change > threshold:
+                regressions.append(name)
+                row += "  ⚠️"
+        lines.append(row)
+    return "\n".join(lines), regressions
+
+
+def run(cases: List[Case], repeat: int) -> Dict[str, dict]:
+    global _workdir
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bench_") as _workdir:
+        for case in cases:
+            results[case.name] = _run_case(case, repeat)
+    _workdir = None
+    return results
+
+
+def _run_case(case: Case, repeat: int) -> dict:
+    # Журнал бота и прогресс Keras в таблицу не попадают, Telegram отключен
+    with contextlib.redirect_stdout(io.StringIO()), \
+            patch("app.utils.log_helper.send_telegram_message"):
+        func, reset = case.setup()
+        func()  # прогрев: ленивые импорты, компиляция графа, кэши
+        result = measure(func, reset, repeat)
+    print(f"  {case.name}: {result['median_ms']:.3f} мс", file=sys.stderr)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки горячих путей бота")
+    parser.add_argument("--only", nargs="+", default=None, help="префиксы имен замеров")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--results", default=RESULTS_PATH)
+    parser.add_argument("--against", default=None, help="коммит для сравнения")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="допустимый рост медианы (0.2 = 20%%)")
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--check", action="store_true", help="код выхода 1 при замедлении")
+    args = parser.parse_args()
+
+    cases = [c for c in CASES if not args.only or any(c.name.startswith(p) for p in args.only)]
+    results = run(cases, args.repeat)
+
+    commit, dirty = git_revision()
+    history = load_history(args.results)
+    baseline = pick_baseline(history, commit, dirty, args.against)
+    table, regressions = compare(results, baseline, args.threshold)
+    if baseline:
+        state = " (с правками)" if baseline["dirty"] else ""
+        print(f"Сравнение с {baseline['commit']}{state} от {baseline['time']}")
+    print(table)
+
+    if not args.no_save:
+        save_record(args.results, {
+            "commit": commit,
+            "dirty": dirty,
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "machine": f"{platform.node()} {platform.machine()} {os.cpu_count()} CPU",
+            "python": platform.python_version(),
+            "results": results,
+        })
+    if regressions:
+        print(f"\n⚠️ Медленнее на {args.threshold:.0%}+: {', '.join(regressions)}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
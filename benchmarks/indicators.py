@@ -0,0 +1,105 @@
+# benchmarks/indicators.py
+"""Сравнение app.indicators.vectorized с прежними циклами Python.
+
+Запуск из корня репозитория:
+    python -m benchmarks.indicators
+    python -m benchmarks.indicators --sizes 1000 10000 --repeat 3
+"""
+import argparse
+import time
+from typing import Callable, List
+
+import numpy as np
+
+from app.indicators import vectorized
+
+SIZES = (1_000, 10_000, 100_000)
+
+
+# --- Прежние реализации (циклы из стратегий и селекторов) ---
+
+def loop_ema(prices, window):
+    k = 2 / (window + 1)
+    ema = prices[0]
+    for price in prices[1:]:
+        ema = price * k + ema * (1 - k)
+    return ema
+
+
+def loop_rsi(closes, period=14):
+    deltas = np.diff(closes)
+    gains = np.where(deltas > 0, deltas, 0)
+    losses = np.where(deltas < 0, -deltas, 0)
+    avg_gain = np.mean(gains[:period])
+    avg_loss = np.mean(losses[:period])
+    for i in range(period, len(gains)):
+        avg_gain = (avg_gain * (period - 1) + gains[i]) / period
+        avg_loss = (avg_loss * (period - 1) + losses[i]) / period
+    return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+
+def loop_true_range(highs, lows, closes):
+    tr_values = []
+    for i in range(1, len(highs)):
+        tr_values.append(max(
+            highs[i] - lows[i], abs(highs[i] - closes[i - 1]), abs(lows[i] - closes[i - 1])
+        ))
+    return tr_values
+
+
+def loop_volatility(closes):
+    returns = []
+    for i in range(1, len(closes)):
+        if closes[i - 1] != 0:
+            returns.append((closes[i] - closes[i - 1]) / closes[i - 1])
+    return np.std(returns) * 100
+
+
+def make_candles(n: int, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+    high = close * (1 + rng.uniform(0, 0.002, n))
+    low = close * (1 - rng.uniform(0, 0.002, n))
+    return high, low, close
+
+
+def best_time(func: Callable, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(sizes: List[int], repeat: int):
+    print(f"{'индикатор':<12}{'свечей':>10}{'цикл, мс':>12}{'numpy, мс':>12}{'ускорение':>12}")
+    for n in sizes:
+        high, low, close = make_candles(n)
+        cases = [
+            ("EMA(21)", lambda: loop_ema(close, 21), lambda: vectorized.ema(close, 21)),
+            ("RSI(14)", lambda: loop_rsi(close), lambda: vectorized.rsi(close)),
+            ("TR", lambda: loop_true_range(high, low, close),
+             lambda: vectorized.true_range(high, low, close)),
+            ("volatility", lambda: loop_volatility(close),
+             lambda: np.std(vectorized.pct_returns(close)) * 100),
+        ]
+        for name, loop, vector in cases:
+            loop_time = best_time(loop, repeat)
+            vector_time = best_time(vector, repeat)
+            print(
+                f"{name:<12}{n:>10}{loop_time * 1000:>12.3f}{vector_time * 1000:>12.3f}"
+                f"{loop_time / vector_time:>11.1f}x"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк векторных индикаторов")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+# benchmarks/trading_system.py
+"""Нагрузочный прогон TradingSystem на стенде Bybit, без сети.
+
+TradingSystem собирается как в run_bot.py, но биржа - BybitSimulator
+(BybitService с base_url и часами стенда), а рабочие файлы
+(bot_state.json, data/, models/, logs/) - во временном каталоге. Тик:
+стенд сдвигается на свечу, затем выполняется то же, что основной цикл
+run_bot.py и TradingBot.run_once, только без ожиданий: ротация монет
+(если нет позиции), свечи, should_trade и исполнение сигнала. Замеряются
+задержка каждого тика и число ордеров стенда. Обучение моделей идет в
+отдельных процессах пула и в прогон не входит (ModelTrainer подменен).
+
+Запросы идут через RateLimiter с лимитами Bybit, поэтому по умолчанию
+задержка тика в основном - очередь лимитера (см. limiter_wait_seconds);
+--unlimited снимает лимиты и оставляет только работу бота. С параметрами
+сигнала по умолчанию вход по тренду не проходит фильтр R/R (2.0 < 2.5),
+и ордеров почти нет; --param min_risk_reward_ratio=2.0 их дает.
+
+Запуск из корня репозитория:
+    python -m benchmarks.trading_system --coins 5 --ticks 300
+    python -m benchmarks.trading_system --unlimited --param min_risk_reward_ratio=2.0
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from unittest.mock import patch
+
+import numpy as np
+
+from app.services.rate_limiter import ENDPOINT_GROUPS
+from app.utils.candle_frame import CandleFrame
+from benchmarks.fixtures import make_frame
+
+ORDER_PATH = "/v5/order/create"
+# Свечей истории до первого тика: хватает на затравку индикаторов стратегии
+HISTORY_BARS = 600
+# Лимиты без очереди: задержка тика - только работа бота и стенда
+UNLIMITED = {group: (1e6, 10**6) for group in ENDPOINT_GROUPS}
+# Волна тренда поверх случайного блуждания: период (свечей) и размах, доли
+TREND_PERIOD = 120
+TREND_AMPLITUDE = 0.04
+
+
+@dataclass
+class LoadReport:
+    ticks: int = 0
+    orders: int = 0
+    latencies_ms: List[float] = field(default_factory=list)
+    limiter: dict = field(default_factory=dict)  # RateLimiter.stats() за прогон
+
+    @property
+    def seconds(self) -> float:
+        """Время тиков без сдвигов стенда"""
+        return sum(self.latencies_ms) / 1000
+
+    @property
+    def orders_per_second(self) -> float:
+        return self.orders / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> dict:
+        latencies = np.array(self.latencies_ms or [0.0])
+        return {
+            "ticks": self.ticks,
+            "orders": self.orders,
+            "seconds": self.seconds,
+            "ticks_per_second": self.ticks / self.seconds if self.seconds else 0.0,
+            "orders_per_second": self.orders_per_second,
+            "mean_ms": float(latencies.mean()),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p95_ms": float(np.percentile(latencies, 95)),
+            "max_ms": float(latencies.max()),
+            # Часть времени тиков - очередь лимитера (лимиты Bybit, как в бою)
+            "limiter_wait_seconds": sum(group["wait_total"] for group in self.limiter.values()),
+        }
+
+
+@contextlib.contextmanager
+def _chdir(path: str):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def trending_frame(n: int, interval: str = "3", seed: int = 1) -> CandleFrame:
+    """Свечи make_frame с волной тренда: на чистом блуждании стратегия
+    почти не входит в сделки, и ордеров в прогоне нет"""
+    data = make_frame(n, interval, seed=seed).data.copy()
+    phase = np.random.default_rng(seed).uniform(0, 2 * np.pi)
+    wave = np.exp(TREND_AMPLITUDE * np.sin(2 * np.pi * np.arange(n) / TREND_PERIOD + phase))
+    data[1:5] *= wave
+    return CandleFrame(data)
+
+
+def apply_params(strategy, params: dict):
+    """Переопределяет параметры сигнала стратегии, как MASignalCore.from_params
+    (кроме окон EMA: индикаторы уже построены)"""
+    for name, value in params.items():
+        if not hasattr(strategy.core, name):
+            raise ValueError(f"Неизвестный параметр стратегии: {name}")
+        setattr(strategy.core, name, value)
+
+
+def tick(system, service, params: Optional[dict] = None):
+    """Один проход основного цикла бота по текущей свече стенда"""
+    from app.trading.order_executor import OrderExecutor
+
+    # Ротация - как в run_bot.py: только без открытой позиции
+    if not system.position_open_time:
+        coin = system.rotator.rotate_coins()
+        if coin != system.current_coin:
+            system.switch_coin(coin)
+            apply_params(system.strategy, params or {})
+
+    strategy = system.strategy
+    candles = service.get_candles(system.current_symbol, str(strategy.interval), limit=100)
+    action = strategy.should_trade(candles)
+    if action:
+        strategy.execute_trade(action, OrderExecutor(system.current_symbol))
+
+
+def run(coins: int = 3, ticks: int = 100, interval: str = "3", seed: int = 1,
+        workdir: Optional[str] = None, quiet: bool = True,
+        limits: Optional[Dict[str, tuple]] = None, **params) -> LoadReport:
+    """ticks тиков TradingSystem по coins монетам стенда; limits - группы
+    RateLimiter (по умолчанию лимиты Bybit), params переопределяют параметры
+    сигнала (см. apply_params)"""
+    from app.backtest.bybit_sim import BookExchange, BybitSimulator
+    from app.services import bybit_service
+    from app.services.bybit_service import BybitService
+    from app.services.http_client import create_session
+    from app.services.rate_limiter import RateLimiter
+    from app.services.trading_system import TradingSystem
+    from app.strategies.neural_network.registry import ModelRegistry
+    from app.utils.candle_store import CandleStore
+
+    if workdir is None:
+        with tempfile.TemporaryDirectory(prefix="system_load_") as workdir:
+            return run(coins, ticks, interval, seed, workdir, quiet, limits, **params)
+
+    names = [f"C{i}" for i in range(coins)]
+    frames = {
+        f"{name}USDT": trending_frame(HISTORY_BARS + ticks, interval, seed=seed + i)
+        for i, name in enumerate(names)
+    }
+    exchange = BookExchange(frames, balance_usdt=1_000)
+    exchange.cursor = HISTORY_BARS - 1
+
+    for directory in ("data", "logs", "models"):
+        os.makedirs(os.path.join(workdir, directory), exist_ok=True)
+
+    report = LoadReport()
+    with BybitSimulator(exchange, interval, api_key="key", api_secret="secret") as simulator, \
+            _chdir(workdir), contextlib.ExitStack() as stack:
+        if quiet:
+            stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+        stack.enter_context(patch("app.utils.log_helper.send_telegram_message"))
+        # Свой лимитер: счетчики очереди только этого прогона
+        limiter = RateLimiter(limits)
+        service = BybitService(
+            api_key="key",
+            api_secret="secret",
+            candle_store=CandleStore(base_dir="data/candles"),
+            session=create_session(base_url=simulator.url, limiter=limiter),
+            base_url=simulator.url,
+            clock=simulator.clock,
+        )
+        service.rate_limiter = limiter
+        # Все модули бота получают клиент стенда
+        stack.enter_context(patch.object(bybit_service, "_default_service", service))
+        stack.enter_context(patch("app.trading.order_executor.bybit", service))
+        stack.enter_context(patch("app.services.trading_system.ModelTrainer"))
+        stack.enter_context(patch("app.services.trading_system.get_model_registry",
+                                  return_value=ModelRegistry("models")))
+
+        system = TradingSystem(names)
+        apply_params(system.strategy, params)
+        try:
+            orders_before = simulator.requests.get(ORDER_PATH, 0)
+            for _ in range(ticks):
+                if not simulator.advance(1):
+                    break
+                started = time.perf_counter()
+                tick(system, service, params)
+                report.latencies_ms.append((time.perf_counter() - started) * 1000)
+                report.ticks += 1
+            report.orders = simulator.requests.get(ORDER_PATH, 0) - orders_before
+            report.limiter = limiter.stats()
+        finally:
+            system.forecasts.stop()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Нагрузочный прогон TradingSystem на стенде Bybit')
+    parser.add_argument('--coins', type=int, default=5, help='Монет на стенде')
+    parser.add_argument('--ticks', type=int, default=300, help='Тиков (свечей стенда)')
+    parser.add_argument('--interval', type=str, default='3', help='Интервал свечей, мин')
+    parser.add_argument('--seed', type=int, default=1, help='Seed свечей')
+    parser.add_argument('--param', action='append', default=[], metavar='NAME=VALUE',
+                        help='Параметр сигнала стратегии, например min_risk_reward_ratio=2.0')
+    parser.add_argument('--unlimited', action='store_true', help='Без лимитов запросов Bybit')
+    parser.add_argument('--verbose', action='store_true', help='Печатать журнал бота')
+    args = parser.parse_args()
+
+    params = {}
+    for item in args.param:
+        name, value = item.split("=", 1)
+        params[name] = json.loads(value)
+    report = run(args.coins, args.ticks, args.interval, args.seed, quiet=not args.verbose,
+                 limits=UNLIMITED if args.unlimited else None, **params)
+    print(json.dumps(report.to_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,18 @@
 import time
 import hmac
 import hashlib
-import requests
 from datetime import datetime, timedelta
 import urllib.parse
 import json  # Добавлен для отладки
 
 from app.config import BYBIT_API_KEY, BYBIT_API_SECRET
+from app.services.http_client import BYBIT_REST_URL, get_http_session
 
 class BybitAccount:
     def __init__(self, api_key, api_secret):
         self.api_key = api_key
         self.api_secret = api_secret
-        self.base_url = "https://api.bybit.com"
+        self.base_url = BYBIT_REST_URL
         self.recv_window = "5000"
 
     def _generate_signature(self, params):
@@ -79,7 +79,7 @@ class BybitAccount:
         full_url = f"{url}?{query_string}"
         
         # Отправляем запрос
-        response = requests.get(full_url, headers=headers)
+        response = get_http_session().get(full_url, headers=headers)
         
         # Возвращаем как словарь для гибкости
         return response.json()
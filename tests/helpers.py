@@ -0,0 +1,76 @@
+# tests/helpers.py
+"""Общие для тестов генераторы свечей и моделей и клиент стенда Bybit"""
+import time
+
+import numpy as np
+
+from app.utils.candle_frame import CandleFrame
+from app.utils.candle_store import interval_to_ms
+
+# Шаг свечей random_frame - 3 минуты
+STEP = 180_000
+
+
+def random_frame(n: int, seed: int = 7, start: int = 1_700_000_000_000) -> CandleFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.002, n))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.002, n))
+    timestamps = start + STEP * np.arange(n)
+    return CandleFrame(np.vstack([timestamps, open_, high, low, close, rng.uniform(1, 10, n)]))
+
+
+def liquid_frame(n: int, seed: int = 7) -> CandleFrame:
+    """Случайные свечи с объемом, достаточным для фильтра объема стратегии"""
+    data = random_frame(n, seed=seed).data.copy()
+    data[5] *= 1e5
+    return CandleFrame(data)
+
+
+def recent_frame(n: int, interval: str = "5", seed: int = 11) -> CandleFrame:
+    """Свечи liquid_frame, последняя из которых - текущая по часам"""
+    step = interval_to_ms(interval)
+    data = liquid_frame(n, seed=seed).data.copy()
+    now = int(time.time() * 1000)
+    data[0] = now - now % step - step * np.arange(n)[::-1]
+    return CandleFrame(data)
+
+
+def sim_bybit(simulator, base_dir: str):
+    """BybitService, направленный на стенд: REST - через base_url, время
+    свечей - часы стенда (simulator.clock)"""
+    from app.services.bybit_service import BybitService
+    from app.services.http_client import create_session
+    from app.utils.candle_store import CandleStore
+
+    return BybitService(
+        api_key="key",
+        api_secret="secret",
+        candle_store=CandleStore(base_dir=base_dir),
+        session=create_session(base_url=simulator.url),
+        base_url=simulator.url,
+        clock=simulator.clock,
+    )
+
+
+def write_model(models_dir, coin: str, seed: int, sequence_length: int = 30, units=(128, 64)):
+    """Веса и скалер модели в формате выгрузки LSTMRuntime, без TensorFlow"""
+    rng = np.random.default_rng(seed)
+    arrays = {}
+    inputs = 5
+    for index, size in enumerate(units):
+        arrays[f"{index}_kernel"] = rng.normal(0, 0.3, (inputs, 4 * size)).astype(np.float32)
+        arrays[f"{index}_recurrent"] = rng.normal(0, 0.1, (size, 4 * size)).astype(np.float32)
+        arrays[f"{index}_bias"] = rng.normal(0, 0.1, 4 * size).astype(np.float32)
+        inputs = size
+    for index, size in enumerate((32, 3), start=len(units)):
+        arrays[f"{index}_kernel"] = rng.normal(0, 0.2, (inputs, size)).astype(np.float32)
+        arrays[f"{index}_bias"] = rng.normal(0, 0.1, size).astype(np.float32)
+        inputs = size
+    base = models_dir / f"{coin}_neural_model"
+    np.savez(f"{base}_weights.npz", kinds=np.array(["LSTM"] * len(units) + ["Dense", "Dense"]),
+             activations=np.array(["tanh"] * len(units) + ["relu", "linear"]),
+             sequence_length=sequence_length, features=5, **arrays)
+    np.savez(f"{base}_scaler.npz", scale=1 / rng.uniform(50, 150, 5), min=-rng.uniform(0, 1, 5))
+    return str(base)
@@ -0,0 +1,111 @@
+import json
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.account_stream import TRACKED_ORDERS_LIMIT, AccountStream
+from app.services.bybit_service import BybitService
+
+
+def order_event(status: str, qty: str = "0.5", avg_price: str = "101.2", order_id: str = "42") -> str:
+    executed = status in ("Filled", "PartiallyFilledCanceled")
+    return json.dumps({
+        "topic": "order",
+        "data": [{
+            "category": "spot", "orderId": order_id, "symbol": "SOLUSDT", "side": "Buy",
+            "orderStatus": status, "qty": qty, "cumExecQty": qty if executed else "0",
+            "cumExecValue": "50.6", "cumExecFee": "0.0005", "avgPrice": avg_price,
+            "createdTime": "1700000000000",
+        }],
+    })
+
+
+@pytest.fixture
+def bybit():
+    service = BybitService()
+    service.client = MagicMock()
+    service.client.get_wallet_balance.return_value = {
+        "retCode": 0,
+        "result": {"list": [{"coin": [
+            {"coin": "USDT", "walletBalance": "100", "availableToWithdraw": "100"},
+        ]}]},
+    }
+    service.client.get_order_history.return_value = {"retCode": 0, "result": {"list": []}}
+    service.account_stream = AccountStream("key", "secret", on_ready=service._seed_account_view)
+    service.account_stream.handle_message(json.dumps({"op": "auth", "success": True}))
+    return service
+
+
+def test_stream_requires_keys():
+    """Без ключа или секрета поток не создается, а не переподключается бесконечно"""
+    with pytest.raises(ValueError):
+        AccountStream("key", None)
+    with pytest.raises(ValueError):
+        AccountStream("", "secret")
+
+
+def test_balances_follow_wallet_events(bybit):
+    """Балансы и позиции читаются из приватного потока без REST"""
+    assert bybit.account_stream.ready.is_set()
+    assert bybit.get_balance("USDT") == 100.0
+
+    bybit.account_stream.handle_message(json.dumps({
+        "topic": "wallet",
+        "data": [{"accountType": "UNIFIED", "coin": [
+            {"coin": "USDT", "walletBalance": "49.4", "availableToWithdraw": "49.4"},
+            {"coin": "SOL", "walletBalance": "0.5", "availableToWithdraw": "0.5"},
+        ]}],
+    }))
+    calls = bybit.client.get_wallet_balance.call_count
+    assert bybit.get_balance("USDT") == 49.4
+    assert bybit.get_balance("SOL") == 0.5
+    assert [p["coin"] for p in bybit.get_open_positions()] == ["SOL"]
+    assert bybit.client.get_wallet_balance.call_count == calls
+
+
+def test_wait_for_fill_returns_this_order(bybit):
+    """Исполнение подтверждается событием именно по размещенному ордеру"""
+    assert bybit.get_filled_orders("SOLUSDT") == []
+
+    stream = bybit.account_stream
+    stream.handle_message(order_event("New"))
+    timer = threading.Timer(0.1, stream.handle_message, args=[order_event("Filled")])
+    timer.start()
+
+    filled = bybit.wait_for_fill("SOLUSDT", "42", timeout=5)
+    timer.join()
+    assert filled["order_id"] == "42"
+    assert filled["cumExecQty"] == "0.5"
+    assert filled["avg_price"] == "101.2"
+
+    # История исполнений пополнилась событием, повторный REST не нужен
+    history_calls = bybit.client.get_order_history.call_count
+    assert bybit.get_last_filled_order("SOLUSDT")["order_id"] == "42"
+    assert bybit.client.get_order_history.call_count == history_calls
+
+
+def test_view_is_dropped_on_disconnect(bybit):
+    """После разрыва соединения запросы снова идут через REST"""
+    bybit.account_stream._on_close()
+    bybit.get_balance("USDT")
+    assert bybit.client.get_wallet_balance.call_count == 2
+
+
+def test_finished_orders_are_bounded(bybit):
+    """Завершенные ордера не копятся, в историю попадают только Filled - как в REST"""
+    stream = bybit.account_stream
+    bybit.get_filled_orders("SOLUSDT")
+
+    stream.handle_message(order_event("PartiallyFilledCanceled", order_id="partial"))
+    assert stream.wait_for_fill("partial", timeout=0)["orderId"] == "partial"
+    assert bybit.get_filled_orders("SOLUSDT") == []
+
+    for i in range(TRACKED_ORDERS_LIMIT + 50):
+        stream.handle_message(json.dumps({"topic": "execution", "data": [{
+            "category": "spot", "orderId": str(i), "execId": f"e{i}", "execQty": "1", "execPrice": "100",
+        }]}))
+        stream.handle_message(order_event("Filled", order_id=str(i)))
+    assert len(stream._orders) == TRACKED_ORDERS_LIMIT
+    assert len(stream._executions) <= TRACKED_ORDERS_LIMIT
+    assert stream.wait_for_fill(str(TRACKED_ORDERS_LIMIT + 49), timeout=0) is not None
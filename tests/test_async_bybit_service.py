@@ -0,0 +1,118 @@
+import asyncio
+import hashlib
+import hmac
+import time
+
+import pytest
+from aiohttp import web
+
+from app.services.async_bybit_service import AsyncBybitService, SyncBybitFacade
+from app.services.bybit_service import BybitService
+from app.utils.candle_store import CandleStore, interval_to_ms
+
+STEP = interval_to_ms("5")
+
+
+class FakeBybitServer:
+    """Локальный REST-сервер с нужными эндпоинтами v5"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.signatures = []
+
+    async def kline(self, request):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.05)
+        self.in_flight -= 1
+
+        params = request.query
+        end = int(params["end"])
+        start = int(params["start"])
+        items = [
+            [str(ts), "1", "2", "0.5", "1.5", "10", "0"]
+            for ts in range(start - start % STEP, end + 1, STEP) if ts >= start
+        ]
+        return web.json_response({"retCode": 0, "result": {"list": items[::-1]}})
+
+    async def wallet(self, request):
+        self.signatures.append(
+            (request.headers.get("X-BAPI-SIGN"), request.headers.get("X-BAPI-TIMESTAMP"), request.query_string)
+        )
+        return web.json_response({
+            "retCode": 0,
+            "result": {"list": [{"coin": [{"coin": "USDT", "walletBalance": "42.5"}]}]},
+        })
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get("/v5/market/kline", self.kline)
+        app.router.add_get("/v5/account/wallet-balance", self.wallet)
+        return app
+
+
+@pytest.fixture
+def facade(tmp_path):
+    server = FakeBybitServer()
+    bybit = BybitService(api_key="key", api_secret="secret",
+                         candle_store=CandleStore(base_dir=str(tmp_path / "candles")))
+    facade = SyncBybitFacade(AsyncBybitService(bybit))
+
+    async def start():
+        runner = web.AppRunner(server.app())
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        return runner, runner.addresses[0][1]
+
+    runner, port = facade.run(start())
+    # История глубже окна догружается синхронным HistoryLoader - тоже с сервера стенда
+    facade.service.base_url = bybit.base_url = f"http://127.0.0.1:{port}"
+    facade.server = server
+    yield facade
+    facade.run(runner.cleanup())
+    facade.close()
+
+
+def test_candles_for_many_symbols_in_one_loop(facade):
+    """Свечи по нескольким монетам запрашиваются одновременно в одном цикле событий"""
+    symbols = ["SOLUSDT", "ADAUSDT", "DOGEUSDT", "XRPUSDT"]
+    frames = facade.get_candles_many(symbols, "5", limit=50)
+
+    assert set(frames) == set(symbols)
+    for frame in frames.values():
+        assert len(frame) == 50
+        assert (frame.timestamp[1:] - frame.timestamp[:-1] == STEP).all()
+    assert facade.server.max_in_flight > 1
+
+    # Закрытые свечи сохранены - повторный запрос идет в кэш
+    assert facade.service.bybit.candle_store.count("SOLUSDT", "5") == 49
+
+
+def test_deep_window_is_backfilled_by_history_loader(facade):
+    """Окно глубже сохраненной истории догружается тем же HistoryLoader,
+    что и в синхронном клиенте, без дыр"""
+    frame = facade.get_candles("SOLUSDT", "5", limit=1500)
+
+    assert len(frame) == 1500
+    ts = facade.service.bybit.candle_store.read("SOLUSDT", "5")[:, 0]
+    assert len(ts) >= 1499
+    assert (ts[1:] - ts[:-1] == STEP).all()
+
+
+def test_signed_request_and_gather(facade):
+    """Приватные запросы подписываются, gather выполняет вызовы одновременно"""
+    balance, frame = facade.gather(
+        facade.service.get_balance("USDT"),
+        facade.service.get_candles("SOLUSDT", "5", limit=10),
+    )
+    assert balance == 42.5
+    assert len(frame) == 10
+
+    sign, timestamp, query = facade.server.signatures[0]
+    expected = hmac.new(
+        b"secret", f"{timestamp}key15000{query}".encode(), hashlib.sha256
+    ).hexdigest()
+    assert sign == expected
+    assert abs(int(timestamp) - time.time() * 1000) < 60_000
@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+
+from app.backtest import Backtester, SimulatedExchange, SimulatedOrderExecutor
+from app.backtest.crossover import CrossoverStrategy, crossover_backtest
+from app.backtest.engine import hourly_trend_series
+from app.indicators.streaming import IndicatorEngine, StreamingEMA
+from app.utils.candle_frame import CandleFrame
+from tests.helpers import liquid_frame, random_frame
+
+
+def test_round_trip_costs():
+    """Покупка и продажа по одной цене теряют две комиссии и проскальзывание"""
+    frame = random_frame(10)
+    exchange = SimulatedExchange({"BTCUSDT": frame}, fee=0.0018, slippage=0.001, qty_precision=8)
+    executor = SimulatedOrderExecutor("BTCUSDT", exchange)
+    exchange.cursor = 5
+
+    assert executor.execute_buy()
+    assert executor.last_buy_price == pytest.approx(frame.close[5] * 1.001)
+    assert executor.execute_sell()
+    expected = 99.9 * (1 - 0.0018) ** 2 * 0.999 / 1.001 + 0.1
+    assert exchange.get_balance("USDT") == pytest.approx(expected, rel=1e-6)
+    assert exchange.get_balance("BTC") == 0
+
+
+def test_min_order_is_rejected():
+    """Ордер меньше минимальной суммы биржа отклоняет"""
+    exchange = SimulatedExchange({"BTCUSDT": random_frame(10)}, balance_usdt=4)
+    response = exchange.market_order("BTCUSDT", "Buy", 4, is_quote=True)
+    assert response["retCode"] != 0
+    assert exchange.get_balance("USDT") == 4
+    assert not SimulatedOrderExecutor("BTCUSDT", exchange).execute_buy()
+
+
+def test_ma_backtest_reports_trades():
+    """Прогон MA-ядра: сделки, комиссии и кривая капитала согласованы"""
+    frame = liquid_frame(6_000)
+    result = Backtester().run_ma("BTCUSDT", frame, min_risk_reward_ratio=2.0)
+
+    assert result.bars == 5_500
+    assert result.trades
+    assert result.fees > 0
+    assert 0 < result.max_drawdown_pct < 100
+    # Все позиции закрыты: итог равен сумме сделок
+    assert result.orders == 2 * len(result.trades)
+    assert result.pnl == pytest.approx(sum(trade.pnl for trade in result.trades), abs=1e-6)
+    summary = result.summary()
+    assert summary["trades"] == len(result.trades)
+    assert 0 <= summary["win_rate"] <= 1
+
+
+def test_hourly_trend_matches_live_check():
+    """Тренд 30м в бэктесте совпадает с расчетом _check_hourly_trend"""
+    frame = random_frame(1_500, seed=3)
+    trend = hourly_trend_series(frame)
+    step = 1_800_000
+    buckets = frame.timestamp // step
+
+    for i in (400, 777, 1_499):
+        # 30-минутные свечи, как их отдала бы биржа в момент свечи i
+        ids = np.unique(buckets[:i + 1])
+        closes = [frame.close[:i + 1][buckets[:i + 1] == b][-1] for b in ids]
+        rows = np.array([[b * step, c, c, c, c, 1.0] for b, c in zip(ids, closes)])
+        engine = IndicatorEngine(step, short_ema=StreamingEMA(5), medium_ema=StreamingEMA(10))
+        half_hour = CandleFrame.from_rows(rows)
+        engine.sync(half_hour)
+        values = engine.peek(half_hour)
+        expected = int(np.sign(values["short_ema"] - values["medium_ema"]))
+        assert trend[i] == expected
+
+
+class ScriptedStrategy:
+    """Покупает и продает на заданных свечах"""
+
+    def __init__(self, exchange, actions):
+        self.bybit = exchange
+        self.actions = actions
+
+    def should_trade(self, candles):
+        return self.actions.get(self.bybit.cursor)
+
+    def execute_trade(self, action, executor):
+        if action == "BUY":
+            executor.execute_buy()
+        elif action == "SELL":
+            executor.execute_sell(strategy=self)
+
+
+def test_generic_strategy_run():
+    """Стратегия, работающая через сервис биржи, гоняется через тот же симулятор"""
+    frame = random_frame(300)
+    backtester = Backtester(slippage=0)
+    exchange = backtester.exchange({"ETHUSDT": frame})
+    strategy = ScriptedStrategy(exchange, {150: "BUY", 200: "SELL"})
+    result = backtester.run_strategy(strategy, "ETHUSDT", exchange)
+
+    assert len(result.trades) == 1
+    trade = result.trades[0]
+    assert trade.entry_price == pytest.approx(frame.close[150])
+    assert trade.exit_price == pytest.approx(frame.close[200])
+    assert result.final_equity == pytest.approx(100 + trade.pnl, abs=1e-3)
+
+
+@pytest.mark.parametrize("seed", [0, 3])
+def test_vectorized_crossover_matches_event_driven(seed):
+    """Векторный кроссовер и событийный прогон тех же правил дают одни сделки"""
+    frame = random_frame(4_000, seed=seed)
+    backtester = Backtester()
+    exchange = backtester.exchange({"XUSDT": frame})
+    strategy = CrossoverStrategy(exchange, "XUSDT", min_volume_ratio=0.5)
+    # Событийный путь видит историю с первой свечи, как и векторный
+    event = backtester.run_strategy(strategy, "XUSDT", exchange, start=backtester.window - 1)
+    fast = crossover_backtest("XUSDT", frame, backtester, min_volume_ratio=0.5)
+
+    assert len(fast.trades) > 10
+    assert [(t.entry_time, t.exit_time) for t in fast.trades] == \
+        [(t.entry_time, t.exit_time) for t in event.trades]
+    assert fast.orders == event.orders
+    assert fast.pnl == pytest.approx(event.pnl, abs=1e-9)
+    assert fast.fees == pytest.approx(event.fees, abs=1e-9)
+    assert fast.final_equity == pytest.approx(event.final_equity, abs=1e-9)
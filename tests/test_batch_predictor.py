@@ -0,0 +1,59 @@
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from app.strategies.neural_network.batch import BatchPredictor
+from app.strategies.neural_network.runtime import LSTMRuntime
+from tests.helpers import random_frame, write_model
+
+
+@pytest.fixture
+def models(tmp_path):
+    coins = [f"C{i}" for i in range(6)]
+    paths = {coin: write_model(tmp_path, coin, seed=i) for i, coin in enumerate(coins)}
+    return tmp_path, paths
+
+
+def test_batch_matches_single_models(models):
+    """Пакетный прогноз по всем монетам совпадает с прогнозом каждой модели отдельно"""
+    models_dir, paths = models
+    with patch("app.strategies.neural_network.batch.log_maker"):
+        batch = BatchPredictor.from_models(list(paths) + ["MISSING"], models_dir=str(models_dir))
+    assert batch.coins == list(paths)
+
+    windows = {coin: random_frame(40, seed=i).ohlcv() for i, coin in enumerate(paths)}
+    predictions = batch.predict(windows)
+    for coin, path in paths.items():
+        runtime = LSTMRuntime()
+        runtime.load(path)
+        np.testing.assert_allclose(predictions[coin], runtime.predict(windows[coin]), rtol=1e-5)
+
+    # Часть монет, другой порядок и короткое окно
+    subset = {"C4": windows["C4"], "C1": windows["C1"], "C2": windows["C2"][:10]}
+    partial = batch.predict(subset)
+    assert set(partial) == {"C4", "C1"}
+    np.testing.assert_allclose(partial["C4"], predictions["C4"], rtol=1e-6)
+    np.testing.assert_allclose(partial["C1"], predictions["C1"], rtol=1e-6)
+
+    # Изменение считается от живой цены, без нее - от последнего закрытия окна
+    changes = batch.expected_changes(windows, {"C0": 101.5})
+    for coin, base in (("C0", 101.5), ("C1", windows["C1"][-1, 3])):
+        steps = (predictions[coin] - base) / base * 100
+        assert changes[coin] == pytest.approx(steps[np.argmax(np.abs(steps))])
+
+    # Модель монеты поверх стопки - те же прогнозы без копии весов
+    view = batch.runtime("C3")
+    np.testing.assert_allclose(view.predict(windows["C3"]), predictions["C3"], rtol=1e-5)
+    assert all(np.shares_memory(a, b) for a, b in zip(view.layers[0][2], batch.layers[0][2]))
+
+
+def test_other_architecture_is_left_out(models):
+    """Модель другой формы не ломает стопку, а исключается из нее"""
+    models_dir, paths = models
+    write_model(models_dir, "ODD", seed=9, units=(64, 32))
+    with patch("app.strategies.neural_network.batch.log_maker") as log:
+        batch = BatchPredictor.from_models(list(paths) + ["ODD"], models_dir=str(models_dir))
+    assert "ODD" in log.call_args[0][0]
+    assert "ODD" not in batch.coins and len(batch.coins) == len(paths)
+    assert batch.predict({"ODD": random_frame(40).ohlcv()}) == {}
@@ -0,0 +1,132 @@
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from app.backtest.bybit_sim import BookExchange, BybitSimulator, resample, walk_book
+from app.services.market_stream import MarketStream
+from app.utils.candle_frame import CandleFrame
+from app.utils.candle_store import CandleStore, interval_to_ms
+from tests.helpers import liquid_frame, sim_bybit
+
+CURSOR = 300
+
+
+def aligned_frame(n: int, seed: int) -> CandleFrame:
+    """Свечи, начинающиеся на границе часа, как на бирже"""
+    data = liquid_frame(n, seed=seed).data.copy()
+    data[0] -= data[0, 0] % interval_to_ms("60")
+    return CandleFrame(data)
+
+
+def wait_until(condition, timeout: float = 5) -> bool:
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+@pytest.fixture
+def frames():
+    return {"AUSDT": aligned_frame(600, seed=1), "BUSDT": aligned_frame(600, seed=2)}
+
+
+@pytest.fixture
+def simulator(frames):
+    exchange = BookExchange(frames, balance_usdt=1_000)
+    exchange.cursor = CURSOR
+    with BybitSimulator(exchange, "3", api_key="key", api_secret="secret") as simulator:
+        yield simulator
+
+
+@pytest.fixture
+def bybit(simulator, tmp_path):
+    return sim_bybit(simulator, str(tmp_path / "candles"))
+
+
+def test_market_data_replays_candles(simulator, bybit, frames):
+    """Свечи, цены, стакан и инструменты - как их видела бы биржа в момент курсора"""
+    frame = frames["AUSDT"]
+    rows = bybit.fetch_klines("AUSDT", "3", limit=100)
+    np.testing.assert_allclose(rows, frame[CURSOR - 99:CURSOR + 1].to_rows())
+
+    # Старший интервал собирается из свечей стенда, последняя - незакрытая
+    quarter = bybit.fetch_klines("AUSDT", "15", limit=3)
+    np.testing.assert_allclose(quarter, resample(frame[:CURSOR + 1], interval_to_ms("15"))[-3:])
+    assert quarter[-1, 4] == frame.close[CURSOR]
+
+    assert bybit.get_price("AUSDT") == pytest.approx(frame.close[CURSOR])
+    bid, ask = bybit.get_best_bid_ask("AUSDT")
+    assert bid < frame.close[CURSOR] < ask
+    assert set(bybit.get_all_tickers()) == {"AUSDT", "BUSDT"}
+    assert bybit.get_qty_precision("AUSDT") == 4
+    assert bybit.get_min_order_qty("AUSDT") == 0.001
+
+    simulator.advance(5)
+    assert bybit.fetch_klines("AUSDT", "3", limit=1)[-1, 0] == frame.timestamp[CURSOR + 5]
+
+
+def test_signed_orders_fill_against_book(simulator, bybit, frames):
+    """Ордера проходят через pybit с проверкой подписи и исполняются по стакану"""
+    response = bybit.market_order("AUSDT", "Buy", 500, is_quote=True)
+    assert response["retCode"] == 0
+    filled = bybit.wait_for_fill("AUSDT", response["result"]["orderId"], timeout=1)
+    assert float(filled["avg_price"]) > frames["AUSDT"].close[CURSOR]
+    coins = bybit.get_balance("A")
+    assert coins == pytest.approx(float(filled["cumExecQty"]) * (1 - simulator.exchange.fee))
+
+    assert bybit.market_order("AUSDT", "Sell", coins)["retCode"] == 0
+    assert bybit.get_balance("A") == pytest.approx(0, abs=1e-9)
+    orders = bybit.get_filled_orders("AUSDT")
+    assert [o["side"] for o in orders] == ["Sell", "Buy"]
+    assert bybit.get_balance("USDT") < 1_000
+
+    # Запрос без подписи биржа отклоняет
+    unsigned = bybit.session.get(f"{simulator.url}/v5/account/wallet-balance",
+                                 params={"accountType": "UNIFIED"}).json()
+    assert unsigned["retCode"] == 10003
+
+
+def test_large_order_walks_the_book():
+    """Крупный ордер проходит несколько уровней и получает худшую цену"""
+    asks = [[100.0, 1.0], [100.1, 2.0], [100.2, 3.0]]
+    assert walk_book(asks, 0.5) == pytest.approx((0.5, 50.0))
+    qty, cost = walk_book(asks, 2.0)
+    assert cost / qty == pytest.approx(100.05)
+    # Остаток сверх глубины - по последнему уровню
+    qty, cost = walk_book(asks, 1_000.0, is_quote=True)
+    assert cost == pytest.approx(1_000.0)
+    assert qty == pytest.approx(1 + 2 + (1_000 - 100 - 200.2) / 100.2)
+
+
+def test_streams_follow_the_replay(simulator, bybit, frames, tmp_path):
+    """Публичный и приватный потоки идут за курсором и ордерами стенда"""
+    store = CandleStore(base_dir=str(tmp_path / "stream"))
+    # История до курсора уже загружена через REST
+    store.append("AUSDT", "3", frames["AUSDT"].to_rows()[:CURSOR])
+    market = MarketStream(url=simulator.ws_public_url, store=store)
+    with patch("app.services.account_stream.log_maker"):
+        market.start()
+        account = bybit.start_account_stream(simulator.ws_private_url)
+        try:
+            market.subscribe("AUSDT", "3")
+            assert account.ready.wait(5)
+            assert wait_until(lambda: market.get_price("AUSDT") is not None)
+            assert market.get_price("AUSDT") == pytest.approx(frames["AUSDT"].close[CURSOR])
+
+            # Свеча под курсором закрывается и попадает в хранилище
+            simulator.advance(1)
+            assert wait_until(lambda: store.last_timestamp("AUSDT", "3") == frames["AUSDT"].timestamp[CURSOR])
+            assert store.last_timestamp("AUSDT", "3") == frames["AUSDT"].timestamp[CURSOR]
+
+            # Исполнение приходит событием приватного потока
+            response = bybit.market_order("AUSDT", "Buy", 100, is_quote=True)
+            filled = account.wait_for_fill(response["result"]["orderId"], timeout=5)
+            assert filled is not None and filled["orderStatus"] == "Filled"
+            assert float(account.coin("A")["walletBalance"]) > 0
+        finally:
+            market.stop()
+            account.stop()
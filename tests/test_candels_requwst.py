@@ -1,17 +1,36 @@
-def test_candle_parsing():
-    from app.services.bybit_service import BybitService
-    sample_data = {
-        "retCode": 0,
-        "result": {
-            "list": [
-                ["1751256300000", "151.89", "151.94", "151.89", "151.93", "140.796", "21388.29436"]
-            ]
-        }
-    }
-    
-    bybit = BybitService()
-    # Метод для тестирования (сделайте parse_candles публичным для тестов)
-    candles = bybit.get_candles("SOLUSDT", 5, 1)  
-    
+import numpy as np
+import pytest
+
+from app.backtest.bybit_sim import BookExchange, BybitSimulator
+from tests.helpers import recent_frame, sim_bybit
+
+
+@pytest.fixture
+def frame():
+    return recent_frame(300, "5", seed=3)
+
+
+@pytest.fixture
+def bybit(frame, tmp_path):
+    exchange = BookExchange({"SOLUSDT": frame})
+    exchange.cursor = len(frame) - 1
+    with BybitSimulator(exchange, "5", api_key="key", api_secret="secret") as simulator:
+        yield sim_bybit(simulator, str(tmp_path / "candles"))
+
+
+def test_candle_parsing(bybit, frame):
+    """Ответ /v5/market/kline разбирается в свечи с объемом и временем стенда"""
+    candles = bybit.get_candles("SOLUSDT", "5", 1)
+
     assert len(candles) == 1
-    assert candles[0]["volume"] == 140.796
\ No newline at end of file
+    assert candles[0]["timestamp"] == frame.timestamp[-1]
+    assert candles[0]["volume"] == pytest.approx(frame.volume[-1])
+
+
+def test_window_matches_replay(bybit, frame):
+    """Окно свечей - закрытые из хранилища и текущая, без пропусков"""
+    candles = bybit.get_candles("SOLUSDT", "5", 120)
+
+    assert len(candles) == 120
+    np.testing.assert_allclose(candles.to_rows(), frame[-120:].to_rows())
+    assert bybit.candle_store.count("SOLUSDT", "5") == 119
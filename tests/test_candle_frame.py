@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from app.utils.candle_frame import CandleFrame
+
+CANDLES = [
+    {"timestamp": 1000 * i, "open": 10.0 + i, "high": 11.0 + i, "low": 9.0 + i, "close": 10.5 + i, "volume": 100.0 * i}
+    for i in range(10)
+]
+
+
+def test_dict_compatibility():
+    """Фрейм ведет себя как список словарей для старого кода"""
+    frame = CandleFrame.from_candles(CANDLES)
+
+    assert len(frame) == 10
+    assert frame[-1] == CANDLES[-1]
+    assert frame[0]["volume"] == 0.0
+    assert [c["close"] for c in frame[-6:-1]] == [c["close"] for c in CANDLES[-6:-1]]
+    assert frame[-1].get("timestamp") == 9000
+    with pytest.raises(IndexError):
+        frame[10]
+
+
+def test_columns_are_contiguous_views():
+    """Колонки - непрерывные float64-массивы, срезы не копируют данные"""
+    frame = CandleFrame.from_rows(np.array([[c[k] for k in c] for c in CANDLES]))
+
+    tail = frame.tail(5)
+    assert tail.close.dtype == np.float64
+    assert tail.close.flags["C_CONTIGUOUS"]
+    assert np.shares_memory(tail.close, frame.close)
+    assert tail.close.tolist() == [c["close"] for c in CANDLES[-5:]]
+    assert frame.ohlcv().shape == (10, 5)
+
+
+def test_empty_frame_is_falsy():
+    """Пустой фрейм ведет себя как пустой список"""
+    assert not CandleFrame.from_candles([])
+    assert len(CandleFrame.from_candles(CANDLES).tail(0)) == 0
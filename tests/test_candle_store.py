@@ -0,0 +1,224 @@
+import time
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.services.bybit_service import BybitService
+from app.utils.candle_store import CandleStore, interval_to_ms
+from app.utils.history_loader import HistoryLoader
+
+STEP = interval_to_ms("5")
+
+
+def make_rows(start_ts: int, count: int, step: int = STEP) -> np.ndarray:
+    ts = start_ts + np.arange(count) * step
+    close = 100 + np.arange(count, dtype=float)
+    return np.column_stack([ts, close, close + 1, close - 1, close, np.full(count, 10.0)])
+
+
+class FakeKlineApi:
+    """Имитация /v5/market/kline: свечи с фиксированным шагом до текущего момента"""
+
+    def __init__(self, step: int = STEP, listed_at: int = 0, fail=None):
+        self.step = step
+        self.listed_at = listed_at
+        self.fail = fail  # fail(params) -> True: запрос завершается ошибкой
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append(dict(params))
+        if self.fail is not None and self.fail(params):
+            return MagicMock(status_code=400)
+        now_ms = int(time.time() * 1000)
+        end = min(params.get("end", now_ms), now_ms)
+        start = max(params.get("start", end - (params["limit"] - 1) * self.step), self.listed_at)
+        first = start - start % self.step
+        if first < start:
+            first += self.step
+        items = []
+        ts = first
+        while ts <= end:
+            price = ts / self.step % 1000
+            items.append([str(ts), str(price), str(price + 1), str(price - 1), str(price), "5", "0"])
+            ts += self.step
+        response = MagicMock(status_code=200)
+        response.json.return_value = {"retCode": 0, "result": {"list": items[::-1]}}
+        return response
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CandleStore(base_dir=str(tmp_path / "candles"))
+
+
+def test_append_only_newer(store):
+    """Дописываются только свечи новее последней сохраненной"""
+    assert store.append("SOLUSDT", "5", make_rows(0, 10)) == 10
+    assert store.append("SOLUSDT", "5", make_rows(5 * STEP, 10)) == 5
+    assert store.count("SOLUSDT", "5") == 15
+    assert store.last_timestamp("SOLUSDT", "5") == 14 * STEP
+
+    tail = store.tail("SOLUSDT", "5", 3)
+    assert tail[:, 0].tolist() == [12 * STEP, 13 * STEP, 14 * STEP]
+
+
+def test_write_merges_older_history(store):
+    """Запись более старых свечей объединяет историю без дубликатов"""
+    store.append("SOLUSDT", "5", make_rows(10 * STEP, 5))
+    assert store.write("SOLUSDT", "5", make_rows(0, 12)) == 15
+    ts = store.read("SOLUSDT", "5")[:, 0]
+    assert np.all(np.diff(ts) == STEP)
+    assert store.first_timestamp("SOLUSDT", "5") == 0
+
+
+def test_partial_record_is_ignored(store):
+    """Недописанная запись в конце файла не ломает чтение и запись"""
+    store.append("SOLUSDT", "5", make_rows(0, 3))
+    with open(store.path("SOLUSDT", "5"), "ab") as f:
+        f.write(b"\x00" * 10)
+    assert store.count("SOLUSDT", "5") == 3
+    store.append("SOLUSDT", "5", make_rows(3 * STEP, 1))
+    assert store.read("SOLUSDT", "5")[:, 0].tolist() == [0, STEP, 2 * STEP, 3 * STEP]
+
+
+def test_get_candles_fetches_only_new(store):
+    """Повторный запрос после перезапуска догружает только новые свечи"""
+    api = FakeKlineApi()
+    bybit = BybitService(candle_store=store)
+    with patch.object(bybit.session, "get", side_effect=api.get):
+        candles = bybit.get_candles("SOLUSDT", "5", limit=200)
+
+    assert len(candles) == 200
+    assert np.all(np.diff([c["timestamp"] for c in candles]) == STEP)
+    assert store.count("SOLUSDT", "5") == 199
+
+    # Новый экземпляр сервиса (как после перезапуска) читает историю с диска
+    restarted = BybitService(candle_store=store)
+    api.calls.clear()
+    with patch.object(restarted.session, "get", side_effect=api.get):
+        candles = restarted.get_candles("SOLUSDT", "5", limit=50)
+
+    assert len(candles) == 50
+    assert len(api.calls) == 1
+    assert api.calls[0]["start"] >= store.last_timestamp("SOLUSDT", "5")
+
+
+def test_get_candles_fills_gap_after_long_downtime(store):
+    """Простой дольше окна не оставляет дыры между старой историей и новыми свечами"""
+    now_ms = int(time.time() * 1000)
+    current_open = now_ms - now_ms % STEP
+    store.append("SOLUSDT", "5", make_rows(current_open - 3000 * STEP, 500))
+
+    api = FakeKlineApi()
+    bybit = BybitService(candle_store=store)
+    with patch.object(bybit.session, "get", side_effect=api.get):
+        candles = bybit.get_candles("SOLUSDT", "5", limit=50)
+
+    assert len(candles) == 50
+    ts = store.read("SOLUSDT", "5")[:, 0]
+    assert ts[0] == current_open - 3000 * STEP
+    assert np.all(np.diff(ts) == STEP)
+
+
+def test_get_candles_serves_from_cache_until_candle_closes(store):
+    """Пока текущая свеча не закрыта, другой limit отдается без запросов"""
+    api = FakeKlineApi()
+    bybit = BybitService(candle_store=store)
+    with patch.object(bybit.session, "get", side_effect=api.get):
+        bybit.get_candles("SOLUSDT", "5", limit=100)
+        calls = len(api.calls)
+        candles = bybit.get_candles("SOLUSDT", "5", limit=30)
+
+    assert len(candles) == 30
+    if time.time() * 1000 < candles[-1]["timestamp"] + STEP:
+        assert len(api.calls) == calls
+
+
+def test_history_loader_pages_backwards(store):
+    """Глубокая история грузится страницами назад, дубликатов и дыр нет"""
+    api = FakeKlineApi()
+    bybit = BybitService(candle_store=store)
+    loader = HistoryLoader(bybit, store, max_workers=4)
+    with patch.object(bybit.session, "get", side_effect=api.get):
+        count = loader.load("SOLUSDT", "5", bars=3500)
+
+    assert count == 3500
+    assert len(api.calls) == 4
+    assert all("end" in call for call in api.calls)
+    ts = store.read("SOLUSDT", "5")[:, 0]
+    assert np.all(np.diff(ts) == STEP)
+
+    # Повторная загрузка с большей глубиной запрашивает только недостающее
+    api.calls.clear()
+    with patch.object(bybit.session, "get", side_effect=api.get):
+        count = loader.load("SOLUSDT", "5", bars=4000)
+    assert count >= 4000
+    assert len(api.calls) <= 2
+
+
+def test_history_loader_stops_at_listing(store):
+    """Загрузка останавливается на начале торгов по монете"""
+    now_ms = int(time.time() * 1000)
+    api = FakeKlineApi(listed_at=now_ms - 1500 * STEP)
+    bybit = BybitService(candle_store=store)
+    loader = HistoryLoader(bybit, store, max_workers=2)
+    with patch.object(bybit.session, "get", side_effect=api.get):
+        count = loader.load("SOLUSDT", "5", bars=10000)
+
+    assert 1498 <= count <= 1500
+    assert len(api.calls) <= 4
+
+
+def test_history_loader_keeps_only_contiguous_pages(store):
+    """После неудачной страницы записывается только часть, примыкающая к
+    сохраненным свечам, а загрузка сообщает об ошибке"""
+    now_ms = int(time.time() * 1000)
+    last_closed = now_ms - now_ms % STEP - STEP
+    # Вторая с конца страница не загружается
+    api = FakeKlineApi(fail=lambda p: last_closed - 1500 * STEP < p["end"] < last_closed - 500 * STEP)
+    bybit = BybitService(candle_store=store)
+    loader = HistoryLoader(bybit, store, max_workers=4)
+    with patch.object(bybit.session, "get", side_effect=api.get):
+        assert loader.load("SOLUSDT", "5", bars=3500) is None
+
+    ts = store.read("SOLUSDT", "5")[:, 0]
+    assert len(ts) == 1000
+    assert ts[-1] == last_closed
+    assert np.all(np.diff(ts) == STEP)
+
+    # Свечи новее сохраненных без первой страницы пропуска не записываются
+    gap_store = CandleStore(base_dir=store.base_dir + "_gap")
+    gap_store.append("SOLUSDT", "5", make_rows(last_closed - 2500 * STEP, 10))
+    api = FakeKlineApi(fail=lambda p: p["end"] == last_closed)
+    loader = HistoryLoader(bybit, gap_store, max_workers=4)
+    with patch.object(bybit.session, "get", side_effect=api.get):
+        assert loader.load("SOLUSDT", "5", start=last_closed - 2490 * STEP) is None
+    assert gap_store.count("SOLUSDT", "5") == 10
+
+
+def test_training_does_not_write_shared_store(store, tmp_path):
+    """Обучение берет сохраненные свечи из общего хранилища, а недостающую
+    историю догружает во временное - общий файл не меняется"""
+    from app.strategies.neural_network import trainer
+
+    now_ms = int(time.time() * 1000)
+    last_closed = now_ms - now_ms % STEP - STEP
+    store.append("SOLUSDT", "5", make_rows(last_closed - 99 * STEP, 100))
+    with open(store.path("SOLUSDT", "5"), "rb") as f:
+        shared = f.read()
+
+    api = FakeKlineApi()
+    bybit = BybitService(candle_store=store)
+    predictor = MagicMock()
+    predictor.return_value.train.return_value.history = {"loss": [0.5]}
+    with patch.object(bybit.session, "get", side_effect=api.get), \
+            patch("app.services.bybit_service.get_bybit_service", return_value=bybit), \
+            patch.object(trainer, "NeuralPredictor", predictor):
+        result = trainer.train("SOLUSDT", "5", epochs=1, days=5,
+                               model_path=str(tmp_path / "SOL_neural_model.keras"))
+
+    assert result["candles"] >= 5 * 288
+    candles = predictor.return_value.prepare_data.call_args[0][0]
+    assert candles[-1]["close"] == 100 + 99  # последняя свеча - из общего хранилища
+    with open(store.path("SOLUSDT", "5"), "rb") as f:
+        assert f.read() == shared
@@ -1,5 +1,6 @@
 import pytest
 from app.services.coin_selector import CoinSelector
+from app.utils.candle_frame import CandleFrame
 from unittest.mock import MagicMock, patch
 import numpy as np
 import random
@@ -128,7 +129,8 @@ def test_normalization(coin_selector):
     # Ожидаемая оценка будет близка к 1.0
     expected_score = 0.95
     
-    with patch.object(coin_selector, 'calculate_metrics', return_value=metrics):
+    all_metrics = {coin: metrics for coin in coin_selector.coin_list}
+    with patch.object(coin_selector, 'calculate_metrics_many', return_value=all_metrics):
         scores = coin_selector.evaluate_coins()
         
         assert scores[0][1] == pytest.approx(expected_score, abs=0.05)
@@ -148,4 +150,18 @@ def test_coin_with_insufficient_data(coin_selector):
         
         # Только DOGE должен быть в списке
         assert len(scores) == 1
-        assert scores[0][0] == "DOGE"
\ No newline at end of file
+        assert scores[0][0] == "DOGE"
+
+def test_batch_scoring_matches_single_coin(coin_selector):
+    """Пакетный расчет дает те же метрики и оценки, что и по одной монете"""
+    frames = {
+        "SOL": CandleFrame.from_candles(MOCK_CANDLES_SOL),
+        "ADA": CandleFrame.from_candles(MOCK_CANDLES_ADA),
+        "DOGE": CandleFrame.from_candles(MOCK_CANDLES_DOGE),
+    }
+    batch = coin_selector.metrics_from_frames(frames)
+    for coin, frame in frames.items():
+        single = coin_selector.metrics_from_frames({coin: frame})[coin]
+        assert batch[coin] == pytest.approx(single)
+        assert batch[coin]['volatility'] == pytest.approx(coin_selector.calculate_volatility(frame.close))
+
@@ -0,0 +1,66 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services.coin_rotator import CoinRotator
+from app.services.forecast_service import ForecastService
+from app.strategies.neural_network.registry import ModelRegistry
+from tests.helpers import random_frame, write_model
+
+
+class FakeBybit:
+    """Свечи и цены монет без сети"""
+
+    def __init__(self):
+        self.candle_calls = 0
+
+    def get_candles(self, symbol, interval, limit=100):
+        self.candle_calls += 1
+        return random_frame(40, seed=len(symbol)).tail(limit)
+
+    def get_prices(self, symbols):
+        return {symbol: 100.0 for symbol in symbols}
+
+
+@pytest.fixture
+def service(tmp_path):
+    for i, coin in enumerate(["A", "BB", "CCC"]):
+        write_model(tmp_path, coin, seed=i)
+    registry = ModelRegistry(str(tmp_path))
+    with patch("app.strategies.neural_network.registry.log_maker"):
+        yield ForecastService(["A", "BB", "CCC", "NOMODEL"], registry=registry, bybit=FakeBybit())
+
+
+def test_refresh_once_per_candle(service):
+    """Прогноз по всем монетам с моделями считается один раз на свечу от живой цены"""
+    changes = service.refresh()
+    assert set(changes) == {"A", "BB", "CCC"}
+    assert service.bybit.candle_calls == 3
+
+    batch = service.registry.batch(service.coins)
+    window = random_frame(40, seed=len("AUSDT")).tail(batch.sequence_length).ohlcv()
+    assert changes["A"] == pytest.approx(batch.expected_changes({"A": window}, {"A": 100.0})["A"])
+
+    assert service.refresh() == changes
+    assert service.bybit.candle_calls == 3
+    assert service.expected_changes() == changes
+
+
+def test_rotator_prefers_expected_growth():
+    """Ротатор выбирает кандидата с наибольшим ожидаемым ростом, а без
+    роста - лучшую монету ранкера"""
+    forecasts = MagicMock()
+    trading_system = MagicMock(position_open_time=0, state={"current_coin": "A", "last_rotation_time": 0})
+    trading_system.strategy.interval = 5
+    with patch("app.services.coin_rotator.CoinRanker") as ranker, \
+            patch("app.services.coin_rotator.CoinSelector") as selector:
+        ranker.return_value.get_best_coins.return_value = ["B", "C"]
+        selector.return_value.evaluate_coins.return_value = [("D", 0.9)]
+        rotator = CoinRotator(["A", "B", "C", "D"], trading_system, forecasts=forecasts)
+
+        forecasts.expected_changes.return_value = {"B": 0.1, "D": 0.8, "A": 2.0}
+        assert rotator.rotate_coins() == "D"
+
+        trading_system.state["last_rotation_time"] = 0
+        forecasts.expected_changes.return_value = {"B": -0.5, "D": -0.1}
+        assert rotator.rotate_coins() == "B"
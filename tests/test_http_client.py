@@ -0,0 +1,21 @@
+from app.services.bybit_service import get_bybit_service
+from app.services.http_client import RateLimitedAdapter, get_http_session
+
+
+def test_single_transport_is_shared():
+    """Все клиенты Bybit в процессе используют одну пул-сессию"""
+    bybit = get_bybit_service()
+    assert get_bybit_service() is bybit
+    assert bybit.session is get_http_session()
+    assert bybit.client.client is bybit.session
+    assert bybit.ccxt_exchange.session is bybit.session
+    assert bybit.session.get_adapter("https://api.bybit.com")._pool_maxsize >= 4
+
+
+def test_bybit_requests_go_through_limiter():
+    """Запросы к Bybit идут через общий ограничитель, свой лимит у ccxt выключен"""
+    bybit = get_bybit_service()
+    adapter = bybit.session.get_adapter("https://api.bybit.com/v5/market/kline")
+    assert isinstance(adapter, RateLimitedAdapter)
+    assert adapter.limiter is bybit.rate_limiter
+    assert not bybit.ccxt_exchange.enableRateLimit
@@ -0,0 +1,49 @@
+from unittest.mock import MagicMock
+
+from app.services.instrument_cache import InstrumentCache
+
+
+def make_session(symbols):
+    session = MagicMock()
+    response = MagicMock()
+    response.json.return_value = {
+        "retCode": 0,
+        "result": {
+            "list": [
+                {
+                    "symbol": symbol,
+                    "status": "Trading",
+                    "lotSizeFilter": {"basePrecision": "0.001", "minOrderQty": "0.05"},
+                    "priceFilter": {"tickSize": "0.01"},
+                }
+                for symbol in symbols
+            ]
+        },
+    }
+    session.get.return_value = response
+    return session
+
+
+def test_lookups_served_from_memory():
+    """Все инструменты загружаются одним запросом, дальше ответы из памяти"""
+    session = make_session(["SOLUSDT", "BTCUSDT"])
+    cache = InstrumentCache(session, ttl=3600)
+    cache.refresh()
+
+    for _ in range(10):
+        info = cache.get("SOLUSDT")
+    assert info["qty_precision"] == 3
+    assert info["price_precision"] == 2
+    assert info["min_order_qty"] == 0.05
+    assert session.get.call_count == 1
+
+
+def test_unknown_symbol_refresh_is_throttled():
+    """Неизвестный символ не вызывает запрос на каждом обращении"""
+    session = make_session(["SOLUSDT"])
+    cache = InstrumentCache(session, ttl=3600, retry_after=60)
+    cache.refresh()
+
+    assert cache.get("NEWUSDT") is None
+    assert cache.get("NEWUSDT") is None
+    assert session.get.call_count == 1
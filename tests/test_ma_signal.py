@@ -0,0 +1,80 @@
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from app.strategies.ma_signal import MASignalCore, Position
+from tests.helpers import random_frame
+
+NOW = 1_700_000_000.0
+
+
+def seeded_core(frame):
+    core = MASignalCore("BTCUSDT")
+    core.seed(frame)
+    return core
+
+
+def test_core_runs_without_exchange():
+    """Ядро считает сигнал только по переданным данным"""
+    frame = random_frame(300)
+    core = seeded_core(frame[:250])
+    actions = []
+    for end in range(251, 301):
+        window = frame[end - 100:end]
+        result = core.evaluate(window, float(window.close[-1]), Position(), balance_usdt=100, now=NOW)
+        actions.append(result.action)
+        assert result.messages
+
+    assert set(actions) <= {None, "BUY"}
+    assert core.trade_opportunities == 50
+    assert core.indicators.last_timestamp == frame[:299].timestamp[-1]
+
+
+def test_stop_loss_uses_snapshot():
+    """Выход по убытку определяется позицией и ценой, позиция не меняется ядром"""
+    frame = random_frame(200)
+    core = seeded_core(frame[:199])
+    price = float(frame.close[-1])
+    position = Position(qty=1.0, avg_buy_price=price * 1.02, last_action="BUY",
+                        last_trade_time=NOW - 2 * 3600)
+
+    result = core.evaluate(frame[-100:], price, position, now=NOW)
+
+    assert result.action == "SELL"
+    assert "[TIME EXIT]" in result.messages[-1]
+    assert result.diagnostics["unrealized_pnl_pct"] < 0
+    assert position.qty == 1.0
+
+
+def test_short_frame_is_skipped():
+    """Меньше 50 свечей - сигнала нет"""
+    core = MASignalCore("BTCUSDT")
+    result = core.evaluate(random_frame(30), 100.0, Position())
+    assert result.action is None
+    assert "Недостаточно данных" in result.messages[0]
+
+
+def test_strategy_delegates_to_core():
+    """Стратегия загружает данные заранее и отдает решение ядру"""
+    from app.strategies.ma_crossover import MovingAverageStrategy
+
+    frame = random_frame(300)
+    bybit = MagicMock()
+    bybit.get_candles.side_effect = lambda symbol, interval, limit: (
+        frame[:250].to_dicts() if interval == "3" else []
+    )
+    bybit.get_balance.return_value = 0.0
+    bybit.get_filled_orders.return_value = []
+    bybit.get_qty_precision.return_value = 2
+    bybit.validate_price.return_value = True
+    bybit.get_price.return_value = float(frame.close[-1])
+
+    with patch("app.strategies.ma_crossover.get_bybit_service", return_value=bybit), \
+            patch("app.strategies.ma_crossover.log_maker"):
+        strategy = MovingAverageStrategy("BTCUSDT")
+        strategy.should_trade(frame[200:300])
+
+    assert strategy.core.trade_opportunities == 1
+    assert strategy.prev_short_ema == strategy.core.prev_short_ema
+    assert np.isfinite(strategy.current_atr)
+    assert set(strategy.profiler.snapshot()["phases"]) >= {"price", "sizing", "trend", "indicators", "filters"}
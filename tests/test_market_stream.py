@@ -0,0 +1,152 @@
+import base64
+import hashlib
+import json
+import socket
+import struct
+import threading
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from app.services.bybit_service import BybitService
+from app.services.market_stream import MarketStream
+from app.utils.candle_store import CandleStore, interval_to_ms
+
+STEP = interval_to_ms("5")
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+class LocalWebSocketServer:
+    """Минимальный WebSocket-сервер вместо биржи: после подписки отправляет
+    заранее заданные сообщения"""
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.received = []
+        self.sock = socket.socket()
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(1)
+        self.url = f"ws://127.0.0.1:{self.sock.getsockname()[1]}"
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        conn, _ = self.sock.accept()
+        request = b""
+        while b"\r\n\r\n" not in request:
+            request += conn.recv(4096)
+        key = next(
+            line.split(":", 1)[1].strip()
+            for line in request.decode().split("\r\n")
+            if line.lower().startswith("sec-websocket-key")
+        )
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        conn.sendall(
+            b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+            b"Connection: Upgrade\r\nSec-WebSocket-Accept: " + accept.encode() + b"\r\n\r\n"
+        )
+        self.received.append(json.loads(self._read_frame(conn)))
+        for message in self.messages:
+            self._send_frame(conn, json.dumps(message).encode())
+        time.sleep(1)
+        conn.close()
+
+    def _read_frame(self, conn) -> bytes:
+        header = conn.recv(2)
+        length = header[1] & 0x7F
+        if length == 126:
+            length = struct.unpack(">H", conn.recv(2))[0]
+        mask = conn.recv(4)
+        payload = b""
+        while len(payload) < length:
+            payload += conn.recv(length - len(payload))
+        return bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+    def _send_frame(self, conn, payload: bytes):
+        if len(payload) < 126:
+            header = bytes([0x81, len(payload)])
+        else:
+            header = bytes([0x81, 126]) + struct.pack(">H", len(payload))
+        conn.sendall(header + payload)
+
+
+def kline(start: int, close: float, confirm: bool) -> dict:
+    bar = {
+        "start": start, "open": "100", "high": "102", "low": "99",
+        "close": str(close), "volume": "5", "confirm": confirm,
+    }
+    return {"topic": "kline.5.SOLUSDT", "type": "snapshot", "data": [bar]}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CandleStore(base_dir=str(tmp_path / "candles"))
+
+
+def test_stream_feeds_store_and_prices(store):
+    """Поток подписывается, пишет закрытые свечи в хранилище и отдает цену без REST"""
+    now_ms = int(time.time() * 1000)
+    current_open = now_ms - now_ms % STEP
+    previous_open = current_open - STEP
+    store.append("SOLUSDT", "5", np.array([[previous_open - STEP, 1, 1, 1, 1, 1]]))
+
+    server = LocalWebSocketServer([
+        {"success": True, "op": "subscribe"},
+        kline(previous_open, 101, confirm=True),
+        kline(current_open, 101.5, confirm=False),
+        {"topic": "tickers.SOLUSDT", "data": {"symbol": "SOLUSDT", "lastPrice": "101.5"}},
+        {"topic": "orderbook.1.SOLUSDT", "data": {"s": "SOLUSDT", "b": [["101.4", "3"]], "a": [["101.6", "2"]]}},
+    ])
+    stream = MarketStream(url=server.url, store=store)
+    stream.subscribe("SOLUSDT", "5")
+    stream.start()
+    try:
+        assert stream.wait_for_close("SOLUSDT", "5", timeout=5)
+        deadline = time.time() + 5
+        while stream.get_best_bid_ask("SOLUSDT") is None and time.time() < deadline:
+            time.sleep(0.05)
+
+        assert set(server.received[0]["args"]) == {
+            "kline.5.SOLUSDT", "tickers.SOLUSDT", "orderbook.1.SOLUSDT"
+        }
+        assert store.last_timestamp("SOLUSDT", "5") == previous_open
+        assert stream.forming_candle("SOLUSDT", "5")[4] == 101.5
+        assert stream.get_best_bid_ask("SOLUSDT") == (101.4, 101.6)
+
+        bybit = BybitService(candle_store=store)
+        bybit.market_stream = stream
+        with patch.object(bybit.session, "get", side_effect=AssertionError("REST не нужен")):
+            assert bybit.get_price("SOLUSDT") == 101.5
+    finally:
+        stream.stop()
+
+
+def test_forming_candle_requires_contiguous_history(store):
+    """При разрыве истории свеча из потока не используется - догрузит REST"""
+    now_ms = int(time.time() * 1000)
+    current_open = now_ms - now_ms % STEP
+    stream = MarketStream(store=store)
+    stream.connected.set()
+    stream.handle_message(json.dumps(kline(current_open, 100, confirm=False)))
+
+    store.append("SOLUSDT", "5", np.array([[current_open - 5 * STEP, 1, 1, 1, 1, 1]]))
+    assert stream.forming_candle("SOLUSDT", "5") is None
+
+    store.append("SOLUSDT", "5", np.array([[current_open - STEP, 1, 1, 1, 1, 1]]))
+    assert stream.forming_candle("SOLUSDT", "5") is not None
+
+
+def test_confirmed_bar_after_gap_is_not_appended(store):
+    """Закрытая свеча после пропуска не дописывается - иначе в истории дыра"""
+    now_ms = int(time.time() * 1000)
+    current_open = now_ms - now_ms % STEP
+    store.append("SOLUSDT", "5", np.array([[current_open - 5 * STEP, 1, 1, 1, 1, 1]]))
+    stream = MarketStream(store=store)
+    stream.connected.set()
+
+    stream.handle_message(json.dumps(kline(current_open - STEP, 100, confirm=True)))
+    assert store.last_timestamp("SOLUSDT", "5") == current_open - 5 * STEP
+
+    stream.handle_message(json.dumps(kline(current_open - 4 * STEP, 100, confirm=True)))
+    assert store.last_timestamp("SOLUSDT", "5") == current_open - 4 * STEP
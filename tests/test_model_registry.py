@@ -0,0 +1,125 @@
+import os
+import threading
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from app.strategies.neural_network.registry import ModelRegistry
+from app.strategies.neural_network.runtime import LSTMRuntime
+from tests.helpers import random_frame, write_model
+
+
+@pytest.fixture
+def models_dir(tmp_path):
+    for i, coin in enumerate(["A", "B", "C"]):
+        write_model(tmp_path, coin, seed=i)
+    (tmp_path / "A_neural_model.config").write_text('{"interval": "5"}')
+    (tmp_path / "C_neural_model.error").write_text("ошибка")
+    return tmp_path
+
+
+def test_index_and_lru(models_dir):
+    """Каталог индексируется один раз, модели грузятся лениво и вытесняются по LRU"""
+    registry = ModelRegistry(str(models_dir), capacity=2)
+    assert registry.info("A").interval == "5"
+    assert registry.info("C").has_error
+    assert registry.missing(["A", "B", "D"]) == ["D"]
+    assert registry.loaded() == []
+
+    a = registry.get("A")
+    assert registry.get("A") is a
+    registry.get("B")
+    registry.get("A")
+    registry.get("C")
+    assert registry.loaded() == ["A", "C"]
+    with pytest.raises(FileNotFoundError):
+        registry.get("D")
+
+
+def test_newer_model_is_swapped_in(models_dir):
+    """Модель, перезаписанная тренером, подменяется при следующем обращении"""
+    registry = ModelRegistry(str(models_dir))
+    window = random_frame(40).ohlcv()
+    old = registry.get("A").predict(window)
+
+    path = write_model(models_dir, "A", seed=42)
+    stamp = registry.info("A").version + 10
+    os.utime(f"{path}_weights.npz", (stamp, stamp))
+    with patch("app.strategies.neural_network.registry.log_maker"):
+        swapped = registry.get("A")
+    assert registry.info("A").version == stamp
+    assert not np.allclose(swapped.predict(window), old)
+
+    # Удаленная модель уходит из индекса и из памяти
+    os.remove(f"{path}_weights.npz")
+    registry.update("A")
+    assert not registry.has_model("A") and "A" not in registry.loaded()
+
+
+def test_keras_without_weights_is_not_loaded(models_dir):
+    """Модель без выгруженных весов недоступна - конвертации в торговом процессе нет"""
+    (models_dir / "D_neural_model.keras").write_bytes(b"keras")
+    (models_dir / "D_neural_model_scaler.npz").write_bytes(b"scaler")
+    registry = ModelRegistry(str(models_dir))
+    assert registry.missing(["A", "D"]) == ["D"]
+    with pytest.raises(FileNotFoundError):
+        registry.get("D")
+
+
+def test_loading_does_not_block_other_coins(models_dir):
+    """Пока одна модель читается с диска, загруженные модели отдаются без ожидания"""
+    registry = ModelRegistry(str(models_dir))
+    b = registry.get("B")
+    started, release = threading.Event(), threading.Event()
+    original = LSTMRuntime.load
+
+    def slow_load(runtime, path):
+        started.set()
+        release.wait(5)
+        original(runtime, path)
+
+    with patch.object(LSTMRuntime, "load", slow_load):
+        loader = threading.Thread(target=registry.get, args=("A",))
+        loader.start()
+        assert started.wait(5)
+        assert registry.get("B") is b
+        release.set()
+        loader.join(5)
+    assert "A" in registry.loaded()
+
+
+def test_batch_shares_weights_with_get(models_dir):
+    """Пакетный предиктор собирается из моделей в памяти, get отдает срезы
+    стопки, а новая версия модели пересобирает стопку с одной загрузкой"""
+    registry = ModelRegistry(str(models_dir), capacity=1)
+    b = registry.get("B")
+    loads = []
+    original = LSTMRuntime.load
+
+    def counting_load(runtime, path):
+        loads.append(os.path.basename(path))
+        original(runtime, path)
+
+    coins = ["A", "B", "C", "D"]
+    with patch.object(LSTMRuntime, "load", counting_load), \
+            patch("app.strategies.neural_network.registry.log_maker"):
+        batch = registry.batch(coins)
+        assert sorted(loads) == ["A_neural_model", "C_neural_model"]
+        assert batch.coins == ["A", "B", "C"]
+        assert registry.batch(coins) is batch
+
+        window = random_frame(40).ohlcv()
+        a = registry.get("A")
+        assert len(loads) == 2
+        assert np.shares_memory(a.layers[0][2][0], batch.layers[0][2][0])
+        np.testing.assert_allclose(a.predict(window), batch.predict({"A": window})["A"], rtol=1e-5)
+        assert registry.get("B") is not b  # копия B заменена срезом стопки
+        np.testing.assert_allclose(registry.get("B").predict(window), b.predict(window), rtol=1e-5)
+
+        path = write_model(models_dir, "A", seed=42)
+        stamp = registry.info("A").version + 10
+        os.utime(f"{path}_weights.npz", (stamp, stamp))
+        rebuilt = registry.batch(coins)
+    assert rebuilt is not batch and len(loads) == 3
+    assert not np.allclose(rebuilt.predict({"A": window})["A"], batch.predict({"A": window})["A"])
@@ -0,0 +1,50 @@
+import os
+
+import numpy as np
+import pytest
+
+from app.strategies.neural_network.runtime import LSTMRuntime, convert, weights_path
+from tests.helpers import random_frame
+
+pytest.importorskip("tensorflow")
+from app.strategies.neural_network.model import NeuralPredictor  # noqa: E402
+
+
+@pytest.fixture
+def trained(tmp_path):
+    """Необученная модель со скалером по случайным свечам, сохраненная на диск"""
+    frame = random_frame(200, seed=5)
+    predictor = NeuralPredictor(sequence_length=30, prediction_steps=3)
+    predictor.prepare_data(frame)
+    path = str(tmp_path / "TEST_neural_model")
+    predictor.save(path)
+    return predictor, path, frame.ohlcv()
+
+
+def test_runtime_matches_keras(trained):
+    """NumPy-прогноз совпадает с model.predict Keras"""
+    predictor, path, data = trained
+    runtime = LSTMRuntime()
+    runtime.load(path)
+
+    assert runtime.sequence_length == 30 and runtime.prediction_steps == 3
+    for end in (30, 120, 200):
+        np.testing.assert_allclose(runtime.predict(data[:end]), predictor.predict(data[:end]), rtol=1e-5)
+    with pytest.raises(ValueError):
+        runtime.predict(data[:10])
+
+
+def test_trading_path_never_converts(trained):
+    """Без выгруженных весов модель не загружается: TensorFlow в торговом
+    процессе не нужен, .keras конвертируется только явно"""
+    predictor, path, data = trained
+    assert not [name for name in os.listdir(os.path.dirname(path)) if ".tmp" in name]
+
+    os.remove(weights_path(path))
+    with pytest.raises(FileNotFoundError):
+        LSTMRuntime().load(f"{path}.keras")
+
+    convert(path)
+    runtime = LSTMRuntime()
+    runtime.load(path)
+    np.testing.assert_allclose(runtime.predict(data), predictor.predict(data), rtol=1e-5)
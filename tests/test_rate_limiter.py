@@ -0,0 +1,91 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.services.http_client import create_session
+from app.services.rate_limiter import RateLimiter, TokenBucket, endpoint_group
+
+
+def test_endpoint_groups():
+    """Пути раскладываются по группам лимитов Bybit"""
+    assert endpoint_group("/v5/market/kline") == "market"
+    assert endpoint_group("/v5/order/create") == "trade"
+    assert endpoint_group("/v5/order/history") == "order"
+    assert endpoint_group("/v5/account/transaction-log") == "account"
+    assert endpoint_group("/unknown") == "default"
+
+
+def test_bucket_queues_requests():
+    """Запросы сверх пачки получают ожидание своей очереди"""
+    bucket = TokenBucket(rate=10.0, capacity=2)
+    waits = [bucket.reserve() for _ in range(4)]
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] == pytest.approx(0.1, abs=0.01)
+    assert waits[3] == pytest.approx(0.2, abs=0.01)
+
+
+def test_exhausted_limit_waits_for_reset():
+    """Нулевой X-Bapi-Limit-Status блокирует группу до времени сброса"""
+    limiter = RateLimiter()
+    reset_ms = int((time.time() + 0.3) * 1000)
+    limiter.observe("/v5/market/kline", 200, {
+        "X-Bapi-Limit-Status": "0",
+        "X-Bapi-Limit": "600",
+        "X-Bapi-Limit-Reset-Timestamp": str(reset_ms),
+    })
+
+    started = time.monotonic()
+    limiter.acquire("/v5/market/tickers")
+    assert time.monotonic() - started >= 0.25
+    # Другие группы не затронуты
+    started = time.monotonic()
+    limiter.acquire("/v5/account/wallet-balance")
+    assert time.monotonic() - started < 0.05
+
+    stats = limiter.stats()["market"]
+    assert stats["requests"] == 1
+    assert stats["queued"] == 1
+
+
+class LimitedHandler(BaseHTTPRequestHandler):
+    calls = []
+
+    def do_GET(self):
+        LimitedHandler.calls.append(time.monotonic())
+        first = len(LimitedHandler.calls) == 1
+        reset_ms = int((time.time() + 0.3) * 1000)
+        body = json.dumps({"retCode": 10006 if first else 0, "result": {}}).encode()
+        self.send_response(429 if first else 200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-Bapi-Limit-Status", "0" if first else "99")
+        self.send_header("X-Bapi-Limit-Reset-Timestamp", str(reset_ms))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_session_honours_limit_headers():
+    """Сессия ставит запрос в очередь до сброса лимита вместо слепого повтора"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LimitedHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    limiter = RateLimiter()
+    session = create_session(limiter=limiter, base_url=base_url)
+    try:
+        first = session.get(f"{base_url}/v5/market/kline")
+        assert first.status_code == 429
+        assert len(LimitedHandler.calls) == 1  # транспорт сам не повторяет
+
+        second = session.get(f"{base_url}/v5/market/kline")
+        assert second.status_code == 200
+        assert LimitedHandler.calls[1] - LimitedHandler.calls[0] >= 0.25
+        assert limiter.stats()["market"]["limited"] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from app.indicators.streaming import (
+    IndicatorEngine,
+    RollingStd,
+    StreamingATR,
+    StreamingEMA,
+    StreamingRSI,
+)
+from app.utils.candle_frame import CandleFrame
+from tests.helpers import STEP, random_frame
+
+
+def reference_ema(prices, window):
+    k = 2 / (window + 1)
+    ema = prices[0]
+    for price in prices[1:]:
+        ema = price * k + ema * (1 - k)
+    return ema
+
+
+def reference_rsi(closes, period=14):
+    deltas = np.diff(closes)
+    gains, losses = np.maximum(deltas, 0), np.maximum(-deltas, 0)
+    avg_gain, avg_loss = gains[:period].mean(), losses[:period].mean()
+    for i in range(period, len(deltas)):
+        avg_gain = (avg_gain * (period - 1) + gains[i]) / period
+        avg_loss = (avg_loss * (period - 1) + losses[i]) / period
+    return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+def make_engine():
+    return IndicatorEngine(
+        STEP,
+        ema=StreamingEMA(21),
+        rsi=StreamingRSI(14),
+        atr=StreamingATR(14),
+        volatility=RollingStd(50),
+    )
+
+
+def test_peek_matches_full_recalculation():
+    """Потоковые значения совпадают с пересчетом по всему окну"""
+    frame = random_frame(300)
+    engine = make_engine()
+    engine.sync(frame)
+    values = engine.peek(frame)
+
+    close, high, low = frame.close, frame.high, frame.low
+    tr = np.maximum(high[1:] - low[1:], np.maximum(abs(high[1:] - close[:-1]), abs(low[1:] - close[:-1])))
+    assert values["ema"] == pytest.approx(reference_ema(close, 21), rel=1e-12)
+    assert values["rsi"] == pytest.approx(reference_rsi(close), rel=1e-9)
+    assert values["atr"] == pytest.approx(tr[-14:].mean(), rel=1e-9)
+    assert values["volatility"] == pytest.approx(np.std(np.diff(np.log(close))[-50:]), rel=1e-6)
+
+
+def test_incremental_sync_equals_seeding():
+    """Продвижение по одной свече дает то же, что затравка по всей истории"""
+    frame = random_frame(260)
+    full = make_engine()
+    full.sync(frame)
+
+    step_by_step = make_engine()
+    step_by_step.sync(CandleFrame(frame._data[:, :200]))
+    for end in range(201, 261):
+        # Как в боте: каждый раз приходят последние 100 свечей
+        assert step_by_step.sync(CandleFrame(frame._data[:, end - 100:end])) == 1
+
+    assert step_by_step.last_timestamp == full.last_timestamp
+    for name, value in full.peek(frame).items():
+        assert step_by_step.peek(frame)[name] == pytest.approx(value, rel=1e-9)
+
+
+def test_gap_reseeds_from_frame():
+    """Разрыв в истории - индикаторы пересчитываются по новому кадру"""
+    engine = make_engine()
+    engine.sync(random_frame(100))
+    later = random_frame(100, seed=3, start=1_700_000_000_000 + STEP * 500)
+    assert engine.sync(later) == 99
+
+    fresh = make_engine()
+    fresh.sync(later)
+    assert engine.peek(later) == fresh.peek(later)
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from app.backtest import Backtester
+from app.backtest.sweep import SweepRunner, build_dataset, grid, open_frame, random_samples, refine
+from tests.helpers import liquid_frame
+
+SPACE = {"short_window": [5, 8], "min_risk_reward_ratio": [2.0, 2.5]}
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    frames = {"AUSDT": liquid_frame(1_500, seed=1), "BUSDT": liquid_frame(1_500, seed=2)}
+    build_dataset(frames, str(tmp_path / "dataset"))
+    return str(tmp_path / "dataset"), frames
+
+
+def test_dataset_is_memory_mapped(dataset):
+    """Свечи открываются через mmap без копирования"""
+    directory, frames = dataset
+    frame = open_frame(directory, "AUSDT")
+    assert isinstance(frame.data.base, np.memmap) or isinstance(frame.data, np.memmap)
+    np.testing.assert_array_equal(frame.close, frames["AUSDT"].close)
+
+
+def test_sweep_persists_and_resumes(dataset, tmp_path):
+    """Результаты пишутся в таблицу, повторный запуск считает только недостающее"""
+    directory, frames = dataset
+    db = str(tmp_path / "sweeps.db")
+    combos = grid(SPACE)
+    assert len(combos) == 4
+
+    runner = SweepRunner(directory, list(frames), db_path=db, workers=2)
+    assert runner.run(combos[:2]) == 4
+    # Новый запуск (как после перезапуска) досчитывает только две новые комбинации
+    resumed = SweepRunner(directory, list(frames), db_path=db, workers=2)
+    assert resumed.run(combos) == 4
+    assert resumed.run(combos) == 0
+
+    results = resumed.results()
+    assert len(results) == 4
+    assert all(row["coins"] == 2 for row in results)
+
+    params = combos[3]
+    direct = [Backtester().run_ma(s, f, **params).pnl_pct for s, f in frames.items()]
+    row = next(r for r in results if r["params"] == params)
+    assert row["pnl_pct"] == pytest.approx(np.mean(direct))
+
+
+def test_resume_on_changed_dataset_is_refused(dataset, tmp_path):
+    """Продолжить перебор на других свечах нельзя - результаты бы смешались"""
+    directory, frames = dataset
+    db = str(tmp_path / "sweeps.db")
+    SweepRunner(directory, list(frames), db_path=db, workers=1).run(grid(SPACE)[:1])
+
+    build_dataset({"AUSDT": liquid_frame(1_600, seed=1)}, directory)
+    with pytest.raises(ValueError):
+        SweepRunner(directory, list(frames), db_path=db, workers=1)
+    # Новый перебор на обновленных данных разрешен
+    SweepRunner(directory, list(frames), db_path=db, sweep="fresh", workers=1)
+
+
+def test_grid_rejects_ranges():
+    """Диапазон в сетке не превращается в две крайние точки"""
+    with pytest.raises(ValueError):
+        grid({"short_window": [5, 8], "long_window": (30, 80)})
+
+
+def test_refine_stays_in_bounds():
+    """Уточнение не выходит за границы диапазонов и перечней"""
+    space = {"base_min_cross": (0.0001, 0.001), "long_window": (30, 80), "short_window": [5, 8, 13]}
+    samples = random_samples(space, 20, seed=1)
+    refined = refine(space, samples[:3], 50, seed=2)
+    for params in refined:
+        assert 0.0001 <= params["base_min_cross"] <= 0.001
+        assert isinstance(params["long_window"], int) and 30 <= params["long_window"] <= 80
+        assert params["short_window"] in (5, 8, 13)
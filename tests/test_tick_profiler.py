@@ -0,0 +1,49 @@
+import json
+import time
+from unittest.mock import patch
+
+from app.utils.tick_profiler import Histogram, TickProfiler
+
+
+def test_phases_are_split_by_marks():
+    """Время тика раскладывается по фазам между отметками"""
+    profiler = TickProfiler("test", report_every=0)
+    for _ in range(3):
+        profiler.start_tick("price")
+        time.sleep(0.02)
+        profiler.mark("indicators")
+        profiler.mark("filters")
+        time.sleep(0.005)
+        profiler.end_tick()
+
+    data = profiler.snapshot()
+    assert data["tick"]["count"] == 3
+    assert set(data["phases"]) == {"price", "indicators", "filters"}
+    assert data["phases"]["price"]["mean_ms"] >= 20
+    assert data["phases"]["indicators"]["max_ms"] < data["phases"]["price"]["max_ms"]
+    assert data["phases"]["price"]["buckets"]["50"] == 3
+
+
+def test_slow_tick_is_flagged(tmp_path):
+    """Тик дольше бюджета попадает в лог, гистограммы выгружаются в JSON"""
+    path = tmp_path / "profile.json"
+    profiler = TickProfiler("test", budget_ms=5, report_every=2, export_path=str(path))
+    with patch("app.utils.tick_profiler.log_maker") as log:
+        profiler.start_tick("state_sync")
+        profiler.end_tick()
+        profiler.start_tick("price")
+        time.sleep(0.02)
+        profiler.end_tick()
+
+    assert profiler.slow_ticks == 1
+    assert "price" in log.call_args_list[0].args[0]
+    assert json.loads(path.read_text())["tick"]["count"] == 2
+
+
+def test_histogram_percentiles():
+    """Процентили считаются по границам корзин"""
+    hist = Histogram()
+    for ms in [0.5] * 90 + [700] * 10:
+        hist.add(ms)
+    assert hist.percentile(50) == 1
+    assert hist.percentile(95) == 700
@@ -0,0 +1,47 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.bybit_service import BybitService
+
+
+def tickers_response():
+    response = MagicMock()
+    response.json.return_value = {
+        "retCode": 0,
+        "result": {"list": [
+            {"symbol": "SOLUSDT", "lastPrice": "101.5", "bid1Price": "101.4",
+             "ask1Price": "101.6", "volume24h": "12000"},
+            {"symbol": "ADAUSDT", "lastPrice": "0.35", "bid1Price": "0.3499",
+             "ask1Price": "0.3501", "volume24h": "5000000"},
+        ]},
+    }
+    return response
+
+
+@pytest.fixture
+def bybit():
+    session = MagicMock()
+    session.get.return_value = tickers_response()
+    return BybitService(session=session)
+
+
+def test_prices_for_many_symbols_in_one_request(bybit):
+    """Цены всех монет берутся из одного снимка тикеров"""
+    prices = bybit.get_prices(["SOLUSDT", "ADAUSDT", "XXXUSDT"])
+    assert prices == {"SOLUSDT": 101.5, "ADAUSDT": 0.35}
+
+    ticker = bybit.get_all_tickers()["SOLUSDT"]
+    assert (ticker.bid, ticker.ask, ticker.volume) == (101.4, 101.6, 12000.0)
+    # Свежий снимок отвечает и на одиночный запрос цены
+    assert bybit.get_price("ADAUSDT") == 0.35
+    assert bybit.session.get.call_count == 1
+    assert bybit.session.get.call_args.kwargs["params"] == {"category": "spot"}
+
+
+def test_snapshot_expires(bybit):
+    """После ticker_ttl снимок запрашивается заново"""
+    bybit.get_all_tickers()
+    bybit._tickers_at -= bybit.ticker_ttl + 1
+    bybit.get_prices(["SOLUSDT"])
+    assert bybit.session.get.call_count == 2
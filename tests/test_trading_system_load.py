@@ -0,0 +1,35 @@
+import pytest
+
+from benchmarks.trading_system import UNLIMITED, run
+
+
+def test_offline_run_places_orders(tmp_path):
+    """Прогон TradingSystem на стенде: задержка на каждый тик, ордера и их темп"""
+    report = run(coins=2, ticks=200, workdir=str(tmp_path), limits=UNLIMITED,
+                 min_risk_reward_ratio=2.0)
+
+    assert report.ticks == 200
+    assert len(report.latencies_ms) == 200
+    assert all(latency > 0 for latency in report.latencies_ms)
+    assert report.orders >= 1
+    summary = report.to_dict()
+    assert summary["orders_per_second"] == pytest.approx(report.orders / report.seconds)
+    assert summary["p50_ms"] <= summary["p95_ms"] <= summary["max_ms"]
+    assert summary["limiter_wait_seconds"] == 0
+    # Рабочие файлы бота - во временном каталоге
+    assert (tmp_path / "bot_state.json").exists()
+
+
+def test_run_goes_through_exchange_limits(tmp_path):
+    """По умолчанию запросы проходят через лимиты Bybit, очередь видна в отчете"""
+    report = run(coins=2, ticks=10, workdir=str(tmp_path))
+
+    assert report.ticks == 10
+    assert report.limiter["account"]["requests"] > 0
+    assert report.limiter["market"]["requests"] > 0
+
+
+def test_unknown_param_rejected(tmp_path):
+    """Опечатка в параметре сигнала - ошибка, а не тихий прогон по умолчанию"""
+    with pytest.raises(ValueError):
+        run(coins=1, ticks=1, workdir=str(tmp_path), limits=UNLIMITED, min_rr=2.0)
@@ -0,0 +1,95 @@
+import os
+import queue
+import subprocess
+import sys
+import time
+
+import pytest
+
+from app.backtest.bybit_sim import BookExchange, BybitSimulator
+from app.services.training_pool import TrainingPool, cpu_sets
+from app.strategies.neural_network.runtime import LSTMRuntime
+from app.strategies.neural_network.training_job import TrainingJob
+from tests.helpers import recent_frame
+
+
+def collect(pool: TrainingPool, coins: int, timeout: float = 240) -> list:
+    events, finished = [], 0
+    deadline = time.time() + timeout
+    while finished < coins:
+        event = pool.events.get(timeout=max(deadline - time.time(), 0.1))
+        events.append(event)
+        finished += event["type"] in ("done", "failed")
+    return events
+
+
+def test_cpu_sets_keep_reserved_cores():
+    """Слоты делят ядра без зарезервированных за торговым процессом"""
+    available = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else [0]
+    sets = cpu_sets(2, reserved=1)
+    assert len(sets) == 2 and all(sets)
+    if len(available) > 1:
+        assert available[0] not in sum(sets, [])
+
+
+def test_cancel_drops_pending_job(monkeypatch):
+    """Отмена задания, ждущего слота, снимает его сразу: процесс не
+    запускается, а failed приходит без ожидания слота"""
+    spawned = []
+
+    def spawn(pool, job, cpus):
+        spawned.append(job.coin)
+        return subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"],
+                                stdout=subprocess.PIPE, text=True)
+
+    monkeypatch.setattr(TrainingPool, "_spawn", spawn)
+    pool = TrainingPool(workers=1)
+    try:
+        pool.submit(TrainingJob(coin="A"))
+        pool.submit(TrainingJob(coin="B"))
+        deadline = time.time() + 10
+        while pool.active() != ["A"] and time.time() < deadline:
+            time.sleep(0.01)
+
+        assert pool.cancel("B")
+        event = pool.events.get(timeout=1)
+        assert event["coin"] == "B" and event["type"] == "failed"
+        assert not pool.cancel("B")
+
+        assert pool.cancel("A")
+        assert pool.events.get(timeout=10)["coin"] == "A"
+        time.sleep(0.2)
+        assert spawned == ["A"] and pool.active() == []
+    finally:
+        pool.stop()
+
+
+def test_jobs_train_in_worker_processes(tmp_path, monkeypatch):
+    """Две монеты обучаются в отдельных процессах по данным стенда, ошибка
+    одной не мешает другой, события приходят в очередь"""
+    pytest.importorskip("tensorflow")
+    frames = {"AUSDT": recent_frame(400), "BUSDT": recent_frame(100)}
+    exchange = BookExchange(frames)
+    exchange.cursor = 399
+    models_dir = str(tmp_path / "models")
+    with BybitSimulator(exchange, "5") as simulator:
+        monkeypatch.setenv("BYBIT_REST_URL", simulator.url)
+        pool = TrainingPool(workers=2, cwd=str(tmp_path))
+        try:
+            for coin in ("A", "B"):
+                pool.submit(TrainingJob(coin=coin, epochs=2, days=1, models_dir=models_dir))
+            events = collect(pool, 2)
+        finally:
+            pool.stop()
+
+    by_coin = {coin: [e for e in events if e["coin"] == coin] for coin in ("A", "B")}
+    assert [e["type"] for e in by_coin["A"]] == ["started", "progress", "progress", "done"]
+    assert by_coin["A"][0]["pid"] != os.getpid()
+    assert by_coin["A"][-1]["candles"] >= 180
+    assert by_coin["B"][-1]["type"] == "failed" and "Недостаточно данных" in by_coin["B"][-1]["error"]
+
+    runtime = LSTMRuntime()
+    runtime.load(os.path.join(models_dir, "A_neural_model"))
+    assert runtime.predict(frames["AUSDT"].ohlcv()).shape == (3,)
+    with pytest.raises(queue.Empty):
+        pool.events.get_nowait()
@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+
+from app.services.training_queue import (
+    PRIORITY_ACTIVE,
+    PRIORITY_MISSING,
+    PRIORITY_STALE,
+    TrainingQueue,
+)
+
+
+def drain(queue: TrainingQueue) -> list:
+    coins = []
+    while True:
+        job = queue.get(timeout=0)
+        if job is None:
+            return coins
+        coins.append(job.coin)
+
+
+def test_priority_order_and_dedup(tmp_path):
+    """Активная монета - первой, без модели - по времени постановки,
+    устаревшие - от самой старой; повтор только повышает приоритет"""
+    queue = TrainingQueue(str(tmp_path / "queue.json"))
+    queue.put("OLD", PRIORITY_STALE, order=100)
+    queue.put("OLDER", PRIORITY_STALE, order=50)
+    queue.put("NEW1", PRIORITY_MISSING, order=1)
+    queue.put("NEW2", PRIORITY_MISSING, order=2)
+    queue.put("LIVE", PRIORITY_STALE, order=200)
+
+    assert not queue.put("NEW1", PRIORITY_STALE, order=0)
+    assert queue.promote("LIVE")
+    assert len(queue) == 5
+    assert queue.cancel("NEW2") and not queue.cancel("NEW2")
+    assert drain(queue) == ["LIVE", "NEW1", "OLDER", "OLD"]
+
+
+def test_demote_returns_job_to_its_place(tmp_path):
+    """Задание бывшей активной монеты опускается до обычного приоритета"""
+    queue = TrainingQueue(str(tmp_path / "queue.json"))
+    queue.put("WAS", PRIORITY_MISSING, order=3)
+    queue.put("NEW1", PRIORITY_MISSING, order=1)
+    queue.put("NEW5", PRIORITY_MISSING, order=5)
+    queue.put("STALE", PRIORITY_STALE, order=10)
+    queue.put("OLD", PRIORITY_STALE, order=20)
+    assert queue.promote("WAS") and queue.promote("OLD")
+
+    assert queue.demote("WAS", PRIORITY_MISSING)
+    assert queue.demote("OLD", PRIORITY_STALE, order=20)
+    assert not queue.demote("NEW1", PRIORITY_MISSING)
+    assert not queue.demote("GONE", PRIORITY_STALE)
+    assert drain(queue) == ["NEW1", "WAS", "NEW5", "STALE", "OLD"]
+
+
+def test_failed_job_retries_with_backoff(tmp_path):
+    """Упавшее задание возвращается с растущей паузой, остальные идут без очереди"""
+    queue = TrainingQueue(str(tmp_path / "queue.json"), retry_base=0.2, retry_max=0.3)
+    queue.put("BAD", PRIORITY_ACTIVE)
+    queue.put("GOOD", PRIORITY_STALE, order=1)
+
+    job = queue.get(timeout=0)
+    started = time.time()
+    assert queue.retry(job) == pytest.approx(started + 0.2, abs=0.05)
+    assert queue.get(timeout=0).coin == "GOOD"
+    assert queue.get(timeout=0) is None
+
+    # Ожидающий get просыпается, когда пауза истекает
+    job = queue.get(timeout=2)
+    assert job.coin == "BAD" and time.time() - started >= 0.2
+    queue.retry(job)
+    assert job.attempts == 2 and job.not_before - time.time() == pytest.approx(0.3, abs=0.05)
+
+
+def test_queue_survives_restart(tmp_path):
+    """Очередь и выданные, но не завершенные задания восстанавливаются"""
+    path = str(tmp_path / "queue.json")
+    queue = TrainingQueue(path)
+    queue.put("A", PRIORITY_MISSING, order=1)
+    queue.put("B", PRIORITY_MISSING, order=2)
+    queue.put("C", PRIORITY_MISSING, order=3)
+    assert queue.get().coin == "A"  # обучение A прервано перезапуском
+    assert queue.get().coin == "B"
+    queue.finish("B")
+
+    assert drain(TrainingQueue(path)) == ["A", "C"]
+
+
+def test_waiting_worker_gets_new_job(tmp_path):
+    """Поток, ждущий в get, получает задание сразу после постановки"""
+    queue = TrainingQueue(None)
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(queue.get(timeout=5)))
+    waiter.start()
+    time.sleep(0.1)
+    queue.put("X", PRIORITY_MISSING)
+    waiter.join(2)
+    assert result and result[0].coin == "X"
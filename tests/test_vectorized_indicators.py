@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from app.indicators import vectorized
+from app.indicators.streaming import (
+    IndicatorEngine,
+    RollingStd,
+    StreamingATR,
+    StreamingEMA,
+    StreamingRSI,
+)
+from app.utils.candle_frame import CandleFrame
+from benchmarks.indicators import loop_ema, loop_rsi, loop_true_range, loop_volatility, make_candles
+
+
+def test_series_match_loops():
+    """Векторные ряды совпадают с прежними циклами"""
+    high, low, close = make_candles(2_000)
+    assert vectorized.ema(close, 21)[-1] == pytest.approx(loop_ema(close, 21), rel=1e-12)
+    assert vectorized.rsi(close)[-1] == pytest.approx(loop_rsi(close), rel=1e-9)
+    assert np.allclose(vectorized.true_range(high, low, close), loop_true_range(high, low, close))
+    assert np.std(vectorized.pct_returns(close)) * 100 == pytest.approx(loop_volatility(close))
+
+    x = np.arange(50)
+    assert vectorized.linear_slope(close[:50]) == pytest.approx(np.polyfit(x, close[:50], 1)[0])
+
+
+def test_rows_are_independent_series():
+    """Двумерный вход (монеты x свечи) считается построчно"""
+    series = np.vstack([make_candles(300, seed=s)[2] for s in range(3)])
+    for func in (lambda v: vectorized.ema(v, 8), vectorized.rsi, lambda v: vectorized.rolling_std(v, 20)):
+        batch = func(series)
+        for row in range(3):
+            np.testing.assert_allclose(batch[row], func(series[row]), equal_nan=True)
+
+
+def test_matches_streaming_engine():
+    """Последние значения рядов совпадают с потоковыми индикаторами"""
+    high, low, close = make_candles(400)
+    frame = CandleFrame(np.vstack([np.arange(400) * 60_000.0, close, high, low, close, np.ones(400)]))
+    engine = IndicatorEngine(
+        60_000, ema=StreamingEMA(21), rsi=StreamingRSI(14), atr=StreamingATR(14), vol=RollingStd(50)
+    )
+    engine.sync(frame)
+    values = engine.peek(frame)
+
+    assert values["ema"] == pytest.approx(vectorized.ema(close, 21)[-1])
+    assert values["rsi"] == pytest.approx(vectorized.rsi(close)[-1])
+    assert values["atr"] == pytest.approx(vectorized.atr(high, low, close, 14)[-1])
+    assert values["vol"] == pytest.approx(vectorized.rolling_std(vectorized.log_returns(close), 50)[-1])